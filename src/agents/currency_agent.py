@@ -0,0 +1,178 @@
+"""
+Currency Agent implementation using Azure AI Agent Framework
+
+This module provides function-based tools for converting amounts and stock
+quotes between currencies. Rates come from the process-wide FX table, so a
+batch of quotes costs one rate lookup per currency pair.
+"""
+
+import asyncio
+import logging
+import re
+from typing import Any, Annotated, Dict, Optional
+
+from agent_framework import ai_function
+
+from pydantic import Field
+
+try:
+    from src.agents.middleware import llm_rate_limit
+    from src.utils.concurrency import get_blocking_executor
+    from src.utils.credentials import get_credential
+    from src.utils.exceptions import CurrencyError
+    from src.utils.fx_rates import get_fx_table
+except ImportError:
+    # Fallback for running from src/ directory directly
+    from agents.middleware import llm_rate_limit  # type: ignore
+    from utils.concurrency import get_blocking_executor  # type: ignore
+    from utils.credentials import get_credential  # type: ignore
+    from utils.exceptions import CurrencyError  # type: ignore
+    from utils.fx_rates import get_fx_table  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+# ISO codes recognised in queries such as "price of NVIDIA in SEK"
+KNOWN_CURRENCIES = frozenset({
+    "USD", "EUR", "GBP", "SEK", "NOK", "DKK", "CHF", "JPY", "CAD", "AUD", "NZD", "CNY",
+    "HKD", "SGD", "INR", "KRW", "MXN", "BRL", "ZAR", "PLN", "CZK", "HUF", "ISK",
+})
+
+CURRENCY_NAMES = {
+    "kronor": "SEK", "krona": "SEK", "euro": "EUR", "euros": "EUR", "pound": "GBP",
+    "pounds": "GBP", "sterling": "GBP", "yen": "JPY", "franc": "CHF", "francs": "CHF",
+}
+
+_CODE_RE = re.compile(r"\b(?:in|to|into)\s+([A-Za-z]{3})\b", re.IGNORECASE)
+_NAME_RE = re.compile(r"\b(" + "|".join(CURRENCY_NAMES) + r")\b", re.IGNORECASE)
+
+
+def requested_currency(text: str) -> Optional[str]:
+    """Return the currency a query asks to convert into, if any."""
+    for match in _CODE_RE.finditer(text):
+        code = match.group(1).upper()
+        if code in KNOWN_CURRENCIES:
+            return code
+    name = _NAME_RE.search(text)
+    return CURRENCY_NAMES[name.group(1).lower()] if name else None
+
+
+def convert_currency(
+    amount: Annotated[float, Field(description="The amount to convert.")],
+    from_currency: Annotated[str, Field(description="ISO code of the source currency, e.g. USD.")],
+    to_currency: Annotated[str, Field(description="ISO code of the target currency, e.g. SEK.")],
+) -> Dict[str, Any]:
+    """Convert an amount between currencies using the cached FX table."""
+    rate = get_fx_table().rate(from_currency, to_currency)
+    return {
+        "amount": amount,
+        "from_currency": from_currency.upper(),
+        "to_currency": to_currency.upper(),
+        "rate": rate,
+        "converted": round(amount * rate, 4),
+    }
+
+
+def convert_stock_quotes(
+    quotes: Annotated[Dict[str, Any], Field(
+        description="A fetch_stock_price result, or a fetch_stock_prices result keyed by ticker."
+    )],
+    to_currency: Annotated[str, Field(description="ISO code of the target currency, e.g. SEK.")],
+) -> Dict[str, Any]:
+    """Convert one quote or a batch of quotes into to_currency, keeping the same shape."""
+    table = get_fx_table()
+    to_currency = to_currency.upper()
+    rates: Dict[str, float] = {}
+
+    def convert(quote: Dict[str, Any]) -> Dict[str, Any]:
+        if "error" in quote or "price" not in quote:
+            return quote
+        source = quote.get("currency", "USD").upper()
+        try:
+            if source not in rates:
+                rates[source] = table.rate(source, to_currency)
+        except CurrencyError as e:
+            return {"ticker": quote.get("ticker"), "error": str(e)}
+        return _convert_quote(quote, to_currency, rates[source])
+
+    if "ticker" in quotes:
+        return convert(quotes)
+    return {ticker: convert(quote) for ticker, quote in quotes.items()}
+
+
+def _convert_quote(quote: Dict[str, Any], to_currency: str, rate: float) -> Dict[str, Any]:
+    def scale(value: Optional[float]) -> Optional[float]:
+        return None if value is None else round(value * rate, 4)
+
+    converted = {
+        **quote,
+        "price": scale(quote["price"]),
+        "currency": to_currency,
+        "original_price": quote["price"],
+        "original_currency": quote.get("currency", "USD"),
+        "fx_rate": rate,
+    }
+    change = quote.get("change")
+    if isinstance(change, dict):
+        # Percent changes are currency-independent; absolute amounts scale with the rate
+        converted["change"] = {
+            **change,
+            "absolute": scale(change.get("absolute")),
+            "previous_close": scale(change.get("previous_close")),
+        }
+        if change.get("periods"):
+            converted["change"]["periods"] = {
+                name: {**period, "absolute": scale(period.get("absolute"))}
+                for name, period in change["periods"].items()
+            }
+    return converted
+
+
+async def convert_currency_async(
+    amount: Annotated[float, Field(description="The amount to convert.")],
+    from_currency: Annotated[str, Field(description="ISO code of the source currency, e.g. USD.")],
+    to_currency: Annotated[str, Field(description="ISO code of the target currency, e.g. SEK.")],
+) -> Dict[str, Any]:
+    """Convert an amount between currencies without blocking the event loop."""
+    try:
+        return await get_blocking_executor().run(convert_currency, amount, from_currency, to_currency)
+    except asyncio.TimeoutError:
+        logger.error(f"Timeout fetching exchange rate {from_currency}->{to_currency}")
+        raise CurrencyError(f"Request timeout for {from_currency}->{to_currency}")
+
+
+async def convert_stock_quotes_async(
+    quotes: Annotated[Dict[str, Any], Field(
+        description="A fetch_stock_price result, or a fetch_stock_prices result keyed by ticker."
+    )],
+    to_currency: Annotated[str, Field(description="ISO code of the target currency, e.g. SEK.")],
+) -> Dict[str, Any]:
+    """Convert quotes into to_currency without blocking the event loop."""
+    try:
+        return await get_blocking_executor().run(convert_stock_quotes, quotes, to_currency)
+    except asyncio.TimeoutError:
+        logger.error(f"Timeout fetching exchange rates for {to_currency}")
+        raise CurrencyError(f"Request timeout for {to_currency}")
+
+
+def currency_agent_factory(client=None):
+    """Factory for CurrencyAgent instance for orchestration workflows."""
+    if client is None:
+        from agent_framework.azure import AzureAIAgentClient
+
+        client = AzureAIAgentClient(async_credential=get_credential())
+    agent = client.create_agent(
+        name="CurrencyAgent",
+        instructions=(
+            "You convert stock prices into the currency the user asked for. The conversation already "
+            "contains the stock quotes in their original currency. Convert them with convert_stock_quotes "
+            "(one call for all quotes) or convert_currency for single amounts, then answer with the "
+            "converted prices and the exchange rate used."
+        ),
+        tools=[
+            # Async variants keep FX I/O off the event loop; names stay stable for the model
+            ai_function(convert_currency_async, name="convert_currency"),
+            ai_function(convert_stock_quotes_async, name="convert_stock_quotes"),
+        ],
+        middleware=[llm_rate_limit],
+    )
+    return agent
@@ -0,0 +1,32 @@
+"""
+Chat middleware shared by the orchestrated agents.
+
+Every model call made by StockAgent and CurrencyAgent passes through
+``llm_rate_limit``, so all agents draw from the one LLM token bucket and
+throttled calls are retried with backoff instead of failing the whole workflow.
+"""
+
+import logging
+from typing import Awaitable, Callable
+
+from agent_framework import ChatContext, chat_middleware
+
+try:
+    from src.utils.rate_limit import LLM, get_rate_limiter
+except ImportError:
+    # Fallback for running from src/ directory directly
+    from utils.rate_limit import LLM, get_rate_limiter  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+
+@chat_middleware
+async def llm_rate_limit(context: ChatContext, next: Callable[[ChatContext], Awaitable[None]]) -> None:
+    """Wait for an LLM token before each model call; retry throttled non-streaming calls."""
+    limiter = get_rate_limiter(LLM)
+    if context.is_streaming:
+        # Updates may already have reached the caller, so a streamed call is never replayed
+        await limiter.acquire()
+        await next(context)
+        return
+    await limiter.run(next, context)
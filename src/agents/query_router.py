@@ -0,0 +1,169 @@
+"""
+Deterministic query router for the StockAnalyzerAgent
+
+Plain price questions ("What's the price of Tesla?") are answered directly with
+extract_ticker -> fetch_stock_price -> format_stock_response, skipping the LLM
+workflow. Anything the router is not sure about falls through to the agent.
+"""
+
+import logging
+import re
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    from src.agents.currency_agent import CURRENCY_NAMES, KNOWN_CURRENCIES, requested_currency
+    from src.agents.stock_agent import extract_ticker, fetch_stock_price_async, format_stock_response
+    from src.utils.answer_cache import IntentKey
+    from src.utils.exceptions import StockAnalyzerError
+    from src.utils.market_data import MarketDataProvider
+    from src.utils.symbol_index import get_symbol_index
+except ImportError:
+    # Fallback for running from src/ directory directly
+    from agents.currency_agent import CURRENCY_NAMES, KNOWN_CURRENCIES, requested_currency  # type: ignore
+    from agents.stock_agent import extract_ticker, fetch_stock_price_async, format_stock_response  # type: ignore
+    from utils.answer_cache import IntentKey  # type: ignore
+    from utils.exceptions import StockAnalyzerError  # type: ignore
+    from utils.market_data import MarketDataProvider  # type: ignore
+    from utils.symbol_index import get_symbol_index  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+# Words that signal the user only wants the current price ("worth" and "value"
+# ask for a valuation, which the agent answers differently)
+PRICE_WORDS = frozenset({
+    "price", "prices", "quote", "cost", "costs", "trading", "much",
+})
+
+# Words that may surround a price question without changing its meaning
+FILLER_WORDS = frozenset({
+    "what", "what's", "whats", "is", "are", "the", "of", "for", "stock", "stocks", "share", "shares",
+    "current", "currently", "today", "now", "right", "latest", "how", "does", "do", "at", "a", "an",
+    "me", "show", "get", "give", "tell", "please", "s", "it", "its", "on", "ticker", "symbol", "trade",
+})
+
+# Words of a conversion request ("in SEK", "to euros"); they change the currency, not the intent
+CURRENCY_WORDS = frozenset({"in", "to", "into"}) | {c.lower() for c in KNOWN_CURRENCIES} | CURRENCY_NAMES.keys()
+
+_WORD_RE = re.compile(r"[A-Za-z][A-Za-z']*")
+
+
+@dataclass
+class RouterMetrics:
+    """Counters and timings for fast-path vs agent-path queries."""
+    fast_path_hits: int = 0
+    fallthroughs: int = 0
+    fast_path_errors: int = 0
+    fast_path_seconds: float = 0.0
+    agent_runs: int = 0
+    agent_seconds: float = 0.0
+
+    @property
+    def fast_path_ratio(self) -> float:
+        """Share of routed queries answered without the LLM."""
+        total = self.fast_path_hits + self.fallthroughs + self.fast_path_errors
+        return self.fast_path_hits / total if total else 0.0
+
+    @property
+    def estimated_seconds_saved(self) -> Optional[float]:
+        """Fast-path hits times the average agent-vs-fast-path latency gap, once both are known."""
+        if not self.fast_path_hits or not self.agent_runs:
+            return None
+        avg_fast = self.fast_path_seconds / self.fast_path_hits
+        avg_agent = self.agent_seconds / self.agent_runs
+        return self.fast_path_hits * max(0.0, avg_agent - avg_fast)
+
+    def record_fast_path(self, seconds: float) -> None:
+        self.fast_path_hits += 1
+        self.fast_path_seconds += seconds
+
+    def record_agent_run(self, seconds: float) -> None:
+        self.agent_runs += 1
+        self.agent_seconds += seconds
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            **self.__dict__,
+            "fast_path_ratio": self.fast_path_ratio,
+            "estimated_seconds_saved": self.estimated_seconds_saved,
+        }
+
+
+class QueryRouter:
+    """Routes plain price queries around the LLM workflow."""
+
+    def __init__(self, provider: Optional[MarketDataProvider] = None):
+        """
+        Args:
+            provider: Market-data source for fast-path quotes; defaults to the process-wide provider.
+        """
+        self.provider = provider
+        self.metrics = RouterMetrics()
+
+    def classify(self, query: str) -> Optional[str]:
+        """Return the ticker when query is a plain price question for exactly one ticker, else None."""
+        scanned = self._scan(query, allow_currency=False)
+        return scanned[0] if scanned is not None and scanned[1] else None
+
+    def intent_key(self, query: str) -> Optional[IntentKey]:
+        """Normalize a price question for one ticker, in any currency, to its IntentKey.
+
+        Unlike classify, a bare ticker or company name ("TSLA") counts as a price question.
+        """
+        scanned = self._scan(query, allow_currency=True)
+        if scanned is None:
+            return None
+        return IntentKey(scanned[0], "price", requested_currency(query) or "USD")
+
+    def _scan(self, query: str, allow_currency: bool) -> Optional[Tuple[str, bool]]:
+        """Return (ticker, has_price_word) when query only mentions one ticker besides price and filler words."""
+        ticker = extract_ticker(query)
+        if ticker == "UNKNOWN":
+            return None
+
+        # Blank out company-name mentions so only the remaining words are classified
+        index = get_symbol_index()
+        mentions_ticker = False
+        remainder = query
+        for match in index.find_all(query):
+            if match.ticker != ticker:
+                return None
+            mentions_ticker = True
+            remainder = remainder[:match.start] + " " * (match.end - match.start) + remainder[match.end:]
+
+        has_price_word = False
+        for word in _WORD_RE.findall(remainder):
+            lowered = word.lower()
+            if word == ticker:
+                mentions_ticker = True
+            elif allow_currency and lowered in CURRENCY_WORDS:
+                continue
+            elif index.is_ticker(word):
+                return None
+            elif lowered in PRICE_WORDS:
+                has_price_word = True
+            elif lowered not in FILLER_WORDS:
+                # A currency or some other intent: let the agent decide
+                return None
+        return (ticker, has_price_word) if mentions_ticker else None
+
+    async def try_fast_path(self, query: str) -> Optional[str]:
+        """Answer query without the LLM, or return None so the caller runs the agent."""
+        start = perf_counter()
+        ticker = self.classify(query)
+        if ticker is None:
+            self.metrics.fallthroughs += 1
+            return None
+
+        try:
+            stock_data = await fetch_stock_price_async(ticker, provider=self.provider)
+        except StockAnalyzerError as e:
+            logger.info(f"Fast path failed for {ticker}, falling back to agent: {e}")
+            self.metrics.fast_path_errors += 1
+            return None
+
+        answer = format_stock_response(stock_data)
+        self.metrics.record_fast_path(perf_counter() - start)
+        logger.info(f"Fast path answered '{query}' for {ticker}")
+        return answer
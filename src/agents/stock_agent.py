@@ -6,55 +6,86 @@ ticker extraction, price fetching, and response formatting.
 """
 
 import asyncio
+import functools
+import inspect
 import re
 import logging
-import yfinance as yf
-from datetime import datetime
-from typing import Dict, Any, Annotated
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, Annotated, Awaitable, Callable, List, Optional
 
-from agent_framework.azure import AzureAIAgentClient
-from azure.identity.aio import AzureCliCredential
+from agent_framework import AIFunction, ai_function
 
 from pydantic import Field
 
 try:
-    from src.utils.exceptions import StockNotFoundError, APIRateLimitError
+    from src.agents.middleware import llm_rate_limit
+    from src.utils.exceptions import StockNotFoundError, UpstreamTimeoutError
+    from src.utils.quote_cache import get_quote_cache
+    from src.utils.rate_limit import MARKET_DATA, get_rate_limiter
+    from src.utils.concurrency import get_blocking_executor
+    from src.utils.credentials import get_credential
+    from src.utils.market_data import MarketDataProvider, get_market_data_provider, price_change
+    from src.utils.symbol_index import get_symbol_index
+    from src.utils.tracing import set_attributes, span, traced
+    from src.utils.history_store import get_history_store
+    from src.utils.indicators import compute_indicators, latest_values, load_price_matrix
+    from src.utils.watchlist import current_watchlist_user, get_watchlist_retriever
 except ImportError:
     # Fallback for running from src/ directory directly
-    from utils.exceptions import StockNotFoundError, APIRateLimitError  # type: ignore
+    from agents.middleware import llm_rate_limit  # type: ignore
+    from utils.exceptions import StockNotFoundError, UpstreamTimeoutError  # type: ignore
+    from utils.quote_cache import get_quote_cache  # type: ignore
+    from utils.rate_limit import MARKET_DATA, get_rate_limiter  # type: ignore
+    from utils.concurrency import get_blocking_executor  # type: ignore
+    from utils.credentials import get_credential  # type: ignore
+    from utils.market_data import MarketDataProvider, get_market_data_provider, price_change  # type: ignore
+    from utils.symbol_index import get_symbol_index  # type: ignore
+    from utils.tracing import set_attributes, span, traced  # type: ignore
+    from utils.history_store import get_history_store  # type: ignore
+    from utils.indicators import compute_indicators, latest_values, load_price_matrix  # type: ignore
+    from utils.watchlist import current_watchlist_user, get_watchlist_retriever  # type: ignore
 
 logger = logging.getLogger(__name__)
 
+# Candidate ticker symbols in free text: standalone runs of 1-5 uppercase letters
+_TICKER_CANDIDATE_RE = re.compile(r'\b[A-Z]{1,5}\b')
 
+# All-caps words that are well-formed but are not meant as tickers
+_NOT_TICKERS = frozenset({
+    "I", "A", "OK", "CEO", "CFO", "IPO", "ETF", "EPS", "PE", "RSI", "SMA", "EMA", "MACD",
+    "USA", "US", "EU", "UK", "AI", "API",
+    "USD", "EUR", "GBP", "SEK", "NOK", "DKK", "CHF", "JPY", "CAD", "AUD", "NZD", "CNY",
+})
+
+
+@traced("tool.extract_ticker", result=lambda ticker: {"stock.ticker": ticker})
 def extract_ticker(
     query: Annotated[str, Field(description="The user query to extract stock ticker from.")]
 ) -> str:
-    """Extract stock ticker from natural language query using regex patterns."""
-    if not query or not query.strip():
+    """Extract stock ticker from natural language query.
+
+    Company names, aliases and tickers in the listed-securities index win; failing
+    that, the first well-formed symbol (1-5 uppercase letters, not a common
+    acronym) is returned so tickers missing from the index still resolve.
+    """
+    if not query or query.isspace():
         return "UNKNOWN"
     
-    # Company name to ticker mapping
-    ticker_map = {
-        'tesla': 'TSLA',
-        'apple': 'AAPL',
-        'microsoft': 'MSFT',
-        'amazon': 'AMZN',
-        'google': 'GOOGL',
-        'meta': 'META',
-        'nvidia': 'NVDA'
-    }
+    index = get_symbol_index()
+
+    # Check for company names and aliases first
+    ticker = index.find_company(query)
+    if ticker:
+        return ticker
     
-    # Check for company names first
-    query_lower = query.lower()
-    for company, ticker in ticker_map.items():
-        if company in query_lower:
+    # Look for direct ticker symbols that are actually listed
+    for ticker in _TICKER_CANDIDATE_RE.findall(query):
+        if index.is_ticker(ticker):
             return ticker
-    
-    # Look for direct ticker symbols
-    ticker_match = re.search(r'\b([A-Z]{1,5})\b', query)
-    if ticker_match:
-        ticker = ticker_match.group(1)
-        if validate_ticker(ticker):
+
+    # Fall back to well-formed symbols the index does not list
+    for ticker in _TICKER_CANDIDATE_RE.findall(query):
+        if ticker not in _NOT_TICKERS and validate_ticker(ticker):
             return ticker
     
     return "UNKNOWN"
@@ -65,80 +96,294 @@ def validate_ticker(ticker: str) -> bool:
     if not ticker or ticker == "UNKNOWN":
         return False
     
-    # Basic validation: 1-5 uppercase letters
-    pattern = r'^[A-Z]{1,5}$'
-    return bool(re.match(pattern, ticker))
+    # Basic validation: 1-5 uppercase ASCII letters, checked without building a match object
+    return len(ticker) <= 5 and ticker.isascii() and ticker.isalpha() and ticker.isupper()
 
 
+@traced("fetch_stock_price", lambda ticker, include_periods=False, provider=None: {
+    "stock.ticker": ticker, "stock.include_periods": include_periods,
+})
 def fetch_stock_price(
-    ticker: Annotated[str, Field(description="The stock ticker symbol to fetch price for.")]
+    ticker: Annotated[str, Field(description="The stock ticker symbol to fetch price for.")],
+    include_periods: Annotated[bool, Field(description="Also report 1-week, 1-month and year-to-date change.")] = False,
+    provider: Optional[MarketDataProvider] = None,
 ) -> Dict[str, Any]:
-    """Fetch current stock price for given ticker using yfinance."""
+    """Fetch current stock price for given ticker, served from the quote cache when possible.
+
+    provider defaults to the process-wide market-data provider (MARKET_DATA_PROVIDERS).
+    """
+    # Validate ticker format before touching the cache so bad input is never cached
+    if not validate_ticker(ticker):
+        raise StockNotFoundError(f"Invalid ticker format: {ticker}")
+
+    provider = provider or get_market_data_provider()
+    fetched = []
+
+    def fetch() -> Dict[str, Any]:
+        fetched.append(True)
+        with span("market_data.quote", **{"market_data.provider": provider.name, "stock.ticker": ticker}):
+            return provider.quote(ticker)
+
+    cache = get_quote_cache()
+    result = fetch() if cache is None else cache.get_or_fetch(ticker, fetch)
+    set_attributes(**{"cache.hit": not fetched})
+    if include_periods:
+        result["change"] = {**result["change"], "periods": _period_changes(ticker, result["price"])}
+    return result
+
+
+def _period_changes(ticker: str, price: float) -> Dict[str, Any]:
+    """1w/1m/YTD change against daily closes from the local history store."""
+    now = datetime.now(timezone.utc)
+    references = {
+        "1w": now - timedelta(days=7),
+        "1m": now - timedelta(days=30),
+        "ytd": datetime(now.year, 1, 1, tzinfo=timezone.utc) - timedelta(seconds=1),
+    }
     try:
-        logger.info(f"Fetching stock price for {ticker}")
-        
-        # Validate ticker format
+        # One range covering every reference point; a few spare days for holidays
+        history = get_history_store().get(ticker, min(references.values()) - timedelta(days=7), now)
+    except Exception as e:
+        logger.warning(f"History unavailable for {ticker}, skipping period changes: {e}")
+        return {}
+
+    periods: Dict[str, Any] = {}
+    for name, when in references.items():
+        # Last close at or before the reference time
+        i = int(history.timestamps.searchsorted(int(when.timestamp()), side="right")) - 1
+        if i >= 0:
+            periods[name] = price_change(price, float(history.close[i]))
+    return periods
+
+
+@traced("fetch_stock_prices", lambda tickers, provider=None: {"stock.tickers": tickers})
+def fetch_stock_prices(
+    tickers: Annotated[List[str], Field(description="The stock ticker symbols to fetch prices for.")],
+    provider: Optional[MarketDataProvider] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """Fetch current stock prices for several tickers with one batch request to the provider.
+
+    Returns a dict keyed by ticker. Each value is either the same result dict that
+    fetch_stock_price returns, or {"ticker": ..., "error": ...} for tickers that failed.
+    """
+    unique_tickers = list(dict.fromkeys(tickers))
+    results: Dict[str, Dict[str, Any]] = {}
+    missing: List[str] = []
+    cache = get_quote_cache()
+
+    for ticker in unique_tickers:
         if not validate_ticker(ticker):
-            raise StockNotFoundError(f"Invalid ticker format: {ticker}")
-        
-        # Get stock data from yfinance
-        stock = yf.Ticker(ticker)
-        info = stock.info
-        
-        # Check if ticker exists
-        if not info or 'regularMarketPrice' not in info:
-            # Try alternative method
-            hist = stock.history(period="1d")
-            if hist.empty:
-                raise StockNotFoundError(f"Stock not found: {ticker}")
-            current_price = float(hist['Close'].iloc[-1])
-            company_name = info.get('longName', ticker)
+            results[ticker] = {"ticker": ticker, "error": f"Invalid ticker format: {ticker}"}
+            continue
+        cached = cache.get(ticker) if cache is not None else None
+        if cached is not None:
+            results[ticker] = cached
         else:
-            current_price = float(info['regularMarketPrice'])
-            company_name = info.get('longName', ticker)
-        
-        # Calculate change (simplified for now)
-        change = "+0.00%"  # TODO: Implement proper change calculation
-        
-        result = {
-            "ticker": ticker,
-            "company_name": company_name,
-            "price": current_price,
-            "currency": info.get('currency', 'USD'),
-            "timestamp": datetime.now().isoformat(),
-            "change": change
-        }
-        
-        logger.info(f"Successfully fetched {ticker}: ${current_price}")
-        return result
-        
-    except TimeoutError as e:
-        logger.error(f"Timeout fetching {ticker}: {e}")
-        raise APIRateLimitError(f"Request timeout for {ticker}")
-    except StockNotFoundError:
-        raise
-    except Exception as e:
-        logger.error(f"Failed to fetch {ticker}: {e}")
-        raise StockNotFoundError(f"Failed to fetch stock data for {ticker}: {e}")
+            missing.append(ticker)
+
+    set_attributes(**{"cache.hits": len(unique_tickers) - len(missing)})
+    if missing:
+        provider = provider or get_market_data_provider()
+        with span("market_data.quotes", **{"market_data.provider": provider.name, "stock.tickers": missing}):
+            fetched = provider.quotes(missing)
+        for ticker, result in fetched.items():
+            if cache is not None and "error" not in result:
+                cache.put(ticker, result)
+            results[ticker] = result
+
+    return {ticker: results[ticker] for ticker in unique_tickers}
 
 
+@traced("tool.fetch_stock_price", lambda ticker, include_periods=False, provider=None: {
+    "stock.ticker": ticker, "stock.include_periods": include_periods,
+})
+async def fetch_stock_price_async(
+    ticker: Annotated[str, Field(description="The stock ticker symbol to fetch price for.")],
+    include_periods: Annotated[bool, Field(description="Also report 1-week, 1-month and year-to-date change.")] = False,
+    provider: Optional[MarketDataProvider] = None,
+) -> Dict[str, Any]:
+    """Fetch current stock price for given ticker without blocking the event loop."""
+    if validate_ticker(ticker) and not include_periods:
+        cache = get_quote_cache()
+        cached = cache.get(ticker) if cache is not None else None
+        if cached is not None:
+            set_attributes(**{"cache.hit": True})
+            return cached
+    try:
+        return await get_rate_limiter(MARKET_DATA).run(
+            get_blocking_executor().run, fetch_stock_price, ticker, include_periods, provider
+        )
+    except asyncio.TimeoutError:
+        logger.error(f"Timeout fetching {ticker}")
+        raise UpstreamTimeoutError(f"Request timeout for {ticker}")
+
+
+@traced("tool.fetch_stock_prices", lambda tickers, provider=None: {"stock.tickers": tickers})
+async def fetch_stock_prices_async(
+    tickers: Annotated[List[str], Field(description="The stock ticker symbols to fetch prices for.")],
+    provider: Optional[MarketDataProvider] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """Fetch current stock prices for several tickers without blocking the event loop."""
+    cache = get_quote_cache()
+    if cache is not None and all(validate_ticker(t) for t in tickers):
+        cached: Dict[str, Dict[str, Any]] = {}
+        for ticker in dict.fromkeys(tickers):
+            quote = cache.get(ticker)
+            if quote is None:
+                break
+            cached[ticker] = quote
+        else:
+            set_attributes(**{"cache.hits": len(cached)})
+            return cached
+    try:
+        return await get_rate_limiter(MARKET_DATA).run(get_blocking_executor().run, fetch_stock_prices, tickers, provider)
+    except asyncio.TimeoutError:
+        logger.error(f"Timeout bulk fetching {tickers}")
+        return {t: {"ticker": t, "error": f"Request timeout for {t}"} for t in dict.fromkeys(tickers)}
+
+
+def compute_technical_indicators(
+    tickers: Annotated[List[str], Field(description="The stock ticker symbols to analyze.")],
+    lookback_days: Annotated[int, Field(description="Days of daily history to compute the indicators over.")] = 365,
+) -> Dict[str, Dict[str, Any]]:
+    """Compute SMA/EMA/RSI/MACD/Bollinger/ATR/volatility for several tickers from daily history.
+
+    Returns a dict keyed by ticker with the latest value of each indicator, or
+    {"ticker": ..., "error": ...} for tickers that failed.
+    """
+    unique_tickers = list(dict.fromkeys(tickers))
+    results: Dict[str, Dict[str, Any]] = {}
+    valid = []
+    for ticker in unique_tickers:
+        if validate_ticker(ticker):
+            valid.append(ticker)
+        else:
+            results[ticker] = {"ticker": ticker, "error": f"Invalid ticker format: {ticker}"}
+
+    if valid:
+        start = datetime.now(timezone.utc) - timedelta(days=lookback_days)
+        errors: Dict[str, Exception] = {}
+        high, low, close = load_price_matrix(valid, start, errors=errors)
+        latest = latest_values(compute_indicators(high, low, close)) if not close.empty else {}
+        for ticker in valid:
+            values = latest.get(ticker)
+            if ticker in errors:
+                logger.error(f"Failed to load history for {ticker}: {errors[ticker]}")
+                results[ticker] = {"ticker": ticker, "error": f"Failed to load price history for {ticker}"}
+            elif values is None or values["close"] is None:
+                results[ticker] = {"ticker": ticker, "error": f"No price history for {ticker}"}
+            else:
+                results[ticker] = {"ticker": ticker, **values}
+
+    return {ticker: results[ticker] for ticker in unique_tickers}
+
+
+@traced("tool.compute_technical_indicators", lambda tickers, lookback_days=365: {
+    "stock.tickers": tickers, "indicators.lookback_days": lookback_days,
+})
+async def compute_technical_indicators_async(
+    tickers: Annotated[List[str], Field(description="The stock ticker symbols to analyze.")],
+    lookback_days: Annotated[int, Field(description="Days of daily history to compute the indicators over.")] = 365,
+) -> Dict[str, Dict[str, Any]]:
+    """Compute technical indicators for several tickers without blocking the event loop."""
+    try:
+        return await get_rate_limiter(MARKET_DATA).run(
+            get_blocking_executor().run, compute_technical_indicators, tickers, lookback_days
+        )
+    except asyncio.TimeoutError:
+        logger.error(f"Timeout computing indicators for {tickers}")
+        return {t: {"ticker": t, "error": f"Request timeout for {t}"} for t in dict.fromkeys(tickers)}
+
+
+def search_watchlist(
+    query: Annotated[str, Field(description="What to look for in the user's watchlist.")],
+    k: Annotated[int, Field(description="Maximum number of entries to return.")] = 5,
+    user: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """Return the current user's watchlist entries most relevant to query."""
+    return get_watchlist_retriever().search(user or current_watchlist_user(), query, k)
+
+
+@traced("tool.search_watchlist", lambda query, k=5: {"watchlist.k": k})
+async def search_watchlist_async(
+    query: Annotated[str, Field(description="What to look for in the user's watchlist.")],
+    k: Annotated[int, Field(description="Maximum number of entries to return.")] = 5,
+) -> List[Dict[str, Any]]:
+    """Search the current user's watchlist without blocking the event loop."""
+    # Resolve the user here so the sync tool gets it as an explicit argument
+    user = current_watchlist_user()
+    try:
+        return await get_blocking_executor().run(search_watchlist, query, k, user)
+    except asyncio.TimeoutError:
+        logger.error(f"Timeout searching watchlist for {user}")
+        return []
+
+
+@traced("tool.format_stock_response", lambda stock_data: {"stock.ticker": stock_data.get("ticker")})
 def format_stock_response(
     stock_data: Annotated[Dict[str, Any], Field(description="Stock data dictionary to format.")]
 ) -> str:
     """Format stock data into human-readable response."""
-    return (f"{stock_data['company_name']} ({stock_data['ticker']}): "
-            f"${stock_data['price']:.2f} {stock_data['currency']} "
-            f"({stock_data['change']})")
+    response = (f"{stock_data['company_name']} ({stock_data['ticker']}): "
+                f"${stock_data['price']:.2f} {stock_data['currency']}")
 
+    change = stock_data.get('change') or {}
+    parts = []
+    if change.get('percent') is not None:
+        parts.append(f"{change['percent']:+.2f}%")
+    for name, period in (change.get('periods') or {}).items():
+        if period.get('percent') is not None:
+            parts.append(f"{name.upper() if name == 'ytd' else name} {period['percent']:+.2f}%")
+    if parts:
+        response += f" ({', '.join(parts)})"
+    return response
 
-def stock_agent_factory(client=None):
-    """Factory for StockAgent instance for orchestration workflows."""
+
+def _async_tool(tool: Callable[..., Awaitable[Any]], name: str, **bound: Any) -> AIFunction[Any, Any]:
+    """Register an async tool under name, with bound keyword arguments left out of its schema."""
+    @functools.wraps(tool)
+    async def call(*args: Any, **kwargs: Any) -> Any:
+        return await tool(*args, **bound, **kwargs)
+
+    signature = inspect.signature(tool)
+    setattr(call, "__signature__", signature.replace(
+        parameters=[p for p in signature.parameters.values() if p.name not in bound]
+    ))
+    # Typed as returning Any: ai_function cannot infer a result type from a coroutine function
+    wrapped: Callable[..., Any] = call
+    return ai_function(wrapped, name=name)
+
+
+def stock_agent_factory(client=None, provider: Optional[MarketDataProvider] = None):
+    """Factory for StockAgent instance for orchestration workflows.
+
+    provider is the market-data source for the price tools; defaults to the
+    process-wide provider.
+    """
+    provider = provider or get_market_data_provider()
     if client is None:
-        client = AzureAIAgentClient(async_credential=AzureCliCredential())
+        from agent_framework.azure import AzureAIAgentClient
+
+        client = AzureAIAgentClient(async_credential=get_credential())
     agent = client.create_agent(
         name="StockAgent",
-        instructions="You are a helpful stock analysis agent. Use the provided tools to extract tickers, fetch prices, and format responses.",
-        tools=[extract_ticker, fetch_stock_price, format_stock_response],
+        instructions=(
+            "You are a helpful stock analysis agent. Use the provided tools to extract tickers, fetch prices, "
+            "and format responses. When several tickers are requested, fetch them together with fetch_stock_prices. "
+            "Set include_periods when the user asks about weekly, monthly or year-to-date performance. "
+            "Use compute_technical_indicators for moving averages, RSI, MACD, Bollinger bands, ATR or volatility. "
+            "When the user refers to their watchlist or holdings, look the tickers up with search_watchlist."
+        ),
+        tools=[
+            extract_ticker,
+            # Async variants keep market-data I/O off the event loop; names stay stable for the model
+            _async_tool(fetch_stock_price_async, "fetch_stock_price", provider=provider),
+            _async_tool(fetch_stock_prices_async, "fetch_stock_prices", provider=provider),
+            _async_tool(compute_technical_indicators_async, "compute_technical_indicators"),
+            _async_tool(search_watchlist_async, "search_watchlist"),
+            format_stock_response,
+        ],
+        middleware=[llm_rate_limit],
     )
     return agent
 
@@ -6,22 +6,273 @@ multiple specialized agents for comprehensive stock analysis.
 """
 
 import asyncio
+import itertools
 import logging
-from typing import Any
-from contextlib import AsyncExitStack
+import weakref
+from time import perf_counter
+from typing import (
+    Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Literal, Optional, Tuple, Union,
+    overload,
+)
+from contextlib import AsyncExitStack, asynccontextmanager
+from dataclasses import dataclass, field
 
-from agent_framework import WorkflowBuilder
-from agent_framework.azure import AzureAIAgentClient
-from azure.identity.aio import AzureCliCredential
+from agent_framework import (
+    AgentExecutorResponse,
+    AgentRunUpdateEvent,
+    AgentThread,
+    FunctionCallContent,
+    FunctionResultContent,
+    TextContent,
+    WorkflowBuilder,
+    WorkflowOutputEvent,
+)
 
 try:
-    from src.agents.stock_agent import stock_agent_factory
+    from src.agents.stock_agent import stock_agent_factory, validate_ticker
+    from src.agents.currency_agent import currency_agent_factory, requested_currency
+    from src.agents.query_router import QueryRouter
+    from src.utils.answer_cache import IntentKey, answer_cache_metrics, get_answer_cache
+    from src.utils.config import AgentConfig
+    from src.utils.credentials import AZURE_AI_SCOPE, get_credential
+    from src.utils.exceptions import StockNotFoundError
+    from src.utils.market_data import MarketDataProvider
+    from src.utils.quote_hub import QuoteHub, QuoteUpdate, get_quote_hub, quote_hub_metrics
+    from src.utils.rate_limit import rate_limit_metrics
+    from src.utils.tracing import init_tracing, span
 except ImportError:
     # Fallback for running from src/ directory directly
-    from agents.stock_agent import stock_agent_factory  # type: ignore
+    from agents.stock_agent import stock_agent_factory, validate_ticker  # type: ignore
+    from agents.currency_agent import currency_agent_factory, requested_currency  # type: ignore
+    from agents.query_router import QueryRouter  # type: ignore
+    from utils.answer_cache import IntentKey, answer_cache_metrics, get_answer_cache  # type: ignore
+    from utils.config import AgentConfig  # type: ignore
+    from utils.credentials import AZURE_AI_SCOPE, get_credential  # type: ignore
+    from utils.exceptions import StockNotFoundError  # type: ignore
+    from utils.market_data import MarketDataProvider  # type: ignore
+    from utils.quote_hub import QuoteHub, QuoteUpdate, get_quote_hub, quote_hub_metrics  # type: ignore
+    from utils.rate_limit import rate_limit_metrics  # type: ignore
+    from utils.tracing import init_tracing, span  # type: ignore
 
 logger = logging.getLogger(__name__)
 
+# Between the streamed texts of consecutive agents
+AGENT_SEPARATOR = "\n\n"
+
+
+class WorkflowPool:
+    """
+    Pool of built workflows reused across analyze_stock calls.
+
+    A Workflow refuses concurrent runs, so each run borrows one; up to max_size
+    workflows are built lazily and callers beyond that wait for one to be returned.
+    ``created`` counts every workflow that exists, idle or borrowed.
+    """
+
+    def __init__(
+        self,
+        build: Callable[[], Any],
+        max_size: int,
+        reset: Optional[Callable[[Any], None]] = None,
+    ):
+        self._build = build
+        self._reset = reset
+        self.max_size = max_size
+        self.created = 0
+        self._idle: List[Any] = []
+        self._closing = False
+        self._available: Optional[asyncio.Condition] = None
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[Any]:
+        """Borrow a workflow for one run."""
+        workflow = await self._take()
+        try:
+            yield workflow
+        except BaseException:
+            # Don't hand a workflow that failed mid-run to the next caller
+            await self._discard()
+            raise
+        else:
+            await self._give_back(workflow)
+
+    async def close(self) -> None:
+        """Drop all pooled workflows, waiting for borrowed ones to be returned first.
+
+        Callers that ask for a workflow meanwhile wait and get a freshly built one
+        once the pool is empty.
+        """
+        available = self._condition()
+        async with available:
+            self._closing = True
+            self.created -= len(self._idle)
+            self._idle.clear()
+            await available.wait_for(lambda: self.created == 0)
+            self._closing = False
+            available.notify_all()
+
+    def _condition(self) -> asyncio.Condition:
+        if self._available is None:
+            self._available = asyncio.Condition()
+        return self._available
+
+    async def _take(self) -> Any:
+        available = self._condition()
+        async with available:
+            while self._closing or (not self._idle and self.created >= self.max_size):
+                await available.wait()
+            if self._idle:
+                return self._idle.pop()
+            self.created += 1
+        try:
+            return self._build()
+        except BaseException:
+            await self._discard()
+            raise
+
+    async def _give_back(self, workflow: Any) -> None:
+        if self._closing:
+            await self._discard()
+            return
+        if self._reset is not None:
+            self._reset(workflow)
+        available = self._condition()
+        async with available:
+            self._idle.append(workflow)
+            available.notify_all()
+
+    async def _discard(self) -> None:
+        available = self._condition()
+        async with available:
+            self.created -= 1
+            available.notify_all()
+
+
+@dataclass
+class BatchSummary:
+    """Throughput summary for an analyze_many run."""
+    succeeded: int = 0
+    failed: int = 0
+    latencies: List[float] = field(default_factory=list)
+    started_at: float = field(default_factory=perf_counter)
+
+    def record(self, item: Dict[str, Any]) -> None:
+        """Account for one analyze_many result."""
+        if item["ok"]:
+            self.succeeded += 1
+        else:
+            self.failed += 1
+        self.latencies.append(item["latency"])
+
+    def as_dict(self) -> Dict[str, Any]:
+        elapsed = perf_counter() - self.started_at
+        total = self.succeeded + self.failed
+        latencies = sorted(self.latencies)
+        return {
+            "total": total,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "elapsed": round(elapsed, 3),
+            "queries_per_second": round(total / elapsed, 3) if elapsed > 0 else 0.0,
+            "p50_latency": round(latencies[len(latencies) // 2], 3) if latencies else None,
+            "max_latency": round(latencies[-1], 3) if latencies else None,
+        }
+
+
+@dataclass
+class StreamEvent:
+    """
+    One item of a streaming analysis.
+
+    kind is "text" (partial answer text), "tool_call" (text = tool name),
+    "tool_result" or "done" (text = full answer, data = {"ttfb", "total", "fast_path", "cached"}).
+    """
+    kind: str
+    text: str = ""
+    data: Dict[str, Any] = field(default_factory=dict)
+
+
+def _to_stream_events(event: Any) -> List[StreamEvent]:
+    """Translate a workflow streaming event into StreamEvents."""
+    if not isinstance(event, AgentRunUpdateEvent) or event.data is None:
+        return []
+    stream_events = []
+    for content in event.data.contents:
+        if isinstance(content, TextContent) and content.text:
+            stream_events.append(StreamEvent("text", content.text))
+        elif isinstance(content, FunctionCallContent) and content.name:
+            # Argument chunks of a streamed call arrive without a name; report the call once
+            stream_events.append(StreamEvent("tool_call", content.name, {"call_id": content.call_id}))
+        elif isinstance(content, FunctionResultContent):
+            stream_events.append(StreamEvent("tool_result", data={"call_id": content.call_id}))
+    return stream_events
+
+
+class PooledThread(AgentThread):
+    """
+    Agent thread of a pooled workflow that can be emptied between runs.
+
+    A workflow keeps the thread it was built with, so instead of swapping threads
+    on its executors this one delegates to a fresh ``agent.get_new_thread()``
+    that reset() replaces.
+    """
+
+    def __init__(self, agent: Any):
+        super().__init__()
+        self._agent = agent
+        self.reset()
+
+    def reset(self) -> None:
+        """Start over with an empty conversation."""
+        self._thread = self._agent.get_new_thread()
+        self.context_provider = self._thread.context_provider
+
+    @property
+    def is_initialized(self) -> bool:
+        return self._thread.is_initialized
+
+    @property
+    def service_thread_id(self) -> Optional[str]:
+        return self._thread.service_thread_id
+
+    @service_thread_id.setter
+    def service_thread_id(self, service_thread_id: Optional[str]) -> None:
+        self._thread.service_thread_id = service_thread_id
+
+    @property
+    def message_store(self) -> Any:
+        return self._thread.message_store
+
+    @message_store.setter
+    def message_store(self, message_store: Any) -> None:
+        self._thread.message_store = message_store
+
+    async def on_new_messages(self, new_messages: Any) -> None:
+        await self._thread.on_new_messages(new_messages)
+
+    async def serialize(self, **kwargs: Any) -> Dict[str, Any]:
+        return await self._thread.serialize(**kwargs)
+
+
+async def _aiter_queries(queries: Union[Iterable[str], AsyncIterable[str]]) -> AsyncIterator[str]:
+    if isinstance(queries, AsyncIterable):
+        async for query in queries:
+            yield query
+    else:
+        for query in queries:
+            yield query
+
+
+def _needs_conversion(response: Any) -> bool:
+    """Edge condition: hand the StockAgent's answer to the CurrencyAgent only for non-USD requests."""
+    if not isinstance(response, AgentExecutorResponse):
+        return False
+    for message in response.full_conversation or []:
+        if message.role.value == "user":
+            currency = requested_currency(message.text)
+            return currency is not None and currency != "USD"
+    return False
+
 
 class StockAnalyzerAgent:
     """
@@ -30,71 +281,322 @@ class StockAnalyzerAgent:
     As shown in the architecture diagram:
     - Acts as orchestrator that parses intent
     - Calls StockAgent through agent-to-agent workflow calls
-    - StockAgent uses its tools (yfinance API, ticker map, regex/LLM)
+    - StockAgent uses its tools (market-data provider, ticker map, regex/LLM)
+    - CurrencyAgent converts the quotes only when the query asks for another currency
+    - Plain price queries skip the workflow through the deterministic QueryRouter
+    - Repeated price questions are answered from the AnswerCache while their quote is fresh
+    - watch() streams price changes from the QuoteHub's shared poller
     """
     
-    def __init__(self):
-        """Initialize the StockAnalyzerAgent orchestrator."""
+    def __init__(
+        self,
+        enable_fast_path: bool = True,
+        max_workflows: Optional[int] = None,
+        market_data: Optional[MarketDataProvider] = None,
+    ):
+        """Initialize the StockAnalyzerAgent orchestrator.
+
+        market_data is the quote source for the StockAgent and the fast path;
+        defaults to the process-wide provider.
+        """
+        self.market_data = market_data
         self._stack = AsyncExitStack()
         self._client = None
+        self._stock_agent = None
+        self._currency_agent = None
+        self.enable_fast_path = enable_fast_path
+        self.router = QueryRouter(market_data)
+        self._quote_hub: Optional[QuoteHub] = None
+        self._threads: "weakref.WeakKeyDictionary[Any, List[PooledThread]]" = weakref.WeakKeyDictionary()
+        self._workflows = WorkflowPool(
+            lambda: self.create_stock_workflow(),
+            max_workflows or AgentConfig.from_env().max_concurrency,
+            reset=self._reset_threads,
+        )
         logger.info("StockAnalyzerAgent orchestrator initialized")
     
     async def __aenter__(self):
-        credential = await self._stack.enter_async_context(AzureCliCredential())
-        self._client = await self._stack.enter_async_context(
-            AzureAIAgentClient(async_credential=credential)
-        )
+        # The Azure client stack is only needed once a session starts
+        from agent_framework.azure import AzureAIAgentClient
+
+        init_tracing()
+        with span("orchestrator.start"):
+            # Shared across sessions; start minting now so it overlaps agent setup
+            credential = get_credential()
+            credential.prefetch(AZURE_AI_SCOPE)
+            self._client = await self._stack.enter_async_context(
+                AzureAIAgentClient(async_credential=credential)
+            )
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
+        logger.info(f"Router metrics: {self.router.metrics.as_dict()}")
+        logger.info(f"Rate limit metrics: {rate_limit_metrics()}")
+        logger.info(f"Answer cache metrics: {answer_cache_metrics()}")
+        logger.info(f"Quote hub metrics: {quote_hub_metrics()}")
+        if self._quote_hub is not None:
+            self._quote_hub.close()
+            self._quote_hub = None
+        await self._workflows.close()
+        self._stock_agent = None
+        self._currency_agent = None
         await self._stack.aclose()
     
+    def get_stock_agent(self) -> Any:
+        """Return the StockAgent, creating it once per orchestrator lifetime."""
+        if self._stock_agent is None:
+            with span("agent.create", **{"agent.name": "StockAgent"}):
+                self._stock_agent = stock_agent_factory(self._client, self.market_data)
+        return self._stock_agent
+
+    def get_currency_agent(self) -> Any:
+        """Return the CurrencyAgent, creating it once per orchestrator lifetime."""
+        if self._currency_agent is None:
+            with span("agent.create", **{"agent.name": "CurrencyAgent"}):
+                self._currency_agent = currency_agent_factory(self._client)
+        return self._currency_agent
+
     def create_stock_workflow(self) -> Any:
-        """Build WorkflowBuilder graph that runs StockAgent."""
-        stock_agent = stock_agent_factory(self._client)
-
-        workflow = (
-            WorkflowBuilder()
-            .add_agent(stock_agent, id="StockAgent", output_response=True)
-            .set_start_executor(stock_agent)  # must be instance, not string
-            .build()
-        )
+        """Build WorkflowBuilder graph: StockAgent, then CurrencyAgent when a conversion was asked for."""
+        with span("workflow.create"):
+            stock_agent = self.get_stock_agent()
+            currency_agent = self.get_currency_agent()
+
+            threads = [PooledThread(stock_agent), PooledThread(currency_agent)]
+            workflow = (
+                WorkflowBuilder()
+                .add_agent(stock_agent, agent_thread=threads[0], id="StockAgent", output_response=True)
+                .add_agent(currency_agent, agent_thread=threads[1], id="CurrencyAgent", output_response=True)
+                .set_start_executor(stock_agent)  # must be instance, not string
+                .add_edge(stock_agent, currency_agent, condition=_needs_conversion)
+                .build()
+            )
+            self._threads[workflow] = threads
         return workflow
+
+    def _reset_threads(self, workflow: Any) -> None:
+        """Give each agent of a returned workflow an empty thread so runs don't share conversation history."""
+        for thread in self._threads.get(workflow, []):
+            thread.reset()
     
-    async def analyze_stock(self, query: str, stream: bool = True) -> str:
-        """Run orchestrated stock analysis."""
-        logger.info(f"StockAnalyzerAgent orchestrating analysis for: {query}")
-        workflow = self.create_stock_workflow()
+    @overload
+    def analyze_stock(self, query: str, stream: Literal[False] = ...) -> Awaitable[str]: ...
+
+    @overload
+    def analyze_stock(self, query: str, stream: Literal[True]) -> AsyncIterator[StreamEvent]: ...
+
+    def analyze_stock(self, query: str, stream: bool = False) -> Any:
+        """
+        Run orchestrated stock analysis.
 
+        By default this returns an awaitable for the answer. With stream=True it
+        returns an async iterator of StreamEvents instead (text chunks and tool
+        progress as they are produced, then a final "done" event with the full
+        answer and timings).
+        """
+        logger.info(f"StockAnalyzerAgent orchestrating analysis for: {query}")
         if stream:
-            return await self._run_streaming_analysis(workflow, query)
-        else:
-            return await self._run_complete_analysis(workflow, query)
-    
+            return self._stream_analysis(query)
+        return self._complete_analysis(query)
+
+    def _cached_answer(self, query: str) -> Tuple[Optional[IntentKey], Optional[str]]:
+        """Return query's intent key (None when it can't be cached) and the cached answer, if any."""
+        cache = get_answer_cache()
+        if cache is None:
+            return None, None
+        key = self.router.intent_key(query)
+        if key is None:
+            return None, None
+        return key, cache.get(key)
+
+    def _remember_answer(self, key: Optional[IntentKey], answer: Any) -> None:
+        text = answer if isinstance(answer, str) else getattr(answer, "text", None)
+        cache = get_answer_cache()
+        if key is not None and cache is not None and text and text != "No result found":
+            cache.put(key, text)
+
+    async def _complete_analysis(self, query: str) -> str:
+        with span("analyze", **{
+            "analyze.stream": False, "analyze.fast_path": False, "analyze.cached": False,
+        }) as analyze_span:
+            key, cached = self._cached_answer(query)
+            if cached is not None:
+                analyze_span.set_attribute("analyze.cached", True)
+                return cached
+
+            if self.enable_fast_path:
+                answer = await self.router.try_fast_path(query)
+                if answer is not None:
+                    analyze_span.set_attribute("analyze.fast_path", True)
+                    self._remember_answer(key, answer)
+                    return answer
+
+            start = perf_counter()
+            async with self._workflows.acquire() as workflow:
+                result = await self._run_complete_analysis(workflow, query)
+            self.router.metrics.record_agent_run(perf_counter() - start)
+            self._remember_answer(key, result)
+            return result
+
+    async def _stream_analysis(self, query: str) -> AsyncIterator[StreamEvent]:
+        with span("analyze", **{
+            "analyze.stream": True, "analyze.fast_path": False, "analyze.cached": False,
+        }) as analyze_span:
+            start = perf_counter()
+            key, cached = self._cached_answer(query)
+            if cached is not None:
+                analyze_span.set_attribute("analyze.cached", True)
+                elapsed = perf_counter() - start
+                yield StreamEvent("text", cached)
+                yield StreamEvent("done", cached, {
+                    "ttfb": elapsed, "total": elapsed, "fast_path": False, "cached": True,
+                })
+                return
+
+            if self.enable_fast_path:
+                answer = await self.router.try_fast_path(query)
+                if answer is not None:
+                    analyze_span.set_attribute("analyze.fast_path", True)
+                    self._remember_answer(key, answer)
+                    elapsed = perf_counter() - start
+                    yield StreamEvent("text", answer)
+                    yield StreamEvent("done", answer, {
+                        "ttfb": elapsed, "total": elapsed, "fast_path": True, "cached": False,
+                    })
+                    return
+
+            ttfb: Optional[float] = None
+            chunks: List[str] = []
+            text_from: Optional[str] = None  # executor whose text is streaming
+            result: Any = None
+            async with self._workflows.acquire() as workflow:
+                with span("workflow.run", **{"workflow.stream": True}) as run_span:
+                    async for event in workflow.run_stream(query):
+                        if isinstance(event, WorkflowOutputEvent):
+                            result = event.data
+                            continue
+                        for stream_event in _to_stream_events(event):
+                            if ttfb is None:
+                                ttfb = perf_counter() - start
+                                run_span.set_attribute("workflow.ttfb", ttfb)
+                            if stream_event.kind == "text":
+                                if text_from is not None and event.executor_id != text_from:
+                                    # The next agent starts a new paragraph rather than continuing the last word
+                                    chunks.append(AGENT_SEPARATOR)
+                                    yield StreamEvent("text", AGENT_SEPARATOR)
+                                text_from = event.executor_id
+                                chunks.append(stream_event.text)
+                            yield stream_event
+
+            total = perf_counter() - start
+            self.router.metrics.record_agent_run(total)
+            text = getattr(result, "text", None) or "".join(chunks) or "No result found"
+            self._remember_answer(key, text)
+            logger.info(f"Streamed analysis: ttfb={ttfb if ttfb is not None else total:.3f}s total={total:.3f}s")
+            yield StreamEvent("done", text, {
+                "ttfb": ttfb if ttfb is not None else total,
+                "total": total,
+                "fast_path": False,
+                "cached": False,
+            })
+
+    def watch(self, tickers: Iterable[str]) -> AsyncIterator[QuoteUpdate]:
+        """
+        Stream quote updates for tickers, yielding whenever a price changes.
+
+        Subscribers share one poller per process (or per orchestrator when it was
+        given its own market_data provider), so watching adds no upstream calls for
+        tickers someone else already watches. Does not need an Azure session.
+
+        Raises:
+            StockNotFoundError: If a ticker is not a valid symbol
+        """
+        symbols = [t.strip().upper() for t in tickers]
+        for ticker in symbols:
+            if not validate_ticker(ticker):
+                raise StockNotFoundError(f"Invalid ticker format: {ticker}")
+        if self.market_data is None:
+            return get_quote_hub().subscribe(symbols)
+        if self._quote_hub is None:
+            config = AgentConfig.from_env()
+            self._quote_hub = QuoteHub(self.market_data, config.watch_interval, config.watch_queue_size)
+        return self._quote_hub.subscribe(symbols)
+
+    async def analyze_many(
+        self, queries: Union[Iterable[str], AsyncIterable[str]], max_concurrency: int = 4
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Analyze many queries concurrently, yielding one result dict per query as it finishes.
+
+        Queries are pulled lazily from the iterable by max_concurrency workers. Pass an
+        async iterable when producing a query can block (e.g. reading stdin), so the
+        wait doesn't stall the event loop. Each result is {"index", "query", "ok",
+        "result" | "error", "latency"}; a failing query never stops the batch.
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+
+        source = _aiter_queries(queries)
+        next_lock = asyncio.Lock()
+        counter = itertools.count()
+        finished: asyncio.Queue = asyncio.Queue()
+
+        async def next_query() -> Optional[Tuple[int, str]]:
+            # One worker at a time: an async generator can't be advanced concurrently
+            async with next_lock:
+                try:
+                    query = await source.__anext__()
+                except StopAsyncIteration:
+                    return None
+                return next(counter), query
+
+        async def worker() -> None:
+            try:
+                while (item := await next_query()) is not None:
+                    await finished.put(await self._analyze_item(*item))
+            finally:
+                await finished.put(None)
+
+        workers = [asyncio.create_task(worker()) for _ in range(max_concurrency)]
+        try:
+            running = len(workers)
+            while running:
+                item = await finished.get()
+                if item is None:
+                    running -= 1
+                else:
+                    yield item
+            # Surface unexpected worker errors (e.g. the query iterable raised)
+            for task in workers:
+                task.result()
+        finally:
+            for task in workers:
+                task.cancel()
+
+    async def _analyze_item(self, index: int, query: str) -> Dict[str, Any]:
+        """Run one batch query, capturing failures instead of raising."""
+        start = perf_counter()
+        try:
+            result = await self.analyze_stock(query, stream=False)
+            item = {"index": index, "query": query, "ok": True, "result": str(result)}
+        except Exception as e:
+            logger.error(f"Batch query {index} failed: {e}")
+            item = {"index": index, "query": query, "ok": False, "error": f"{type(e).__name__}: {e}"}
+        item["latency"] = round(perf_counter() - start, 4)
+        return item
+
     def _extract_workflow_result(self, events) -> str:
-        """Extract the final result from workflow events."""
+        """Extract the final result from workflow events (the last agent's output wins)."""
+        result = "No result found"
         for event in events:
             if hasattr(event, 'data') and event.__class__.__name__ == 'WorkflowOutputEvent':
-                return event.data
-        return "No result found"
-    
-    async def _run_streaming_analysis(self, workflow: Any, query: str) -> str:
-        """Run orchestrated analysis with simulated streaming output."""
-        print(f"🔍 [StockAnalyzerAgent] Orchestrating analysis: {query}\n")
-
-        events = await workflow.run(query)
-        result = self._extract_workflow_result(events)
-        
-        # print("\n\n" + "=" * 60)
-        # print("📊 ORCHESTRATED STOCK ANALYSIS")
-        # print("=" * 60)
-        # print(result)
-
+                result = event.data
         return result
     
     async def _run_complete_analysis(self, workflow: Any, query: str) -> str:
         """Run orchestrated analysis without streaming."""
-        events = await workflow.run(query)
+        with span("workflow.run", **{"workflow.stream": False}):
+            events = await workflow.run(query)
         return self._extract_workflow_result(events)
     
 
@@ -104,7 +606,10 @@ async def main() -> None:
     print("=== StockAnalyzerAgent orchestrating StockAgent via Workflow ===\n")
     async with StockAnalyzerAgent() as orchestrator:
         query = "What's the price of Tesla?"
-        await orchestrator.analyze_stock(query, stream=True)
+        async for event in orchestrator.analyze_stock(query, stream=True):
+            if event.kind == "text":
+                print(event.text, end="", flush=True)
+        print()
 
 
 
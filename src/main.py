@@ -1,26 +1,135 @@
 """Main CLI interface for the Agentic AI Stock Analyzer"""
 
+import argparse
 import asyncio
+import json
 import logging
 import sys
-from dotenv import load_dotenv
-from agents.stock_orchestrator import StockAnalyzerAgent
+from contextlib import aclosing
+from typing import TYPE_CHECKING, AsyncIterator, TextIO
+from utils.watchlist import current_watchlist_user, watchlist_user
 
-# Load environment variables from .env file
-load_dotenv()
+if TYPE_CHECKING:
+    from agents.stock_orchestrator import BatchSummary, StockAnalyzerAgent
+
+# The orchestrator (agent_framework, Azure identity) is imported inside main() once
+# the arguments are known, so --help and argument errors return immediately.
+# utils.config loads .env when the orchestrator is imported.
 
 # Suppress agent_framework warnings
 logging.getLogger("agent_framework._clients").setLevel(logging.ERROR)
 logging.getLogger("agent_framework").setLevel(logging.ERROR)
 
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Agentic AI Stock Analyzer")
+    parser.add_argument("query", nargs="*", help="Stock query; prompts for one when omitted")
+    parser.add_argument(
+        "--batch", metavar="FILE",
+        help="Read one query per line from FILE ('-' for stdin) and stream JSONL results"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=4,
+        help="Maximum number of batch queries in flight (default: 4)"
+    )
+    parser.add_argument(
+        "--watch", metavar="TICKERS",
+        help="Print live price changes for comma-separated TICKERS until interrupted"
+    )
+    parser.add_argument(
+        "--user", help="Whose watchlist the agent may search (default: WATCHLIST_USER)"
+    )
+    return parser.parse_args(argv)
+
+
+async def read_queries(source: TextIO) -> AsyncIterator[str]:
+    """Yield non-empty, stripped lines from source.
+
+    Lines are read in a worker thread, so waiting for input (e.g. a slow pipe on
+    stdin) doesn't stall the queries already being analyzed.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        line = await loop.run_in_executor(None, source.readline)
+        if not line:
+            return
+        query = line.strip()
+        if query:
+            yield query
+
+
+async def run_batch(orchestrator: "StockAnalyzerAgent", source: TextIO, concurrency: int) -> "BatchSummary":
+    """Print one JSON line per finished query, then a throughput summary on stderr."""
+    from agents.stock_orchestrator import BatchSummary
+
+    summary = BatchSummary()
+    async for item in orchestrator.analyze_many(read_queries(source), max_concurrency=concurrency):
+        summary.record(item)
+        print(json.dumps(item), flush=True)
+    print(json.dumps({"summary": summary.as_dict()}), file=sys.stderr)
+    return summary
+
+
+async def print_streaming_analysis(orchestrator: "StockAnalyzerAgent", query: str) -> None:
+    """Print answer text as it streams, tool progress and timings on stderr."""
+    print(f"🔍 [StockAnalyzerAgent] Orchestrating analysis: {query}\n", file=sys.stderr)
+    printed_text = False
+    async for event in orchestrator.analyze_stock(query, stream=True):
+        if event.kind == "text":
+            print(event.text, end="", flush=True)
+            printed_text = True
+        elif event.kind == "tool_call":
+            print(f"🛠️  calling {event.text}...", file=sys.stderr, flush=True)
+        elif event.kind == "done":
+            if not printed_text:
+                print(event.text, end="")
+            print()
+            print(
+                f"⏱️  first output after {event.data['ttfb']:.2f}s, total {event.data['total']:.2f}s",
+                file=sys.stderr,
+            )
+
+
+async def print_quote_updates(orchestrator: "StockAnalyzerAgent", tickers: str) -> None:
+    """Print one line per price change; needs no Azure session."""
+    async with aclosing(orchestrator.watch(t for t in tickers.split(",") if t.strip())) as updates:
+        async for update in updates:
+            change = "" if update.previous_price is None else f" ({update.price - update.previous_price:+.2f})"
+            print(f"{update.ticker} {update.price:.2f} {update.quote['currency']}{change}", flush=True)
+
+
 async def main():
-    if len(sys.argv) > 1:
-        query = " ".join(sys.argv[1:])
-    else:
-        query = input("Enter your stock query: ").strip()
-    async with StockAnalyzerAgent() as orchestrator:
-        result = await orchestrator.analyze_stock(query, stream=True)
-        print(result)
+    args = parse_args()
+    from agents.stock_orchestrator import StockAnalyzerAgent
+
+    if args.watch:
+        from utils.quote_hub import get_quote_hub
+
+        # Watching needs no Azure session, so the orchestrator is not entered;
+        # stop the shared poller here instead
+        try:
+            await print_quote_updates(StockAnalyzerAgent(), args.watch)
+        finally:
+            get_quote_hub().close()
+        return
+
+    with watchlist_user(args.user or current_watchlist_user()):
+        if args.batch:
+            source = sys.stdin if args.batch == "-" else open(args.batch, encoding="utf-8")
+            try:
+                async with StockAnalyzerAgent() as orchestrator:
+                    await run_batch(orchestrator, source, args.concurrency)
+            finally:
+                if source is not sys.stdin:
+                    source.close()
+            return
+
+        if args.query:
+            query = " ".join(args.query)
+        else:
+            query = input("Enter your stock query: ").strip()
+        async with StockAnalyzerAgent() as orchestrator:
+            await print_streaming_analysis(orchestrator, query)
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
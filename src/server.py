@@ -0,0 +1,415 @@
+"""
+Long-running HTTP service for the Agentic AI Stock Analyzer
+
+Keeps one StockAnalyzerAgent (credential, agent client, pooled workflows) and the
+process-wide quote cache warm for the lifetime of the process, so requests skip
+the interpreter start-up, imports and credential acquisition that every one-shot
+CLI invocation pays for.
+
+Endpoints:
+    GET  /health                          -> {"status": "ok"}
+    GET  /metrics                         -> {"rate_limits": {upstream: queue/retry counters},
+                                              "answer_cache": hit/miss counters or null,
+                                              "quote_hub": poll/subscriber counters or null}
+    GET  /quote?ticker=TSLA               -> quote JSON
+    GET  /quote?tickers=TSLA,AAPL         -> {ticker: quote} JSON from one bulk fetch
+    GET  /watch?tickers=TSLA,AAPL         -> chunked NDJSON stream of {"kind": "quote", "text": ticker,
+                                             "data": update} events, one per price change
+    POST /analyze {"query": ..., "user": ...}   (or GET /analyze?query=...)
+         -> chunked NDJSON stream of {"kind", "text", "data"} events;
+            add "stream": false (or ?stream=false) for a single JSON answer.
+            "user" picks the watchlist and is only accepted from loopback
+            connections; remote callers get WATCHLIST_USER (403 if they pass one)
+
+Run with:
+    python -m src.server [--host 127.0.0.1] [--port 8080]
+"""
+
+import argparse
+import asyncio
+import ipaddress
+import json
+import logging
+import signal
+from dataclasses import asdict, dataclass, field
+from http import HTTPStatus
+from typing import Any, AsyncIterator, Dict, Optional, Set
+from urllib.parse import parse_qs, urlsplit
+
+try:
+    from src.agents.stock_orchestrator import StockAnalyzerAgent
+    from src.agents.stock_agent import fetch_stock_price_async, fetch_stock_prices_async
+    from src.utils.answer_cache import answer_cache_metrics
+    from src.utils.config import AgentConfig
+    from src.utils.exceptions import (
+        APIRateLimitError, StockNotFoundError, UpstreamTimeoutError, UpstreamUnavailableError,
+    )
+    from src.utils.quote_hub import quote_hub_metrics
+    from src.utils.rate_limit import rate_limit_metrics
+    from src.utils.symbol_index import get_symbol_index
+    from src.utils.watchlist import current_watchlist_user, watchlist_user
+except ImportError:
+    # Fallback for running from src/ directory directly
+    from agents.stock_orchestrator import StockAnalyzerAgent  # type: ignore
+    from agents.stock_agent import fetch_stock_price_async, fetch_stock_prices_async  # type: ignore
+    from utils.answer_cache import answer_cache_metrics  # type: ignore
+    from utils.config import AgentConfig  # type: ignore
+    from utils.exceptions import (  # type: ignore
+        APIRateLimitError, StockNotFoundError, UpstreamTimeoutError, UpstreamUnavailableError,
+    )
+    from utils.quote_hub import quote_hub_metrics  # type: ignore
+    from utils.rate_limit import rate_limit_metrics  # type: ignore
+    from utils.symbol_index import get_symbol_index  # type: ignore
+    from utils.watchlist import current_watchlist_user, watchlist_user  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 64 * 1024
+
+_REASONS = {status.value: status.phrase for status in HTTPStatus}
+
+
+class HTTPError(Exception):
+    """Error that maps directly to an HTTP status."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+@dataclass
+class Request:
+    """A parsed HTTP/1.1 request."""
+    method: str
+    path: str
+    query: Dict[str, str] = field(default_factory=dict)
+    headers: Dict[str, str] = field(default_factory=dict)
+    body: bytes = b""
+    version: str = "HTTP/1.1"
+
+    @property
+    def keep_alive(self) -> bool:
+        connection = self.headers.get("connection", "").lower()
+        if self.version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+    def json(self) -> Dict[str, Any]:
+        if not self.body:
+            return {}
+        try:
+            payload = json.loads(self.body)
+        except ValueError:
+            raise HTTPError(400, "Body is not valid JSON")
+        if not isinstance(payload, dict):
+            raise HTTPError(400, "Body must be a JSON object")
+        return payload
+
+
+async def read_request(reader: asyncio.StreamReader) -> Optional[Request]:
+    """Read one request; returns None when the client closed the connection."""
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError as e:
+        if not e.partial.strip():
+            return None
+        raise HTTPError(400, "Incomplete request")
+    except asyncio.LimitOverrunError:
+        raise HTTPError(431, "Request header too large")
+
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, target, version = lines[0].split(" ", 2)
+        headers = {}
+        for line in lines[1:]:
+            if line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+        length = int(headers.get("content-length", "0"))
+    except ValueError:
+        raise HTTPError(400, "Malformed request")
+    if length > MAX_BODY_BYTES:
+        raise HTTPError(413, "Request body too large")
+
+    try:
+        body = await reader.readexactly(length) if length else b""
+    except asyncio.IncompleteReadError:
+        raise HTTPError(400, "Request body shorter than Content-Length")
+    url = urlsplit(target)
+    query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+    return Request(method.upper(), url.path, query, headers, body, version)
+
+
+def _head(status: int, headers: Dict[str, str]) -> bytes:
+    lines = [f"HTTP/1.1 {status} {_REASONS.get(status, 'Unknown')}"]
+    lines.extend(f"{name}: {value}" for name, value in headers.items())
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+async def send_json(writer: asyncio.StreamWriter, status: int, payload: Any, keep_alive: bool) -> None:
+    body = json.dumps(payload).encode("utf-8")
+    writer.write(_head(status, {
+        "Content-Type": "application/json",
+        "Content-Length": str(len(body)),
+        "Connection": "keep-alive" if keep_alive else "close",
+    }) + body)
+    await writer.drain()
+
+
+async def send_ndjson_stream(
+    writer: asyncio.StreamWriter, lines: AsyncIterator[Dict[str, Any]], keep_alive: bool
+) -> None:
+    """Send each item as one NDJSON line in its own chunk, flushed as soon as it is produced."""
+    writer.write(_head(200, {
+        "Content-Type": "application/x-ndjson",
+        "Transfer-Encoding": "chunked",
+        "Cache-Control": "no-cache",
+        "Connection": "keep-alive" if keep_alive else "close",
+    }))
+    try:
+        async for item in lines:
+            data = (json.dumps(item) + "\n").encode("utf-8")
+            writer.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+            await writer.drain()
+    except Exception as e:
+        # Headers are already out, so report the failure in-band
+        logger.error(f"Stream failed: {e}")
+        data = (json.dumps({"kind": "error", "text": str(e), "data": {}}) + "\n").encode("utf-8")
+        writer.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+    writer.write(b"0\r\n\r\n")
+    await writer.drain()
+
+
+def is_local_peer(writer: asyncio.StreamWriter) -> bool:
+    """Return True if the connection comes from a loopback address."""
+    peer = writer.get_extra_info("peername")
+    try:
+        return ipaddress.ip_address(peer[0]).is_loopback
+    except (TypeError, ValueError, IndexError):
+        return False
+
+
+class StockAnalyzerServer:
+    """asyncio HTTP server sharing one warm StockAnalyzerAgent across requests."""
+
+    def __init__(
+        self,
+        orchestrator: Optional[Any] = None,
+        host: str = "127.0.0.1",
+        port: int = 8080,
+        shutdown_timeout: float = 30.0,
+    ):
+        self.orchestrator = orchestrator if orchestrator is not None else StockAnalyzerAgent()
+        self.host = host
+        self.port = port
+        self.shutdown_timeout = shutdown_timeout
+        self._server: Optional[asyncio.base_events.Server] = None
+        self._connections: Dict[asyncio.Task, bool] = {}  # task -> busy with a request
+        self._watchers: Set[asyncio.Task] = set()  # connections streaming /watch
+        self._closing = False
+
+    async def __aenter__(self):
+        await self.orchestrator.__aenter__()
+        try:
+            await self.start()
+        except BaseException:
+            await self.orchestrator.__aexit__(None, None, None)
+            raise
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.shutdown()
+        await self.orchestrator.__aexit__(exc_type, exc_val, exc_tb)
+
+    async def start(self) -> None:
+        """Warm shared state and start listening."""
+        get_symbol_index()
+        self.orchestrator.get_stock_agent()
+        self._server = await asyncio.start_server(
+            self._handle_connection, self.host, self.port, limit=MAX_HEADER_BYTES
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"Stock analyzer service listening on http://{self.host}:{self.port}")
+
+    async def shutdown(self) -> None:
+        """Stop accepting connections and let in-flight requests finish (up to shutdown_timeout)."""
+        if self._server is None or self._closing:
+            return
+        self._closing = True
+        self._server.close()
+
+        # Idle keep-alive connections are just waiting for the next request, and
+        # quote streams never finish on their own
+        for task, busy in list(self._connections.items()):
+            if not busy or task in self._watchers:
+                task.cancel()
+        busy_tasks = [task for task, busy in self._connections.items() if busy]
+        if busy_tasks:
+            logger.info(f"Waiting for {len(busy_tasks)} in-flight request(s)")
+            _, pending = await asyncio.wait(busy_tasks, timeout=self.shutdown_timeout)
+            for task in pending:
+                task.cancel()
+        await self._server.wait_closed()
+        logger.info("Stock analyzer service stopped")
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        assert task is not None
+        self._connections[task] = False
+        try:
+            while not self._closing:
+                try:
+                    request = await read_request(reader)
+                except HTTPError as e:
+                    await send_json(writer, e.status, {"error": e.message}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+
+                keep_alive = request.keep_alive and not self._closing
+                self._connections[task] = True
+                try:
+                    await self._dispatch(request, writer, keep_alive)
+                finally:
+                    self._connections[task] = False
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            self._connections.pop(task, None)
+            writer.close()
+
+    async def _dispatch(self, request: Request, writer: asyncio.StreamWriter, keep_alive: bool) -> None:
+        routes = {
+            "/health": ("GET",),
+            "/metrics": ("GET",),
+            "/quote": ("GET",),
+            "/analyze": ("GET", "POST"),
+            "/watch": ("GET",),
+        }
+        try:
+            if request.path not in routes:
+                raise HTTPError(404, f"Unknown path {request.path}")
+            if request.method not in routes[request.path]:
+                raise HTTPError(405, f"{request.method} not allowed on {request.path}")
+
+            if request.path == "/health":
+                await send_json(writer, 200, {"status": "ok"}, keep_alive)
+            elif request.path == "/metrics":
+                metrics = {
+                    "rate_limits": rate_limit_metrics(),
+                    "answer_cache": answer_cache_metrics(),
+                    "quote_hub": quote_hub_metrics(),
+                }
+                await send_json(writer, 200, metrics, keep_alive)
+            elif request.path == "/quote":
+                await send_json(writer, 200, await self._quote(request), keep_alive)
+            elif request.path == "/watch":
+                await self._watch(request, writer)
+            else:
+                await self._analyze(request, writer, keep_alive)
+        except HTTPError as e:
+            await send_json(writer, e.status, {"error": e.message}, keep_alive)
+        except StockNotFoundError as e:
+            await send_json(writer, 404, {"error": str(e)}, keep_alive)
+        except APIRateLimitError as e:
+            await send_json(writer, 503, {"error": str(e)}, keep_alive)
+        except UpstreamTimeoutError as e:
+            await send_json(writer, 504, {"error": str(e)}, keep_alive)
+        except UpstreamUnavailableError as e:
+            await send_json(writer, 502, {"error": str(e)}, keep_alive)
+        except ConnectionError:
+            raise
+        except Exception as e:
+            logger.error(f"{request.method} {request.path} failed: {e}")
+            await send_json(writer, 500, {"error": "Internal server error"}, keep_alive)
+
+    async def _quote(self, request: Request) -> Dict[str, Any]:
+        include_periods = request.query.get("include_periods", "").lower() in ("1", "true", "yes")
+        if "tickers" in request.query:
+            tickers = [t.strip().upper() for t in request.query["tickers"].split(",") if t.strip()]
+            if not tickers:
+                raise HTTPError(400, "tickers must not be empty")
+            return await fetch_stock_prices_async(tickers)
+        ticker = request.query.get("ticker", "").strip().upper()
+        if not ticker:
+            raise HTTPError(400, "Missing ticker or tickers parameter")
+        return await fetch_stock_price_async(ticker, include_periods)
+
+    async def _watch(self, request: Request, writer: asyncio.StreamWriter) -> None:
+        tickers = [t.strip() for t in request.query.get("tickers", "").split(",") if t.strip()]
+        if not tickers:
+            raise HTTPError(400, "Missing tickers parameter")
+        updates = self.orchestrator.watch(tickers)
+
+        async def events() -> AsyncIterator[Dict[str, Any]]:
+            async for update in updates:
+                yield {"kind": "quote", "text": update.ticker, "data": update.as_dict()}
+
+        task = asyncio.current_task()
+        assert task is not None
+        self._watchers.add(task)
+        try:
+            await send_ndjson_stream(writer, events(), keep_alive=False)
+        finally:
+            self._watchers.discard(task)
+
+    async def _analyze(self, request: Request, writer: asyncio.StreamWriter, keep_alive: bool) -> None:
+        params: Dict[str, Any] = {**request.query, **request.json()}
+        query = str(params.get("query") or params.get("q") or "").strip()
+        if not query:
+            raise HTTPError(400, "Missing query")
+        stream = str(params.get("stream", True)).lower() not in ("0", "false", "no")
+        user = params.get("user")
+        if user and not is_local_peer(writer):
+            # No authentication here, so only local callers may act as another user
+            raise HTTPError(403, "user can only be chosen from a local connection")
+        user = user or current_watchlist_user()
+
+        with watchlist_user(str(user)):
+            if not stream:
+                answer = await self.orchestrator.analyze_stock(query, stream=False)
+                await send_json(writer, 200, {"query": query, "answer": str(answer)}, keep_alive)
+                return
+
+            async def events() -> AsyncIterator[Dict[str, Any]]:
+                async for event in self.orchestrator.analyze_stock(query, stream=True):
+                    yield asdict(event)
+
+            await send_ndjson_stream(writer, events(), keep_alive)
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    config = AgentConfig.from_env()
+    parser = argparse.ArgumentParser(description="Agentic AI Stock Analyzer HTTP service")
+    parser.add_argument("--host", default=config.server_host, help=f"Bind address (default: {config.server_host})")
+    parser.add_argument("--port", type=int, default=config.server_port, help=f"Port (default: {config.server_port})")
+    return parser.parse_args(argv)
+
+
+async def serve(host: str, port: int) -> None:
+    """Run the service until SIGINT/SIGTERM, then shut down gracefully."""
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except (NotImplementedError, RuntimeError):
+            # Windows: Ctrl+C cancels the main task instead, which still runs __aexit__
+            pass
+    async with StockAnalyzerServer(host=host, port=port):
+        await stop.wait()
+
+
+def main() -> None:
+    args = parse_args()
+    logging.basicConfig(level=AgentConfig.from_env().log_level)
+    logging.getLogger("agent_framework").setLevel(logging.ERROR)
+    asyncio.run(serve(args.host, args.port))
+
+
+if __name__ == "__main__":
+    main()
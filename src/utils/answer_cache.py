@@ -0,0 +1,170 @@
+"""
+Cache of full query answers keyed by normalized intent.
+
+"price of tesla", "Tesla price?" and "TSLA" all resolve to the same intent,
+(TSLA, price, USD), so once one of them has been answered the others are served
+from here instead of running the LLM workflow again.
+
+An answer is only as fresh as the quote it was built from: each entry records
+when that quote expires in the QuoteCache, and it is served only while the
+QuoteCache still holds that same fresh quote. When the quote expires, is
+refreshed or is invalidated, the answer goes with it.
+"""
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+try:
+    from src.utils.quote_cache import QuoteCache, get_quote_cache
+except ImportError:
+    # Fallback for running from src/ directory directly
+    from utils.quote_cache import QuoteCache, get_quote_cache  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class IntentKey:
+    """What a query asks for, independent of how it is phrased."""
+    ticker: str
+    intent: str = "price"
+    currency: str = "USD"
+
+
+@dataclass
+class AnswerCacheStats:
+    """Counters exposed by AnswerCache."""
+    hits: int = 0
+    misses: int = 0
+    expired: int = 0
+    stores: int = 0
+    skipped: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {**self.__dict__, "hit_rate": round(self.hit_rate, 4)}
+
+
+@dataclass
+class _Answer:
+    text: str
+    quote_fresh_until: float
+
+
+class AnswerCache:
+    """
+    Thread-safe LRU cache of formatted answers keyed by IntentKey.
+
+    - put() stores an answer only while the QuoteCache holds a fresh quote for
+      its ticker; otherwise there is nothing to tie its lifetime to and it is skipped.
+    - get() returns the answer while that same quote is still fresh (expired
+      entries count as misses and are dropped).
+    - At most ``max_entries`` answers are kept; the least recently used goes first.
+    """
+
+    def __init__(self, quotes: QuoteCache, max_entries: int = 256):
+        self.quotes = quotes
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[IntentKey, _Answer]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = AnswerCacheStats()
+
+    @property
+    def stats(self) -> AnswerCacheStats:
+        """Snapshot of the cache counters."""
+        with self._lock:
+            return AnswerCacheStats(**self._stats.__dict__)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: IntentKey) -> Optional[str]:
+        """Return the cached answer for key while its quote is still fresh, or None."""
+        quote_fresh_until = self.quotes.fresh_until(key.ticker)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.quote_fresh_until != quote_fresh_until:
+                # The quote behind the answer expired or was replaced
+                del self._entries[key]
+                self._stats.expired += 1
+                entry = None
+            if entry is None:
+                self._stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats.hits += 1
+            return entry.text
+
+    def put(self, key: IntentKey, answer: str) -> bool:
+        """Store answer for key; returns False when its ticker has no fresh quote to expire with."""
+        quote_fresh_until = self.quotes.fresh_until(key.ticker)
+        with self._lock:
+            if quote_fresh_until is None:
+                self._stats.skipped += 1
+                return False
+            self._entries[key] = _Answer(answer, quote_fresh_until)
+            self._entries.move_to_end(key)
+            self._stats.stores += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats.evictions += 1
+        return True
+
+    def invalidate(self, ticker: Optional[str] = None) -> None:
+        """Drop the answers for one ticker, or every answer when no ticker is given."""
+        with self._lock:
+            if ticker is None:
+                self._entries.clear()
+                return
+            for key in [k for k in self._entries if k.ticker == ticker]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        """Drop all answers and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._stats = AnswerCacheStats()
+
+
+_answer_cache: Optional[AnswerCache] = None
+_answer_cache_configured = False
+
+
+def get_answer_cache() -> Optional[AnswerCache]:
+    """Return the process-wide answer cache, creating it from AgentConfig on first use.
+
+    None when ANSWER_CACHE_SIZE is 0 or quote caching is off, since answers
+    expire with their quotes.
+    """
+    global _answer_cache, _answer_cache_configured
+    if not _answer_cache_configured:
+        from .config import AgentConfig
+
+        config = AgentConfig.from_env()
+        quotes = get_quote_cache()
+        if config.answer_cache_size > 0 and quotes is not None:
+            _answer_cache = AnswerCache(quotes, max_entries=config.answer_cache_size)
+        _answer_cache_configured = True
+    return _answer_cache
+
+
+def set_answer_cache(cache: Optional[AnswerCache]) -> None:
+    """Replace the process-wide answer cache; pass None to disable answer caching."""
+    global _answer_cache, _answer_cache_configured
+    _answer_cache = cache
+    _answer_cache_configured = True
+
+
+def answer_cache_metrics() -> Optional[Dict[str, Any]]:
+    """Counters and size of the process-wide answer cache, or None when it is off."""
+    cache = _answer_cache
+    if cache is None:
+        return None
+    return {**cache.stats.as_dict(), "size": len(cache)}
@@ -0,0 +1,572 @@
+"""
+Storage backends for the quote cache.
+
+QuoteCache keeps its freshness rules (TTLs, stale-while-revalidate, coalescing)
+and delegates storage to a backend:
+
+- ``memory``: an in-process LRU, the default; nothing is shared or serialized
+- ``sqlite``: one SQLite file (WAL mode) shared by every worker process on a host
+  and kept across restarts
+- ``redis``: any server speaking the Redis protocol (Redis, Valkey, ...), shared
+  by workers and pods; a small built-in RESP client, so no extra dependency
+
+Shared backends store values in a compact, versioned binary encoding (see
+``pack``/``unpack``) and support ``add`` (set-if-absent), which QuoteCache uses
+as a cross-process refresh lock so only one worker fetches an expired quote.
+"""
+import logging
+import math
+from abc import ABC, abstractmethod
+import os
+import socket
+import sqlite3
+import struct
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, List, Optional, Tuple
+from urllib.parse import unquote, urlsplit
+
+try:
+    from src.utils.exceptions import CacheBackendError
+except ImportError:
+    # Fallback for running from src/ directory directly
+    from utils.exceptions import CacheBackendError  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("memory", "sqlite", "redis")
+
+# First byte of every packed value; bump when the encoding or SYMBOLS changes
+FORMAT_VERSION = 1
+
+# Strings every quote repeats (its field names), stored as one-byte references
+SYMBOLS = (
+    "ticker", "company_name", "price", "currency", "timestamp", "change", "absolute",
+    "percent", "previous_close", "periods", "error", "USD",
+)
+_SYMBOL_INDEX = {symbol: i for i, symbol in enumerate(SYMBOLS)}
+
+_NONE, _FALSE, _TRUE, _INT, _FLOAT, _STR, _BYTES, _LIST, _DICT, _SYMBOL, _DECIMAL = range(11)
+_DOUBLE = struct.Struct("<d")
+_POWERS = tuple(10.0 ** scale for scale in range(7))
+
+
+def _write_varint(out: bytearray, n: int) -> None:
+    while n > 0x7F:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _write_zigzag(out: bytearray, n: int) -> None:
+    _write_varint(out, (n << 1) if n >= 0 else ((-n << 1) - 1))
+
+
+def _encode_float(out: bytearray, value: float) -> None:
+    # Prices and percentages have a few decimals: store them as a scaled integer when that round-trips exactly
+    # (-0.0 is left to the 8-byte form so its sign survives)
+    if math.isfinite(value) and (value != 0 or math.copysign(1.0, value) > 0):
+        for scale, power in enumerate(_POWERS):
+            mantissa = round(value * power)
+            if abs(mantissa) < 2**53 and mantissa / power == value:
+                out.append(_DECIMAL)
+                out.append(scale)
+                _write_zigzag(out, mantissa)
+                return
+    out.append(_FLOAT)
+    out += _DOUBLE.pack(value)
+
+
+def _encode(out: bytearray, value: Any) -> None:
+    if value is None:
+        out.append(_NONE)
+    elif value is True:
+        out.append(_TRUE)
+    elif value is False:
+        out.append(_FALSE)
+    elif isinstance(value, int):
+        out.append(_INT)
+        _write_zigzag(out, value)
+    elif isinstance(value, float):
+        _encode_float(out, value)
+    elif isinstance(value, str):
+        symbol = _SYMBOL_INDEX.get(value)
+        if symbol is not None:
+            out.append(_SYMBOL)
+            out.append(symbol)
+            return
+        raw = value.encode("utf-8")
+        out.append(_STR)
+        _write_varint(out, len(raw))
+        out += raw
+    elif isinstance(value, (bytes, bytearray)):
+        out.append(_BYTES)
+        _write_varint(out, len(value))
+        out += value
+    elif isinstance(value, (list, tuple)):
+        out.append(_LIST)
+        _write_varint(out, len(value))
+        for item in value:
+            _encode(out, item)
+    elif isinstance(value, dict):
+        out.append(_DICT)
+        _write_varint(out, len(value))
+        for key, item in value.items():
+            _encode(out, key)
+            _encode(out, item)
+    else:
+        raise TypeError(f"Cannot encode {type(value).__name__} for the cache")
+
+
+def _decode(data: bytes, pos: int) -> Tuple[Any, int]:
+    tag = data[pos]
+    pos += 1
+    if tag == _NONE:
+        return None, pos
+    if tag == _TRUE:
+        return True, pos
+    if tag == _FALSE:
+        return False, pos
+    if tag == _SYMBOL:
+        return SYMBOLS[data[pos]], pos + 1
+    if tag == _INT:
+        n, pos = _read_varint(data, pos)
+        return (n >> 1) ^ -(n & 1), pos
+    if tag == _DECIMAL:
+        n, end = _read_varint(data, pos + 1)
+        return ((n >> 1) ^ -(n & 1)) / _POWERS[data[pos]], end
+    if tag == _FLOAT:
+        return _DOUBLE.unpack_from(data, pos)[0], pos + 8
+    if tag in (_STR, _BYTES):
+        size, pos = _read_varint(data, pos)
+        raw = data[pos:pos + size]
+        return (raw.decode("utf-8") if tag == _STR else bytes(raw)), pos + size
+    if tag == _LIST:
+        count, pos = _read_varint(data, pos)
+        items = []
+        for _ in range(count):
+            item, pos = _decode(data, pos)
+            items.append(item)
+        return items, pos
+    if tag == _DICT:
+        count, pos = _read_varint(data, pos)
+        mapping = {}
+        for _ in range(count):
+            key, pos = _decode(data, pos)
+            mapping[key], pos = _decode(data, pos)
+        return mapping, pos
+    raise ValueError(f"Unknown cache value tag {tag}")
+
+
+def pack(value: Any) -> bytes:
+    """Encode None/bool/int/float/str/bytes and lists/dicts of them; tuples come back as lists."""
+    out = bytearray([FORMAT_VERSION])
+    _encode(out, value)
+    return bytes(out)
+
+
+def _unpack_stored(data: bytes, where: str) -> Any:
+    try:
+        return unpack(data)
+    except (ValueError, IndexError, struct.error, UnicodeDecodeError) as e:
+        raise CacheBackendError(f"Unreadable value in {where}: {e}") from e
+
+
+def unpack(data: bytes) -> Any:
+    """Decode bytes written by pack."""
+    if not data or data[0] != FORMAT_VERSION:
+        raise ValueError(f"Unsupported cache value format {data[:1]!r}")
+    value, pos = _decode(data, 1)
+    if pos != len(data):
+        raise ValueError("Trailing bytes after cache value")
+    return value
+
+
+class CacheBackend(ABC):
+    """
+    Key/value storage with per-key expiry.
+
+    Values are JSON-like (see pack). Shared backends raise CacheBackendError when
+    the store cannot be reached; callers treat that as a miss.
+    """
+
+    name = "base"
+    # True when other processes see the same entries
+    shared = False
+
+    def __init__(self):
+        self.evictions = 0
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        """Return the value for key, or None when it is missing or expired."""
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        """Store value for ttl seconds."""
+
+    @abstractmethod
+    def add(self, key: str, value: Any, ttl: float) -> bool:
+        """Atomically store value only if key holds no live value; returns whether it was stored."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove key if present."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Drop every entry and reset the eviction counter."""
+
+    @abstractmethod
+    def count(self, prefix: str = "") -> int:
+        """Number of stored entries whose key starts with prefix, possibly including expired ones."""
+
+    def __len__(self) -> int:
+        return self.count()
+
+    def close(self) -> None:
+        pass
+
+
+class MemoryBackend(CacheBackend):
+    """In-process LRU holding values as-is; the least recently used entry goes first."""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = 1024, clock: Callable[[], float] = time.time):
+        super().__init__()
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if self._clock() >= entry[0]:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._store(key, value, ttl)
+
+    def add(self, key: str, value: Any, ttl: float) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._clock() < entry[0]:
+                return False
+            self._store(key, value, ttl)
+            return True
+
+    def _store(self, key: str, value: Any, ttl: float) -> None:
+        # Caller holds self._lock
+        self._entries[key] = (self._clock() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.evictions = 0
+
+    def count(self, prefix: str = "") -> int:
+        with self._lock:
+            return sum(1 for key in self._entries if key.startswith(prefix))
+
+
+class SqliteBackend(CacheBackend):
+    """
+    One SQLite file shared by every process that opens it.
+
+    WAL mode lets readers run alongside a writer; each thread gets its own
+    connection. Expired rows are purged every ``purge_every`` writes, and past
+    ``max_entries`` the rows closest to expiry are dropped first.
+    """
+
+    name = "sqlite"
+    shared = True
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int = 10_000,
+        clock: Callable[[], float] = time.time,
+        purge_every: int = 256,
+        busy_timeout: float = 5.0,
+    ):
+        super().__init__()
+        self.path = path
+        self.max_entries = max_entries
+        self._clock = clock
+        self._purge_every = purge_every
+        self._busy_timeout = busy_timeout
+        self._writes = 0
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            # Autocommit: every statement below is atomic on its own
+            connection = sqlite3.connect(
+                self.path, timeout=self._busy_timeout, isolation_level=None, check_same_thread=False
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    def _execute(self, sql: str, params: Tuple[Any, ...] = ()) -> sqlite3.Cursor:
+        try:
+            return self._connection().execute(sql, params)
+        except sqlite3.Error as e:
+            raise CacheBackendError(f"SQLite cache {self.path}: {e}") from e
+
+    def get(self, key: str) -> Optional[Any]:
+        row = self._execute(
+            "SELECT value FROM cache WHERE key = ? AND expires_at > ?", (key, self._clock())
+        ).fetchone()
+        return _unpack_stored(row[0], self.path) if row is not None else None
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        self._execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, pack(value), self._clock() + ttl),
+        )
+        self._after_write()
+
+    def add(self, key: str, value: Any, ttl: float) -> bool:
+        now = self._clock()
+        # Insert, or take over a row that has already expired; a live row is left alone
+        cursor = self._execute(
+            "INSERT INTO cache (key, value, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at "
+            "WHERE cache.expires_at <= ?",
+            (key, pack(value), now + ttl, now),
+        )
+        return cursor.rowcount == 1
+
+    def delete(self, key: str) -> None:
+        self._execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        self._execute("DELETE FROM cache")
+        self.evictions = 0
+
+    def count(self, prefix: str = "") -> int:
+        return self._execute(
+            "SELECT COUNT(*) FROM cache WHERE substr(key, 1, ?) = ? AND expires_at > ?",
+            (len(prefix), prefix, self._clock()),
+        ).fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for connection in connections:
+            connection.close()
+        self._local = threading.local()
+
+    def _after_write(self) -> None:
+        self._writes += 1
+        if self._writes % self._purge_every:
+            return
+        self._execute("DELETE FROM cache WHERE expires_at <= ?", (self._clock(),))
+        excess = self._execute(
+            "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY expires_at LIMIT "
+            "max(0, (SELECT COUNT(*) FROM cache) - ?))",
+            (self.max_entries,),
+        ).rowcount
+        self.evictions += max(0, excess)
+
+
+class RespBackend(CacheBackend):
+    """
+    Cache on a Redis-protocol server, shared by every worker that points at it.
+
+    Keys are namespaced with ``prefix``; expiry is left to the server (SET ... PX),
+    so ``max_entries`` does not apply and eviction follows the server's maxmemory
+    policy. Connections are pooled and reused.
+    """
+
+    name = "redis"
+    shared = True
+
+    def __init__(
+        self,
+        url: str = "redis://127.0.0.1:6379/0",
+        prefix: str = "stock-analyzer:",
+        timeout: float = 1.0,
+        max_idle: int = 8,
+    ):
+        super().__init__()
+        parts = urlsplit(url)
+        if parts.scheme != "redis":
+            raise ValueError(f"Unsupported cache URL scheme: {parts.scheme}")
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or 6379
+        self.db = int(parts.path.lstrip("/") or 0)
+        self._username = unquote(parts.username) if parts.username else None
+        self._password = unquote(parts.password) if parts.password else None
+        self.prefix = prefix
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self._idle: List[Tuple[socket.socket, Any]] = []
+        self._lock = threading.Lock()
+
+    def _connect(self) -> Tuple[socket.socket, Any]:
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        conn = (sock, sock.makefile("rb"))
+        if self._password is not None:
+            auth = ("AUTH", self._username, self._password) if self._username else ("AUTH", self._password)
+            self._roundtrip(conn, auth)
+        if self.db:
+            self._roundtrip(conn, ("SELECT", self.db))
+        return conn
+
+    def command(self, *args: Any) -> Any:
+        """Send one command and return its reply, on a pooled connection."""
+        with self._lock:
+            conn = self._idle.pop() if self._idle else None
+        try:
+            if conn is None:
+                conn = self._connect()
+            reply = self._roundtrip(conn, args)
+        except (OSError, ValueError) as e:
+            if conn is not None:
+                self._discard(conn)
+            raise CacheBackendError(f"Redis cache {self.host}:{self.port}: {e}") from e
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                conn = None
+        if conn is not None:
+            self._discard(conn)
+        if isinstance(reply, CacheBackendError):
+            raise reply
+        return reply
+
+    def _roundtrip(self, conn: Tuple[socket.socket, Any], args: Tuple[Any, ...]) -> Any:
+        out = bytearray(b"*%d\r\n" % len(args))
+        for arg in args:
+            raw = arg if isinstance(arg, bytes) else str(arg).encode("utf-8")
+            out += b"$%d\r\n%s\r\n" % (len(raw), raw)
+        conn[0].sendall(out)
+        return self._read_reply(conn[1])
+
+    def _read_reply(self, reader: Any) -> Any:
+        line = reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise ConnectionError("Connection closed by cache server")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b"+":
+            return rest.decode()
+        if kind == b"-":
+            # Returned, not raised, so the connection (still in sync) goes back to the pool
+            return CacheBackendError(rest.decode())
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            size = int(rest)
+            if size < 0:
+                return None
+            data = reader.read(size + 2)
+            return data[:-2]
+        if kind == b"*":
+            count = int(rest)
+            return None if count < 0 else [self._read_reply(reader) for _ in range(count)]
+        raise ValueError(f"Unexpected reply from cache server: {line!r}")
+
+    @staticmethod
+    def _discard(conn: Tuple[socket.socket, Any]) -> None:
+        try:
+            conn[1].close()
+            conn[0].close()
+        except OSError:
+            pass
+
+    @staticmethod
+    def _ms(ttl: float) -> int:
+        return max(1, int(ttl * 1000))
+
+    def get(self, key: str) -> Optional[Any]:
+        data = self.command("GET", self.prefix + key)
+        return _unpack_stored(data, f"{self.host}:{self.port}") if data is not None else None
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        self.command("SET", self.prefix + key, pack(value), "PX", self._ms(ttl))
+
+    def add(self, key: str, value: Any, ttl: float) -> bool:
+        return self.command("SET", self.prefix + key, pack(value), "PX", self._ms(ttl), "NX") == "OK"
+
+    def delete(self, key: str) -> None:
+        self.command("DEL", self.prefix + key)
+
+    def _keys(self, prefix: str = "") -> List[bytes]:
+        # Escape glob characters so only keys literally starting with the prefix match
+        pattern = "".join("\\" + c if c in "*?[]\\" else c for c in self.prefix + prefix) + "*"
+        keys: List[bytes] = []
+        cursor = b"0"
+        while True:
+            cursor, batch = self.command("SCAN", cursor, "MATCH", pattern, "COUNT", 500)
+            keys.extend(batch)
+            if cursor in (b"0", 0):
+                return keys
+
+    def clear(self) -> None:
+        """Delete every key under the prefix (SCAN, so other keys on the server are untouched)."""
+        keys = self._keys()
+        for start in range(0, len(keys), 500):
+            self.command("DEL", *keys[start:start + 500])
+        self.evictions = 0
+
+    def count(self, prefix: str = "") -> int:
+        return len(self._keys(prefix))
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            self._discard(conn)
+
+
+def create_cache_backend(name: str, config: Any, clock: Callable[[], float] = time.time) -> CacheBackend:
+    """Build a quote-cache backend by name from AgentConfig."""
+    if name == "memory":
+        return MemoryBackend(config.quote_cache_size, clock=clock)
+    if name == "sqlite":
+        return SqliteBackend(config.quote_cache_path, max_entries=config.quote_cache_size, clock=clock)
+    if name == "redis":
+        return RespBackend(config.quote_cache_url)
+    raise ValueError(f"Unknown quote cache backend: {name} (expected one of {', '.join(BACKENDS)})")
@@ -0,0 +1,95 @@
+"""Helpers for running blocking I/O without stalling the asyncio event loop."""
+import asyncio
+import contextvars
+import functools
+import logging
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class BoundedExecutor:
+    """
+    Run blocking callables in a dedicated thread pool with bounded concurrency.
+
+    Callers beyond ``max_concurrency`` wait on a semaphore instead of piling up in
+    the pool, and every call is cancelled from the caller's point of view after
+    ``timeout`` seconds. A timed-out worker thread still finishes its call in the
+    background; it just no longer holds a concurrency slot.
+    """
+
+    def __init__(self, max_concurrency: int = 8, timeout: Optional[float] = 30.0):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # asyncio primitives are bound to a loop, so keep one semaphore per loop
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    async def run(self, func: Callable[..., T], *args: Any, timeout: Optional[float] = None) -> T:
+        """Run func(*args) in the pool and await its result.
+
+        Raises:
+            asyncio.TimeoutError: If the call does not finish within the timeout
+        """
+        loop = asyncio.get_running_loop()
+        # Run in a copy of the caller's context so spans started in the worker nest under the caller's
+        context = contextvars.copy_context()
+        async with self._semaphore(loop):
+            future = loop.run_in_executor(self._get_executor(), functools.partial(context.run, func, *args))
+            return await asyncio.wait_for(future, timeout if timeout is not None else self.timeout)
+
+    def shutdown(self, wait: bool = False) -> None:
+        """Release the worker threads."""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    def _semaphore(self, loop: asyncio.AbstractEventLoop) -> asyncio.Semaphore:
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphores[loop] = semaphore
+        return semaphore
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_concurrency, thread_name_prefix="blocking-io"
+            )
+        return self._executor
+
+
+_blocking_executor: Optional[BoundedExecutor] = None
+
+
+def get_blocking_executor() -> BoundedExecutor:
+    """Return the process-wide executor, sized from AgentConfig on first use."""
+    global _blocking_executor
+    if _blocking_executor is None:
+        from .config import AgentConfig
+
+        config = AgentConfig.from_env()
+        _blocking_executor = BoundedExecutor(
+            max_concurrency=config.max_concurrency,
+            timeout=config.timeout,
+        )
+        logger.info(
+            f"Blocking executor ready: max_concurrency={config.max_concurrency}, timeout={config.timeout}s"
+        )
+    return _blocking_executor
+
+
+def set_blocking_executor(executor: Optional[BoundedExecutor]) -> None:
+    """Replace the process-wide executor; None re-reads AgentConfig on next use."""
+    global _blocking_executor
+    if _blocking_executor is not None and _blocking_executor is not executor:
+        _blocking_executor.shutdown()
+    _blocking_executor = executor
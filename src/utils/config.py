@@ -15,7 +15,44 @@ class AgentConfig:
     azure_ai_api_version: str = "2024-12-01-preview"
     azure_ai_model_deployment: str = "gpt-4.1-nano"
     rate_limit: int = 100
+    rate_limit_burst: int = 10
+    rate_limit_max_retries: int = 3
     timeout: int = 30
+    max_concurrency: int = 8
+    market_data_max_connections: int = 10
+    market_data_http2: bool = True
+    market_data_providers: str = "yfinance"
+    market_data_quote_url: str = "https://query1.finance.yahoo.com/v7/finance/quote"
+    market_data_replay_path: str = ""
+    market_data_replay_latency_ms: int = 0
+    market_data_hedge_percentile: int = 95
+    quote_cache_size: int = 1024
+    quote_cache_backend: str = "memory"
+    quote_cache_path: str = ".cache/quotes.sqlite3"
+    quote_cache_url: str = "redis://127.0.0.1:6379/0"
+    quote_ttl_market_open: int = 15
+    quote_ttl_market_closed: int = 300
+    quote_max_stale: int = 60
+    answer_cache_size: int = 256
+    watch_interval: int = 5
+    watch_queue_size: int = 100
+    history_dir: str = ".cache/history"
+    history_fixtures_dir: str = ""
+    fx_ttl: int = 3600
+    fx_currencies: str = "EUR,GBP,SEK,NOK,DKK,CHF,JPY,CAD,AUD"
+    fx_fixtures_path: str = ""
+    watchlist_path: str = "watchlist.json"
+    watchlist_index_dir: str = ".cache/watchlist"
+    watchlist_user: str = "default"
+    watchlist_embedder: str = "hashing"
+    server_host: str = "127.0.0.1"
+    server_port: int = 8080
+    token_cache_path: str = ""
+    token_cache_key: str = ""
+    token_refresh_margin: int = 300
+    tracing_exporter: str = ""
+    tracing_service_name: str = "stock-analyzer"
+    application_insights_connection_string: str = ""
     log_level: str = "INFO"
     debug: bool = False
 
@@ -28,7 +65,46 @@ class AgentConfig:
             azure_ai_api_version=os.getenv("AZURE_AI_API_VERSION", "2024-12-01-preview"),
             azure_ai_model_deployment=os.getenv("AZURE_AI_MODEL_DEPLOYMENT", "gpt-4.1-nano"),
             rate_limit=int(os.getenv("RATE_LIMIT", "100")),
+            rate_limit_burst=int(os.getenv("RATE_LIMIT_BURST", "10")),
+            rate_limit_max_retries=int(os.getenv("RATE_LIMIT_MAX_RETRIES", "3")),
             timeout=int(os.getenv("TIMEOUT", "30")),
+            max_concurrency=int(os.getenv("MAX_CONCURRENCY", "8")),
+            market_data_max_connections=int(os.getenv("MARKET_DATA_MAX_CONNECTIONS", "10")),
+            market_data_http2=os.getenv("MARKET_DATA_HTTP2", "True").lower() == "true",
+            market_data_providers=os.getenv("MARKET_DATA_PROVIDERS", "yfinance"),
+            market_data_quote_url=os.getenv(
+                "MARKET_DATA_QUOTE_URL", "https://query1.finance.yahoo.com/v7/finance/quote"
+            ),
+            market_data_replay_path=os.getenv("MARKET_DATA_REPLAY_PATH", ""),
+            market_data_replay_latency_ms=int(os.getenv("MARKET_DATA_REPLAY_LATENCY_MS", "0")),
+            market_data_hedge_percentile=int(os.getenv("MARKET_DATA_HEDGE_PERCENTILE", "95")),
+            quote_cache_size=int(os.getenv("QUOTE_CACHE_SIZE", "1024")),
+            quote_cache_backend=os.getenv("QUOTE_CACHE_BACKEND", "memory"),
+            quote_cache_path=os.getenv("QUOTE_CACHE_PATH", ".cache/quotes.sqlite3"),
+            quote_cache_url=os.getenv("QUOTE_CACHE_URL", "redis://127.0.0.1:6379/0"),
+            quote_ttl_market_open=int(os.getenv("QUOTE_TTL_MARKET_OPEN", "15")),
+            quote_ttl_market_closed=int(os.getenv("QUOTE_TTL_MARKET_CLOSED", "300")),
+            quote_max_stale=int(os.getenv("QUOTE_MAX_STALE", "60")),
+            answer_cache_size=int(os.getenv("ANSWER_CACHE_SIZE", "256")),
+            watch_interval=int(os.getenv("WATCH_INTERVAL", "5")),
+            watch_queue_size=int(os.getenv("WATCH_QUEUE_SIZE", "100")),
+            history_dir=os.getenv("HISTORY_DIR", ".cache/history"),
+            history_fixtures_dir=os.getenv("HISTORY_FIXTURES_DIR", ""),
+            fx_ttl=int(os.getenv("FX_TTL", "3600")),
+            fx_currencies=os.getenv("FX_CURRENCIES", "EUR,GBP,SEK,NOK,DKK,CHF,JPY,CAD,AUD"),
+            fx_fixtures_path=os.getenv("FX_FIXTURES_PATH", ""),
+            watchlist_path=os.getenv("WATCHLIST_PATH", "watchlist.json"),
+            watchlist_index_dir=os.getenv("WATCHLIST_INDEX_DIR", ".cache/watchlist"),
+            watchlist_user=os.getenv("WATCHLIST_USER", "default"),
+            watchlist_embedder=os.getenv("WATCHLIST_EMBEDDER", "hashing"),
+            server_host=os.getenv("SERVER_HOST", "127.0.0.1"),
+            server_port=int(os.getenv("SERVER_PORT", "8080")),
+            token_cache_path=os.getenv("TOKEN_CACHE_PATH", ""),
+            token_cache_key=os.getenv("TOKEN_CACHE_KEY", ""),
+            token_refresh_margin=int(os.getenv("TOKEN_REFRESH_MARGIN", "300")),
+            tracing_exporter=os.getenv("TRACING_EXPORTER", ""),
+            tracing_service_name=os.getenv("TRACING_SERVICE_NAME", "stock-analyzer"),
+            application_insights_connection_string=os.getenv("APPLICATION_INSIGHTS_CONNECTION_STRING", ""),
             log_level=os.getenv("LOG_LEVEL", "INFO"),
             debug=os.getenv("DEBUG", "False").lower() == "true"
         )
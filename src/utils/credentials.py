@@ -0,0 +1,261 @@
+"""
+Shared Azure credential with in-memory and optional encrypted on-disk token caching.
+
+AzureCliCredential shells out to ``az account get-access-token`` for every
+token, which takes hundreds of milliseconds to seconds. CachingCredential wraps
+any async token source and hands out cached tokens while they are fresh. It
+refreshes a token in the background ``refresh_margin`` seconds before it
+expires, so callers only wait for the source when nothing usable is cached.
+
+With TOKEN_CACHE_PATH and TOKEN_CACHE_KEY set, tokens are also kept in a
+Fernet-encrypted file, so the next process run starts with a valid token
+instead of minting a new one.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from types import TracebackType
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Optional, Protocol, Tuple, Type, Union
+
+try:
+    from src.utils.tracing import span
+except ImportError:
+    # Fallback for running from src/ directory directly
+    from utils.tracing import span  # type: ignore
+
+if TYPE_CHECKING:
+    from azure.core.credentials import AccessToken
+
+logger = logging.getLogger(__name__)
+
+# Scope requested by the Azure AI agents/projects clients
+AZURE_AI_SCOPE = "https://ai.azure.com/.default"
+
+# Tokens closer than this to expiry are never handed out
+MIN_VALIDITY = 60.0
+
+
+class TokenSource(Protocol):
+    """Anything that mints tokens like an azure.identity.aio credential."""
+
+    async def get_token(self, *scopes: str, **kwargs: Any) -> AccessToken: ...
+
+
+class EncryptedTokenCache:
+    """Tokens persisted in a Fernet-encrypted JSON file readable only by the owner."""
+
+    def __init__(self, path: Union[str, os.PathLike], key: Union[str, bytes]):
+        """
+        Args:
+            path: File holding the encrypted tokens.
+            key: Fernet key (urlsafe base64 of 32 bytes), e.g. from Fernet.generate_key().
+        """
+        from cryptography.fernet import Fernet
+
+        self.path = Path(path)
+        self._fernet = Fernet(key)
+
+    def load(self) -> Dict[str, AccessToken]:
+        from azure.core.credentials import AccessToken
+        from cryptography.fernet import InvalidToken
+
+        try:
+            data = self.path.read_bytes()
+        except FileNotFoundError:
+            return {}
+        try:
+            payload = json.loads(self._fernet.decrypt(data))
+        except (InvalidToken, ValueError):
+            # Written with another key or corrupted; it is only a cache
+            logger.warning(f"Ignoring unreadable token cache {self.path}")
+            return {}
+        return {key: AccessToken(entry["token"], int(entry["expires_on"])) for key, entry in payload.items()}
+
+    def save(self, tokens: Dict[str, AccessToken]) -> None:
+        payload = {key: {"token": t.token, "expires_on": t.expires_on} for key, t in tokens.items()}
+        data = self._fernet.encrypt(json.dumps(payload).encode("utf-8"))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(data)
+        os.replace(tmp_path, self.path)
+
+
+def _cache_key(scopes: Iterable[str], tenant_id: Optional[str]) -> str:
+    return f"{tenant_id or ''}|{' '.join(sorted(scopes))}"
+
+
+class CachingCredential:
+    """Async token credential that caches and proactively refreshes tokens from source."""
+
+    def __init__(
+        self,
+        source: TokenSource,
+        disk_cache: Optional[EncryptedTokenCache] = None,
+        refresh_margin: float = 300.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Args:
+            source: Credential that actually mints tokens (AzureCliCredential in production).
+            disk_cache: Optional persistent cache shared across process runs.
+            refresh_margin: Seconds before expiry at which a token is refreshed in the background.
+            clock: Wall clock in epoch seconds (tokens carry absolute expiry times), injectable for tests.
+        """
+        self._source = source
+        self._disk_cache = disk_cache
+        self.refresh_margin = refresh_margin
+        self._clock = clock
+        self._tokens: Dict[str, AccessToken] = {}
+        self._disk_loaded = disk_cache is None
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.fetches = 0  # tokens minted by source, for monitoring cache effectiveness
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]] = None,
+        exc_value: Optional[BaseException] = None,
+        traceback: Optional[TracebackType] = None,
+    ) -> None:
+        await self.close()
+
+    async def get_token(
+        self, *scopes: str, claims: Optional[str] = None, tenant_id: Optional[str] = None, **kwargs: Any
+    ) -> AccessToken:
+        """Return a cached token for scopes, minting one only when none is usable."""
+        if claims:
+            # A claims challenge means the service rejected the cached token
+            return await self._source.get_token(*scopes, claims=claims, tenant_id=tenant_id, **kwargs)
+
+        self._bind_loop()
+        key = _cache_key(scopes, tenant_id)
+        token = self._cached(key)
+        if token is not None:
+            remaining = token.expires_on - self._clock()
+            if remaining > self.refresh_margin:
+                return token
+            if remaining > MIN_VALIDITY:
+                self._refresh_in_background(key, scopes, tenant_id)
+                return token
+        # Only a caller that has to wait gets a span; cache hits stay free
+        with span("credential.get_token", **{"cache.hit": False, "credential.scopes": scopes}):
+            return await asyncio.shield(self._refresh(key, scopes, tenant_id))
+
+    def prefetch(self, *scopes: str, tenant_id: Optional[str] = None) -> None:
+        """Start minting a token in the background unless a fresh one is cached."""
+        self._bind_loop()
+        key = _cache_key(scopes, tenant_id)
+        token = self._cached(key)
+        if token is None or token.expires_on - self._clock() <= self.refresh_margin:
+            self._refresh_in_background(key, scopes, tenant_id)
+
+    async def close(self) -> None:
+        """Cancel pending refreshes and close the underlying source."""
+        for timer in self._timers.values():
+            timer.cancel()
+        self._timers.clear()
+        for task in self._inflight.values():
+            task.cancel()
+        self._inflight.clear()
+        close = getattr(self._source, "close", None)
+        if close is not None:
+            await close()
+
+    def _cached(self, key: str) -> Optional[AccessToken]:
+        if not self._disk_loaded and self._disk_cache is not None:
+            self._disk_loaded = True
+            for disk_key, token in self._disk_cache.load().items():
+                if token.expires_on - self._clock() > MIN_VALIDITY:
+                    self._tokens.setdefault(disk_key, token)
+        return self._tokens.get(key)
+
+    def _bind_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Tasks and timers belong to the loop that created them; tokens stay valid
+            for timer in self._timers.values():
+                timer.cancel()
+            self._timers.clear()
+            self._inflight.clear()
+            self._loop = loop
+
+    def _refresh(self, key: str, scopes: Tuple[str, ...], tenant_id: Optional[str]) -> asyncio.Task:
+        """Return the in-flight fetch for key, starting one if needed (one fetch per key at a time)."""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(key, scopes, tenant_id))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._inflight.pop(key, None) if self._inflight.get(key) is done else None)
+        return task
+
+    def _refresh_in_background(self, key: str, scopes: Tuple[str, ...], tenant_id: Optional[str]) -> None:
+        if key in self._inflight:
+            return
+
+        def report(task: asyncio.Task) -> None:
+            if not task.cancelled() and task.exception() is not None:
+                logger.warning(f"Background token refresh failed, serving cached token: {task.exception()}")
+
+        self._refresh(key, scopes, tenant_id).add_done_callback(report)
+
+    async def _fetch(self, key: str, scopes: Tuple[str, ...], tenant_id: Optional[str]) -> AccessToken:
+        kwargs = {"tenant_id": tenant_id} if tenant_id else {}
+        with span("credential.fetch", **{"credential.scopes": scopes}):
+            token = await self._source.get_token(*scopes, **kwargs)
+        self.fetches += 1
+        self._tokens[key] = token
+        if self._disk_cache is not None:
+            try:
+                self._disk_cache.save(self._tokens)
+            except OSError as e:
+                logger.warning(f"Could not write token cache: {e}")
+
+        previous = self._timers.pop(key, None)
+        if previous is not None:
+            previous.cancel()
+        delay = token.expires_on - self.refresh_margin - self._clock()
+        if delay > 0:
+            self._timers[key] = asyncio.get_running_loop().call_later(
+                delay, self._refresh_in_background, key, scopes, tenant_id
+            )
+        logger.info(f"Minted token for {' '.join(scopes)}, valid for {token.expires_on - self._clock():.0f}s")
+        return token
+
+
+_credential: Optional[CachingCredential] = None
+
+
+def get_credential() -> CachingCredential:
+    """Return the process-wide credential, creating it from AgentConfig on first use."""
+    global _credential
+    if _credential is None:
+        from azure.identity.aio import AzureCliCredential
+
+        from .config import AgentConfig
+
+        config = AgentConfig.from_env()
+        disk_cache = None
+        if config.token_cache_path:
+            if config.token_cache_key:
+                disk_cache = EncryptedTokenCache(config.token_cache_path, config.token_cache_key)
+            else:
+                logger.warning("TOKEN_CACHE_PATH is set without TOKEN_CACHE_KEY; caching tokens in memory only")
+        _credential = CachingCredential(AzureCliCredential(), disk_cache, refresh_margin=config.token_refresh_margin)
+    return _credential
+
+
+def set_credential(credential: Optional[CachingCredential]) -> None:
+    """Replace the process-wide credential; None rebuilds it from config on next use."""
+    global _credential
+    _credential = credential
@@ -16,6 +16,21 @@ class APIRateLimitError(StockAnalyzerError):
     pass
 
 
+class UpstreamTimeoutError(StockAnalyzerError):
+    """Raised when an upstream service does not answer in time."""
+    pass
+
+
+class UpstreamUnavailableError(StockAnalyzerError):
+    """Raised when an upstream service fails or cannot be reached."""
+    pass
+
+
+class CurrencyError(StockAnalyzerError):
+    """Raised when an exchange rate is unavailable."""
+    pass
+
+
 class ConfigurationError(StockAnalyzerError):
     """Raised when configuration is invalid."""
     pass
@@ -23,4 +38,9 @@ class ConfigurationError(StockAnalyzerError):
 
 class AgentError(StockAnalyzerError):
     """Raised when agent processing fails."""
-    pass
\ No newline at end of file
+    pass
+
+
+class CacheBackendError(StockAnalyzerError):
+    """Raised when a shared cache backend cannot be reached or read."""
+    pass
@@ -0,0 +1,211 @@
+"""
+In-memory FX rate table with TTL refresh and triangulation through USD.
+
+All rates are stored as units of currency per 1 USD, so any pair is
+rates[quote] / rates[base] and the whole table refreshes with one upstream
+request. Converting many prices costs one rate lookup per currency pair.
+Refreshes go through the market-data rate limiter and run outside the table
+lock: one caller fetches while the others keep serving the current rates.
+"""
+import json
+import logging
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional, Set
+
+try:
+    from src.utils.exceptions import CurrencyError
+    from src.utils.http_session import get_market_session, market_timeout
+    from src.utils.lazy_import import lazy_import
+    from src.utils.rate_limit import MARKET_DATA, get_rate_limiter
+except ImportError:
+    # Fallback for running from src/ directory directly
+    from utils.exceptions import CurrencyError  # type: ignore
+    from utils.http_session import get_market_session, market_timeout  # type: ignore
+    from utils.lazy_import import lazy_import  # type: ignore
+    from utils.rate_limit import MARKET_DATA, get_rate_limiter  # type: ignore
+
+# yfinance (and pandas with it) loads on the first FX fetch, not when this module is imported
+yf = lazy_import("yfinance")
+
+logger = logging.getLogger(__name__)
+
+BASE_CURRENCY = "USD"
+DEFAULT_CURRENCIES = ("EUR", "GBP", "SEK", "NOK", "DKK", "CHF", "JPY", "CAD", "AUD")
+
+# fetcher(currencies) -> {currency: units per 1 USD}
+FxFetcher = Callable[[Iterable[str]], Dict[str, float]]
+
+
+class FxRateTable:
+    """USD-based rate table refreshed as a whole once its TTL expires."""
+
+    def __init__(
+        self,
+        fetcher: FxFetcher,
+        ttl: float = 3600.0,
+        currencies: Iterable[str] = DEFAULT_CURRENCIES,
+        clock: Callable[[], float] = time.monotonic,
+        retry_interval: float = 60.0,
+    ):
+        """
+        Args:
+            fetcher: Returns units per USD for the requested currencies in one call.
+            ttl: Seconds before the table is refreshed.
+            currencies: Currencies loaded on every refresh; others are added on first use.
+            clock: Monotonic clock, injectable for tests.
+            retry_interval: Seconds to keep serving stale rates after a failed refresh
+                before trying again.
+        """
+        self._fetcher = fetcher
+        self.ttl = ttl
+        self.retry_interval = retry_interval
+        self._currencies: Set[str] = {c.upper() for c in currencies}
+        self._clock = clock
+        self._rates: Dict[str, float] = {}
+        self._expires_at = float("-inf")
+        self._retry_at = float("-inf")
+        # Currencies the upstream had no rate for, not asked for again until the next refresh
+        self._unknown: Set[str] = set()
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self.refreshes = 0
+
+    def rate(self, base: str, quote: str) -> float:
+        """Return units of quote per 1 unit of base."""
+        base, quote = base.upper(), quote.upper()
+        if base == quote:
+            return 1.0
+        rates = self._ensure({base, quote})
+        return rates[quote] / rates[base]
+
+    def convert(self, amount: float, base: str, quote: str) -> float:
+        """Convert amount from base to quote currency."""
+        return amount * self.rate(base, quote)
+
+    def rates(self) -> Dict[str, float]:
+        """Return a snapshot of the table (units per USD)."""
+        return dict(self._ensure(set()))
+
+    def _ensure(self, needed: Set[str]) -> Dict[str, float]:
+        needed.discard(BASE_CURRENCY)
+        with self._lock:
+            rates = self._usable(needed)
+            stale = self._rates if needed <= self._rates.keys() else None
+        if rates is not None:
+            return rates
+
+        # One caller refreshes; the others serve stale rates if they have them, else wait for it
+        if stale is None:
+            self._refresh_lock.acquire()
+        elif not self._refresh_lock.acquire(blocking=False):
+            return stale
+        try:
+            with self._lock:
+                due = self._usable(needed) is None
+            if due:
+                self._refresh(needed)
+        finally:
+            self._refresh_lock.release()
+
+        with self._lock:
+            unknown = needed - self._rates.keys()
+            if unknown:
+                raise CurrencyError(f"No exchange rate for {', '.join(sorted(unknown))}")
+            return self._rates
+
+    def _usable(self, needed: Set[str]) -> Optional[Dict[str, float]]:
+        """Return the rates if they can serve needed, None if a refresh is due. Hold self._lock."""
+        now = self._clock()
+        if now >= self._expires_at and now >= self._retry_at:
+            return None
+        missing = needed - self._rates.keys()
+        unknown = missing & self._unknown
+        if unknown:
+            raise CurrencyError(f"No exchange rate for {', '.join(sorted(unknown))}")
+        if not missing:
+            return self._rates
+        if now < self._retry_at:
+            raise CurrencyError(f"Exchange rates unavailable for {', '.join(sorted(missing))}, retrying later")
+        return None
+
+    def _refresh(self, needed: Set[str]) -> None:
+        with self._lock:
+            currencies = sorted(self._currencies | needed)
+        try:
+            fetched = get_rate_limiter(MARKET_DATA).run_sync(self._fetcher, currencies)
+        except Exception as e:
+            with self._lock:
+                # Back off instead of hitting the upstream again on every lookup
+                self._retry_at = self._clock() + min(self.retry_interval, self.ttl)
+                if needed <= self._rates.keys():
+                    logger.warning(f"FX refresh failed, serving rates past their TTL: {e}")
+                    return
+            raise CurrencyError(f"Failed to fetch exchange rates: {e}") from e
+
+        with self._lock:
+            # Currencies missing from a partial response keep their previous rate
+            rates = dict(self._rates)
+            rates[BASE_CURRENCY] = 1.0
+            rates.update({c.upper(): float(r) for c, r in fetched.items() if r and r > 0})
+            self._rates = rates
+            self._currencies |= needed & rates.keys()
+            if self._clock() >= self._expires_at:
+                # A TTL refresh gives currencies unknown so far another chance
+                self._unknown = set()
+            self._unknown |= needed - rates.keys()
+            self._expires_at = self._clock() + self.ttl
+            self._retry_at = float("-inf")
+            self.refreshes += 1
+        logger.info(f"Refreshed FX table with {len(rates) - 1} currencies")
+
+
+def yfinance_fx_fetcher(currencies: Iterable[str]) -> Dict[str, float]:
+    """Fetch USD->currency rates for all currencies in one Yahoo Finance download."""
+    symbols = {f"{BASE_CURRENCY}{c}=X": c for c in currencies if c != BASE_CURRENCY}
+    data = yf.download(
+        list(symbols), period="5d", group_by="ticker", progress=False, threads=True,
+        session=get_market_session(), timeout=market_timeout(),
+    )
+    rates = {}
+    for symbol, currency in symbols.items():
+        try:
+            closes = data[symbol]["Close"].dropna()
+        except (KeyError, TypeError):
+            continue
+        if not closes.empty:
+            rates[currency] = float(closes.iloc[-1])
+    return rates
+
+
+class FixtureFxFetcher:
+    """Offline fetcher serving rates from a JSON file like {"rates": {"SEK": 10.5, ...}}."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def __call__(self, currencies: Iterable[str]) -> Dict[str, float]:
+        with open(self.path, encoding="utf-8") as handle:
+            return json.load(handle)["rates"]
+
+
+_fx_table: Optional[FxRateTable] = None
+
+
+def get_fx_table() -> FxRateTable:
+    """Return the process-wide FX table, creating it from AgentConfig on first use."""
+    global _fx_table
+    if _fx_table is None:
+        from .config import AgentConfig
+
+        config = AgentConfig.from_env()
+        fetcher: FxFetcher = FixtureFxFetcher(config.fx_fixtures_path) if config.fx_fixtures_path else yfinance_fx_fetcher
+        currencies = [c.strip() for c in config.fx_currencies.split(",") if c.strip()]
+        _fx_table = FxRateTable(fetcher, ttl=config.fx_ttl, currencies=currencies)
+    return _fx_table
+
+
+def set_fx_table(table: Optional[FxRateTable]) -> None:
+    """Replace the process-wide FX table; None rebuilds it from config on next use."""
+    global _fx_table
+    _fx_table = table
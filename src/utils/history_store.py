@@ -0,0 +1,338 @@
+"""
+Local OHLCV history store backed by memory-mapped NumPy columns.
+
+Bars are kept per interval and ticker as one ``.npy`` file per column
+(timestamp, open, high, low, close, volume) next to a ``meta.json`` that records
+which time ranges have already been fetched. Requests only fetch the missing
+ranges, and range queries return slices of the memory-mapped columns, so reads
+never copy the stored data.
+
+Layout::
+
+    <root>/<interval>/<TICKER>/meta.json
+    <root>/<interval>/<TICKER>/g<generation>/{ts,open,high,low,close,volume}.npy
+
+Every write goes to a new generation directory and then swaps ``meta.json``.
+Readers that still hold the previous generation's memory maps are not affected.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple, Union
+
+try:
+    from src.utils.lazy_import import lazy_import
+except ImportError:
+    # Fallback for running from src/ directory directly
+    from utils.lazy_import import lazy_import  # type: ignore
+
+# numpy/pandas load on first use so importing the agents stays cheap
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+else:
+    np = lazy_import("numpy")
+    pd = lazy_import("pandas")
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ("open", "high", "low", "close", "volume")
+
+# Bar length in seconds for the supported yfinance intervals
+INTERVAL_SECONDS: Dict[str, int] = {
+    "1m": 60, "2m": 120, "5m": 300, "15m": 900, "30m": 1800,
+    "60m": 3600, "1h": 3600, "1d": 86400,
+}
+
+TimeLike = Union[int, float, str, date, datetime, "pd.Timestamp"]
+
+# fetcher(ticker, start, end, interval) -> DataFrame indexed by bar time with
+# Open/High/Low/Close/Volume columns (the shape yfinance's Ticker.history returns)
+HistoryFetcher = Callable[[str, int, int, str], "pd.DataFrame"]
+
+
+@dataclass(frozen=True)
+class PriceHistory:
+    """Bars for one ticker and interval; the arrays are read-only views into the store."""
+    ticker: str
+    interval: str
+    timestamps: np.ndarray  # int64 epoch seconds (UTC) of each bar's start
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Copy the bars into a DataFrame with a UTC DatetimeIndex."""
+        index = pd.to_datetime(np.asarray(self.timestamps), unit="s", utc=True)
+        return pd.DataFrame(
+            {column.capitalize(): np.asarray(getattr(self, column)) for column in COLUMNS},
+            index=index,
+        )
+
+
+def to_epoch(value: TimeLike) -> int:
+    """Convert a date, datetime, ISO string or epoch number to UTC epoch seconds."""
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return int(value)
+    stamp = pd.Timestamp(value)
+    if stamp.tzinfo is None:
+        stamp = stamp.tz_localize(timezone.utc)
+    return int(stamp.timestamp())
+
+
+def _frame_to_columns(frame: pd.DataFrame) -> Dict[str, np.ndarray]:
+    if frame is None or frame.empty:
+        return {"ts": np.empty(0, dtype=np.int64), **{c: np.empty(0) for c in COLUMNS}}
+    index = pd.DatetimeIndex(frame.index)
+    index = index.tz_localize(timezone.utc) if index.tz is None else index.tz_convert(timezone.utc)
+    epoch = pd.Timestamp(0, tz=timezone.utc)
+    columns = {"ts": np.asarray((index - epoch) // pd.Timedelta(seconds=1), dtype=np.int64)}
+    for column in COLUMNS:
+        columns[column] = frame[column.capitalize()].to_numpy(dtype=np.float64)
+    return columns
+
+
+def _merge_ranges(ranges: List[List[int]]) -> List[List[int]]:
+    merged: List[List[int]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def missing_ranges(coverage: List[List[int]], start: int, end: int) -> List[Tuple[int, int]]:
+    """Return the parts of [start, end) that coverage does not include."""
+    gaps = []
+    cursor = start
+    for covered_start, covered_end in coverage:
+        if covered_end <= cursor:
+            continue
+        if covered_start >= end:
+            break
+        if covered_start > cursor:
+            gaps.append((cursor, covered_start))
+        cursor = max(cursor, covered_end)
+    if cursor < end:
+        gaps.append((cursor, end))
+    return gaps
+
+
+class _StoredSeries:
+    """Memory-mapped columns plus metadata for one ticker/interval."""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        meta_path = directory / "meta.json"
+        if meta_path.exists():
+            with open(meta_path, encoding="utf-8") as handle:
+                self.meta = json.load(handle)
+        else:
+            self.meta = {"generation": 0, "rows": 0, "coverage": []}
+
+        self.columns: Dict[str, np.ndarray] = {}
+        generation = directory / f"g{self.meta['generation']}"
+        for column in ("ts", *COLUMNS):
+            path = generation / f"{column}.npy"
+            if self.meta["rows"] and path.exists():
+                self.columns[column] = np.load(path, mmap_mode="r")
+            else:
+                self.columns[column] = np.empty(0, dtype=np.int64 if column == "ts" else np.float64)
+
+    @property
+    def coverage(self) -> List[List[int]]:
+        return self.meta["coverage"]
+
+
+class HistoryStore:
+    """On-disk OHLCV store that fetches only the date ranges it has not seen yet."""
+
+    def __init__(
+        self,
+        root: Union[str, os.PathLike],
+        fetcher: Optional[HistoryFetcher] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Args:
+            root: Directory that holds the column files.
+            fetcher: Source for missing bars; None serves only what is already stored (offline).
+            clock: Wall clock in epoch seconds, used to avoid marking unfinished bars as complete.
+        """
+        self.root = Path(root)
+        self.fetcher = fetcher
+        self._clock = clock
+        self._series: Dict[Tuple[str, str], _StoredSeries] = {}
+        # One lock per series so a slow fetch only holds up callers of the same ticker
+        self._locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def get(
+        self,
+        ticker: str,
+        start: TimeLike,
+        end: Optional[TimeLike] = None,
+        interval: str = "1d",
+    ) -> PriceHistory:
+        """Return bars with start <= time < end (end defaults to now), fetching any gaps first."""
+        if interval not in INTERVAL_SECONDS:
+            raise ValueError(f"Unsupported interval {interval!r}; expected one of {sorted(INTERVAL_SECONDS)}")
+        ticker = ticker.upper()
+        start_ts = to_epoch(start)
+        end_ts = to_epoch(end) if end is not None else int(self._clock())
+
+        fetcher = self.fetcher
+        with self._lock_for(ticker, interval):
+            series = self._load(ticker, interval)
+            if fetcher is not None:
+                gaps = missing_ranges(series.coverage, start_ts, end_ts)
+                if gaps:
+                    series = self._fill(fetcher, ticker, interval, series, gaps)
+
+        ts = series.columns["ts"]
+        lo, hi = np.searchsorted(ts, [start_ts, end_ts], side="left")
+        return PriceHistory(
+            ticker, interval, ts[lo:hi],
+            *(series.columns[column][lo:hi] for column in COLUMNS),
+        )
+
+    def coverage(self, ticker: str, interval: str = "1d") -> List[Tuple[int, int]]:
+        """Return the [start, end) epoch ranges already stored for ticker."""
+        ticker = ticker.upper()
+        with self._lock_for(ticker, interval):
+            return [(r[0], r[1]) for r in self._load(ticker, interval).coverage]
+
+    def _lock_for(self, ticker: str, interval: str) -> threading.Lock:
+        key = (interval, ticker)
+        with self._locks_guard:
+            lock = self._locks.get(key)
+            if lock is None:
+                lock = self._locks[key] = threading.Lock()
+            return lock
+
+    def _load(self, ticker: str, interval: str) -> _StoredSeries:
+        key = (interval, ticker)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = _StoredSeries(self.root / interval / ticker)
+        return series
+
+    def _fill(
+        self,
+        fetcher: HistoryFetcher,
+        ticker: str,
+        interval: str,
+        series: _StoredSeries,
+        gaps: List[Tuple[int, int]],
+    ) -> _StoredSeries:
+        step = INTERVAL_SECONDS[interval]
+        # Bars that have not closed yet will change, so coverage stops at the current bar
+        complete_until = int(self._clock()) // step * step
+
+        fetched = []
+        coverage = [list(r) for r in series.coverage]
+        for gap_start, gap_end in gaps:
+            logger.info(f"Fetching {interval} history for {ticker} from {gap_start} to {gap_end}")
+            # Start one bar early so a bar that was still open last time gets refreshed
+            frame = fetcher(ticker, gap_start - step, gap_end, interval)
+            fetched.append(_frame_to_columns(frame))
+            if min(gap_end, complete_until) > gap_start:
+                coverage.append([gap_start, min(gap_end, complete_until)])
+
+        # Newly fetched bars come first so np.unique keeps them over stored ones
+        ts = np.concatenate([part["ts"] for part in fetched] + [series.columns["ts"]])
+        ts, keep = np.unique(ts, return_index=True)
+        columns = {"ts": ts}
+        for column in COLUMNS:
+            columns[column] = np.concatenate([part[column] for part in fetched] + [series.columns[column]])[keep]
+
+        self._write(series, columns, _merge_ranges(coverage))
+        new_series = self._series[(interval, ticker)] = _StoredSeries(series.directory)
+        return new_series
+
+    def _write(self, series: _StoredSeries, columns: Dict[str, np.ndarray], coverage: List[List[int]]) -> None:
+        directory = series.directory
+        old_generation = series.meta["generation"]
+        generation = old_generation + 1
+        target = directory / f"g{generation}"
+        target.mkdir(parents=True, exist_ok=True)
+        for column, values in columns.items():
+            np.save(target / f"{column}.npy", values)
+
+        meta = {"generation": generation, "rows": int(len(columns["ts"])), "coverage": coverage}
+        tmp_path = directory / "meta.json.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(meta, handle)
+        os.replace(tmp_path, directory / "meta.json")
+        # Best effort: an open memory map may still pin the old files on some platforms
+        shutil.rmtree(directory / f"g{old_generation}", ignore_errors=True)
+
+
+def yfinance_fetcher(ticker: str, start: int, end: int, interval: str) -> pd.DataFrame:
+    """Fetch bars for [start, end) from Yahoo Finance."""
+    import yfinance as yf
+
+    from .http_session import get_market_session, market_timeout
+
+    return yf.Ticker(ticker, session=get_market_session()).history(
+        start=pd.Timestamp(start, unit="s", tz=timezone.utc),
+        end=pd.Timestamp(end, unit="s", tz=timezone.utc),
+        interval=interval,
+        auto_adjust=False,
+        actions=False,
+        timeout=market_timeout(),
+    )
+
+
+class CsvHistoryFetcher:
+    """Offline fetcher reading ``<TICKER>_<interval>.csv`` files, e.g. test fixtures."""
+
+    def __init__(self, directory: Union[str, os.PathLike]):
+        self.directory = Path(directory)
+
+    def __call__(self, ticker: str, start: int, end: int, interval: str) -> pd.DataFrame:
+        path = self.directory / f"{ticker}_{interval}.csv"
+        if not path.exists():
+            return pd.DataFrame(columns=[c.capitalize() for c in COLUMNS])
+        frame = pd.read_csv(path, index_col=0)
+        frame.index = pd.to_datetime(frame.index, utc=True)
+        lo = pd.Timestamp(start, unit="s", tz=timezone.utc)
+        hi = pd.Timestamp(end, unit="s", tz=timezone.utc)
+        return frame[(frame.index >= lo) & (frame.index < hi)]
+
+
+_history_store: Optional[HistoryStore] = None
+
+
+def get_history_store() -> HistoryStore:
+    """Return the process-wide history store, creating it from AgentConfig on first use."""
+    global _history_store
+    if _history_store is None:
+        from .config import AgentConfig
+
+        config = AgentConfig.from_env()
+        fetcher: HistoryFetcher = (
+            CsvHistoryFetcher(config.history_fixtures_dir) if config.history_fixtures_dir else yfinance_fetcher
+        )
+        _history_store = HistoryStore(config.history_dir, fetcher=fetcher)
+    return _history_store
+
+
+def set_history_store(store: Optional[HistoryStore]) -> None:
+    """Replace the process-wide history store; None rebuilds it from config on next use."""
+    global _history_store
+    _history_store = store
@@ -0,0 +1,93 @@
+"""
+Shared HTTP session for market-data requests.
+
+Unless a session is passed in, yfinance builds a new one for every ``yf.Ticker``
+and ``yf.download`` call, so each fetch paid for fresh TCP/TLS handshakes. All
+price, history and FX fetches pass the process-wide session from
+``get_market_session()`` instead. It keeps connections alive between requests
+(one connection cache per worker thread), caps how many it keeps open and
+negotiates HTTP/2 with servers that support it.
+
+The session is a curl_cffi session with browser impersonation, the transport
+yfinance supports and Yahoo accepts. When curl_cffi is not installed it falls
+back to a pooled ``requests`` session.
+"""
+import logging
+import threading
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+_FALLBACK_USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36"
+)
+
+
+def create_market_session(max_connections: int = 10, timeout: float = 30.0, http2: bool = True) -> Any:
+    """
+    Build a keep-alive session suitable for yfinance.
+
+    Args:
+        max_connections: Connections kept open per worker thread (curl) or per host pool (requests).
+        timeout: Default request timeout in seconds.
+        http2: Negotiate HTTP/2 over TLS; HTTP/1.1 otherwise.
+    """
+    try:
+        from curl_cffi import CurlHttpVersion, CurlOpt
+        from curl_cffi import requests as curl_requests
+    except ImportError:
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        logger.info("curl_cffi not installed, using a pooled requests session (HTTP/1.1)")
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_connections, pool_maxsize=max_connections)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers["User-Agent"] = _FALLBACK_USER_AGENT
+        return session
+
+    return curl_requests.Session(
+        impersonate="chrome",
+        timeout=timeout,
+        http_version=CurlHttpVersion.V2TLS if http2 else CurlHttpVersion.V1_1,
+        curl_options={CurlOpt.MAXCONNECTS: max_connections},
+    )
+
+
+_session: Any = None
+_timeout: float = 30.0
+_lock = threading.Lock()
+
+
+def get_market_session() -> Any:
+    """Return the process-wide market-data session, creating it from AgentConfig on first use."""
+    global _session, _timeout
+    if _session is None:
+        # Fetches run on executor threads; make sure they all get the same session
+        with _lock:
+            if _session is None:
+                from .config import AgentConfig
+
+                config = AgentConfig.from_env()
+                _timeout = float(config.timeout)
+                _session = create_market_session(
+                    config.market_data_max_connections, _timeout, config.market_data_http2
+                )
+    return _session
+
+
+def market_timeout() -> float:
+    """Per-request timeout (seconds) for yfinance calls that take one."""
+    get_market_session()
+    return _timeout
+
+
+def set_market_session(session: Any, timeout: Optional[float] = None) -> None:
+    """Replace the process-wide session; None rebuilds it from config on next use."""
+    global _session, _timeout
+    with _lock:
+        _session = session
+        if timeout is not None:
+            _timeout = timeout
@@ -0,0 +1,158 @@
+"""
+Vectorized technical indicators over many tickers at once.
+
+Every function takes wide DataFrames laid out time x tickers (one column per
+ticker, rows in time order). pandas' rolling/ewm operations then run over all
+columns in a single call, so the cost does not grow with a Python loop per
+ticker. Leading values without enough history are NaN.
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, Iterable, Optional, Tuple
+
+try:
+    from src.utils.history_store import HistoryStore, TimeLike, get_history_store
+    from src.utils.lazy_import import lazy_import
+except ImportError:
+    # Fallback for running from src/ directory directly
+    from utils.history_store import HistoryStore, TimeLike, get_history_store  # type: ignore
+    from utils.lazy_import import lazy_import  # type: ignore
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+else:
+    np = lazy_import("numpy")
+    pd = lazy_import("pandas")
+
+TRADING_DAYS_PER_YEAR = 252
+
+
+def sma(close: pd.DataFrame, window: int = 20) -> pd.DataFrame:
+    """Simple moving average."""
+    return close.rolling(window, min_periods=window).mean()
+
+
+def ema(close: pd.DataFrame, span: int = 20) -> pd.DataFrame:
+    """Exponential moving average, seeded with the first close."""
+    return close.ewm(span=span, adjust=False, min_periods=span).mean()
+
+
+def _wilder(values: pd.DataFrame, period: int) -> pd.DataFrame:
+    return values.ewm(alpha=1 / period, adjust=False, min_periods=period).mean()
+
+
+def rsi(close: pd.DataFrame, period: int = 14) -> pd.DataFrame:
+    """Relative Strength Index with Wilder smoothing (0-100)."""
+    delta = close.diff()
+    gain = _wilder(delta.clip(lower=0), period)
+    loss = _wilder(-delta.clip(upper=0), period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result = 100 - 100 / (1 + gain / loss)
+    # Without losses the ratio is undefined: all gains is maximum strength, a flat series is neutral
+    result = result.mask((loss == 0) & (gain > 0), 100.0)
+    return result.mask((loss == 0) & (gain == 0), 50.0)
+
+
+def macd(
+    close: pd.DataFrame, fast: int = 12, slow: int = 26, signal: int = 9
+) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """Return (MACD line, signal line, histogram)."""
+    line = ema(close, fast) - ema(close, slow)
+    signal_line = line.ewm(span=signal, adjust=False, min_periods=signal).mean()
+    return line, signal_line, line - signal_line
+
+
+def bollinger(
+    close: pd.DataFrame, window: int = 20, num_std: float = 2.0
+) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """Return (lower band, middle band, upper band) using the population standard deviation."""
+    rolling = close.rolling(window, min_periods=window)
+    middle = rolling.mean()
+    width = rolling.std(ddof=0) * num_std
+    return middle - width, middle, middle + width
+
+
+def atr(high: pd.DataFrame, low: pd.DataFrame, close: pd.DataFrame, period: int = 14) -> pd.DataFrame:
+    """Average True Range with Wilder smoothing."""
+    previous = close.shift(1)
+    true_range = np.fmax(high - low, np.fmax((high - previous).abs(), (low - previous).abs()))
+    return _wilder(true_range, period)
+
+
+def volatility(close: pd.DataFrame, window: int = 20, periods_per_year: int = TRADING_DAYS_PER_YEAR) -> pd.DataFrame:
+    """Annualized rolling standard deviation of log returns."""
+    returns = np.log(close / close.shift(1))
+    return returns.rolling(window, min_periods=window).std() * np.sqrt(periods_per_year)
+
+
+def compute_indicators(high: pd.DataFrame, low: pd.DataFrame, close: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """Compute the standard indicator set for every ticker column."""
+    macd_line, macd_signal, macd_hist = macd(close)
+    bb_lower, bb_middle, bb_upper = bollinger(close)
+    return {
+        "close": close,
+        "sma_20": sma(close, 20),
+        "sma_50": sma(close, 50),
+        "ema_12": ema(close, 12),
+        "ema_26": ema(close, 26),
+        "rsi_14": rsi(close, 14),
+        "macd": macd_line,
+        "macd_signal": macd_signal,
+        "macd_hist": macd_hist,
+        "bb_lower": bb_lower,
+        "bb_middle": bb_middle,
+        "bb_upper": bb_upper,
+        "atr_14": atr(high, low, close, 14),
+        "volatility_20": volatility(close, 20),
+    }
+
+
+def latest_values(indicators: Dict[str, pd.DataFrame]) -> Dict[str, Dict[str, Optional[float]]]:
+    """Last value of each indicator per ticker, with NaN reported as None."""
+    # One row per indicator, one column per ticker
+    table = pd.DataFrame({name: _last_valid(frame) for name, frame in indicators.items()}).T
+    return {
+        ticker: {
+            name: None if pd.isna(value) else round(float(value), 4)
+            for name, value in table[ticker].items()
+        }
+        for ticker in table.columns
+    }
+
+
+def _last_valid(frame: pd.DataFrame) -> pd.Series:
+    last = frame.iloc[-1]
+    # Only tickers whose series ended early (halted, delisted) need the full forward fill
+    return frame.ffill().iloc[-1] if last.isna().any() else last
+
+
+def load_price_matrix(
+    tickers: Iterable[str],
+    start: TimeLike,
+    end: Optional[TimeLike] = None,
+    store: Optional[HistoryStore] = None,
+    interval: str = "1d",
+    errors: Optional[Dict[str, Exception]] = None,
+) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """Return (high, low, close) time x tickers frames from the history store, aligned on bar time.
+
+    When errors is given, a ticker whose history cannot be loaded gets an
+    all-NaN column and its exception is recorded there instead of being raised.
+    """
+    store = store or get_history_store()
+    highs, lows, closes = {}, {}, {}
+    for ticker in dict.fromkeys(tickers):
+        try:
+            history = store.get(ticker, start, end, interval=interval)
+        except Exception as e:
+            if errors is None:
+                raise
+            errors[ticker] = e
+            highs[ticker] = lows[ticker] = closes[ticker] = pd.Series(dtype="float64")
+            continue
+        index = pd.Index(history.timestamps, name="timestamp")
+        highs[ticker] = pd.Series(history.high, index=index)
+        lows[ticker] = pd.Series(history.low, index=index)
+        closes[ticker] = pd.Series(history.close, index=index)
+    return pd.DataFrame(highs), pd.DataFrame(lows), pd.DataFrame(closes)
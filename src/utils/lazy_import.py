@@ -0,0 +1,49 @@
+"""
+Deferred module imports for keeping CLI start-up cheap.
+
+``np = lazy_import("numpy")`` binds a placeholder that imports numpy on first
+attribute access, so modules that only need a heavy dependency inside their
+functions don't pay for it at import time. Attributes can still be patched in
+tests (``patch("src.agents.stock_agent.yf.Ticker")``). Modules that use the
+placeholder in annotations import the real module under ``TYPE_CHECKING`` so
+type checkers still see its types.
+
+Unlike ``importlib.util.LazyLoader`` nothing is put into ``sys.modules`` early:
+the real import goes through the normal (thread-safe) import machinery the
+first time it is needed, whichever thread gets there first.
+"""
+import importlib
+import sys
+import types
+from typing import Any
+
+
+class LazyModule(types.ModuleType):
+    """Module placeholder that imports its target on first attribute access."""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_target"] = None
+
+    def _load(self) -> types.ModuleType:
+        module = self.__dict__["_lazy_target"]
+        if module is None:
+            module = importlib.import_module(self.__name__)
+            # Copy the namespace so later lookups skip __getattr__; attributes
+            # already set on the placeholder (e.g. by mock.patch) win
+            for name, value in vars(module).items():
+                self.__dict__.setdefault(name, value)
+            self.__dict__["_lazy_target"] = module
+        return module
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._load(), name)
+
+    def __dir__(self):
+        return dir(self._load())
+
+
+def lazy_import(name: str) -> types.ModuleType:
+    """Return the module if it is already imported, else a placeholder that imports it on use."""
+    module = sys.modules.get(name)
+    return module if module is not None else LazyModule(name)
@@ -0,0 +1,628 @@
+"""
+Pluggable market-data providers for current quotes.
+
+``fetch_stock_price`` and ``fetch_stock_prices`` get quotes from a
+``MarketDataProvider`` instead of calling yfinance directly:
+
+- ``YFinanceProvider``: yfinance over the shared market-data session (default)
+- ``HttpBatchProvider``: one GET per batch against a quote endpoint answering in
+  Yahoo's v7 ``quoteResponse`` format, which also carries name and currency
+- ``ReplayProvider``: recorded quotes from a JSON file at a configurable
+  latency, for offline runs, tests and load tests
+- ``TickReplayProvider``: recorded price ticks from a JSON-lines file, one
+  line per poll, for replaying a live session into quote subscriptions
+
+``FallbackProvider`` chains providers in order. A provider that fails is
+followed by the next one. Once a provider has a latency history, a request
+still running past its p95 latency is hedged: the next provider is asked as
+well and the first answer wins.
+
+Every provider returns the same quote dicts: ticker, company_name, price,
+currency, timestamp and change (absolute, percent, previous_close).
+"""
+import json
+import logging
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import datetime
+from time import perf_counter
+from typing import Any, Deque, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    from src.utils.exceptions import (
+        APIRateLimitError, StockNotFoundError, UpstreamTimeoutError, UpstreamUnavailableError,
+    )
+    from src.utils.http_session import get_market_session, market_timeout
+    from src.utils.lazy_import import lazy_import
+    from src.utils.rate_limit import is_throttling_error
+except ImportError:
+    # Fallback for running from src/ directory directly
+    from utils.exceptions import (  # type: ignore
+        APIRateLimitError, StockNotFoundError, UpstreamTimeoutError, UpstreamUnavailableError,
+    )
+    from utils.http_session import get_market_session, market_timeout  # type: ignore
+    from utils.lazy_import import lazy_import  # type: ignore
+    from utils.rate_limit import is_throttling_error  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+# yfinance (and pandas with it) loads on the first fetch, not when this module is imported
+yf = lazy_import("yfinance")
+
+YAHOO_QUOTE_URL = "https://query1.finance.yahoo.com/v7/finance/quote"
+
+Quote = Dict[str, Any]
+
+
+def price_change(price: float, reference: Optional[float]) -> Dict[str, Optional[float]]:
+    """Absolute and percent change of price against a reference close (None when unknown)."""
+    if not reference:
+        return {"absolute": None, "percent": None}
+    absolute = price - reference
+    return {"absolute": round(absolute, 4), "percent": round(absolute / reference * 100, 4)}
+
+
+def make_quote(
+    ticker: str,
+    price: float,
+    previous_close: Optional[float] = None,
+    company_name: Optional[str] = None,
+    currency: str = "USD",
+    timestamp: Optional[str] = None,
+) -> Quote:
+    """Build the quote dict every provider returns."""
+    return {
+        "ticker": ticker,
+        "company_name": company_name or ticker,
+        "price": price,
+        "currency": currency,
+        "timestamp": timestamp or datetime.now().isoformat(),
+        "change": {**price_change(price, previous_close), "previous_close": previous_close},
+    }
+
+
+def is_timeout_error(exc: BaseException) -> bool:
+    """True for the builtin TimeoutError and the HTTP libraries' own timeout exceptions.
+
+    requests, curl_cffi and httpx raise timeouts (``Timeout``, ``ReadTimeout``,
+    ``TimeoutException``...) that do not derive from the builtin.
+    """
+    return isinstance(exc, TimeoutError) or "Timeout" in type(exc).__name__
+
+
+def error_quote(ticker: str, message: str) -> Quote:
+    """Per-ticker failure entry in a batch result."""
+    return {"ticker": ticker, "error": message}
+
+
+class MarketDataProvider(ABC):
+    """Source of current quotes.
+
+    Subclasses implement ``quote``; ``quotes`` defaults to one ``quote`` call per
+    ticker and should be overridden where the source can answer a batch at once.
+    """
+
+    name = "provider"
+
+    @abstractmethod
+    def quote(self, ticker: str) -> Quote:
+        """Return the current quote for ticker.
+
+        Raises:
+            StockNotFoundError: The source has no price for ticker.
+            APIRateLimitError: The source throttled the request.
+            UpstreamTimeoutError: The source did not answer in time.
+            UpstreamUnavailableError: The source failed or could not be reached.
+        """
+
+    def quotes(self, tickers: Sequence[str]) -> Dict[str, Quote]:
+        """Return {ticker: quote or error_quote} for every ticker."""
+        results = {}
+        for ticker in tickers:
+            try:
+                results[ticker] = self.quote(ticker)
+            except (StockNotFoundError, APIRateLimitError, UpstreamTimeoutError, UpstreamUnavailableError) as e:
+                results[ticker] = error_quote(ticker, str(e))
+        return results
+
+    def close(self) -> None:
+        """Release resources held by the provider."""
+
+
+class YFinanceProvider(MarketDataProvider):
+    """Quotes from yfinance: ``Ticker.info`` for one ticker, one bulk download for a batch.
+
+    The bulk download carries prices only, so company name and currency come from
+    per-ticker metadata, remembered for the life of the provider. A ticker seen
+    for the first time costs one metadata lookup; a batch entry whose metadata
+    cannot be found falls back to quote() so it never differs from a single fetch.
+    """
+
+    name = "yfinance"
+
+    def __init__(self, metadata_workers: int = 8):
+        self.metadata_workers = metadata_workers
+        self._metadata: Dict[str, Tuple[str, str]] = {}  # ticker -> (company_name, currency)
+        self._lock = threading.Lock()
+
+    def _remember_metadata(self, ticker: str, company_name: str, currency: str) -> None:
+        with self._lock:
+            self._metadata[ticker] = (company_name, currency)
+
+    def _lookup_metadata(self, ticker: str) -> Optional[Tuple[str, str]]:
+        """Name and currency from the chart metadata of ticker, or None when unavailable."""
+        try:
+            meta = yf.Ticker(ticker, session=get_market_session()).get_history_metadata() or {}
+        except Exception as e:
+            logger.warning(f"No metadata for {ticker}: {e}")
+            return None
+        currency = meta.get("currency")
+        if not currency:
+            return None
+        metadata = (meta.get("longName") or meta.get("shortName") or ticker, currency)
+        self._remember_metadata(ticker, *metadata)
+        return metadata
+
+    def _metadata_for(self, tickers: Sequence[str]) -> Dict[str, Tuple[str, str]]:
+        with self._lock:
+            known = {t: self._metadata[t] for t in tickers if t in self._metadata}
+        unknown = [t for t in tickers if t not in known]
+        if unknown:
+            with ThreadPoolExecutor(min(self.metadata_workers, len(unknown))) as pool:
+                for ticker, metadata in zip(unknown, pool.map(self._lookup_metadata, unknown)):
+                    if metadata is not None:
+                        known[ticker] = metadata
+        return known
+
+    def quote(self, ticker: str) -> Quote:
+        try:
+            logger.info(f"Fetching stock price for {ticker}")
+
+            stock = yf.Ticker(ticker, session=get_market_session())
+            info = stock.info
+
+            # Check if ticker exists
+            if not info or 'regularMarketPrice' not in info:
+                # Try alternative method; a few sessions also give the previous close
+                hist = stock.history(period="5d", timeout=market_timeout())
+                if hist.empty:
+                    raise StockNotFoundError(f"Stock not found: {ticker}")
+                closes = hist['Close']
+                current_price = float(closes.iloc[-1])
+                previous_close = float(closes.iloc[-2]) if len(closes) > 1 else None
+            else:
+                current_price = float(info['regularMarketPrice'])
+                previous_close = info.get('regularMarketPreviousClose') or info.get('previousClose')
+
+            result = make_quote(
+                ticker, current_price, float(previous_close) if previous_close else None,
+                company_name=info.get('longName', ticker), currency=info.get('currency', 'USD'),
+            )
+            if info and 'currency' in info:
+                self._remember_metadata(ticker, result["company_name"], result["currency"])
+            logger.info(f"Successfully fetched {ticker}: ${current_price}")
+            return result
+
+        except TimeoutError as e:
+            logger.error(f"Timeout fetching {ticker}: {e}")
+            raise UpstreamTimeoutError(f"Request timeout for {ticker}") from e
+        except StockNotFoundError:
+            raise
+        except Exception as e:
+            if is_throttling_error(e):
+                # Surface throttling so the market-data limiter backs off and retries
+                logger.warning(f"Throttled fetching {ticker}: {e}")
+                raise APIRateLimitError(f"Rate limited fetching {ticker}") from e
+            logger.error(f"Failed to fetch {ticker}: {e}")
+            raise StockNotFoundError(f"Failed to fetch stock data for {ticker}: {e}")
+
+    def quotes(self, tickers: Sequence[str]) -> Dict[str, Quote]:
+        """Latest closes for all tickers in a single yfinance request."""
+        logger.info(f"Bulk fetching stock prices for {', '.join(tickers)}")
+        try:
+            # Five sessions so the previous close comes from the same request
+            data = yf.download(
+                list(tickers), period="5d", group_by="ticker", progress=False, threads=True,
+                session=get_market_session(), timeout=market_timeout(),
+            )
+        except TimeoutError as e:
+            logger.error(f"Timeout bulk fetching {tickers}: {e}")
+            return {t: error_quote(t, f"Request timeout for {t}") for t in tickers}
+        except Exception as e:
+            logger.error(f"Failed to bulk fetch {tickers}: {e}")
+            return {t: error_quote(t, f"Failed to fetch stock data for {t}: {e}") for t in tickers}
+
+        timestamp = datetime.now().isoformat()
+        prices: Dict[str, Tuple[float, Optional[float]]] = {}
+        for ticker in tickers:
+            try:
+                closes = data[ticker]["Close"].dropna()
+            except (KeyError, TypeError):
+                closes = None
+            if closes is not None and not closes.empty:
+                prices[ticker] = (float(closes.iloc[-1]), float(closes.iloc[-2]) if len(closes) > 1 else None)
+
+        metadata = self._metadata_for(list(prices))
+        results: Dict[str, Quote] = {}
+        for ticker in tickers:
+            if ticker not in prices:
+                results[ticker] = error_quote(ticker, f"Stock not found: {ticker}")
+            elif ticker in metadata:
+                company_name, currency = metadata[ticker]
+                price, previous_close = prices[ticker]
+                results[ticker] = make_quote(
+                    ticker, price, previous_close, company_name=company_name, currency=currency, timestamp=timestamp,
+                )
+            else:
+                # Without a name and currency the entry would not match a single fetch
+                try:
+                    results[ticker] = self.quote(ticker)
+                except (StockNotFoundError, APIRateLimitError, UpstreamTimeoutError, UpstreamUnavailableError) as e:
+                    results[ticker] = error_quote(ticker, str(e))
+        return results
+
+
+class HttpBatchProvider(MarketDataProvider):
+    """Quotes for a whole batch from one GET ``<url>?symbols=A,B,...`` over the shared session."""
+
+    name = "http"
+
+    def __init__(self, url: str = YAHOO_QUOTE_URL, session: Any = None, max_batch: int = 50):
+        """
+        Args:
+            url: Endpoint answering ``{"quoteResponse": {"result": [...]}}``.
+            session: HTTP session; defaults to the shared market-data session.
+            max_batch: Symbols per request; longer batches are split.
+        """
+        self.url = url
+        self._session = session
+        self.max_batch = max_batch
+
+    def quote(self, ticker: str) -> Quote:
+        result = self._request([ticker]).get(ticker)
+        if result is None:
+            raise StockNotFoundError(f"Stock not found: {ticker}")
+        return result
+
+    def quotes(self, tickers: Sequence[str]) -> Dict[str, Quote]:
+        results: Dict[str, Quote] = {}
+        for i in range(0, len(tickers), self.max_batch):
+            chunk = list(tickers[i:i + self.max_batch])
+            try:
+                found = self._request(chunk)
+            except (APIRateLimitError, UpstreamTimeoutError, UpstreamUnavailableError) as e:
+                # A failed request fails each ticker in it, not the whole batch
+                found = {t: error_quote(t, str(e)) for t in chunk}
+            for ticker in chunk:
+                results[ticker] = found.get(ticker) or error_quote(ticker, f"Stock not found: {ticker}")
+        return results
+
+    def _request(self, tickers: List[str]) -> Dict[str, Quote]:
+        session = self._session or get_market_session()
+        try:
+            response = session.get(self.url, params={"symbols": ",".join(tickers)}, timeout=market_timeout())
+            response.raise_for_status()
+            rows = response.json()["quoteResponse"]["result"]
+        except Exception as e:
+            if is_timeout_error(e):
+                raise UpstreamTimeoutError(f"Quote request timed out for {', '.join(tickers)}: {e}") from e
+            if is_throttling_error(e):
+                raise APIRateLimitError(f"Quote request failed for {', '.join(tickers)}: {e}") from e
+            # Connection failures, 5xx and unreadable bodies say nothing about the symbols
+            raise UpstreamUnavailableError(f"Quote request failed for {', '.join(tickers)}: {e}") from e
+
+        timestamp = datetime.now().isoformat()
+        results = {}
+        for row in rows or []:
+            ticker, price = row.get("symbol"), row.get("regularMarketPrice")
+            if ticker in tickers and price is not None:
+                results[ticker] = make_quote(
+                    ticker, float(price), row.get("regularMarketPreviousClose"),
+                    company_name=row.get("longName") or row.get("shortName"),
+                    currency=row.get("currency") or "USD", timestamp=timestamp,
+                )
+        return results
+
+
+class ReplayProvider(MarketDataProvider):
+    """Serves recorded quotes from a JSON file like {"quotes": {"TSLA": {...quote...}}}.
+
+    Each call sleeps ``latency`` seconds (once per batch) to stand in for a
+    network round trip. Served quotes carry the current time as timestamp.
+    """
+
+    name = "replay"
+
+    def __init__(self, path: str, latency: float = 0.0):
+        self.path = path
+        self.latency = latency
+        self._quotes: Optional[Dict[str, Quote]] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def record(path: str, quotes: Iterable[Quote]) -> None:
+        """Write quotes (e.g. fetch_stock_prices results) to a replay file."""
+        recorded = {q["ticker"]: q for q in quotes if "error" not in q}
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump({"quotes": recorded}, handle, indent=2)
+
+    def _load(self) -> Dict[str, Quote]:
+        if self._quotes is None:
+            with self._lock:
+                if self._quotes is None:
+                    with open(self.path, encoding="utf-8") as handle:
+                        self._quotes = json.load(handle)["quotes"]
+        return self._quotes
+
+    def _serve(self, ticker: str, timestamp: str) -> Optional[Quote]:
+        recorded = self._load().get(ticker)
+        if recorded is None:
+            return None
+        return {**recorded, "change": dict(recorded.get("change") or {}), "timestamp": timestamp}
+
+    def quote(self, ticker: str) -> Quote:
+        if self.latency:
+            time.sleep(self.latency)
+        result = self._serve(ticker, datetime.now().isoformat())
+        if result is None:
+            raise StockNotFoundError(f"Stock not found: {ticker}")
+        return result
+
+    def quotes(self, tickers: Sequence[str]) -> Dict[str, Quote]:
+        if self.latency:
+            time.sleep(self.latency)
+        timestamp = datetime.now().isoformat()
+        return {t: self._serve(t, timestamp) or error_quote(t, f"Stock not found: {t}") for t in tickers}
+
+
+class TickReplayProvider(MarketDataProvider):
+    """Replays price ticks from a JSON-lines file, one line per poll.
+
+    Each line maps tickers to prices, e.g. {"TSLA": 250.45, "AAPL": 180.1}.
+    Every quotes() call is a poll and serves the next line; quote() reads the
+    prices of the current line without advancing. Tickers missing from a line
+    keep their last price, and the first price seen for a ticker is its
+    previous close. After the last line the final prices are served again, or
+    the file starts over when ``loop`` is set.
+    """
+
+    name = "ticks"
+
+    def __init__(self, path: str, loop: bool = False):
+        self.path = path
+        self.loop = loop
+        self._ticks: Optional[List[Dict[str, float]]] = None
+        self._step = 0
+        self._prices: Dict[str, float] = {}
+        self._opening: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def record(path: str, ticks: Iterable[Dict[str, float]]) -> None:
+        """Write ticks (one {ticker: price} dict per poll) to a tick file."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as handle:
+            for tick in ticks:
+                handle.write(json.dumps(tick) + "\n")
+
+    def _load(self) -> List[Dict[str, float]]:
+        if self._ticks is None:
+            with open(self.path, encoding="utf-8") as handle:
+                self._ticks = [json.loads(line) for line in handle if line.strip()]
+        return self._ticks
+
+    def _advance(self) -> None:
+        ticks = self._load()
+        if self._step >= len(ticks):
+            if not self.loop or not ticks:
+                return
+            self._step = 0
+        for ticker, price in ticks[self._step].items():
+            self._opening.setdefault(ticker, price)
+            self._prices[ticker] = price
+        self._step += 1
+
+    def _serve(self, ticker: str, timestamp: str) -> Optional[Quote]:
+        price = self._prices.get(ticker)
+        if price is None:
+            return None
+        return make_quote(ticker, price, self._opening[ticker], timestamp=timestamp)
+
+    def quote(self, ticker: str) -> Quote:
+        timestamp = datetime.now().isoformat()
+        with self._lock:
+            if self._step == 0:
+                self._advance()
+            result = self._serve(ticker, timestamp)
+        if result is None:
+            raise StockNotFoundError(f"Stock not found: {ticker}")
+        return result
+
+    def quotes(self, tickers: Sequence[str]) -> Dict[str, Quote]:
+        timestamp = datetime.now().isoformat()
+        with self._lock:
+            self._advance()
+            return {t: self._serve(t, timestamp) or error_quote(t, f"Stock not found: {t}") for t in tickers}
+
+
+class FallbackProvider(MarketDataProvider):
+    """Tries providers in order, hedging slow requests to the next provider."""
+
+    name = "fallback"
+
+    def __init__(
+        self,
+        providers: Sequence[MarketDataProvider],
+        hedge_percentile: float = 95,
+        min_samples: int = 20,
+        window: int = 200,
+        max_workers: int = 8,
+    ):
+        """
+        Args:
+            providers: Providers in order of preference.
+            hedge_percentile: Latency percentile after which the next provider is
+                also asked; 0 disables hedging.
+            min_samples: Successful calls a provider needs before it is hedged.
+            window: Recent latencies kept per provider.
+            max_workers: Threads for hedged requests.
+        """
+        if not providers:
+            raise ValueError("FallbackProvider needs at least one provider")
+        self.providers = list(providers)
+        self.hedge_percentile = hedge_percentile
+        self.min_samples = min_samples
+        self._latencies: Dict[int, Deque[float]] = {id(p): deque(maxlen=window) for p in self.providers}
+        self._lock = threading.Lock()
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._max_workers = max_workers
+        self.fallbacks = 0
+        self.hedges = 0
+
+    def deadline(self, provider: MarketDataProvider) -> Optional[float]:
+        """Seconds to wait for provider before hedging; None until it has enough history."""
+        if self.hedge_percentile <= 0:
+            return None
+        with self._lock:
+            samples = sorted(self._latencies[id(provider)])
+        if len(samples) < self.min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * self.hedge_percentile / 100))]
+
+    def _timed(self, provider: MarketDataProvider, method: str, arg: Any) -> Any:
+        start = perf_counter()
+        result = getattr(provider, method)(arg)
+        with self._lock:
+            self._latencies[id(provider)].append(perf_counter() - start)
+        return result
+
+    def _submit(self, provider: MarketDataProvider, method: str, arg: Any) -> Future:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(self._max_workers, thread_name_prefix="market-data-hedge")
+        return self._pool.submit(self._timed, provider, method, arg)
+
+    def _first(self, providers: List[MarketDataProvider], method: str, arg: Any) -> Any:
+        """First successful answer from providers, falling through on errors and hedging past deadlines."""
+        first_error: Optional[BaseException] = None
+        remaining = list(providers)
+        pending: Dict[Future, MarketDataProvider] = {}
+        while remaining or pending:
+            if not pending:
+                provider = remaining.pop(0)
+                deadline = self.deadline(provider)
+                if deadline is None or not remaining:
+                    # Nothing to hedge with (yet): call inline, no thread hop
+                    try:
+                        return self._timed(provider, method, arg)
+                    except Exception as e:
+                        first_error = first_error or e
+                        self._log_fallback(provider, remaining, e)
+                        continue
+                pending[self._submit(provider, method, arg)] = provider
+            else:
+                deadline = self.deadline(list(pending.values())[-1]) if remaining else None
+
+            done, _ = wait(pending, timeout=deadline, return_when=FIRST_COMPLETED)
+            if not done:
+                # Slowest recent provider is past its deadline: ask the next one too
+                provider = remaining.pop(0)
+                self.hedges += 1
+                logger.info(f"Hedging market-data request to {provider.name} after {deadline:.3f}s")
+                pending[self._submit(provider, method, arg)] = provider
+                continue
+            for future in done:
+                provider = pending.pop(future)
+                error = future.exception()
+                if error is None:
+                    return future.result()
+                first_error = first_error or error
+                self._log_fallback(provider, remaining, error)
+        assert first_error is not None
+        raise first_error
+
+    def _log_fallback(self, provider: MarketDataProvider, remaining: List[MarketDataProvider], error: BaseException):
+        if remaining:
+            self.fallbacks += 1
+            logger.warning(f"{provider.name} failed ({error}), falling back to {remaining[0].name}")
+
+    def quote(self, ticker: str) -> Quote:
+        return self._first(self.providers, "quote", ticker)
+
+    def quotes(self, tickers: Sequence[str]) -> Dict[str, Quote]:
+        results = dict(self._first(self.providers, "quotes", list(tickers)))
+        # Tickers a provider could not price get another chance further down the chain
+        for position in range(1, len(self.providers)):
+            failed = [t for t in tickers if "error" in results[t]]
+            if not failed:
+                break
+            self.fallbacks += 1
+            try:
+                found = self._first(self.providers[position:], "quotes", failed)
+            except Exception as e:
+                logger.warning(f"Fallback providers failed for {failed}: {e}")
+                break
+            results.update({t: q for t, q in found.items() if "error" not in q})
+        return results
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+        for provider in self.providers:
+            provider.close()
+
+
+def create_provider(name: str, config: Any) -> MarketDataProvider:
+    """Build one provider by name from AgentConfig."""
+    if name == "yfinance":
+        return YFinanceProvider()
+    if name == "http":
+        return HttpBatchProvider(config.market_data_quote_url)
+    if name == "replay":
+        if not config.market_data_replay_path:
+            raise ValueError("The replay market-data provider needs MARKET_DATA_REPLAY_PATH")
+        return ReplayProvider(config.market_data_replay_path, config.market_data_replay_latency_ms / 1000)
+    if name == "ticks":
+        if not config.market_data_replay_path:
+            raise ValueError("The ticks market-data provider needs MARKET_DATA_REPLAY_PATH")
+        return TickReplayProvider(config.market_data_replay_path, loop=True)
+    raise ValueError(f"Unknown market-data provider: {name}")
+
+
+_provider: Optional[MarketDataProvider] = None
+_provider_lock = threading.Lock()
+
+
+def get_market_data_provider() -> MarketDataProvider:
+    """Return the process-wide provider, built from MARKET_DATA_PROVIDERS on first use."""
+    global _provider
+    if _provider is None:
+        with _provider_lock:
+            if _provider is None:
+                from .config import AgentConfig
+
+                config = AgentConfig.from_env()
+                names = [n.strip().lower() for n in config.market_data_providers.split(",") if n.strip()]
+                providers = [create_provider(name, config) for name in names or ["yfinance"]]
+                _provider = (
+                    providers[0] if len(providers) == 1
+                    else FallbackProvider(providers, hedge_percentile=config.market_data_hedge_percentile)
+                )
+    return _provider
+
+
+def set_market_data_provider(provider: Optional[MarketDataProvider]) -> None:
+    """Replace the process-wide provider; None rebuilds it from config on next use."""
+    global _provider
+    with _provider_lock:
+        _provider = provider
@@ -0,0 +1,346 @@
+"""Quote cache with market-aware TTLs and stale-while-revalidate, on a pluggable backend."""
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional
+
+try:
+    from src.utils.cache_backends import CacheBackend, MemoryBackend, create_cache_backend
+    from src.utils.exceptions import CacheBackendError
+except ImportError:
+    # Fallback for running from src/ directory directly
+    from utils.cache_backends import CacheBackend, MemoryBackend, create_cache_backend  # type: ignore
+    from utils.exceptions import CacheBackendError  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+try:
+    from zoneinfo import ZoneInfo
+    _NEW_YORK: Any = ZoneInfo("America/New_York")
+except Exception:  # pragma: no cover - tz database missing (e.g. Windows without tzdata)
+    _NEW_YORK = timezone(timedelta(hours=-5))
+
+
+def is_us_market_open(now: Optional[datetime] = None) -> bool:
+    """Return True during regular NYSE/Nasdaq trading hours (holidays are not considered)."""
+    local = (now or datetime.now(timezone.utc)).astimezone(_NEW_YORK)
+    if local.weekday() >= 5:
+        return False
+    minutes = local.hour * 60 + local.minute
+    return 9 * 60 + 30 <= minutes < 16 * 60
+
+
+class MarketHoursTTL:
+    """TTL policy: short TTLs while the market is open, long ones while it is closed."""
+
+    def __init__(
+        self,
+        open_ttl: float = 15.0,
+        closed_ttl: float = 300.0,
+        market_open: Callable[[], bool] = is_us_market_open,
+    ):
+        self.open_ttl = open_ttl
+        self.closed_ttl = closed_ttl
+        self._market_open = market_open
+
+    def __call__(self, ticker: str) -> float:
+        return self.open_ttl if self._market_open() else self.closed_ttl
+
+
+@dataclass
+class CacheStats:
+    """Counters exposed by QuoteCache."""
+    hits: int = 0
+    stale_hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+    peer_waits: int = 0
+    refreshes: int = 0
+    refresh_failures: int = 0
+    evictions: int = 0
+    backend_errors: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return dict(self.__dict__)
+
+
+@dataclass
+class _Entry:
+    value: Dict[str, Any]
+    fresh_until: float
+    stale_until: float
+    fetched_at: float = field(default=0.0)
+
+
+class QuoteCache:
+    """
+    Thread-safe quote cache keyed by ticker, stored in a CacheBackend.
+
+    - Fresh entries are returned directly.
+    - Stale entries (expired, but within ``max_stale`` seconds) are returned at once
+      while a single background refresh runs.
+    - Concurrent misses for the same ticker share one upstream call. With a shared
+      backend, workers in other processes that miss at the same time wait for that
+      call's result instead of fetching it again.
+    - Backend errors count as misses, so an unreachable shared cache never fails a quote.
+
+    Times come from ``clock`` (wall-clock by default, so processes sharing a
+    backend agree on expiry).
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_policy: Optional[Callable[[str], float]] = None,
+        max_stale: float = 60.0,
+        clock: Callable[[], float] = time.time,
+        refresh_workers: int = 2,
+        backend: Optional[CacheBackend] = None,
+        lock_timeout: float = 5.0,
+        poll_interval: float = 0.02,
+    ):
+        """
+        Args:
+            max_entries: LRU bound of the default in-memory backend.
+            backend: Where entries are stored; an in-memory LRU by default.
+            lock_timeout: How long a worker waits for another process's fetch
+                before fetching itself (shared backends only).
+            poll_interval: Seconds between checks while waiting for that fetch.
+        """
+        self.max_entries = max_entries
+        self.ttl_policy = ttl_policy or MarketHoursTTL()
+        self.max_stale = max_stale
+        self.backend = backend if backend is not None else MemoryBackend(max_entries, clock=clock)
+        self.lock_timeout = lock_timeout
+        self.poll_interval = poll_interval
+        self._clock = clock
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._stats = CacheStats()
+        self._refresh_workers = refresh_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def stats(self) -> CacheStats:
+        """Snapshot of the cache counters."""
+        with self._lock:
+            stats = CacheStats(**self._stats.as_dict())
+        stats.evictions = self.backend.evictions
+        return stats
+
+    def __len__(self) -> int:
+        try:
+            with self._lock:
+                # Stampede locks share the backend; only quotes count as entries
+                return self.backend.count(_key(""))
+        except CacheBackendError as e:
+            self._backend_error(e)
+            return 0
+
+    def get(self, ticker: str) -> Optional[Dict[str, Any]]:
+        """Return a fresh cached quote without touching upstream, or None."""
+        entry = self._load(ticker)
+        if entry is None or self._clock() >= entry.fresh_until:
+            return None
+        with self._lock:
+            self._stats.hits += 1
+        return dict(entry.value)
+
+    def put(self, ticker: str, value: Dict[str, Any]) -> None:
+        """Store a quote using the TTL policy for the ticker."""
+        self._store(ticker, value, self.ttl_policy(ticker))
+
+    def fresh_until(self, ticker: str) -> Optional[float]:
+        """Return the clock time at which the cached quote expires, or None if it is not fresh."""
+        entry = self._load(ticker)
+        if entry is None or self._clock() >= entry.fresh_until:
+            return None
+        return entry.fresh_until
+
+    def invalidate(self, ticker: Optional[str] = None) -> None:
+        """Drop one ticker, or every entry when no ticker is given."""
+        try:
+            if ticker is None:
+                self.backend.clear()
+            else:
+                self.backend.delete(_key(ticker))
+        except CacheBackendError as e:
+            self._backend_error(e)
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        self.invalidate()
+        with self._lock:
+            self._stats = CacheStats()
+
+    def get_or_fetch(self, ticker: str, fetch: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """Return the cached quote for ticker, calling fetch() on a miss."""
+        entry = self._load(ticker)
+        with self._lock:
+            now = self._clock()
+            if entry is not None and now < entry.fresh_until:
+                self._stats.hits += 1
+                return dict(entry.value)
+            if entry is not None and now < entry.stale_until:
+                self._stats.stale_hits += 1
+                if ticker not in self._inflight:
+                    self._start_refresh(ticker, fetch)
+                return dict(entry.value)
+
+            inflight = self._inflight.get(ticker)
+            if inflight is None:
+                self._stats.misses += 1
+                pending: Future = Future()
+                self._inflight[ticker] = pending
+            else:
+                self._stats.coalesced += 1
+                pending = inflight
+
+        if inflight is None:
+            self._run_fetch(ticker, fetch, pending)
+        return dict(pending.result())
+
+    def close(self) -> None:
+        """Wait for background refreshes to finish and release the worker threads and backend."""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+        self.backend.close()
+
+    def _start_refresh(self, ticker: str, fetch: Callable[[], Dict[str, Any]]) -> None:
+        # Caller holds the lock.
+        pending: Future = Future()
+        self._inflight[ticker] = pending
+        self._stats.refreshes += 1
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._refresh_workers, thread_name_prefix="quote-refresh"
+            )
+        self._executor.submit(self._run_fetch, ticker, fetch, pending, True)
+
+    def _run_fetch(
+        self,
+        ticker: str,
+        fetch: Callable[[], Dict[str, Any]],
+        pending: Future,
+        background: bool = False,
+    ) -> None:
+        try:
+            value = self._fetch_once(ticker, fetch)
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(ticker, None)
+                if background:
+                    self._stats.refresh_failures += 1
+            if background:
+                logger.warning(f"Background refresh failed for {ticker}: {e}")
+            pending.set_exception(e)
+            return
+        with self._lock:
+            self._inflight.pop(ticker, None)
+        pending.set_result(value)
+
+    def _fetch_once(self, ticker: str, fetch: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """Fetch and store a quote; with a shared backend, only one process fetches at a time."""
+        locked = False
+        if self.backend.shared:
+            try:
+                locked = self.backend.add(_lock_key(ticker), os.getpid(), self.lock_timeout)
+            except CacheBackendError as e:
+                self._backend_error(e)
+            else:
+                if not locked:
+                    value = self._wait_for_peer(ticker)
+                    if value is not None:
+                        return value
+        try:
+            value = fetch()
+            self.put(ticker, value)
+            return value
+        finally:
+            if locked:
+                try:
+                    self.backend.delete(_lock_key(ticker))
+                except CacheBackendError as e:
+                    self._backend_error(e)
+
+    def _wait_for_peer(self, ticker: str) -> Optional[Dict[str, Any]]:
+        """Poll for the quote another process is fetching; None if it doesn't arrive within lock_timeout."""
+        deadline = time.monotonic() + self.lock_timeout
+        while time.monotonic() < deadline:
+            time.sleep(self.poll_interval)
+            entry = self._load(ticker)
+            if entry is not None and self._clock() < entry.fresh_until:
+                with self._lock:
+                    self._stats.peer_waits += 1
+                return entry.value
+        logger.info(f"Gave up waiting for another worker's fetch of {ticker}")
+        return None
+
+    def _load(self, ticker: str) -> Optional[_Entry]:
+        try:
+            stored = self.backend.get(_key(ticker))
+        except CacheBackendError as e:
+            self._backend_error(e)
+            return None
+        if stored is None:
+            return None
+        value, fresh_until, stale_until, fetched_at = stored
+        return _Entry(value, fresh_until, stale_until, fetched_at)
+
+    def _store(self, ticker: str, value: Dict[str, Any], ttl: float) -> None:
+        now = self._clock()
+        try:
+            self.backend.set(
+                _key(ticker), [dict(value), now + ttl, now + ttl + self.max_stale, now], ttl + self.max_stale
+            )
+        except CacheBackendError as e:
+            self._backend_error(e)
+
+    def _backend_error(self, error: CacheBackendError) -> None:
+        with self._lock:
+            self._stats.backend_errors += 1
+        logger.warning(f"Quote cache backend {self.backend.name} unavailable, treating as a miss: {error}")
+
+
+def _key(ticker: str) -> str:
+    return f"quote:{ticker}"
+
+
+def _lock_key(ticker: str) -> str:
+    return f"lock:quote:{ticker}"
+
+
+_quote_cache: Optional[QuoteCache] = None
+_quote_cache_configured = False
+
+
+def get_quote_cache() -> Optional[QuoteCache]:
+    """Return the process-wide quote cache, creating it from AgentConfig on first use."""
+    global _quote_cache, _quote_cache_configured
+    if not _quote_cache_configured:
+        from .config import AgentConfig
+
+        config = AgentConfig.from_env()
+        _quote_cache = QuoteCache(
+            max_entries=config.quote_cache_size,
+            ttl_policy=MarketHoursTTL(
+                open_ttl=config.quote_ttl_market_open,
+                closed_ttl=config.quote_ttl_market_closed,
+            ),
+            max_stale=config.quote_max_stale,
+            backend=create_cache_backend(config.quote_cache_backend.strip().lower(), config),
+        )
+        _quote_cache_configured = True
+    return _quote_cache
+
+
+def set_quote_cache(cache: Optional[QuoteCache]) -> None:
+    """Replace the process-wide quote cache; pass None to disable caching."""
+    global _quote_cache, _quote_cache_configured
+    _quote_cache = cache
+    _quote_cache_configured = True
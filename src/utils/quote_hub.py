@@ -0,0 +1,272 @@
+"""
+Live quote subscriptions fanned out from one shared poller.
+
+``QuoteHub.subscribe(tickers)`` is an async iterator of QuoteUpdates. However
+many subscribers there are, the hub runs a single poller that asks the
+market-data provider for every watched ticker in one batch per interval, so a
+ticker costs one upstream poll per interval whether one subscriber or ten
+thousand watch it. Subscriptions to the same ticker are coalesced, and an
+update is pushed only when the price actually changes.
+
+Polled quotes are also written to the QuoteCache, so watched tickers stay warm
+for the tools and the fast path. The poller stops when the last subscriber
+leaves and starts again with the next one.
+"""
+import asyncio
+import logging
+from dataclasses import asdict, dataclass
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Set
+
+try:
+    from src.utils.concurrency import get_blocking_executor
+    from src.utils.market_data import MarketDataProvider, Quote, get_market_data_provider
+    from src.utils.quote_cache import get_quote_cache
+    from src.utils.rate_limit import MARKET_DATA, get_rate_limiter
+except ImportError:
+    # Fallback for running from src/ directory directly
+    from utils.concurrency import get_blocking_executor  # type: ignore
+    from utils.market_data import MarketDataProvider, Quote, get_market_data_provider  # type: ignore
+    from utils.quote_cache import get_quote_cache  # type: ignore
+    from utils.rate_limit import MARKET_DATA, get_rate_limiter  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class QuoteUpdate:
+    """A price change pushed to subscribers.
+
+    previous_price is None on the first update a subscriber gets for a ticker.
+    """
+    ticker: str
+    price: float
+    previous_price: Optional[float]
+    quote: Quote
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class HubMetrics:
+    """Counters exposed by QuoteHub."""
+    polls: int = 0
+    poll_errors: int = 0
+    updates: int = 0
+    deliveries: int = 0
+    dropped: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return dict(self.__dict__)
+
+
+class _Subscription:
+    """One subscriber's tickers and its bounded queue of pending updates."""
+
+    def __init__(self, tickers: List[str], queue_size: int):
+        self.tickers = tickers
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+    def push(self, update: Optional[QuoteUpdate]) -> bool:
+        """Queue update, dropping the oldest pending one when full; False if one was dropped."""
+        dropped = self.queue.full()
+        if dropped:
+            self.queue.get_nowait()
+        self.queue.put_nowait(update)
+        return not dropped
+
+
+class QuoteHub:
+    """
+    Shared poller behind every quote subscription in one event loop.
+
+    - Each interval, one ``provider.quotes`` call covers every watched ticker,
+      through the market-data rate limiter and the blocking executor.
+    - A ticker nobody watched before is polled right away instead of waiting for
+      the next interval; the others stay on their schedule.
+    - A new subscriber immediately gets the last known quote of each ticker.
+    - A subscriber that falls ``queue_size`` updates behind loses the oldest ones
+      rather than holding up the others.
+    """
+
+    def __init__(
+        self,
+        provider: Optional[MarketDataProvider] = None,
+        interval: float = 5.0,
+        queue_size: int = 100,
+    ):
+        """
+        Args:
+            provider: Quote source; defaults to the process-wide provider.
+            interval: Seconds between polls.
+            queue_size: Updates buffered per subscriber.
+        """
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        self.provider = provider
+        self.interval = interval
+        self.queue_size = queue_size
+        self.metrics = HubMetrics()
+        self._subscribers: Dict[str, Set[_Subscription]] = {}
+        self._last: Dict[str, Quote] = {}
+        self._new: Set[str] = set()
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def tickers(self) -> List[str]:
+        """Tickers with at least one subscriber."""
+        return sorted(self._subscribers)
+
+    def subscriber_count(self) -> int:
+        return len({sub for subs in self._subscribers.values() for sub in subs})
+
+    async def subscribe(self, tickers: Iterable[str]) -> AsyncIterator[QuoteUpdate]:
+        """Yield an update whenever the price of one of tickers changes, until closed."""
+        subscription = self._register(tickers)
+        try:
+            while True:
+                update = await subscription.queue.get()
+                if update is None:
+                    return
+                yield update
+        finally:
+            self._unregister(subscription)
+
+    def _register(self, tickers: Iterable[str]) -> _Subscription:
+        symbols = list(dict.fromkeys(t.upper() for t in tickers))
+        if not symbols:
+            raise ValueError("subscribe needs at least one ticker")
+        subscription = _Subscription(symbols, self.queue_size)
+        for ticker in symbols:
+            if ticker not in self._subscribers:
+                self._subscribers[ticker] = set()
+                self._new.add(ticker)
+            self._subscribers[ticker].add(subscription)
+            last = self._last.get(ticker)
+            if last is not None:
+                self._deliver(subscription, QuoteUpdate(ticker, last["price"], None, last))
+        self._ensure_polling()
+        return subscription
+
+    def _unregister(self, subscription: _Subscription) -> None:
+        for ticker in subscription.tickers:
+            subscribers = self._subscribers.get(ticker)
+            if subscribers is None:
+                continue
+            subscribers.discard(subscription)
+            if not subscribers:
+                # Nobody watches it any more: stop polling it and forget its price
+                del self._subscribers[ticker]
+                self._last.pop(ticker, None)
+                self._new.discard(ticker)
+        if not self._subscribers and self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def _ensure_polling(self) -> None:
+        if self._task is None or self._task.done():
+            self._wake = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._poll_loop())
+        elif self._new and self._wake is not None:
+            self._wake.set()
+
+    async def _poll_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        assert self._wake is not None
+        next_poll = loop.time()
+        while self._subscribers:
+            if loop.time() >= next_poll:
+                next_poll = loop.time() + self.interval
+                await self._poll(self.tickers)
+            elif self._new:
+                await self._poll(sorted(self._new))
+            self._wake.clear()
+            if self._new:
+                continue
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=max(0.0, next_poll - loop.time()))
+            except asyncio.TimeoutError:
+                pass
+
+    async def _poll(self, tickers: List[str]) -> None:
+        self._new.difference_update(tickers)
+        try:
+            quotes = await get_rate_limiter(MARKET_DATA).run(get_blocking_executor().run, self._fetch, tickers)
+        except Exception as e:
+            self.metrics.poll_errors += 1
+            logger.warning(f"Quote poll for {tickers} failed: {e}")
+            return
+        self.metrics.polls += 1
+        for ticker, quote in quotes.items():
+            if "error" not in quote:
+                self._publish(ticker, quote)
+
+    def _fetch(self, tickers: List[str]) -> Dict[str, Quote]:
+        """Blocking part of a poll: one batch fetch, written through to the quote cache."""
+        quotes = (self.provider or get_market_data_provider()).quotes(tickers)
+        cache = get_quote_cache()
+        if cache is not None:
+            for ticker, quote in quotes.items():
+                if "error" not in quote:
+                    cache.put(ticker, quote)
+        return quotes
+
+    def _publish(self, ticker: str, quote: Quote) -> None:
+        subscribers = self._subscribers.get(ticker)
+        if not subscribers:
+            return
+        last = self._last.get(ticker)
+        if last is not None and last["price"] == quote["price"]:
+            return
+        self._last[ticker] = quote
+        self.metrics.updates += 1
+        update = QuoteUpdate(ticker, quote["price"], last["price"] if last else None, quote)
+        for subscription in subscribers:
+            self._deliver(subscription, update)
+
+    def _deliver(self, subscription: _Subscription, update: QuoteUpdate) -> None:
+        if subscription.push(update):
+            self.metrics.deliveries += 1
+        else:
+            self.metrics.dropped += 1
+
+    def close(self) -> None:
+        """Stop polling and end every open subscription."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for subscription in {sub for subs in self._subscribers.values() for sub in subs}:
+            subscription.push(None)
+        self._subscribers.clear()
+        self._last.clear()
+        self._new.clear()
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {**self.metrics.as_dict(), "subscribers": self.subscriber_count(), "tickers": len(self._subscribers)}
+
+
+_quote_hub: Optional[QuoteHub] = None
+
+
+def get_quote_hub() -> QuoteHub:
+    """Return the process-wide quote hub, creating it from AgentConfig on first use."""
+    global _quote_hub
+    if _quote_hub is None:
+        from .config import AgentConfig
+
+        config = AgentConfig.from_env()
+        _quote_hub = QuoteHub(interval=config.watch_interval, queue_size=config.watch_queue_size)
+    return _quote_hub
+
+
+def set_quote_hub(hub: Optional[QuoteHub]) -> None:
+    """Replace the process-wide quote hub; None rebuilds it from config on next use."""
+    global _quote_hub
+    _quote_hub = hub
+
+
+def quote_hub_metrics() -> Optional[Dict[str, Any]]:
+    """Counters of the process-wide quote hub, or None when nothing has subscribed yet."""
+    hub = _quote_hub
+    return hub.as_dict() if hub is not None else None
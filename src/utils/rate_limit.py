@@ -0,0 +1,272 @@
+"""
+Client-side rate limiting with jittered exponential backoff, per upstream service.
+
+Each upstream (market data, LLM) gets a token bucket refilled at
+``AgentConfig.rate_limit`` requests per minute with a small burst allowance.
+Callers that find the bucket empty are queued, first come first served, rather
+than failed, and the time they spend waiting is recorded per upstream.
+
+Throttling errors (HTTP 429/503, yfinance rate-limit errors,
+APIRateLimitError) are retried with full-jitter exponential backoff; timeouts
+(UpstreamTimeoutError) and other failures are not. Retries are
+bounded per call by ``max_retries`` and across calls by a retry budget, so a
+throttled upstream is not hit with an amplified retry storm.
+"""
+import asyncio
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+try:
+    from src.utils.exceptions import APIRateLimitError
+except ImportError:
+    # Fallback for running from src/ directory directly
+    from utils.exceptions import APIRateLimitError  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+MARKET_DATA = "market_data"
+LLM = "llm"
+
+_THROTTLE_STATUS = (429, 503)
+
+
+def is_throttling_error(exc: BaseException) -> bool:
+    """True when exc (or the error it wraps) says the upstream is throttling us."""
+    seen = set()
+    current: Optional[BaseException] = exc
+    while current is not None and id(current) not in seen:
+        seen.add(id(current))
+        if isinstance(current, APIRateLimitError) or "RateLimit" in type(current).__name__:
+            return True
+        status = (
+            getattr(current, "status_code", None)
+            or getattr(getattr(current, "response", None), "status_code", None)
+        )
+        if status in _THROTTLE_STATUS:
+            return True
+        current = current.__cause__ or current.__context__
+    return False
+
+
+def backoff_delay(attempt: int, base: float, cap: float, rng: Callable[[], float] = random.random) -> float:
+    """Full-jitter exponential backoff: uniform in [0, min(cap, base * 2**attempt))."""
+    return rng() * min(cap, base * (2 ** attempt))
+
+
+class TokenBucket:
+    """Thread-safe token bucket where callers reserve tokens ahead of time.
+
+    A reservation may drive the balance negative. The caller then waits until
+    its token has been refilled, and later callers queue up behind it.
+    """
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            rate: Tokens added per second; 0 or less disables limiting.
+            capacity: Burst size (tokens available after an idle period).
+            clock: Monotonic clock, injectable for tests.
+        """
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take one token; returns how many seconds to wait before using it."""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def refund(self) -> None:
+        """Return a reserved token that was never used (e.g. the waiter was cancelled)."""
+        if self.rate <= 0:
+            return
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + 1)
+
+
+class RetryBudget:
+    """Caps retries at a fraction of first attempts, plus a small reserve.
+
+    Every first attempt deposits ``ratio`` and every retry withdraws 1, so a
+    sustained outage settles at roughly ``ratio`` retries per request.
+    """
+
+    def __init__(self, ratio: float = 0.2, reserve: float = 10.0):
+        self.ratio = ratio
+        self.reserve = reserve
+        self._balance = reserve
+        self._lock = threading.Lock()
+
+    def record_request(self) -> None:
+        with self._lock:
+            self._balance = min(self.reserve, self._balance + self.ratio)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self._balance < 1:
+                return False
+            self._balance -= 1
+            return True
+
+
+@dataclass
+class LimiterMetrics:
+    """Counters for one upstream limiter."""
+    acquired: int = 0
+    queued: int = 0
+    wait_total: float = 0.0
+    wait_max: float = 0.0
+    retries: int = 0
+    retries_denied: int = 0
+
+    def record_wait(self, wait: float) -> None:
+        self.acquired += 1
+        if wait > 0:
+            self.queued += 1
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "acquired": self.acquired,
+            "queued": self.queued,
+            "wait_total": round(self.wait_total, 4),
+            "wait_avg": round(self.wait_total / self.acquired, 4) if self.acquired else 0.0,
+            "wait_max": round(self.wait_max, 4),
+            "retries": self.retries,
+            "retries_denied": self.retries_denied,
+        }
+
+
+class UpstreamLimiter:
+    """Rate limit plus retry policy for one upstream service."""
+
+    def __init__(
+        self,
+        name: str,
+        requests_per_minute: float,
+        burst: int = 10,
+        max_retries: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 10.0,
+        budget: Optional[RetryBudget] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.bucket = TokenBucket(requests_per_minute / 60.0, burst, clock)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget or RetryBudget()
+        self.metrics = LimiterMetrics()
+
+    async def acquire(self) -> float:
+        """Wait for this caller's turn; returns the seconds spent queued."""
+        wait = self.bucket.reserve()
+        if wait > 0:
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                self.bucket.refund()
+                raise
+        self.metrics.record_wait(wait)
+        return wait
+
+    async def run(self, func: Callable[..., Awaitable[T]], *args: Any) -> T:
+        """Await func(*args) within the rate limit, retrying throttling errors with backoff."""
+        self.budget.record_request()
+        attempt = 0
+        while True:
+            await self.acquire()
+            try:
+                return await func(*args)
+            except Exception as e:
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                attempt += 1
+                await asyncio.sleep(delay)
+
+    def run_sync(self, func: Callable[..., T], *args: Any) -> T:
+        """Blocking counterpart of run, for code already running on a worker thread."""
+        self.budget.record_request()
+        attempt = 0
+        while True:
+            wait = self.bucket.reserve()
+            if wait > 0:
+                time.sleep(wait)
+            self.metrics.record_wait(wait)
+            try:
+                return func(*args)
+            except Exception as e:
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                attempt += 1
+                time.sleep(delay)
+
+    def _retry_delay(self, exc: Exception, attempt: int) -> Optional[float]:
+        """Backoff before retrying after exc, or None when it must not be retried."""
+        if not is_throttling_error(exc) or attempt >= self.max_retries:
+            return None
+        if not self.budget.try_spend():
+            self.metrics.retries_denied += 1
+            logger.warning(f"{self.name} throttled and retry budget exhausted: {exc}")
+            return None
+        delay = backoff_delay(attempt, self.base_delay, self.max_delay)
+        self.metrics.retries += 1
+        logger.warning(f"{self.name} throttled, retry {attempt + 1}/{self.max_retries} in {delay:.2f}s: {exc}")
+        return delay
+
+
+_limiters: Dict[str, UpstreamLimiter] = {}
+_lock = threading.Lock()
+
+
+def get_rate_limiter(name: str) -> UpstreamLimiter:
+    """Return the process-wide limiter for an upstream, creating it from AgentConfig on first use."""
+    limiter = _limiters.get(name)
+    if limiter is None:
+        with _lock:
+            limiter = _limiters.get(name)
+            if limiter is None:
+                from .config import AgentConfig
+
+                config = AgentConfig.from_env()
+                limiter = UpstreamLimiter(
+                    name,
+                    config.rate_limit,
+                    burst=config.rate_limit_burst,
+                    max_retries=config.rate_limit_max_retries,
+                )
+                _limiters[name] = limiter
+    return limiter
+
+
+def set_rate_limiter(name: str, limiter: Optional[UpstreamLimiter]) -> None:
+    """Replace the limiter for an upstream; None rebuilds it from config on next use."""
+    with _lock:
+        if limiter is None:
+            _limiters.pop(name, None)
+        else:
+            _limiters[name] = limiter
+
+
+def rate_limit_metrics() -> Dict[str, Dict[str, Any]]:
+    """Metrics of every limiter created so far, keyed by upstream."""
+    return {name: limiter.metrics.as_dict() for name, limiter in sorted(_limiters.items())}
@@ -0,0 +1,145 @@
+"""
+Prebuilt symbol index for resolving tickers and company names in free text.
+
+Company names and aliases are tokenized once at load time and stored in a dict
+keyed by their normalized token sequence. A query is tokenized the same way and
+each position is probed for the longest listed phrase, so lookup cost depends on
+the query length, not on how many names the universe holds. Ticker symbols are
+checked with a set lookup.
+"""
+import csv
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SYMBOLS_PATH = Path(__file__).resolve().parents[2] / "data" / "symbols.csv"
+
+# Used when the symbols file is missing so ticker extraction keeps working
+_FALLBACK_SYMBOLS: Tuple[Tuple[str, str, Tuple[str, ...]], ...] = (
+    ("TSLA", "Tesla Inc.", ("tesla",)),
+    ("AAPL", "Apple Inc.", ("apple",)),
+    ("MSFT", "Microsoft Corporation", ("microsoft",)),
+    ("AMZN", "Amazon.com Inc.", ("amazon",)),
+    ("GOOGL", "Alphabet Inc.", ("google",)),
+    ("META", "Meta Platforms Inc.", ("meta",)),
+    ("NVDA", "NVIDIA Corporation", ("nvidia",)),
+)
+
+
+class SymbolMatch(NamedTuple):
+    """A company name or alias found in a text."""
+    start: int
+    end: int
+    ticker: str
+
+
+class SymbolIndex:
+    """Ticker set plus a phrase table over lowercased company names and aliases."""
+
+    def __init__(self, entries: Iterable[Tuple[str, str, Sequence[str]]]):
+        tickers: List[str] = []
+        names: Dict[str, str] = {}
+        phrases: Dict[str, int] = {}
+        # First word of each phrase -> most words in any phrase starting with it
+        first_words: Dict[str, int] = {}
+        for ticker, name, aliases in entries:
+            ticker = ticker.strip().upper()
+            if not ticker or ticker in names:
+                continue
+            ticker_id = len(tickers)
+            tickers.append(ticker)
+            names[ticker] = name
+            for phrase in (name, *aliases):
+                tokens = _TOKEN_RE.findall(phrase.lower())
+                key = " ".join(tokens)
+                # First listed owner wins when two entries share an alias
+                if key and key not in phrases:
+                    phrases[key] = ticker_id
+                    first_words[tokens[0]] = max(first_words.get(tokens[0], 0), len(tokens))
+
+        self._tickers = tickers
+        self._ticker_set: FrozenSet[str] = frozenset(tickers)
+        self._names = names
+        self._phrases = phrases
+        self._first_words = first_words
+
+    @classmethod
+    def from_csv(cls, path: "os.PathLike[str] | str") -> "SymbolIndex":
+        """Load an index from a CSV with ticker,name,aliases columns (aliases separated by '|')."""
+        with open(path, newline="", encoding="utf-8") as handle:
+            rows = [
+                (row["ticker"], row["name"], [a for a in (row.get("aliases") or "").split("|") if a])
+                for row in csv.DictReader(handle)
+            ]
+        logger.info(f"Loaded {len(rows)} symbols from {path}")
+        return cls(rows)
+
+    def __len__(self) -> int:
+        return len(self._tickers)
+
+    def is_ticker(self, symbol: str) -> bool:
+        """Return True if symbol is a listed ticker."""
+        return symbol in self._ticker_set
+
+    def company_name(self, ticker: str) -> Optional[str]:
+        """Return the listed company name for ticker."""
+        return self._names.get(ticker)
+
+    def find_company(self, text: str) -> Optional[str]:
+        """Return the ticker for the leftmost (then longest) company name or alias in text."""
+        matches = self.find_all(text)
+        return matches[0].ticker if matches else None
+
+    def find_all(self, text: str) -> List[SymbolMatch]:
+        """Return non-overlapping whole-word name/alias matches, leftmost-longest first."""
+        lowered = text.lower()
+        words = _TOKEN_RE.findall(lowered)
+        first_words = self._first_words
+        if not any(word in first_words for word in words):
+            return []
+
+        tokens = list(_TOKEN_RE.finditer(lowered))
+        phrases = self._phrases
+        matches: List[SymbolMatch] = []
+        i = 0
+        while i < len(words):
+            longest = first_words.get(words[i], 0)
+            for n in range(min(longest, len(words) - i), 0, -1):
+                ticker_id = phrases.get(words[i] if n == 1 else " ".join(words[i:i + n]))
+                if ticker_id is not None:
+                    matches.append(SymbolMatch(tokens[i].start(), tokens[i + n - 1].end(), self._tickers[ticker_id]))
+                    i += n
+                    break
+            else:
+                i += 1
+        return matches
+
+
+# Words, with inner punctuation kept ("amazon.com", "at&t"), and a standalone "&"
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[.&'-][a-z0-9]+)*|&")
+
+
+_symbol_index: Optional[SymbolIndex] = None
+
+
+def get_symbol_index() -> SymbolIndex:
+    """Return the process-wide index, loading SYMBOLS_PATH (or data/symbols.csv) once."""
+    global _symbol_index
+    if _symbol_index is None:
+        path = os.getenv("SYMBOLS_PATH") or DEFAULT_SYMBOLS_PATH
+        try:
+            _symbol_index = SymbolIndex.from_csv(path)
+        except OSError as e:
+            logger.warning(f"Symbol file {path} unavailable ({e}); using built-in fallback symbols")
+            _symbol_index = SymbolIndex(_FALLBACK_SYMBOLS)
+    return _symbol_index
+
+
+def set_symbol_index(index: Optional[SymbolIndex]) -> None:
+    """Replace the process-wide index; None reloads it on next use."""
+    global _symbol_index
+    _symbol_index = index
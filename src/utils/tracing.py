@@ -0,0 +1,233 @@
+"""
+Span-based latency tracing with OpenTelemetry export.
+
+Spans cover each stage of an answer: orchestrator start-up, credential
+acquisition, agent and workflow creation, the workflow run, every StockAgent
+tool and each market-data request. Attributes record tickers and cache hits,
+so a trace shows whether a slow answer waited on the credential, the LLM or
+the market-data provider.
+
+Tracing is off unless ``TRACING_EXPORTER`` names an exporter:
+
+- ``console``: spans printed to stdout as they end (local use)
+- ``memory``: kept in an InMemorySpanExporter (tests, benchmarks)
+- ``otlp``: OTLP over HTTP to ``OTEL_EXPORTER_OTLP_ENDPOINT``
+- ``azure``: Application Insights via ``APPLICATION_INSIGHTS_CONNECTION_STRING``
+  (needs azure-monitor-opentelemetry-exporter)
+
+While tracing is off, ``span()`` returns a shared no-op object and ``traced``
+functions make one extra call and a flag check, and OpenTelemetry is never imported.
+"""
+import atexit
+import functools
+import inspect
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+try:
+    from src.utils.exceptions import ConfigurationError
+except ImportError:
+    # Fallback for running from src/ directory directly
+    from utils.exceptions import ConfigurationError  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+TRACER_NAME = "stock_analyzer"
+EXPORTERS = ("console", "memory", "otlp", "azure")
+
+
+class _NoopSpan:
+    """Stands in for a span (and its context manager) while tracing is off."""
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        return None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, attributes: Dict[str, Any]) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+_tracer: Any = None
+_provider: Any = None
+_initialized = False
+_lock = threading.Lock()
+
+
+def _clean(attributes: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop None values and turn lists into tuples, the attribute types OpenTelemetry accepts."""
+    cleaned = {}
+    for key, value in attributes.items():
+        if value is None:
+            continue
+        if isinstance(value, (list, tuple, set, frozenset)):
+            value = tuple(str(v) for v in value)
+        elif not isinstance(value, (str, bool, int, float)):
+            value = str(value)
+        cleaned[key] = value
+    return cleaned
+
+
+def tracing_enabled() -> bool:
+    return _tracer is not None
+
+
+def span(name: str, **attributes: Any) -> Any:
+    """Context manager for a span that becomes the current span; a no-op while tracing is off."""
+    if _tracer is None:
+        return _NOOP_SPAN
+    return _tracer.start_as_current_span(name, attributes=_clean(attributes))
+
+
+def set_attributes(**attributes: Any) -> None:
+    """Add attributes to the current span."""
+    if _tracer is None:
+        return
+    from opentelemetry import trace
+
+    trace.get_current_span().set_attributes(_clean(attributes))
+
+
+def traced(
+    name: str,
+    attributes: Optional[Callable[..., Dict[str, Any]]] = None,
+    result: Optional[Callable[[Any], Dict[str, Any]]] = None,
+) -> Callable[[F], F]:
+    """Wrap a sync or async function in a span.
+
+    attributes, when given, is called with the function's arguments and returns
+    the span's starting attributes; result is called with the return value and
+    returns attributes added at the end. The wrapper keeps the function's
+    signature, so decorated tools still produce the same tool schema.
+    """
+    def start(args: Any, kwargs: Any) -> Any:
+        return span(name, **(attributes(*args, **kwargs) if attributes else {}))
+
+    def finish(current: Any, value: Any) -> Any:
+        if result is not None:
+            current.set_attributes(_clean(result(value)))
+        return value
+
+    def decorate(func: F) -> F:
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                if _tracer is None:
+                    return await func(*args, **kwargs)
+                with start(args, kwargs) as current:
+                    return finish(current, await func(*args, **kwargs))
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if _tracer is None:
+                return func(*args, **kwargs)
+            with start(args, kwargs) as current:
+                return finish(current, func(*args, **kwargs))
+        return wrapper  # type: ignore[return-value]
+    return decorate
+
+
+def _create_exporter(exporter: str, connection_string: str = "") -> Any:
+    if exporter == "console":
+        from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+
+        return ConsoleSpanExporter()
+    if exporter == "memory":
+        from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+        return InMemorySpanExporter()
+    if exporter == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+        return OTLPSpanExporter()
+    if exporter == "azure":
+        if not connection_string:
+            raise ConfigurationError("The azure trace exporter needs APPLICATION_INSIGHTS_CONNECTION_STRING")
+        try:
+            from azure.monitor.opentelemetry.exporter import AzureMonitorTraceExporter
+        except ImportError as e:
+            raise ConfigurationError(
+                "The azure trace exporter needs azure-monitor-opentelemetry-exporter"
+            ) from e
+        return AzureMonitorTraceExporter(connection_string=connection_string)
+    raise ConfigurationError(f"Unknown trace exporter: {exporter} (expected one of {', '.join(EXPORTERS)})")
+
+
+def configure_tracing(
+    exporter: str,
+    connection_string: str = "",
+    service_name: str = "stock-analyzer",
+    set_global: bool = False,
+) -> Any:
+    """
+    Start recording spans to the given exporter; returns the exporter.
+
+    Args:
+        exporter: One of console, memory, otlp or azure.
+        connection_string: Application Insights connection string (azure only).
+        service_name: ``service.name`` resource attribute.
+        set_global: Also install the provider as OpenTelemetry's global one, so
+            spans from instrumented libraries join the same traces.
+    """
+    global _tracer, _provider
+    from opentelemetry import trace
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, SimpleSpanProcessor
+
+    span_exporter = _create_exporter(exporter, connection_string)
+    provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
+    # Local exporters see each span as it ends; remote ones export in batches off the hot path
+    processor = SimpleSpanProcessor if exporter in ("console", "memory") else BatchSpanProcessor
+    provider.add_span_processor(processor(span_exporter))
+
+    with _lock:
+        previous, _provider = _provider, provider
+        _tracer = provider.get_tracer(TRACER_NAME)
+    if previous is not None:
+        previous.shutdown()
+    if set_global:
+        trace.set_tracer_provider(provider)
+    logger.info(f"Tracing enabled with the {exporter} exporter")
+    return span_exporter
+
+
+def disable_tracing() -> None:
+    """Flush and stop recording spans."""
+    global _tracer, _provider
+    with _lock:
+        provider, _provider, _tracer = _provider, None, None
+    if provider is not None:
+        provider.shutdown()
+
+
+def init_tracing() -> None:
+    """Configure tracing from AgentConfig once per process; a no-op when TRACING_EXPORTER is empty."""
+    global _initialized
+    if _initialized:
+        return
+    with _lock:
+        if _initialized:
+            return
+        _initialized = True
+    from .config import AgentConfig
+
+    config = AgentConfig.from_env()
+    exporter = config.tracing_exporter.strip().lower()
+    if not exporter or exporter == "none":
+        return
+    configure_tracing(
+        exporter, config.application_insights_connection_string, config.tracing_service_name, set_global=True
+    )
+    # Flush batched spans before the interpreter exits
+    atexit.register(disable_tracing)
@@ -0,0 +1,202 @@
+"""
+Persistent brute-force vector index with pluggable embedders.
+
+Vectors live in a memory-mapped ``.npy`` file per collection next to a
+``meta.json`` that lists the key and content hash of every row. ``sync`` only
+embeds entries whose text changed, and ``search`` embeds just the query and
+scores it against the mapped matrix with one matrix-vector product.
+
+Collections are small (a user's watchlist), so exact search over a NumPy
+matrix is both simpler and faster than building an ANN index.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Mapping, NamedTuple, Optional, Protocol, Sequence, Union
+
+try:
+    from src.utils.lazy_import import lazy_import
+except ImportError:
+    # Fallback for running from src/ directory directly
+    from utils.lazy_import import lazy_import  # type: ignore
+
+if TYPE_CHECKING:
+    import numpy as np
+else:
+    np = lazy_import("numpy")
+
+logger = logging.getLogger(__name__)
+
+
+class Embedder(Protocol):
+    """Turns texts into L2-normalized float32 vectors."""
+    name: str
+    dim: int
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray: ...
+
+
+class HashingEmbedder:
+    """Deterministic offline embedder: hashed word and character-trigram features."""
+
+    _WORD_RE = re.compile(r"[a-z0-9]+")
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                # blake2b is stable across processes, unlike the salted built-in hash()
+                digest = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "little")
+                vectors[row, digest % self.dim] += 1.0 if digest >> 63 else -1.0
+        return _normalize(vectors)
+
+    def _features(self, text: str) -> List[str]:
+        words = self._WORD_RE.findall(text.lower())
+        features = [f"w:{word}" for word in words]
+        for word in words:
+            padded = f"#{word}#"
+            features.extend(f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2))
+        return features
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class SearchHit(NamedTuple):
+    """One search result."""
+    key: str
+    score: float
+
+
+class VectorIndex:
+    """Named collections of embedded texts persisted under root."""
+
+    def __init__(self, root: Union[str, os.PathLike], embedder: Embedder):
+        self.root = Path(root)
+        self.embedder = embedder
+        self._collections: Dict[str, "_Collection"] = {}
+        self._lock = threading.Lock()
+        self.embedded = 0  # texts embedded by sync, for monitoring re-embedding
+
+    def sync(self, collection: str, texts: Mapping[str, str]) -> int:
+        """Make collection hold exactly texts (key -> text); returns how many were embedded."""
+        with self._lock:
+            current = self._load(collection)
+            hashes = {key: content_hash(text) for key, text in texts.items()}
+            reusable = {
+                key: row for row, (key, digest) in enumerate(zip(current.keys, current.hashes))
+                if hashes.get(key) == digest
+            }
+            if len(reusable) == len(hashes) == len(current.keys):
+                return 0
+
+            keys = list(texts)
+            changed = [key for key in keys if key not in reusable]
+            fresh = (
+                self.embedder.embed([texts[key] for key in changed]) if changed
+                else np.empty((0, self.embedder.dim), dtype=np.float32)
+            )
+            vectors = np.empty((len(keys), self.embedder.dim), dtype=np.float32)
+            fresh_rows = {key: i for i, key in enumerate(changed)}
+            for row, key in enumerate(keys):
+                vectors[row] = current.vectors[reusable[key]] if key in reusable else fresh[fresh_rows[key]]
+
+            self._collections[collection] = current.replace(keys, [hashes[k] for k in keys], vectors)
+            self.embedded += len(changed)
+            logger.info(f"Synced {collection}: {len(changed)} embedded, {len(reusable)} reused")
+            return len(changed)
+
+    def search(self, collection: str, query: str, k: int = 5) -> List[SearchHit]:
+        """Return up to k keys ranked by cosine similarity to query."""
+        with self._lock:
+            current = self._load(collection)
+        if not current.keys:
+            return []
+        scores = current.vectors @ self.embedder.embed([query])[0]
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [SearchHit(current.keys[i], float(scores[i])) for i in top]
+
+    def keys(self, collection: str) -> List[str]:
+        with self._lock:
+            return list(self._load(collection).keys)
+
+    def _load(self, collection: str) -> "_Collection":
+        loaded = self._collections.get(collection)
+        if loaded is None:
+            loaded = _Collection.open(self.root / collection, self.embedder)
+            self._collections[collection] = loaded
+        return loaded
+
+
+class _Collection:
+    """One collection on disk: meta.json plus vectors.<generation>.npy."""
+
+    def __init__(self, directory: Path, embedder: Embedder, generation: int,
+                 keys: List[str], hashes: List[str], vectors: np.ndarray):
+        self.directory = directory
+        self.embedder = embedder
+        self.generation = generation
+        self.keys = keys
+        self.hashes = hashes
+        self.vectors = vectors
+
+    @classmethod
+    def open(cls, directory: Path, embedder: Embedder) -> "_Collection":
+        empty = np.empty((0, embedder.dim), dtype=np.float32)
+        meta_path = directory / "meta.json"
+        if not meta_path.exists():
+            return cls(directory, embedder, 0, [], [], empty)
+        with open(meta_path, encoding="utf-8") as handle:
+            meta = json.load(handle)
+        if meta.get("embedder") != embedder.name:
+            # Vectors from another embedder are not comparable; re-embed everything
+            logger.info(f"Embedder changed for {directory.name}, rebuilding index")
+            return cls(directory, embedder, meta["generation"], [], [], empty)
+        vectors = empty
+        if meta["keys"]:
+            vectors = np.load(directory / f"vectors.{meta['generation']}.npy", mmap_mode="r")
+        return cls(directory, embedder, meta["generation"], meta["keys"], meta["hashes"], vectors)
+
+    def replace(self, keys: List[str], hashes: List[str], vectors: np.ndarray) -> "_Collection":
+        generation = self.generation + 1
+        self.directory.mkdir(parents=True, exist_ok=True)
+        np.save(self.directory / f"vectors.{generation}.npy", vectors)
+        meta = {"embedder": self.embedder.name, "generation": generation, "keys": keys, "hashes": hashes}
+        tmp_path = self.directory / "meta.json.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(meta, handle)
+        os.replace(tmp_path, self.directory / "meta.json")
+        try:
+            (self.directory / f"vectors.{self.generation}.npy").unlink()
+        except OSError:
+            pass  # never written, or still mapped on platforms that pin open files
+        return _Collection.open(self.directory, self.embedder) if keys else \
+            _Collection(self.directory, self.embedder, generation, [], [], vectors)
+
+
+def get_embedder(name: Optional[str] = None) -> Embedder:
+    """Return the embedder configured by name ("hashing" or "hashing-<dim>")."""
+    name = name or "hashing"
+    if name == "hashing":
+        return HashingEmbedder()
+    if name.startswith("hashing-"):
+        return HashingEmbedder(int(name.split("-", 1)[1]))
+    raise ValueError(f"Unknown embedder: {name}")
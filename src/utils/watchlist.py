@@ -0,0 +1,170 @@
+"""
+Per-user watchlists loaded from watchlist.json and searchable through a vector index.
+
+File format::
+
+    {
+      "users": {
+        "alice": [
+          {"ticker": "TSLA", "name": "Tesla Inc.", "note": "EV deliveries", "tags": ["ev"]},
+          ...
+        ]
+      }
+    }
+
+The index is synced with the file only when the file changes on disk, and a
+sync only re-embeds entries whose text changed.
+"""
+import contextvars
+import hashlib
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+try:
+    from src.utils.vector_index import VectorIndex, get_embedder
+except ImportError:
+    # Fallback for running from src/ directory directly
+    from utils.vector_index import VectorIndex, get_embedder  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_USER = "default"
+_NOT_LOADED = object()
+
+_current_user: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("watchlist_user", default=None)
+
+
+@dataclass(frozen=True)
+class WatchlistEntry:
+    """One watched security."""
+    ticker: str
+    name: str = ""
+    note: str = ""
+    tags: Tuple[str, ...] = field(default_factory=tuple)
+
+    def text(self) -> str:
+        """Text that represents the entry in the vector index."""
+        return " | ".join(part for part in (self.ticker, self.name, self.note, " ".join(self.tags)) if part)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"ticker": self.ticker, "name": self.name, "note": self.note, "tags": list(self.tags)}
+
+
+def load_watchlists(path: Union[str, os.PathLike]) -> Dict[str, List[WatchlistEntry]]:
+    """Read watchlist.json into {user: [entries]}."""
+    with open(path, encoding="utf-8") as handle:
+        data = json.load(handle)
+    watchlists = {}
+    for user, entries in data.get("users", {}).items():
+        watchlists[user] = [
+            WatchlistEntry(
+                ticker=entry["ticker"].upper(),
+                name=entry.get("name", ""),
+                note=entry.get("note", ""),
+                tags=tuple(entry.get("tags", ())),
+            )
+            for entry in entries
+        ]
+    return watchlists
+
+
+class WatchlistRetriever:
+    """Keeps the vector index in step with watchlist.json and answers per-user searches."""
+
+    def __init__(self, path: Union[str, os.PathLike], index: VectorIndex):
+        self.path = Path(path)
+        self.index = index
+        self._entries: Dict[str, Dict[str, WatchlistEntry]] = {}
+        self._signature: Any = _NOT_LOADED
+        self._lock = threading.Lock()
+
+    def refresh(self) -> bool:
+        """Reload and sync the index if watchlist.json changed; returns True when it did."""
+        with self._lock:
+            try:
+                stat = self.path.stat()
+                signature: Any = (stat.st_mtime_ns, stat.st_size)
+            except FileNotFoundError:
+                signature = None
+            if signature == self._signature:
+                return False
+
+            watchlists = load_watchlists(self.path) if signature is not None else {}
+            for user in set(self._entries) - set(watchlists):
+                self.index.sync(_collection(user), {})
+            entries = {}
+            for user, items in watchlists.items():
+                by_ticker = {entry.ticker: entry for entry in items}
+                self.index.sync(_collection(user), {t: e.text() for t, e in by_ticker.items()})
+                entries[user] = by_ticker
+            self._entries = entries
+            self._signature = signature
+            return True
+
+    def entries(self, user: str) -> List[WatchlistEntry]:
+        self.refresh()
+        return list(self._entries.get(user, {}).values())
+
+    def search(self, user: str, query: str, k: int = 5) -> List[Dict[str, Any]]:
+        """Return the user's watchlist entries most similar to query."""
+        self.refresh()
+        entries = self._entries.get(user, {})
+        return [
+            {**entries[hit.key].as_dict(), "score": round(hit.score, 4)}
+            for hit in self.index.search(_collection(user), query, k)
+            if hit.key in entries
+        ]
+
+
+def _collection(user: str) -> str:
+    # Keep user ids from escaping the index directory; the hash of the raw id keeps
+    # ids that sanitize to the same prefix ("a.b" and "a_b") in separate collections
+    safe = "".join(c if c.isalnum() or c in "-_" else "_" for c in user[:32])
+    return f"user-{safe}-{hashlib.sha1(user.encode('utf-8')).hexdigest()[:12]}"
+
+
+def current_watchlist_user() -> str:
+    """Return the user whose watchlist tools should see."""
+    user = _current_user.get()
+    if user is None:
+        from .config import AgentConfig
+
+        user = AgentConfig.from_env().watchlist_user or DEFAULT_USER
+    return user
+
+
+@contextmanager
+def watchlist_user(user: str) -> Iterator[None]:
+    """Scope watchlist lookups in this context (and tasks started from it) to user."""
+    token = _current_user.set(user)
+    try:
+        yield
+    finally:
+        _current_user.reset(token)
+
+
+_retriever: Optional[WatchlistRetriever] = None
+
+
+def get_watchlist_retriever() -> WatchlistRetriever:
+    """Return the process-wide retriever, creating it from AgentConfig on first use."""
+    global _retriever
+    if _retriever is None:
+        from .config import AgentConfig
+
+        config = AgentConfig.from_env()
+        index = VectorIndex(config.watchlist_index_dir, get_embedder(config.watchlist_embedder))
+        _retriever = WatchlistRetriever(config.watchlist_path, index)
+    return _retriever
+
+
+def set_watchlist_retriever(retriever: Optional[WatchlistRetriever]) -> None:
+    """Replace the process-wide retriever; None rebuilds it from config on next use."""
+    global _retriever
+    _retriever = retriever
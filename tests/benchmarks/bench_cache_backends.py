@@ -0,0 +1,116 @@
+"""
+Benchmark the quote-cache backends and their stampede protection.
+
+Part 1 times QuoteCache.get and put on each backend (memory, SQLite, and the
+Redis-protocol backend against the local stand-in, or a real server with
+--redis-url) and compares the packed quote size with JSON.
+
+Part 2 starts several worker processes that share one SQLite cache file and
+miss the same ticker at the same moment. Each worker's upstream fetch is slow,
+and the run counts how many fetches actually reach upstream.
+
+Usage:
+    python tests/benchmarks/bench_cache_backends.py [--ops 5000] [--workers 8]
+        [--redis-url redis://127.0.0.1:6379/0]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from time import perf_counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.utils.cache_backends import MemoryBackend, RespBackend, SqliteBackend, pack  # noqa: E402
+from src.utils.quote_cache import QuoteCache  # noqa: E402
+from tests.benchmarks.fake_services import start_fake_redis  # noqa: E402
+
+QUOTE = {
+    "ticker": "TSLA", "company_name": "Tesla Inc", "price": 250.45, "currency": "USD",
+    "timestamp": "2025-10-10T10:30:00Z",
+    "change": {"absolute": 5.27, "percent": 2.15, "previous_close": 245.18},
+}
+
+
+def per_op_us(func, ops: int) -> float:
+    start = perf_counter()
+    for i in range(ops):
+        func(i)
+    return (perf_counter() - start) / ops * 1e6
+
+
+def bench_backend(backend, ops: int):
+    cache = QuoteCache(backend=backend, ttl_policy=lambda ticker: 60.0)
+    tickers = [f"T{i % 100}" for i in range(ops)]
+    put = per_op_us(lambda i: cache.put(tickers[i], QUOTE), ops)
+    get = per_op_us(lambda i: cache.get(tickers[i]), ops)
+    cache.close()
+    return put, get
+
+
+def stampede_worker(path: str, start_at: float, fetches, results) -> None:
+    cache = QuoteCache(backend=SqliteBackend(path), ttl_policy=lambda ticker: 60.0)
+
+    def slow_fetch():
+        with fetches.get_lock():
+            fetches.value += 1
+        time.sleep(0.3)
+        return QUOTE
+
+    time.sleep(max(0.0, start_at - time.time()))
+    results.put(cache.get_or_fetch("TSLA", slow_fetch)["price"])
+
+
+def bench_stampede(workers: int) -> int:
+    """Upstream fetches made when every worker misses the same ticker at once."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "quotes.sqlite3")
+        SqliteBackend(path).close()  # create the table before the workers race
+        fetches, results = multiprocessing.Value("i", 0), multiprocessing.Queue()
+        start_at = time.time() + 1.0
+        processes = [
+            multiprocessing.Process(target=stampede_worker, args=(path, start_at, fetches, results))
+            for _ in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        prices = [results.get(timeout=30) for _ in processes]
+        for process in processes:
+            process.join()
+        assert prices == [QUOTE["price"]] * workers
+        return fetches.value
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ops", type=int, default=5000, help="Gets and puts per backend")
+    parser.add_argument("--workers", type=int, default=8, help="Processes in the stampede test")
+    parser.add_argument("--redis-url", help="Real Redis-protocol server (default: local stand-in)")
+    args = parser.parse_args()
+
+    print(f"packed quote: {len(pack(QUOTE))} bytes, JSON: {len(json.dumps(QUOTE, separators=(',', ':')))} bytes\n")
+
+    stand_in = None if args.redis_url else start_fake_redis()
+    with tempfile.TemporaryDirectory() as tmp:
+        backends = [
+            ("memory", MemoryBackend()),
+            ("sqlite", SqliteBackend(os.path.join(tmp, "quotes.sqlite3"))),
+            ("redis" if args.redis_url else "redis (stand-in)", RespBackend(args.redis_url or stand_in.url)),
+        ]
+        print(f"{'backend':<18}{'put':>12}{'get':>12}")
+        for name, backend in backends:
+            put, get = bench_backend(backend, args.ops)
+            print(f"{name:<18}{put:>9.1f} us{get:>9.1f} us")
+    if stand_in is not None:
+        stand_in.close()
+
+    fetches = bench_stampede(args.workers)
+    print(f"\n{args.workers} workers missing TSLA at once on a shared SQLite cache: {fetches} upstream fetch(es)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Benchmark extract_ticker: the original linear ticker_map scan vs the SymbolIndex.
+
+Runs both resolvers over a query corpus against (a) the bundled data/symbols.csv
+and (b) a synthetic universe of --universe names, and reports build time,
+memory and ns/query.
+
+Usage:
+    python tests/benchmarks/bench_extract_ticker.py [--universe 50000] [--repeat 2000]
+"""
+
+import argparse
+import csv
+import os
+import random
+import re
+import string
+import sys
+import tracemalloc
+from time import perf_counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.utils.symbol_index import DEFAULT_SYMBOLS_PATH, SymbolIndex  # noqa: E402
+
+QUERIES = [
+    "What's the price of Tesla?",
+    "How much is Apple stock?",
+    "NVIDIA price",
+    "Tell me about TSLA",
+    "I want NVIDIA",
+    "What's the price of Bank of America?",
+    "Compare Microsoft and Google",
+    "What's the weather?",
+    "Show me the latest quote for Johnson & Johnson please",
+    "random text without any company in it at all",
+]
+
+
+def legacy_extract_ticker(query, ticker_map):
+    """The original implementation, generalised to an arbitrary ticker_map."""
+    if not query or not query.strip():
+        return "UNKNOWN"
+    query_lower = query.lower()
+    for company, ticker in ticker_map.items():
+        if company in query_lower:
+            return ticker
+    ticker_match = re.search(r'\b([A-Z]{1,5})\b', query)
+    if ticker_match and re.match(r'^[A-Z]{1,5}$', ticker_match.group(1)):
+        return ticker_match.group(1)
+    return "UNKNOWN"
+
+
+def index_extract_ticker(query, index):
+    ticker = index.find_company(query)
+    if ticker:
+        return ticker
+    for match in re.finditer(r'\b([A-Z]{1,5})\b', query):
+        if index.is_ticker(match.group(1)):
+            return match.group(1)
+    return "UNKNOWN"
+
+
+def synthetic_universe(size, seed=7):
+    rng = random.Random(seed)
+    seen = set()
+    rows = []
+    while len(rows) < size:
+        ticker = "".join(rng.choices(string.ascii_uppercase, k=rng.randint(2, 5)))
+        if ticker in seen:
+            continue
+        seen.add(ticker)
+        words = [
+            "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 9))).capitalize()
+            for _ in range(rng.randint(1, 3))
+        ]
+        name = " ".join(words) + " Inc."
+        rows.append((ticker, name, [" ".join(words).lower()]))
+    return rows
+
+
+def measure(label, resolver, repeat):
+    start = perf_counter()
+    for _ in range(repeat):
+        for query in QUERIES:
+            resolver(query)
+    elapsed = perf_counter() - start
+    print(f"  {label:<22}{elapsed / (repeat * len(QUERIES)) * 1e9:>14,.0f} ns/query")
+
+
+def build(label, factory):
+    tracemalloc.start()
+    start = perf_counter()
+    value = factory()
+    elapsed = perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {label:<22}build {elapsed * 1e3:8.1f} ms, retained {current / 1e6:7.2f} MB (peak {peak / 1e6:.2f} MB)")
+    return value
+
+
+def run(title, rows, repeat):
+    print(f"\n{title}: {len(rows)} symbols")
+    ticker_map = build("legacy dict", lambda: {alias: t for t, _, aliases in rows for alias in aliases})
+    index = build("SymbolIndex", lambda: SymbolIndex(rows))
+    measure("legacy linear scan", lambda q: legacy_extract_ticker(q, ticker_map), repeat)
+    measure("SymbolIndex", lambda q: index_extract_ticker(q, index), repeat)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--universe", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    with open(DEFAULT_SYMBOLS_PATH, newline="", encoding="utf-8") as handle:
+        rows = [(r["ticker"], r["name"], (r["aliases"] or "").split("|")) for r in csv.DictReader(handle)]
+
+    run("Bundled data/symbols.csv", rows, args.repeat)
+    run("Synthetic universe", synthetic_universe(args.universe), max(1, args.repeat // 10))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark market-data HTTP throughput with and without connection pooling.
+
+Starts a local keep-alive stub server that answers like Yahoo's chart endpoint
+and fires requests from several threads, the way the blocking executor runs
+fetches:
+
+- per-request: a new session for every request (what yfinance does when no
+  session is passed in), so every request opens a new connection
+- pooled: the shared session from get_market_session(), reusing one
+  connection per thread
+
+Usage:
+    python tests/benchmarks/bench_http_pooling.py [--requests 2000] [--threads 8]
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import perf_counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.utils.http_session import create_market_session  # noqa: E402
+
+CHART = json.dumps({"chart": {"result": [{"meta": {"symbol": "TSLA", "regularMarketPrice": 250.45}}]}}).encode()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep connections open between requests
+    disable_nagle_algorithm = True  # headers and body go out as separate writes
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(CHART)))
+        self.end_headers()
+        self.wfile.write(CHART)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server():
+    """Start the stub on a free local port; returns the server (call .shutdown() when done)."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.connections = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run(server, requests: int, threads: int, pooled: bool) -> float:
+    """Return requests/sec for one configuration."""
+    url = f"http://127.0.0.1:{server.server_address[1]}/v8/finance/chart/TSLA"
+    shared = create_market_session(max_connections=threads) if pooled else None
+
+    def fetch(_):
+        session = shared or create_market_session(max_connections=1)
+        try:
+            response = session.get(url)
+            response.raise_for_status()
+        finally:
+            if shared is None:
+                session.close()
+
+    start = perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(fetch, range(requests)))
+    return requests / (perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per configuration")
+    parser.add_argument("--threads", type=int, default=8, help="Concurrent worker threads")
+    args = parser.parse_args()
+
+    server = start_stub_server()
+    try:
+        print(f"{args.requests} requests, {args.threads} threads, stub server on port {server.server_address[1]}")
+        for name, pooled in (("per-request session", False), ("pooled session", True)):
+            server.connections = 0
+            rate = run(server, args.requests, args.threads, pooled)
+            print(f"{name:<22} {rate:9.0f} req/s  {server.connections:6d} connections")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark CLI start-up cost with ``python -X importtime``.
+
+Imports each target in a fresh interpreter from src/ (the way ``python
+src/main.py`` runs) and reports the cumulative import time together with the
+modules that dominate it. Heavy dependencies (agent_framework, Azure identity,
+yfinance, pandas, numpy) should only show up for targets whose code path
+needs them.
+
+Usage:
+    python tests/benchmarks/bench_import_time.py [--runs 5] [--top 10] [--budget-ms 300]
+
+With --budget-ms the script exits with status 1 when `main` exceeds the budget.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from typing import List, NamedTuple
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+TARGETS = ("main", "agents.stock_orchestrator", "agents.stock_agent")
+
+
+class ImportTiming(NamedTuple):
+    """One line of -X importtime output (times in microseconds)."""
+    module: str
+    self_us: int
+    cumulative_us: int
+
+
+def import_timings(module: str, cwd: str = SRC_DIR) -> List[ImportTiming]:
+    """Import module in a fresh interpreter and return every import it triggered."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd, capture_output=True, text=True, check=True,
+    )
+    timings = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        timings.append(ImportTiming(name.strip(), int(self_us), int(cumulative_us)))
+    return timings
+
+
+def cumulative_ms(module: str, runs: int = 1, cwd: str = SRC_DIR) -> float:
+    """Best-of-runs cumulative import time of module in milliseconds."""
+    best = float("inf")
+    for _ in range(runs):
+        timings = import_timings(module, cwd)
+        total = next(t.cumulative_us for t in reversed(timings) if t.module == module)
+        best = min(best, total / 1000)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per target (best is reported)")
+    parser.add_argument("--top", type=int, default=10, help="Heaviest modules to list per target")
+    parser.add_argument("--budget-ms", type=float, help="Fail when importing main takes longer than this")
+    args = parser.parse_args()
+
+    results = {}
+    for target in TARGETS:
+        results[target] = cumulative_ms(target, args.runs)
+        print(f"{target:<28} {results[target]:8.1f} ms")
+        heaviest = sorted(import_timings(target), key=lambda t: t.self_us, reverse=True)[:args.top]
+        for timing in heaviest:
+            print(f"    {timing.module:<48} self {timing.self_us / 1000:7.1f} ms")
+
+    if args.budget_ms is not None and results["main"] > args.budget_ms:
+        print(f"main imports in {results['main']:.1f} ms, over the {args.budget_ms:.0f} ms budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
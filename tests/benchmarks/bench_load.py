@@ -0,0 +1,288 @@
+"""
+Load-test StockAnalyzerAgent and the StockAgent tools at configurable concurrency.
+
+Runs against local fakes (see fake_services.py): an OpenAI-compatible
+chat-completions server that scripts the StockAgent's tool calls, and a quote
+endpoint read through HttpBatchProvider. Both inject configurable latency, so
+the numbers measure this code's overhead and concurrency behaviour rather than
+Azure or Yahoo.
+
+Modes:
+    agent   full analyze_stock queries: workflow, LLM round trips, tool calls
+    tools   fetch_stock_prices_async alone, the market-data path of a query
+    both    agent, then tools
+
+Reports p50/p95/p99 latency, throughput, errors and peak RSS per concurrency
+level, and time to first token when streaming. --output writes the results as
+JSON; --baseline compares this run with an earlier JSON file.
+
+Usage:
+    python tests/benchmarks/bench_load.py [--queries 200] [--concurrency 1,8,32]
+        [--mode agent|tools|both] [--stream] [--llm-latency-ms 50]
+        [--quote-latency-ms 20] [--output results.json] [--baseline old.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import statistics
+import sys
+from datetime import datetime
+from time import perf_counter
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from tests.benchmarks.fake_services import start_fake_services  # noqa: E402
+
+QUERIES = [
+    "What's the price of Tesla?",
+    "Compare Apple and Microsoft",
+    "How is NVDA doing today?",
+    "Amazon, Alphabet and Meta stock prices",
+    "Netflix share price",
+]
+
+TICKER_SETS = [["TSLA"], ["AAPL", "MSFT"], ["NVDA"], ["AMZN", "GOOGL", "META"], ["NFLX"]]
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float, ttfb: Optional[List[float]] = None) -> Dict[str, Any]:
+    """Latency percentiles (ms), throughput and peak RSS for one run."""
+    ordered = sorted(latencies)
+    summary = {
+        "requests": len(latencies) + errors,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(ordered, 50) * 1000, 2),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 2),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 2),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 2) if ordered else 0.0,
+        "max_ms": round(ordered[-1] * 1000, 2) if ordered else 0.0,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+    if ttfb:
+        ordered_ttfb = sorted(ttfb)
+        summary["ttfb_p50_ms"] = round(percentile(ordered_ttfb, 50) * 1000, 2)
+        summary["ttfb_p95_ms"] = round(percentile(ordered_ttfb, 95) * 1000, 2)
+    return summary
+
+
+async def drive(request, total: int, concurrency: int) -> Dict[str, Any]:
+    """Run ``request(i)`` total times with at most concurrency in flight.
+
+    request returns the time to first token (or None) and raises on failure.
+    """
+    latencies: List[float] = []
+    ttfb: List[float] = []
+    errors = 0
+    next_index = 0
+
+    async def worker() -> None:
+        nonlocal errors, next_index
+        while next_index < total:
+            index, next_index = next_index, next_index + 1
+            start = perf_counter()
+            try:
+                first = await request(index)
+            except Exception:
+                errors += 1
+                continue
+            latencies.append(perf_counter() - start)
+            if first is not None:
+                ttfb.append(first - start)
+
+    start = perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, perf_counter() - start, ttfb)
+
+
+async def run_agent(services, total: int, concurrency: int, stream: bool, fast_path: bool) -> Dict[str, Any]:
+    """analyze_stock end to end, one orchestrator sized for the concurrency level."""
+    from agent_framework.openai import OpenAIChatClient
+
+    from src.agents.stock_orchestrator import StockAnalyzerAgent
+    from src.utils.market_data import HttpBatchProvider
+
+    orchestrator = StockAnalyzerAgent(
+        enable_fast_path=fast_path,
+        max_workflows=concurrency,
+        market_data=HttpBatchProvider(services.quote_url),
+    )
+    orchestrator._client = OpenAIChatClient(model_id="fake-model", api_key="fake", base_url=services.llm_url)
+
+    async def request(index: int) -> Optional[float]:
+        query = QUERIES[index % len(QUERIES)]
+        if not stream:
+            await orchestrator.analyze_stock(query, stream=False)
+            return None
+        first = None
+        async for event in orchestrator.analyze_stock(query, stream=True):
+            if first is None and event.kind == "text":
+                first = perf_counter()
+            if event.kind == "error":
+                raise RuntimeError(event.text)
+        return first
+
+    return await drive(request, total, concurrency)
+
+
+async def run_tools(services, total: int, concurrency: int) -> Dict[str, Any]:
+    """fetch_stock_prices_async alone against the fake quote endpoint."""
+    from src.agents.stock_agent import fetch_stock_prices_async
+    from src.utils.market_data import HttpBatchProvider
+
+    provider = HttpBatchProvider(services.quote_url)
+
+    async def request(index: int) -> None:
+        results = await fetch_stock_prices_async(TICKER_SETS[index % len(TICKER_SETS)], provider=provider)
+        failed = [ticker for ticker, quote in results.items() if "error" in quote]
+        if failed:
+            raise RuntimeError(f"No quote for {', '.join(failed)}")
+
+    return await drive(request, total, concurrency)
+
+
+def run_load(
+    queries: int = 200,
+    concurrency: List[int] = (1, 8, 32),
+    mode: str = "agent",
+    stream: bool = False,
+    fast_path: bool = True,
+    llm_latency_ms: float = 50.0,
+    chunk_delay_ms: float = 0.0,
+    quote_latency_ms: float = 20.0,
+    quote_cache: bool = True,
+    rate_limit: int = 0,
+    separate_process: bool = True,
+) -> Dict[str, Any]:
+    """Run every mode at every concurrency level and return the results document."""
+    from src.utils.quote_cache import get_quote_cache, set_quote_cache
+    from src.utils.rate_limit import LLM, MARKET_DATA, UpstreamLimiter, set_rate_limiter
+
+    config = {
+        "queries": queries, "concurrency": list(concurrency), "mode": mode, "stream": stream,
+        "fast_path": fast_path, "llm_latency_ms": llm_latency_ms, "chunk_delay_ms": chunk_delay_ms,
+        "quote_latency_ms": quote_latency_ms, "quote_cache": quote_cache, "rate_limit": rate_limit,
+    }
+    # Unthrottled by default: the point is to load this code, not the client-side limiter
+    for name in (LLM, MARKET_DATA):
+        set_rate_limiter(name, UpstreamLimiter(name, rate_limit))
+    previous_cache = get_quote_cache()
+    if not quote_cache:
+        set_quote_cache(None)
+
+    services = start_fake_services(
+        llm_latency=llm_latency_ms / 1000,
+        quote_latency=quote_latency_ms / 1000,
+        chunk_delay=chunk_delay_ms / 1000,
+        separate_process=separate_process,
+    )
+    modes = ["agent", "tools"] if mode == "both" else [mode]
+    results = []
+    try:
+        for current in modes:
+            for level in concurrency:
+                cache = get_quote_cache()
+                if cache is not None:
+                    # Every level starts cold, so earlier levels don't turn later fetches into hits
+                    cache.clear()
+                if current == "agent":
+                    summary = asyncio.run(run_agent(services, queries, level, stream, fast_path))
+                else:
+                    summary = asyncio.run(run_tools(services, queries, level))
+                results.append({"mode": current, "concurrency": level, **summary})
+    finally:
+        services.close()
+        for name in (LLM, MARKET_DATA):
+            set_rate_limiter(name, None)
+        set_quote_cache(previous_cache)
+
+    return {
+        "started": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": config,
+        "results": results,
+    }
+
+
+def print_results(document: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> None:
+    previous = {(r["mode"], r["concurrency"]): r for r in (baseline or {}).get("results", [])}
+    print(f"{'mode':<7}{'conc':>5}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+          f"{'errors':>8}{'rss MB':>9}")
+    for row in document["results"]:
+        line = (f"{row['mode']:<7}{row['concurrency']:>5}{row['throughput_rps']:>10.1f}{row['p50_ms']:>10.1f}"
+                f"{row['p95_ms']:>10.1f}{row['p99_ms']:>10.1f}{row['errors']:>8}{row['peak_rss_mb']:>9.1f}")
+        if "ttfb_p50_ms" in row:
+            line += f"   ttfb p50 {row['ttfb_p50_ms']:.1f} ms"
+        print(line)
+        old = previous.get((row["mode"], row["concurrency"]))
+        if old:
+            def delta(key: str) -> str:
+                return f"{(row[key] - old[key]) / old[key] * 100:+.1f}%" if old[key] else "n/a"
+            print(f"{'':<12}vs baseline: req/s {delta('throughput_rps')}, p50 {delta('p50_ms')}, "
+                  f"p95 {delta('p95_ms')}, p99 {delta('p99_ms')}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=200, help="Requests per concurrency level")
+    parser.add_argument("--concurrency", default="1,8,32", help="Comma-separated concurrency levels to sweep")
+    parser.add_argument("--mode", choices=["agent", "tools", "both"], default="agent")
+    parser.add_argument("--stream", action="store_true", help="Stream agent answers and record time to first token")
+    parser.add_argument("--no-fast-path", action="store_true", help="Send every query through the workflow")
+    parser.add_argument("--llm-latency-ms", type=float, default=50.0, help="Fake LLM latency per response")
+    parser.add_argument("--chunk-delay-ms", type=float, default=0.0, help="Fake LLM delay between streamed chunks")
+    parser.add_argument("--quote-latency-ms", type=float, default=20.0, help="Fake quote endpoint latency")
+    parser.add_argument("--no-quote-cache", action="store_true", help="Fetch every quote from the endpoint")
+    parser.add_argument("--rate-limit", type=int, default=0, help="Requests/minute per upstream (0 = unlimited)")
+    parser.add_argument("--in-process", action="store_true", help="Serve the fakes from this process")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--baseline", help="Earlier JSON results to compare against")
+    args = parser.parse_args()
+
+    document = run_load(
+        queries=args.queries,
+        concurrency=[int(level) for level in args.concurrency.split(",")],
+        mode=args.mode,
+        stream=args.stream,
+        fast_path=not args.no_fast_path,
+        llm_latency_ms=args.llm_latency_ms,
+        chunk_delay_ms=args.chunk_delay_ms,
+        quote_latency_ms=args.quote_latency_ms,
+        quote_cache=not args.no_quote_cache,
+        rate_limit=args.rate_limit,
+        separate_process=not args.in_process,
+    )
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_results(document, baseline)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(document, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
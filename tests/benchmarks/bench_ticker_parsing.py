@@ -0,0 +1,138 @@
+"""
+Microbenchmark ns/call for validate_ticker and extract_ticker.
+
+Each function is timed over several query corpora and compared with the
+previous string-pattern implementation. Results can be saved as JSON and
+compared against a previous run to catch regressions.
+
+Usage:
+    python tests/benchmarks/bench_ticker_parsing.py [--number 20000]
+    python tests/benchmarks/bench_ticker_parsing.py --save baseline.json
+    python tests/benchmarks/bench_ticker_parsing.py --compare baseline.json [--tolerance 0.2]
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.agents.stock_agent import extract_ticker, validate_ticker  # noqa: E402
+from src.utils.symbol_index import get_symbol_index  # noqa: E402
+
+TICKER_CORPORA = {
+    "valid": ["TSLA", "AAPL", "A", "GOOGL", "BRK", "NVDA", "JPM", "MSFT"],
+    "invalid": ["", "UNKNOWN", "tsla", "TS-LA", "123", "TOOLONG", "AAPL\n", "Nvda"],
+}
+
+QUERY_CORPORA = {
+    "company_names": [
+        "What's the price of Tesla?",
+        "How much is Apple stock?",
+        "Show me the current share price of Microsoft",
+        "What's the price of Bank of America?",
+        "How is Johnson & Johnson doing today?",
+    ],
+    "tickers": [
+        "TSLA price",
+        "Check JPM today",
+        "What is AAPL trading at?",
+        "GOOGL and AMZN",
+        "Compare NVDA with AMD over the last week",
+    ],
+    "no_match": [
+        "What's the weather?",
+        "I want to buy something",
+        "Tell me a joke about the market",
+        "How do I open a brokerage account in the EU?",
+        "",
+    ],
+    "long": [
+        "I have been following the semiconductor sector for a while and I am curious, "
+        "given the recent earnings season and all the talk about AI demand, what is the "
+        "current share price of NVIDIA and how has it moved compared with last month?",
+    ],
+}
+
+
+def legacy_validate_ticker(ticker):
+    if not ticker or ticker == "UNKNOWN":
+        return False
+    pattern = r'^[A-Z]{1,5}$'
+    return bool(re.match(pattern, ticker))
+
+
+def legacy_extract_ticker(query):
+    index = get_symbol_index()
+    if not query or not query.strip():
+        return "UNKNOWN"
+    ticker = index.find_company(query)
+    if ticker:
+        return ticker
+    for ticker_match in re.finditer(r'\b([A-Z]{1,5})\b', query):
+        if index.is_ticker(ticker_match.group(1)):
+            return ticker_match.group(1)
+    return "UNKNOWN"
+
+
+def ns_per_call(func, corpus, number):
+    """Best-of-5 ns per call, cycling through corpus."""
+    def loop():
+        for item in corpus:
+            func(item)
+    best = min(timeit.repeat(loop, number=max(1, number // len(corpus)), repeat=5))
+    return best / (max(1, number // len(corpus)) * len(corpus)) * 1e9
+
+
+def run(number):
+    get_symbol_index()  # load outside the timed region
+    results = {}
+    suites = [
+        ("validate_ticker", validate_ticker, legacy_validate_ticker, TICKER_CORPORA),
+        ("extract_ticker", extract_ticker, legacy_extract_ticker, QUERY_CORPORA),
+    ]
+    print(f"{'benchmark':<34}{'current':>12}{'legacy':>12}{'speedup':>10}")
+    for name, current, legacy, corpora in suites:
+        for corpus_name, corpus in corpora.items():
+            key = f"{name}[{corpus_name}]"
+            now = ns_per_call(current, corpus, number)
+            old = ns_per_call(legacy, corpus, number)
+            results[key] = now
+            print(f"{key:<34}{now:>9,.0f} ns{old:>9,.0f} ns{old / now:>9.2f}x")
+    return results
+
+
+def compare(results, baseline_path, tolerance):
+    with open(baseline_path, encoding="utf-8") as handle:
+        baseline = json.load(handle)
+    regressions = []
+    for key, now in results.items():
+        before = baseline.get(key)
+        if before and now > before * (1 + tolerance):
+            regressions.append(f"{key}: {before:,.0f} ns -> {now:,.0f} ns")
+    for line in regressions:
+        print(f"REGRESSION {line}", file=sys.stderr)
+    return not regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=20000, help="Calls per measurement")
+    parser.add_argument("--save", metavar="FILE", help="Write ns/call results as JSON")
+    parser.add_argument("--compare", metavar="FILE", help="Fail if slower than a saved run")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown for --compare")
+    args = parser.parse_args()
+
+    results = run(args.number)
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+    if args.compare and not compare(results, args.compare, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Benchmark the per-call cost of tracing on a StockAgent tool.
+
+Times ``format_stock_response`` (a traced tool doing almost no work, so the
+tracing cost is most of what is measured) untraced, with tracing disabled and
+with tracing recording to an in-memory exporter.
+
+Usage:
+    python tests/benchmarks/bench_tracing.py [--calls 200000]
+"""
+
+import argparse
+import os
+import sys
+from time import perf_counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.agents.stock_agent import format_stock_response  # noqa: E402
+from src.utils.tracing import configure_tracing, disable_tracing  # noqa: E402
+
+QUOTE = {
+    "ticker": "TSLA", "company_name": "Tesla Inc", "price": 250.45, "currency": "USD",
+    "change": {"absolute": 5.27, "percent": 2.15, "previous_close": 245.18},
+}
+
+
+def per_call_us(func, calls: int) -> float:
+    start = perf_counter()
+    for _ in range(calls):
+        func(QUOTE)
+    return (perf_counter() - start) / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200_000, help="Calls per configuration")
+    args = parser.parse_args()
+
+    untraced = per_call_us(format_stock_response.__wrapped__, args.calls)
+    disabled = per_call_us(format_stock_response, args.calls)
+    exporter = configure_tracing("memory")
+    try:
+        enabled = per_call_us(format_stock_response, args.calls // 10)
+    finally:
+        disable_tracing()
+        exporter.clear()
+
+    print(f"{'untraced':<18} {untraced:8.3f} us/call")
+    print(f"{'tracing disabled':<18} {disabled:8.3f} us/call  (+{disabled - untraced:.3f} us)")
+    print(f"{'tracing enabled':<18} {enabled:8.3f} us/call  (+{enabled - untraced:.3f} us)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Benchmark per-request workflow setup cost in StockAnalyzerAgent.
+
+Compares the old behaviour (create StockAgent + build a Workflow for every query)
+with the pooled behaviour (borrow a prebuilt Workflow from WorkflowPool).
+Uses an in-process fake chat client, so no Azure access is needed.
+
+Usage:
+    python tests/benchmarks/bench_workflow_setup.py [--requests 2000]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from time import perf_counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.agents.stock_agent import stock_agent_factory  # noqa: E402
+from src.agents.stock_orchestrator import StockAnalyzerAgent  # noqa: E402
+from tests.conftest import FakeChatClient  # noqa: E402
+
+
+def bench_rebuild_per_request(requests: int) -> float:
+    """Old path: factory + WorkflowBuilder for every query."""
+    orchestrator = StockAnalyzerAgent(enable_fast_path=False)
+    orchestrator._client = FakeChatClient()
+    start = perf_counter()
+    for _ in range(requests):
+        orchestrator._stock_agent = stock_agent_factory(orchestrator._client)
+        orchestrator.create_stock_workflow()
+    return (perf_counter() - start) / requests
+
+
+async def bench_pooled(requests: int) -> float:
+    """New path: borrow a prebuilt workflow from the pool."""
+    orchestrator = StockAnalyzerAgent(enable_fast_path=False)
+    orchestrator._client = FakeChatClient()
+    start = perf_counter()
+    for _ in range(requests):
+        async with orchestrator._workflows.acquire():
+            pass
+    return (perf_counter() - start) / requests
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    before = bench_rebuild_per_request(args.requests)
+    after = asyncio.run(bench_pooled(args.requests))
+
+    print(f"{'path':<28}{'setup/request':>16}")
+    print(f"{'rebuild per request':<28}{before * 1e6:>13.1f} us")
+    print(f"{'pooled workflow':<28}{after * 1e6:>13.1f} us")
+    print(f"speedup: {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,335 @@
+"""
+Local fake upstreams for load tests: an OpenAI-style chat-completions endpoint
+with scripted tool calls, a v7-style quote endpoint, and a Redis-protocol
+stand-in for the shared quote cache.
+
+The chat endpoint plays the StockAgent's model. A user turn naming tickers or
+companies is answered with one ``fetch_stock_prices`` tool call; once the tool
+result is in the conversation it answers with a short text built from it.
+Anything else gets a plain text answer. Both streaming (SSE) and
+non-streaming requests are supported.
+
+Latency is injected per response (``llm_latency``), per streamed chunk
+(``chunk_delay``) and per quote request (``quote_latency``).
+
+Usage from a benchmark:
+    services = start_fake_services(llm_latency=0.2, quote_latency=0.05)
+    client = OpenAIChatClient(model_id="fake", api_key="fake", base_url=services.llm_url)
+    provider = HttpBatchProvider(services.quote_url)
+    ...
+    services.close()
+
+    redis = start_fake_redis()
+    backend = RespBackend(redis.url)
+    ...
+    redis.close()
+"""
+
+import fnmatch
+import json
+import multiprocessing
+import re
+import socketserver
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+COMPANIES = {
+    "Tesla": "TSLA", "Apple": "AAPL", "Microsoft": "MSFT", "NVIDIA": "NVDA", "Amazon": "AMZN",
+    "Alphabet": "GOOGL", "Meta": "META", "Netflix": "NFLX", "Intel": "INTC", "AMD": "AMD",
+}
+
+_TICKER_RE = re.compile(r"\b[A-Z]{1,5}\b")
+
+
+def tickers_in(text: str) -> List[str]:
+    """Tickers a user message asks about: company names and bare symbols, in order."""
+    found = [ticker for name, ticker in COMPANIES.items() if name.lower() in text.lower()]
+    found += [t for t in _TICKER_RE.findall(text) if t in COMPANIES.values()]
+    return list(dict.fromkeys(found))
+
+
+def fake_price(ticker: str) -> float:
+    """Deterministic price per ticker, so runs are comparable."""
+    return round(20 + zlib.crc32(ticker.encode()) % 50000 / 100, 2)
+
+
+def _message_text(message: Dict[str, Any]) -> str:
+    content = message.get("content")
+    if isinstance(content, list):
+        return " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return content or ""
+
+
+def script_reply(request: Dict[str, Any]) -> Dict[str, Any]:
+    """Decide the assistant message for a chat-completions request."""
+    messages = request.get("messages", [])
+    tools = {t["function"]["name"] for t in request.get("tools") or [] if t.get("type") == "function"}
+    last_user = max((i for i, m in enumerate(messages) if m.get("role") == "user"), default=-1)
+    tool_results = [_message_text(m) for m in messages[last_user + 1:] if m.get("role") == "tool"]
+
+    if tool_results:
+        return {"content": "Here is the latest data: " + " ".join(tool_results)[:400]}
+    tickers = tickers_in(_message_text(messages[last_user])) if last_user >= 0 else []
+    if tickers and "fetch_stock_prices" in tools:
+        return {"tool_calls": [{
+            "id": f"call_{zlib.crc32(','.join(tickers).encode())}",
+            "type": "function",
+            "function": {"name": "fetch_stock_prices", "arguments": json.dumps({"tickers": tickers})},
+        }]}
+    return {"content": "I can only help with stock prices."}
+
+
+def _completion(reply: Dict[str, Any], model: str) -> Dict[str, Any]:
+    finish = "tool_calls" if "tool_calls" in reply else "stop"
+    return {
+        "id": "chatcmpl-fake", "object": "chat.completion", "created": int(time.time()), "model": model,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": None, **reply}, "finish_reason": finish}],
+        "usage": {"prompt_tokens": 100, "completion_tokens": 20, "total_tokens": 120},
+    }
+
+
+def _chunks(reply: Dict[str, Any], model: str) -> List[Dict[str, Any]]:
+    """The reply as chat.completion.chunk payloads: text in a few pieces, tool calls in one."""
+    def chunk(delta: Dict[str, Any], finish: Optional[str] = None) -> Dict[str, Any]:
+        return {
+            "id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": int(time.time()), "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish}],
+        }
+
+    if "tool_calls" in reply:
+        calls = [{"index": i, **call} for i, call in enumerate(reply["tool_calls"])]
+        return [chunk({"role": "assistant", "tool_calls": calls}), chunk({}, "tool_calls")]
+    words = reply["content"].split(" ")
+    pieces = [" ".join(words[i:i + 8]) + (" " if i + 8 < len(words) else "") for i in range(0, len(words), 8)]
+    return [chunk({"role": "assistant", "content": ""})] + [chunk({"content": p}) for p in pieces] + [chunk({}, "stop")]
+
+
+class FakeServiceHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep connections open between requests
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            return self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        with self.server.lock:
+            self.server.llm_requests += 1
+        reply = script_reply(body)
+        model = body.get("model", "fake")
+        time.sleep(self.server.llm_latency)
+        if not body.get("stream"):
+            return self._send_json(200, _completion(reply, model))
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for payload in _chunks(reply, model):
+            self._write_chunk(f"data: {json.dumps(payload)}\n\n".encode())
+            if self.server.chunk_delay:
+                time.sleep(self.server.chunk_delay)
+        self._write_chunk(b"data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path != "/v7/finance/quote":
+            return self._send_json(404, {"error": f"Unknown path {url.path}"})
+        symbols = [s for s in parse_qs(url.query).get("symbols", [""])[0].split(",") if s]
+        with self.server.lock:
+            self.server.quote_requests += 1
+        time.sleep(self.server.quote_latency)
+        rows = [{
+            "symbol": s, "regularMarketPrice": fake_price(s), "regularMarketPreviousClose": fake_price(s) * 0.99,
+            "longName": next((name for name, t in COMPANIES.items() if t == s), s), "currency": "USD",
+        } for s in symbols if s in COMPANIES.values()]
+        self._send_json(200, {"quoteResponse": {"result": rows, "error": None}})
+
+    def _send_json(self, status: int, payload: Dict[str, Any]) -> None:
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _write_chunk(self, data: bytes) -> None:
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _make_server(llm_latency: float, quote_latency: float, chunk_delay: float) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeServiceHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.llm_latency, server.quote_latency, server.chunk_delay = llm_latency, quote_latency, chunk_delay
+    server.llm_requests = server.quote_requests = 0
+    return server
+
+
+def _serve_in_child(port_queue: Any, llm_latency: float, quote_latency: float, chunk_delay: float) -> None:
+    server = _make_server(llm_latency, quote_latency, chunk_delay)
+    port_queue.put(server.server_address[1])
+    server.serve_forever()
+
+
+@dataclass
+class FakeServices:
+    """Running fake upstreams; call close() when done."""
+    port: int
+    server: Optional[ThreadingHTTPServer] = None
+    process: Optional[multiprocessing.Process] = None
+
+    @property
+    def llm_url(self) -> str:
+        """base_url for an OpenAI-compatible client."""
+        return f"http://127.0.0.1:{self.port}/v1"
+
+    @property
+    def quote_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/v7/finance/quote"
+
+    def close(self) -> None:
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+        if self.process is not None:
+            self.process.terminate()
+            self.process.join()
+
+
+def start_fake_services(
+    llm_latency: float = 0.0, quote_latency: float = 0.0, chunk_delay: float = 0.0, separate_process: bool = False
+) -> FakeServices:
+    """
+    Start both fake endpoints on one free local port.
+
+    Args:
+        llm_latency: Seconds before each chat-completions response starts.
+        quote_latency: Seconds before each quote response.
+        chunk_delay: Seconds between streamed chunks.
+        separate_process: Serve from a child process, so the fakes' CPU time and
+            memory stay out of the benchmark process's measurements.
+    """
+    if separate_process:
+        queue = multiprocessing.Queue()
+        process = multiprocessing.Process(
+            target=_serve_in_child, args=(queue, llm_latency, quote_latency, chunk_delay), daemon=True
+        )
+        process.start()
+        return FakeServices(port=queue.get(timeout=10), process=process)
+
+    server = _make_server(llm_latency, quote_latency, chunk_delay)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return FakeServices(port=server.server_address[1], server=server)
+
+
+class FakeRedisHandler(socketserver.StreamRequestHandler):
+    """The subset of Redis commands RespBackend uses, with key expiry."""
+
+    def handle(self):
+        while True:
+            try:
+                command = self._read_command()
+            except (ConnectionError, ValueError):
+                return
+            if command is None:
+                return
+            with self.server.lock:
+                self.server.commands += 1
+                reply = self._execute(command[0].upper().decode(), command[1:])
+            self.wfile.write(reply)
+
+    def _read_command(self) -> Optional[List[bytes]]:
+        line = self.rfile.readline()
+        if not line:
+            return None
+        if not line.startswith(b"*"):
+            raise ValueError("Inline commands are not supported")
+        args = []
+        for _ in range(int(line[1:])):
+            size = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(size + 2)[:-2])
+        return args
+
+    def _live(self, key: bytes) -> Optional[bytes]:
+        entry = self.server.data.get(key)
+        if entry is None:
+            return None
+        if entry[1] is not None and time.time() >= entry[1]:
+            del self.server.data[key]
+            return None
+        return entry[0]
+
+    def _execute(self, name: str, args: List[bytes]) -> bytes:
+        data = self.server.data
+        if name in ("PING", "AUTH", "SELECT", "CLIENT", "FLUSHDB"):
+            if name == "FLUSHDB":
+                data.clear()
+            return b"+PONG\r\n" if name == "PING" else b"+OK\r\n"
+        if name == "GET":
+            value = self._live(args[0])
+            return b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+        if name == "SET":
+            key, value, options = args[0], args[1], [a.upper() for a in args[2:]]
+            expires_at = None
+            if b"PX" in options:
+                expires_at = time.time() + int(args[2 + options.index(b"PX") + 1]) / 1000
+            elif b"EX" in options:
+                expires_at = time.time() + int(args[2 + options.index(b"EX") + 1])
+            if b"NX" in options and self._live(key) is not None:
+                return b"$-1\r\n"
+            data[key] = (value, expires_at)
+            return b"+OK\r\n"
+        if name == "DEL":
+            live = [key for key in args if self._live(key) is not None]
+            for key in live:
+                del data[key]
+            return b":%d\r\n" % len(live)
+        if name == "DBSIZE":
+            return b":%d\r\n" % sum(1 for key in list(data) if self._live(key) is not None)
+        if name == "SCAN":
+            pattern = args[args.index(b"MATCH") + 1].decode() if b"MATCH" in args else "*"
+            keys = [k for k in list(data) if self._live(k) is not None and fnmatch.fnmatchcase(k.decode(), pattern)]
+            return b"*2\r\n$1\r\n0\r\n*%d\r\n" % len(keys) + b"".join(
+                b"$%d\r\n%s\r\n" % (len(k), k) for k in keys
+            )
+        return b"-ERR unknown command '%s'\r\n" % name.encode()
+
+
+@dataclass
+class FakeRedis:
+    """Running Redis-protocol stand-in; call close() when done."""
+    server: socketserver.ThreadingTCPServer
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"redis://{host}:{port}/0"
+
+    @property
+    def data(self) -> Dict[bytes, Tuple[bytes, Optional[float]]]:
+        return self.server.data
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def start_fake_redis() -> FakeRedis:
+    """Serve an in-memory Redis-protocol stand-in on a free local port, from a thread."""
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), FakeRedisHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.data = {}
+    server.commands = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return FakeRedis(server)
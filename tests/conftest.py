@@ -1,9 +1,15 @@
 """Pytest configuration and fixtures."""
+import asyncio
 import pytest
+import time
 from unittest.mock import Mock, patch
 import os
 import sys
 
+from agent_framework import (
+    BaseChatClient, ChatMessage, ChatResponse, ChatResponseUpdate, use_chat_middleware, use_function_invocation,
+)
+
 # Add src to Python path for testing
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
@@ -22,6 +28,98 @@ def pytest_configure(config):
         # Remove the default filter that excludes live tests
         config.option.markexpr = "live or not live"
 
+class FakeClock:
+    """Manually advanced clock; set or add to now."""
+
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+@use_function_invocation
+@use_chat_middleware
+class FakeChatClient(BaseChatClient):
+    """In-process chat client.
+
+    reply is the answer text, or a function of the messages sent; chunks, when
+    given, are streamed one by one instead. errors are raised by the first calls,
+    one per call. calls counts every model call.
+    """
+
+    def __init__(self, reply="ok", chunks=None, errors=(), **kwargs):
+        super().__init__(**kwargs)
+        self.reply = reply
+        self.chunks = chunks
+        self.errors = list(errors)
+        self.calls = 0
+
+    def _answer(self, messages):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        if self.chunks is not None:
+            return list(self.chunks)
+        return [self.reply(messages) if callable(self.reply) else self.reply]
+
+    async def _inner_get_response(self, *, messages, chat_options, **kwargs):
+        await asyncio.sleep(0)
+        text = "".join(self._answer(messages))
+        return ChatResponse(messages=[ChatMessage(role="assistant", text=text)])
+
+    async def _inner_get_streaming_response(self, *, messages, chat_options, **kwargs):
+        for chunk in self._answer(messages):
+            await asyncio.sleep(0)
+            yield ChatResponseUpdate(role="assistant", text=chunk)
+
+class FakeTokenSource:
+    """Local token source: mints numbered tokens valid for lifetime seconds."""
+
+    def __init__(self, lifetime=3600, delay=0.0):
+        self.lifetime = lifetime
+        self.delay = delay
+        self.calls = []
+        self.fail = False
+        self.closed = False
+
+    async def get_token(self, *scopes, **kwargs):
+        from azure.core.credentials import AccessToken
+
+        self.calls.append((scopes, kwargs))
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("az login required")
+        return AccessToken(f"token-{len(self.calls)}", int(time.time() + self.lifetime))
+
+    async def close(self):
+        self.closed = True
+
+@pytest.fixture
+def clock():
+    """A FakeClock starting at 0."""
+    return FakeClock()
+
+@pytest.fixture(autouse=True)
+def fresh_quote_cache():
+    """Give every test an empty process-wide quote cache."""
+    from src.utils.quote_cache import QuoteCache, set_quote_cache
+
+    cache = QuoteCache()
+    set_quote_cache(cache)
+    yield cache
+    cache.close()
+    set_quote_cache(None)
+
+@pytest.fixture(autouse=True)
+def no_answer_cache():
+    """Keep answer caching off unless a test installs a cache, so repeated queries reach the agent."""
+    from src.utils.answer_cache import set_answer_cache
+
+    set_answer_cache(None)
+    yield
+    set_answer_cache(None)
+
 @pytest.fixture
 def mock_azure_openai_client():
     """Mock Azure OpenAI client for testing."""
@@ -55,9 +153,21 @@ def sample_stock_data():
         "price": 250.45,
         "currency": "USD",
         "timestamp": "2025-10-10T10:30:00Z",
-        "change": "+2.15%"
+        "change": {"absolute": 5.27, "percent": 2.15, "previous_close": 245.18}
     }
 
+@pytest.fixture
+def replay_provider(tmp_path, sample_stock_data):
+    """Offline market-data provider serving sample_stock_data, installed process-wide."""
+    from src.utils.market_data import ReplayProvider, set_market_data_provider
+
+    path = str(tmp_path / "quotes.json")
+    ReplayProvider.record(path, [sample_stock_data])
+    provider = ReplayProvider(path)
+    set_market_data_provider(provider)
+    yield provider
+    set_market_data_provider(None)
+
 @pytest.fixture
 def mock_yfinance_ticker():
     """Mock yfinance ticker for testing."""
@@ -14,7 +14,7 @@ from src.agents.stock_agent import extract_ticker, fetch_stock_price, format_sto
 class TestStockAgentIntegration:
     """Integration tests for stock agent functions."""
     
-    @patch('src.agents.stock_agent.yf.Ticker')
+    @patch('src.utils.market_data.yf.Ticker')
     def test_extract_and_fetch_integration(self, mock_ticker_class):
         """Test complete workflow from ticker extraction to price fetching."""
         # Setup mock yfinance response
@@ -0,0 +1,136 @@
+"""Unit tests for the intent-keyed answer cache."""
+from unittest.mock import patch
+
+import pytest
+from src.agents.query_router import QueryRouter
+from src.agents.stock_orchestrator import StockAnalyzerAgent
+from src.utils.answer_cache import AnswerCache, IntentKey, answer_cache_metrics, set_answer_cache
+from src.utils.quote_cache import QuoteCache
+from tests.conftest import FakeChatClient
+
+
+@pytest.fixture
+def quotes(clock, sample_stock_data):
+    cache = QuoteCache(ttl_policy=lambda ticker: 15.0, max_stale=0, clock=clock)
+    cache.put("TSLA", sample_stock_data)
+    return cache
+
+
+class TestIntentKey:
+    """Different phrasings of one question share a key."""
+
+    @pytest.mark.parametrize("query", ["price of tesla", "Tesla price?", "TSLA", "What's TSLA trading at?"])
+    def test_price_phrasings(self, query):
+        assert QueryRouter().intent_key(query) == IntentKey("TSLA", "price", "USD")
+
+    def test_currency_is_part_of_the_key(self):
+        router = QueryRouter()
+
+        assert router.intent_key("Tesla price in SEK") == IntentKey("TSLA", "price", "SEK")
+        assert router.intent_key("Tesla price in USD") == IntentKey("TSLA", "price", "USD")
+
+    @pytest.mark.parametrize("query", [
+        "Compare Tesla and Apple", "Tesla RSI", "Should I buy Tesla?", "What is Tesla worth?", "Tesla value",
+    ])
+    def test_other_intents_are_not_cached(self, query):
+        assert QueryRouter().intent_key(query) is None
+
+
+class TestAnswerCache:
+    """Answers live exactly as long as their quote."""
+
+    def test_served_while_quote_is_fresh(self, quotes, clock):
+        cache = AnswerCache(quotes)
+        key = IntentKey("TSLA")
+
+        assert cache.put(key, "Tesla is at $250.45")
+        clock.now = 14.0
+        assert cache.get(key) == "Tesla is at $250.45"
+
+        clock.now = 15.0
+        assert cache.get(key) is None
+        assert cache.stats.expired == 1
+        assert len(cache) == 0
+
+    def test_refreshed_quote_invalidates_answer(self, quotes, clock, sample_stock_data):
+        cache = AnswerCache(quotes)
+        cache.put(IntentKey("TSLA"), "old answer")
+
+        clock.now = 5.0
+        quotes.put("TSLA", {**sample_stock_data, "price": 260.0})
+
+        assert cache.get(IntentKey("TSLA")) is None
+
+    def test_answer_without_fresh_quote_is_skipped(self, quotes):
+        cache = AnswerCache(quotes)
+
+        assert not cache.put(IntentKey("AAPL"), "Apple is at $180")
+        assert cache.stats.skipped == 1
+
+    def test_lru_eviction(self, quotes, sample_stock_data):
+        for ticker in ("AAPL", "MSFT"):
+            quotes.put(ticker, {**sample_stock_data, "ticker": ticker})
+        cache = AnswerCache(quotes, max_entries=2)
+
+        cache.put(IntentKey("TSLA"), "tesla")
+        cache.put(IntentKey("AAPL"), "apple")
+        cache.get(IntentKey("TSLA"))
+        cache.put(IntentKey("MSFT"), "microsoft")
+
+        assert cache.get(IntentKey("AAPL")) is None
+        assert cache.get(IntentKey("TSLA")) == "tesla"
+        assert cache.stats.evictions == 1
+
+    def test_hit_rate(self, quotes):
+        cache = AnswerCache(quotes)
+        cache.put(IntentKey("TSLA"), "tesla")
+
+        cache.get(IntentKey("TSLA"))
+        cache.get(IntentKey("TSLA", currency="SEK"))
+
+        assert cache.stats.as_dict()["hit_rate"] == 0.5
+
+
+class TestOrchestratorAnswerCache:
+    """analyze_stock answers repeated questions without running the workflow."""
+
+    @pytest.fixture
+    def orchestrator(self, fresh_quote_cache, sample_stock_data):
+        fresh_quote_cache.put("TSLA", sample_stock_data)
+        set_answer_cache(AnswerCache(fresh_quote_cache))
+        orchestrator = StockAnalyzerAgent(enable_fast_path=False, max_workflows=1)
+        orchestrator._client = FakeChatClient("Tesla is at $250.45")
+        with patch('src.agents.stock_orchestrator.stock_agent_factory',
+                   side_effect=lambda client, provider=None: client.create_agent(name="StockAgent")):
+            yield orchestrator
+
+    @pytest.mark.asyncio
+    async def test_rephrased_question_is_served_from_cache(self, orchestrator):
+        first = await orchestrator.analyze_stock("price of tesla", stream=False)
+        calls = orchestrator._client.calls
+
+        second = await orchestrator.analyze_stock("TSLA", stream=False)
+
+        assert second == getattr(first, "text", first)
+        assert orchestrator._client.calls == calls
+        assert answer_cache_metrics()["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_streamed_hit_is_marked_cached(self, orchestrator):
+        [event async for event in orchestrator.analyze_stock("Tesla price?", stream=True)]
+
+        events = [event async for event in orchestrator.analyze_stock("price of tesla", stream=True)]
+
+        assert [e.kind for e in events] == ["text", "done"]
+        assert events[-1].data["cached"] is True
+        assert events[-1].text == "Tesla is at $250.45"
+
+    @pytest.mark.asyncio
+    async def test_other_currency_runs_the_workflow(self, orchestrator):
+        await orchestrator.analyze_stock("price of tesla", stream=False)
+        calls = orchestrator._client.calls
+
+        await orchestrator.analyze_stock("price of tesla in SEK", stream=False)
+
+        assert orchestrator._client.calls > calls
+        assert answer_cache_metrics()["hits"] == 0
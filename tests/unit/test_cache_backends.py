@@ -0,0 +1,236 @@
+"""Unit tests for the quote-cache storage backends."""
+import json
+import socket
+import threading
+import time
+
+import pytest
+
+from src.utils.cache_backends import (
+    CacheBackend, MemoryBackend, RespBackend, SqliteBackend, create_cache_backend, pack, unpack,
+)
+from src.utils.exceptions import CacheBackendError
+from src.utils.quote_cache import QuoteCache, get_quote_cache
+from tests.benchmarks.fake_services import start_fake_redis
+
+QUOTE = {
+    "ticker": "TSLA", "company_name": "Tesla Inc", "price": 250.45, "currency": "USD",
+    "timestamp": "2025-10-10T10:30:00Z",
+    "change": {"absolute": 5.27, "percent": 2.15, "previous_close": 245.18},
+}
+
+
+@pytest.fixture
+def fake_redis():
+    redis = start_fake_redis()
+    yield redis
+    redis.close()
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        backend = MemoryBackend()
+    elif request.param == "sqlite":
+        backend = SqliteBackend(str(tmp_path / "cache.sqlite3"))
+    else:
+        backend = RespBackend(request.getfixturevalue("fake_redis").url)
+    yield backend
+    backend.close()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class TestCodec:
+    """Tests for the binary value encoding."""
+
+    def test_round_trip(self):
+        value = [QUOTE, None, True, False, -7, 2**40, 0.1, 1 / 3, 1e300, "kröna", b"\x00\xff", []]
+
+        assert unpack(pack(value)) == value
+
+    def test_quote_is_under_half_its_json_size(self):
+        assert len(pack(QUOTE)) < len(json.dumps(QUOTE, separators=(",", ":"))) / 2
+
+    def test_rejects_unknown_format(self):
+        with pytest.raises(ValueError):
+            unpack(b"\x09" + pack(QUOTE)[1:])
+        with pytest.raises(TypeError):
+            pack({"when": object()})
+
+
+class TestBackends:
+    """Every backend honours the same get/set/add/expiry contract."""
+
+    def test_set_get_delete(self, backend):
+        backend.set("quote:TSLA", QUOTE, 10)
+
+        assert backend.get("quote:TSLA") == QUOTE
+        assert len(backend) == 1
+        backend.delete("quote:TSLA")
+        assert backend.get("quote:TSLA") is None
+
+    def test_entries_expire(self, backend):
+        backend.set("quote:TSLA", QUOTE, 0.05)
+        time.sleep(0.1)
+
+        assert backend.get("quote:TSLA") is None
+
+    def test_add_only_when_absent_or_expired(self, backend):
+        assert backend.add("lock", 1, 0.05)
+        assert not backend.add("lock", 2, 10)
+        time.sleep(0.1)
+        assert backend.add("lock", 3, 10)
+        assert backend.get("lock") == 3
+
+    def test_concurrent_memory_add_has_one_winner(self):
+        backend = MemoryBackend()
+        barrier = threading.Barrier(8)
+        won = []
+
+        def contend(n):
+            barrier.wait()
+            if backend.add("lock", n, 10):
+                won.append(n)
+
+        threads = [threading.Thread(target=contend, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(won) == 1
+        assert backend.get("lock") == won[0]
+
+    def test_count_by_prefix(self, backend):
+        backend.set("quote:TSLA", QUOTE, 10)
+        backend.add("lock:quote:AAPL", 1, 10)
+
+        assert backend.count("quote:") == 1
+        assert len(backend) == 2
+
+    def test_base_class_is_abstract(self):
+        with pytest.raises(TypeError):
+            CacheBackend()
+
+    def test_clear(self, backend):
+        backend.set("a", 1, 10)
+        backend.set("b", 2, 10)
+
+        backend.clear()
+
+        assert len(backend) == 0
+
+
+class TestSharedBackends:
+    """Workers pointing at the same store share entries and survive restarts."""
+
+    def test_sqlite_is_shared_between_instances(self, tmp_path):
+        path = str(tmp_path / "cache.sqlite3")
+        first, second = SqliteBackend(path), SqliteBackend(path)
+
+        first.set("quote:TSLA", QUOTE, 10)
+
+        assert second.get("quote:TSLA") == QUOTE
+        first.close()
+        second.close()
+
+    def test_sqlite_bounds_entries(self, tmp_path):
+        backend = SqliteBackend(str(tmp_path / "cache.sqlite3"), max_entries=3, purge_every=1)
+        for i in range(5):
+            backend.set(f"k{i}", i, 10 + i)
+
+        assert len(backend) == 3
+        assert backend.get("k0") is None
+        assert backend.evictions == 2
+
+    def test_restarted_worker_starts_warm(self, tmp_path):
+        path = str(tmp_path / "cache.sqlite3")
+        QuoteCache(backend=SqliteBackend(path)).get_or_fetch("TSLA", lambda: QUOTE)
+
+        restarted = QuoteCache(backend=SqliteBackend(path))
+
+        assert restarted.get_or_fetch("TSLA", lambda: pytest.fail("refetched")) == QUOTE
+
+    def test_redis_keys_are_prefixed(self, fake_redis):
+        RespBackend(fake_redis.url, prefix="app:").set("quote:TSLA", QUOTE, 10)
+
+        assert list(fake_redis.data) == [b"app:quote:TSLA"]
+
+    def test_unreachable_redis_is_a_miss(self):
+        cache = QuoteCache(backend=RespBackend(f"redis://127.0.0.1:{free_port()}/0", timeout=0.2))
+
+        assert cache.get_or_fetch("TSLA", lambda: QUOTE) == QUOTE
+        assert cache.stats.backend_errors >= 2
+
+    def test_backend_error_type(self):
+        with pytest.raises(CacheBackendError):
+            RespBackend(f"redis://127.0.0.1:{free_port()}/0", timeout=0.2).get("quote:TSLA")
+
+
+class TestStampedeProtection:
+    """Only one worker fetches a quote that several miss at once."""
+
+    def test_second_worker_waits_for_the_first(self, fake_redis):
+        workers = [QuoteCache(backend=RespBackend(fake_redis.url)) for _ in range(2)]
+        started = threading.Event()
+        calls = []
+
+        def slow_fetch():
+            calls.append(1)
+            started.set()
+            time.sleep(0.2)
+            return QUOTE
+
+        results = []
+        leader = threading.Thread(target=lambda: results.append(workers[0].get_or_fetch("TSLA", slow_fetch)))
+        leader.start()
+        started.wait(5)
+        results.append(workers[1].get_or_fetch("TSLA", slow_fetch))
+        leader.join(5)
+
+        assert len(calls) == 1
+        assert results == [QUOTE, QUOTE]
+        assert workers[1].stats.peer_waits == 1
+        assert not any(key.startswith(b"stock-analyzer:lock:") for key in fake_redis.data)
+
+    def test_locks_are_not_counted_as_entries(self, fake_redis):
+        cache = QuoteCache(backend=RespBackend(fake_redis.url))
+        cache.put("TSLA", QUOTE)
+        cache.backend.add("lock:quote:AAPL", 1, 10)  # a fetch in flight
+
+        assert len(cache) == 1
+        cache.backend.close()
+
+    def test_worker_fetches_itself_when_peer_never_finishes(self, tmp_path):
+        backend = SqliteBackend(str(tmp_path / "cache.sqlite3"))
+        backend.add("lock:quote:TSLA", 1, 10)  # a crashed worker's lock
+        cache = QuoteCache(backend=backend, lock_timeout=0.1, poll_interval=0.01)
+
+        assert cache.get_or_fetch("TSLA", lambda: QUOTE) == QUOTE
+        assert cache.stats.peer_waits == 0
+
+
+class TestConfiguration:
+    """The process-wide quote cache picks its backend from config."""
+
+    def test_sqlite_backend_from_env(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("QUOTE_CACHE_BACKEND", "sqlite")
+        monkeypatch.setenv("QUOTE_CACHE_PATH", str(tmp_path / "quotes.sqlite3"))
+        monkeypatch.setattr("src.utils.quote_cache._quote_cache_configured", False)
+
+        cache = get_quote_cache()
+
+        assert isinstance(cache.backend, SqliteBackend)
+        cache.close()
+
+    def test_unknown_backend(self):
+        class Config:
+            quote_cache_size = 10
+
+        with pytest.raises(ValueError):
+            create_cache_backend("memcached", Config())
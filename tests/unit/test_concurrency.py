@@ -0,0 +1,110 @@
+"""Unit tests for the bounded executor and async price fetching."""
+import asyncio
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from src.utils.concurrency import BoundedExecutor, set_blocking_executor
+from src.utils.exceptions import UpstreamTimeoutError
+
+
+@pytest.fixture
+def executor():
+    """Install a small process-wide executor for the test."""
+    executor = BoundedExecutor(max_concurrency=2, timeout=1.0)
+    set_blocking_executor(executor)
+    yield executor
+    set_blocking_executor(None)
+
+
+class TestBoundedExecutor:
+    """Test cases for BoundedExecutor."""
+
+    @pytest.mark.asyncio
+    async def test_run_returns_result(self, executor):
+        assert await executor.run(lambda a, b: a + b, 2, 3) == 5
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self, executor):
+        active = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def work():
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.05)
+            with lock:
+                active -= 1
+
+        await asyncio.gather(*(executor.run(work) for _ in range(6)))
+
+        assert peak == 2
+
+    @pytest.mark.asyncio
+    async def test_timeout(self, executor):
+        with pytest.raises(asyncio.TimeoutError):
+            await executor.run(time.sleep, 0.5, timeout=0.05)
+
+    def test_rejects_invalid_concurrency(self):
+        with pytest.raises(ValueError):
+            BoundedExecutor(max_concurrency=0)
+
+
+class TestFetchStockPriceAsync:
+    """Test cases for the async fetch_stock_price variant."""
+
+    @pytest.mark.asyncio
+    @patch('src.utils.market_data.yf.Ticker')
+    async def test_does_not_block_event_loop(self, mock_ticker_class, executor):
+        from src.agents.stock_agent import fetch_stock_price_async
+
+        class SlowTicker:
+            @property
+            def info(self):
+                time.sleep(0.2)
+                return {"regularMarketPrice": 250.45, "currency": "USD"}
+
+        mock_ticker_class.return_value = SlowTicker()
+        ticks = 0
+
+        async def heartbeat():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        beat = asyncio.create_task(heartbeat())
+        result = await fetch_stock_price_async("TSLA")
+        beat.cancel()
+
+        assert result["price"] == 250.45
+        assert ticks >= 5
+
+    @pytest.mark.asyncio
+    @patch('src.utils.market_data.yf.Ticker')
+    async def test_timeout_raises_upstream_timeout_error(self, mock_ticker_class):
+        from src.agents.stock_agent import fetch_stock_price_async
+
+        set_blocking_executor(BoundedExecutor(max_concurrency=1, timeout=0.05))
+        try:
+            type(mock_ticker_class.return_value).info = property(lambda self: time.sleep(0.3) or {})
+            with pytest.raises(UpstreamTimeoutError):
+                await fetch_stock_price_async("TSLA")
+        finally:
+            set_blocking_executor(None)
+
+    @pytest.mark.asyncio
+    async def test_cache_hit_skips_executor(self, fresh_quote_cache, executor):
+        from src.agents.stock_agent import fetch_stock_price_async
+
+        fresh_quote_cache.put("TSLA", {"ticker": "TSLA", "price": 250.45})
+        with patch.object(executor, "run") as mock_run:
+            result = await fetch_stock_price_async("TSLA")
+
+        assert result["price"] == 250.45
+        mock_run.assert_not_called()
@@ -0,0 +1,222 @@
+"""Unit tests for the caching credential provider."""
+import asyncio
+import os
+import time
+from unittest.mock import patch
+
+import pytest
+from azure.core.credentials import AccessToken
+from cryptography.fernet import Fernet
+
+from src.utils.credentials import (
+    AZURE_AI_SCOPE, CachingCredential, EncryptedTokenCache, get_credential, set_credential,
+)
+
+from tests.conftest import FakeTokenSource
+
+SCOPE = "https://ai.azure.com/.default"
+
+
+@pytest.fixture(autouse=True)
+def reset_credential():
+    yield
+    set_credential(None)
+
+
+class TestCachingCredential:
+    """Tests for in-memory caching and refresh."""
+
+    @pytest.mark.asyncio
+    async def test_fresh_token_is_reused(self):
+        source = FakeTokenSource()
+        credential = CachingCredential(source)
+
+        first = await credential.get_token(SCOPE)
+        second = await credential.get_token(SCOPE)
+
+        assert first.token == second.token == "token-1"
+        assert credential.fetches == 1
+
+    @pytest.mark.asyncio
+    async def test_scopes_and_tenants_are_cached_separately(self):
+        source = FakeTokenSource()
+        credential = CachingCredential(source)
+
+        await credential.get_token(SCOPE)
+        await credential.get_token("https://management.azure.com/.default")
+        await credential.get_token(SCOPE, tenant_id="other")
+
+        assert credential.fetches == 3
+        assert source.calls[2] == ((SCOPE,), {"tenant_id": "other"})
+
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_one_fetch(self):
+        source = FakeTokenSource(delay=0.05)
+        credential = CachingCredential(source)
+
+        tokens = await asyncio.gather(*(credential.get_token(SCOPE) for _ in range(10)))
+
+        assert {t.token for t in tokens} == {"token-1"}
+        assert len(source.calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_token_near_expiry_is_served_while_refreshing(self):
+        source = FakeTokenSource(lifetime=200, delay=0.01)
+        credential = CachingCredential(source, refresh_margin=300)
+
+        await credential.get_token(SCOPE)
+        served = await credential.get_token(SCOPE)  # inside the margin: no waiting
+        assert served.token == "token-1"
+
+        await asyncio.sleep(0.05)
+        assert credential.fetches == 2
+        source.lifetime = 3600
+        assert (await credential.get_token(SCOPE)).token == "token-2"
+
+    @pytest.mark.asyncio
+    async def test_token_about_to_expire_is_fetched_in_foreground(self):
+        source = FakeTokenSource(lifetime=30)
+        credential = CachingCredential(source, refresh_margin=300)
+
+        await credential.get_token(SCOPE)
+        token = await credential.get_token(SCOPE)
+
+        assert token.token == "token-2"
+
+    @pytest.mark.asyncio
+    async def test_refreshes_ahead_of_expiry_without_callers(self):
+        source = FakeTokenSource(lifetime=301)
+        credential = CachingCredential(source, refresh_margin=300)
+
+        await credential.get_token(SCOPE)
+        await asyncio.sleep(1.2)
+
+        assert credential.fetches >= 2
+        await credential.close()
+
+    @pytest.mark.asyncio
+    async def test_failed_background_refresh_keeps_cached_token(self, caplog):
+        source = FakeTokenSource(lifetime=200)
+        credential = CachingCredential(source, refresh_margin=300)
+        await credential.get_token(SCOPE)
+
+        source.fail = True
+        token = await credential.get_token(SCOPE)
+        await asyncio.sleep(0.01)
+
+        assert token.token == "token-1"
+        assert "Background token refresh failed" in caplog.text
+
+    @pytest.mark.asyncio
+    async def test_claims_challenge_bypasses_cache(self):
+        source = FakeTokenSource()
+        credential = CachingCredential(source)
+        await credential.get_token(SCOPE)
+
+        token = await credential.get_token(SCOPE, claims='{"access_token": {}}')
+
+        assert token.token == "token-2"
+        assert (await credential.get_token(SCOPE)).token == "token-1"
+
+    @pytest.mark.asyncio
+    async def test_prefetch_mints_in_background(self):
+        source = FakeTokenSource(delay=0.01)
+        credential = CachingCredential(source)
+
+        credential.prefetch(SCOPE)
+        await asyncio.sleep(0.05)
+        await credential.get_token(SCOPE)
+
+        assert credential.fetches == 1
+
+    @pytest.mark.asyncio
+    async def test_close_closes_source(self):
+        source = FakeTokenSource()
+        async with CachingCredential(source):
+            pass
+        assert source.closed
+
+
+class TestEncryptedTokenCache:
+    """Tests for the on-disk token cache."""
+
+    @pytest.mark.asyncio
+    async def test_next_process_reuses_cached_token(self, tmp_path):
+        key = Fernet.generate_key()
+        path = tmp_path / "tokens.bin"
+        first = CachingCredential(FakeTokenSource(), EncryptedTokenCache(path, key))
+        token = await first.get_token(SCOPE)
+
+        source = FakeTokenSource()
+        second = CachingCredential(source, EncryptedTokenCache(path, key))
+
+        assert (await second.get_token(SCOPE)).token == token.token
+        assert source.calls == []
+
+    @pytest.mark.asyncio
+    async def test_file_is_encrypted_and_private(self, tmp_path):
+        path = tmp_path / "tokens.bin"
+        credential = CachingCredential(FakeTokenSource(), EncryptedTokenCache(path, Fernet.generate_key()))
+        await credential.get_token(SCOPE)
+
+        assert b"token-1" not in path.read_bytes()
+        if os.name == "posix":
+            assert path.stat().st_mode & 0o777 == 0o600
+
+    @pytest.mark.asyncio
+    async def test_unreadable_cache_is_ignored(self, tmp_path):
+        path = tmp_path / "tokens.bin"
+        await CachingCredential(FakeTokenSource(), EncryptedTokenCache(path, Fernet.generate_key())).get_token(SCOPE)
+
+        source = FakeTokenSource()
+        credential = CachingCredential(source, EncryptedTokenCache(path, Fernet.generate_key()))
+        await credential.get_token(SCOPE)
+
+        assert len(source.calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_expired_disk_tokens_are_not_served(self, tmp_path):
+        key = Fernet.generate_key()
+        path = tmp_path / "tokens.bin"
+        EncryptedTokenCache(path, key).save({f"|{SCOPE}": AccessToken("old", int(time.time()) - 10)})
+
+        credential = CachingCredential(FakeTokenSource(), EncryptedTokenCache(path, key))
+
+        assert (await credential.get_token(SCOPE)).token == "token-1"
+
+
+class TestSharedCredential:
+    """Tests for the process-wide credential."""
+
+    def test_orchestrator_and_factory_share_credential(self):
+        from src.agents.stock_agent import stock_agent_factory
+
+        shared = CachingCredential(FakeTokenSource())
+        set_credential(shared)
+
+        assert get_credential() is shared
+        with patch("agent_framework.azure.AzureAIAgentClient") as client_cls:
+            stock_agent_factory()
+        client_cls.assert_called_once_with(async_credential=shared)
+
+    @pytest.mark.asyncio
+    async def test_orchestrator_prefetches_agent_scope(self):
+        from src.agents.stock_orchestrator import StockAnalyzerAgent
+
+        source = FakeTokenSource()
+        set_credential(CachingCredential(source))
+        with patch("agent_framework.azure.AzureAIAgentClient"):
+            async with StockAnalyzerAgent():
+                await asyncio.sleep(0)
+
+        assert source.calls[0][0] == (AZURE_AI_SCOPE,)
+        assert not source.closed  # shared credential outlives the session
+
+    def test_disk_cache_needs_key(self, monkeypatch, caplog):
+        monkeypatch.setenv("TOKEN_CACHE_PATH", "tokens.bin")
+        monkeypatch.setenv("TOKEN_CACHE_KEY", "")
+
+        credential = get_credential()
+
+        assert credential._disk_cache is None
+        assert "without TOKEN_CACHE_KEY" in caplog.text
@@ -0,0 +1,73 @@
+"""Unit tests for the currency agent tools."""
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+
+from src.agents.currency_agent import convert_currency, convert_stock_quotes, requested_currency
+from src.utils.fx_rates import FixtureFxFetcher, FxRateTable, set_fx_table
+
+FIXTURE = Path(__file__).resolve().parents[1] / "fixtures" / "fx_rates.json"
+
+
+@pytest.fixture
+def fx_fetcher():
+    fetcher = Mock(side_effect=FixtureFxFetcher(str(FIXTURE)))
+    set_fx_table(FxRateTable(fetcher))
+    yield fetcher
+    set_fx_table(None)
+
+
+class TestRequestedCurrency:
+    """Test cases for requested_currency."""
+
+    @pytest.mark.parametrize("query,expected", [
+        ("What's the price of NVIDIA in SEK?", "SEK"),
+        ("Convert Tesla to eur", "EUR"),
+        ("Apple stock in Swedish kronor", "SEK"),
+        ("How much is Microsoft in pounds?", "GBP"),
+        ("What's the price of Tesla?", None),
+        ("I want to try something in the market", None),
+    ])
+    def test_requested_currency(self, query, expected):
+        assert requested_currency(query) == expected
+
+
+class TestConversionTools:
+    """Test cases for convert_currency and convert_stock_quotes."""
+
+    def test_convert_currency(self, fx_fetcher):
+        result = convert_currency(100.0, "usd", "sek")
+
+        assert result["converted"] == pytest.approx(1068.45)
+        assert result["to_currency"] == "SEK"
+
+    def test_convert_single_quote(self, fx_fetcher, sample_stock_data):
+        result = convert_stock_quotes(sample_stock_data, "SEK")
+
+        assert result["currency"] == "SEK"
+        assert result["price"] == pytest.approx(250.45 * 10.6845, abs=1e-3)
+        assert result["original_price"] == 250.45
+        assert result["change"]["percent"] == 2.15
+        assert result["change"]["absolute"] == pytest.approx(5.27 * 10.6845, abs=1e-3)
+
+    def test_convert_batch_uses_one_rate_lookup(self, fx_fetcher, sample_stock_data):
+        quotes = {
+            "TSLA": sample_stock_data,
+            "AAPL": {**sample_stock_data, "ticker": "AAPL", "price": 175.5},
+            "ZZZZ": {"ticker": "ZZZZ", "error": "Stock not found: ZZZZ"},
+        }
+        table = FxRateTable(Mock(side_effect=FixtureFxFetcher(str(FIXTURE))))
+        table.rate = Mock(wraps=table.rate)
+        set_fx_table(table)
+
+        result = convert_stock_quotes(quotes, "EUR")
+
+        assert list(result) == ["TSLA", "AAPL", "ZZZZ"]
+        assert result["AAPL"]["price"] == pytest.approx(175.5 * 0.9259, abs=1e-3)
+        assert result["ZZZZ"] == quotes["ZZZZ"]
+        table.rate.assert_called_once_with("USD", "EUR")
+
+    def test_unknown_target_currency_marks_quotes_failed(self, fx_fetcher, sample_stock_data):
+        result = convert_stock_quotes({"TSLA": sample_stock_data}, "XYZ")
+        assert "error" in result["TSLA"]
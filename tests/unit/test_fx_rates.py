@@ -0,0 +1,176 @@
+"""Unit tests for the FX rate table."""
+import threading
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+
+from src.utils.exceptions import APIRateLimitError, CurrencyError
+from src.utils.fx_rates import FixtureFxFetcher, FxRateTable
+from src.utils.rate_limit import MARKET_DATA, UpstreamLimiter, set_rate_limiter
+
+FIXTURE = Path(__file__).resolve().parents[1] / "fixtures" / "fx_rates.json"
+
+
+@pytest.fixture
+def fetcher():
+    return Mock(side_effect=FixtureFxFetcher(str(FIXTURE)))
+
+
+@pytest.fixture(autouse=True)
+def reset_limiter():
+    yield
+    set_rate_limiter(MARKET_DATA, None)
+
+
+class TestFxRateTable:
+    """Test cases for FxRateTable."""
+
+    def test_usd_rates_and_identity(self, fetcher):
+        table = FxRateTable(fetcher)
+
+        assert table.rate("USD", "SEK") == pytest.approx(10.6845)
+        assert table.rate("sek", "usd") == pytest.approx(1 / 10.6845)
+        assert table.rate("SEK", "SEK") == 1.0
+
+    def test_triangulates_through_usd(self, fetcher):
+        table = FxRateTable(fetcher)
+        assert table.rate("EUR", "SEK") == pytest.approx(10.6845 / 0.9259)
+
+    def test_many_conversions_cost_one_fetch(self, fetcher):
+        table = FxRateTable(fetcher)
+
+        for amount in range(100):
+            table.convert(amount, "USD", "SEK")
+        table.convert(1.0, "GBP", "JPY")
+
+        assert fetcher.call_count == 1
+
+    def test_refreshes_after_ttl(self, fetcher, clock):
+        table = FxRateTable(fetcher, ttl=60, clock=clock)
+        table.rate("USD", "SEK")
+
+        clock.now = 59
+        table.rate("USD", "SEK")
+        assert fetcher.call_count == 1
+
+        clock.now = 61
+        table.rate("USD", "SEK")
+        assert fetcher.call_count == 2
+
+    def test_serves_expired_rates_when_refresh_fails(self, fetcher, clock):
+        table = FxRateTable(fetcher, ttl=60, clock=clock)
+        table.rate("USD", "SEK")
+
+        fetcher.side_effect = RuntimeError("offline")
+        clock.now = 120
+
+        assert table.rate("USD", "SEK") == pytest.approx(10.6845)
+
+    def test_failed_refresh_waits_before_retrying(self, fetcher, clock):
+        table = FxRateTable(fetcher, ttl=3600, clock=clock, retry_interval=30)
+        table.rate("USD", "SEK")
+
+        fetcher.side_effect = RuntimeError("offline")
+        clock.now = 3601
+        for _ in range(10):
+            table.rate("USD", "SEK")
+        assert fetcher.call_count == 2
+
+        clock.now = 3632
+        table.rate("USD", "SEK")
+        assert fetcher.call_count == 3
+
+    def test_partial_refresh_keeps_previous_rates(self, fetcher, clock):
+        table = FxRateTable(fetcher, ttl=60, clock=clock)
+        table.rate("USD", "SEK")
+
+        fetcher.side_effect = lambda currencies: {"SEK": 11.0}
+        clock.now = 61
+
+        assert table.rate("USD", "SEK") == pytest.approx(11.0)
+        assert table.rate("USD", "EUR") == pytest.approx(0.9259)
+
+    def test_first_refresh_failure_raises(self):
+        table = FxRateTable(Mock(side_effect=RuntimeError("offline")))
+        with pytest.raises(CurrencyError):
+            table.rate("USD", "SEK")
+
+    def test_unknown_currency(self, fetcher):
+        table = FxRateTable(fetcher)
+        with pytest.raises(CurrencyError):
+            table.rate("USD", "XYZ")
+
+    def test_unlisted_currency_is_added_on_first_use(self):
+        fetcher = Mock(side_effect=lambda currencies: {c: 2.0 for c in currencies})
+        table = FxRateTable(fetcher, currencies=["SEK"])
+
+        table.rate("USD", "SEK")
+        table.rate("USD", "NZD")
+
+        assert "NZD" in fetcher.call_args[0][0]
+        assert fetcher.call_count == 2
+
+    def test_unknown_currency_is_fetched_once_per_ttl(self, fetcher, clock):
+        table = FxRateTable(fetcher, ttl=60, clock=clock)
+        table.rate("USD", "SEK")
+
+        for _ in range(5):
+            with pytest.raises(CurrencyError):
+                table.rate("USD", "BTC")
+        assert fetcher.call_count == 2
+
+        clock.now = 61
+        with pytest.raises(CurrencyError):
+            table.rate("USD", "BTC")
+        assert fetcher.call_count == 3
+
+    def test_concurrent_lookups_share_one_fetch(self):
+        release = threading.Event()
+
+        def slow_fetch(currencies):
+            release.wait(5)
+            return {c: 2.0 for c in currencies}
+
+        fetcher = Mock(side_effect=slow_fetch)
+        table = FxRateTable(fetcher)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(table.rate("USD", "SEK"))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        assert results == [2.0] * 8
+        assert fetcher.call_count == 1
+
+    def test_lookups_are_not_blocked_by_a_refresh(self, clock):
+        started, release = threading.Event(), threading.Event()
+
+        def fetch(currencies):
+            if table.refreshes:
+                started.set()
+                release.wait(5)
+            return {c: 2.0 for c in currencies}
+
+        table = FxRateTable(fetch, ttl=60, clock=clock)
+        table.rate("USD", "SEK")
+        clock.now = 61
+        refresh = threading.Thread(target=table.rate, args=("USD", "SEK"))
+        refresh.start()
+        assert started.wait(5)
+
+        # Stale rates are served while the other thread's refresh is in flight
+        assert table.rate("USD", "EUR") == 2.0
+        release.set()
+        refresh.join(5)
+        assert table.refreshes == 2
+
+    def test_refresh_goes_through_market_data_limiter(self):
+        set_rate_limiter(MARKET_DATA, UpstreamLimiter(MARKET_DATA, requests_per_minute=0, base_delay=0.001))
+        fetcher = Mock(side_effect=[APIRateLimitError("slow down"), {"SEK": 10.0}])
+        table = FxRateTable(fetcher, currencies=["SEK"])
+
+        assert table.rate("USD", "SEK") == 10.0
+        assert fetcher.call_count == 2
@@ -0,0 +1,138 @@
+"""Unit tests for the on-disk OHLCV history store."""
+import threading
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from src.utils.history_store import (
+    CsvHistoryFetcher, HistoryStore, missing_ranges, to_epoch,
+)
+
+FIXTURES = Path(__file__).resolve().parents[1] / "fixtures" / "history"
+NOW = to_epoch("2024-06-01")
+
+
+class CountingFetcher:
+    """Wraps the CSV fixture fetcher and records every requested range."""
+
+    def __init__(self):
+        self.inner = CsvHistoryFetcher(FIXTURES)
+        self.calls = []
+
+    def __call__(self, ticker, start, end, interval):
+        self.calls.append((ticker, start, end, interval))
+        return self.inner(ticker, start, end, interval)
+
+
+@pytest.fixture
+def fetcher():
+    return CountingFetcher()
+
+
+@pytest.fixture
+def store(tmp_path, fetcher):
+    return HistoryStore(tmp_path, fetcher=fetcher, clock=lambda: NOW)
+
+
+class TestHistoryStore:
+    """Test cases for HistoryStore."""
+
+    def test_range_query_returns_requested_bars(self, store):
+        history = store.get("TSLA", "2024-01-01", "2024-02-01")
+
+        assert len(history) == 21  # January 2024 sessions (MLK day closed)
+        assert history.close[0] == pytest.approx(249.93)
+        assert np.all(np.diff(history.timestamps) > 0)
+        assert history.to_frame().index[0].strftime("%Y-%m-%d") == "2024-01-02"
+
+    def test_only_missing_ranges_are_fetched(self, store, fetcher):
+        store.get("TSLA", "2024-01-01", "2024-01-15")
+        store.get("TSLA", "2024-01-01", "2024-02-01")
+        store.get("TSLA", "2024-01-10", "2024-01-20")
+
+        assert len(fetcher.calls) == 2
+        _, start, end, _ = fetcher.calls[1]
+        assert start < to_epoch("2024-01-15") and end == to_epoch("2024-02-01")
+        assert store.coverage("TSLA") == [(to_epoch("2024-01-01"), to_epoch("2024-02-01"))]
+
+    def test_reads_are_views_into_the_store(self, store):
+        first = store.get("AAPL", "2024-01-01", "2024-04-01")
+        second = store.get("AAPL", "2024-02-01", "2024-03-01")
+
+        assert isinstance(first.close, np.memmap)
+        assert np.shares_memory(first.close, second.close)
+        assert not first.close.flags.writeable
+
+    def test_persists_across_instances(self, tmp_path, store, fetcher):
+        store.get("MSFT", "2024-01-01", "2024-04-01")
+
+        offline = HistoryStore(tmp_path, fetcher=None)
+        history = offline.get("MSFT", "2024-03-01", "2024-04-01")
+
+        assert len(fetcher.calls) == 1
+        assert len(history) == 20
+
+    def test_offline_store_serves_only_cached_bars(self, tmp_path):
+        store = HistoryStore(tmp_path, fetcher=None)
+        assert len(store.get("TSLA", "2024-01-01", "2024-02-01")) == 0
+
+    def test_unfinished_bars_are_refetched(self, tmp_path, fetcher):
+        now = [to_epoch("2024-01-10 15:00")]
+        store = HistoryStore(tmp_path, fetcher=fetcher, clock=lambda: now[0])
+
+        store.get("TSLA", "2024-01-01")
+        now[0] = to_epoch("2024-01-10 23:00")
+        store.get("TSLA", "2024-01-01")
+
+        assert len(fetcher.calls) == 2
+        assert store.coverage("TSLA") == [(to_epoch("2024-01-01"), to_epoch("2024-01-10"))]
+
+    def test_intraday_interval_is_stored_separately(self, store):
+        intraday = store.get("AAPL", "2024-03-28", "2024-03-29", interval="5m")
+        daily = store.get("AAPL", "2024-03-28", "2024-03-29")
+
+        assert len(intraday) == 78
+        assert len(daily) == 1
+        assert intraday.timestamps[1] - intraday.timestamps[0] == 300
+
+    def test_unknown_ticker_has_no_bars(self, store):
+        assert len(store.get("ZZZZ", "2024-01-01", "2024-02-01")) == 0
+
+    def test_slow_fetch_does_not_block_other_tickers(self, tmp_path, fetcher):
+        release = threading.Event()
+
+        def slow_tesla(ticker, start, end, interval):
+            if ticker == "TSLA":
+                assert release.wait(timeout=5)
+            return fetcher(ticker, start, end, interval)
+
+        store = HistoryStore(tmp_path, fetcher=slow_tesla, clock=lambda: NOW)
+        tesla = threading.Thread(target=store.get, args=("TSLA", "2024-01-01", "2024-02-01"))
+        tesla.start()
+        try:
+            apple = store.get("AAPL", "2024-01-01", "2024-02-01")
+        finally:
+            release.set()
+            tesla.join()
+
+        assert len(apple) == 21
+        assert [call[0] for call in fetcher.calls] == ["AAPL", "TSLA"]
+
+    def test_unsupported_interval(self, store):
+        with pytest.raises(ValueError):
+            store.get("TSLA", "2024-01-01", interval="3d")
+
+
+class TestMissingRanges:
+    """Test cases for coverage gap computation."""
+
+    @pytest.mark.parametrize("coverage,start,end,expected", [
+        ([], 0, 10, [(0, 10)]),
+        ([[0, 10]], 2, 8, []),
+        ([[0, 5]], 0, 10, [(5, 10)]),
+        ([[3, 5], [7, 8]], 0, 10, [(0, 3), (5, 7), (8, 10)]),
+        ([[20, 30]], 0, 10, [(0, 10)]),
+    ])
+    def test_missing_ranges(self, coverage, start, end, expected):
+        assert missing_ranges(coverage, start, end) == expected
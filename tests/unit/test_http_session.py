@@ -0,0 +1,107 @@
+"""Unit tests for the shared market-data HTTP session."""
+import threading
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from src.agents.stock_agent import fetch_stock_price, fetch_stock_prices
+from src.utils.http_session import create_market_session, get_market_session, market_timeout, set_market_session
+from tests.benchmarks.bench_http_pooling import start_stub_server
+
+
+@pytest.fixture
+def shared_session():
+    session = object()
+    set_market_session(session, timeout=12.0)
+    yield session
+    set_market_session(None)
+
+
+@pytest.fixture
+def stub_server():
+    server = start_stub_server()
+    yield server
+    server.shutdown()
+
+
+class TestMarketSession:
+    """Tests for the process-wide session."""
+
+    def test_one_session_across_threads(self):
+        set_market_session(None)
+        try:
+            seen = []
+            threads = [threading.Thread(target=lambda: seen.append(get_market_session())) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            assert len({id(session) for session in seen}) == 1
+        finally:
+            set_market_session(None)
+
+    def test_timeout_comes_from_config(self, monkeypatch):
+        monkeypatch.setenv("TIMEOUT", "7")
+        set_market_session(None)
+        try:
+            assert market_timeout() == 7.0
+        finally:
+            set_market_session(None)
+
+    def test_pooled_session_reuses_connection(self, stub_server):
+        session = create_market_session(max_connections=2)
+        url = f"http://127.0.0.1:{stub_server.server_address[1]}/v8/finance/chart/TSLA"
+
+        for _ in range(5):
+            assert session.get(url).status_code == 200
+
+        assert stub_server.connections == 1
+
+
+class TestFetchesUseSharedSession:
+    """Price and history fetches route through the shared session."""
+
+    @patch('src.utils.market_data.yf.Ticker')
+    def test_single_quote(self, mock_ticker_class, shared_session):
+        mock_ticker_class.return_value.info = {"regularMarketPrice": 250.45, "currency": "USD"}
+
+        fetch_stock_price("TSLA")
+
+        assert mock_ticker_class.call_args.kwargs["session"] is shared_session
+
+    @patch('src.utils.market_data.yf.Ticker')
+    def test_history_fallback(self, mock_ticker_class, shared_session):
+        mock_ticker_class.return_value.info = {}
+        mock_ticker_class.return_value.history.return_value = pd.DataFrame({"Close": [245.67]})
+
+        fetch_stock_price("TSLA")
+
+        assert mock_ticker_class.return_value.history.call_args.kwargs["timeout"] == 12.0
+
+    @patch('src.utils.market_data.yf.download')
+    def test_bulk_quotes(self, mock_download, shared_session):
+        mock_download.return_value = pd.concat({"TSLA": pd.DataFrame({"Close": [250.45]})}, axis=1)
+
+        fetch_stock_prices(["TSLA"])
+
+        assert mock_download.call_args.kwargs["session"] is shared_session
+        assert mock_download.call_args.kwargs["timeout"] == 12.0
+
+    @patch('yfinance.Ticker')
+    def test_history_store_fetcher(self, mock_ticker_class, shared_session):
+        from src.utils.history_store import yfinance_fetcher
+
+        yfinance_fetcher("TSLA", 1_704_067_200, 1_704_153_600, "1d")
+
+        assert mock_ticker_class.call_args.kwargs["session"] is shared_session
+        assert mock_ticker_class.return_value.history.call_args.kwargs["timeout"] == 12.0
+
+    @patch('yfinance.download')
+    def test_fx_fetcher(self, mock_download, shared_session):
+        from src.utils.fx_rates import yfinance_fx_fetcher
+
+        mock_download.return_value = pd.concat({"USDSEK=X": pd.DataFrame({"Close": [10.5]})}, axis=1)
+
+        assert yfinance_fx_fetcher(["SEK"]) == {"SEK": 10.5}
+        assert mock_download.call_args.kwargs["session"] is shared_session
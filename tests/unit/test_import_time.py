@@ -0,0 +1,63 @@
+"""Start-up budget tests: heavy dependencies load only on the paths that need them."""
+import subprocess
+import sys
+import types
+from unittest.mock import patch
+
+import pytest
+
+from src.utils.lazy_import import LazyModule, lazy_import
+from tests.benchmarks.bench_import_time import SRC_DIR, cumulative_ms
+
+# Importing the CLI used to take ~1.9 s because it pulled in the whole agent stack
+MAIN_IMPORT_BUDGET_MS = 400
+
+HEAVY_MODULES = ("yfinance", "pandas", "numpy", "agent_framework", "azure.identity.aio", "azure.ai.projects")
+
+
+def loaded_after_import(module):
+    """Return which HEAVY_MODULES a fresh interpreter has loaded after importing module."""
+    code = f"import sys, {module}; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], cwd=SRC_DIR, capture_output=True, text=True, check=True)
+    return set(filter(None, result.stdout.strip().split(",")))
+
+
+class TestStartupBudget:
+    """Tests for what importing the entry points costs."""
+
+    def test_cli_imports_no_heavy_modules(self):
+        assert loaded_after_import("main") == set()
+
+    def test_orchestrator_defers_data_and_azure_stacks(self):
+        assert loaded_after_import("agents.stock_orchestrator") == {"agent_framework"}
+
+    def test_cli_import_within_budget(self):
+        assert cumulative_ms("main", runs=3) < MAIN_IMPORT_BUDGET_MS
+
+
+class TestLazyImport:
+    """Tests for lazy_import."""
+
+    def test_returns_loaded_module_directly(self):
+        assert lazy_import("json") is sys.modules["json"]
+
+    def test_imports_on_first_attribute_access(self):
+        sys.modules.pop("colorsys", None)
+        module = lazy_import("colorsys")
+        assert isinstance(module, LazyModule)
+        assert "colorsys" not in sys.modules
+
+        assert module.rgb_to_hsv(1.0, 0.0, 0.0) == (0.0, 1.0, 1.0)
+        assert isinstance(sys.modules["colorsys"], types.ModuleType)
+
+    def test_patched_attribute_wins_and_is_restored(self):
+        sys.modules.pop("colorsys", None)
+        module = lazy_import("colorsys")
+        with patch.object(module, "rgb_to_hsv", return_value="patched"):
+            assert module.rgb_to_hsv(1.0, 0.0, 0.0) == "patched"
+        assert module.rgb_to_hsv(1.0, 0.0, 0.0) == (0.0, 1.0, 1.0)
+
+    def test_missing_module_raises_on_use(self):
+        module = lazy_import("not_a_real_module_xyz")
+        with pytest.raises(ModuleNotFoundError):
+            module.anything
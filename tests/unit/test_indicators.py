@@ -0,0 +1,153 @@
+"""Unit tests for the vectorized technical indicators."""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.utils.history_store import CsvHistoryFetcher, HistoryStore, set_history_store
+from src.utils.indicators import (
+    atr, bollinger, compute_indicators, ema, latest_values, load_price_matrix, macd, rsi, sma, volatility,
+)
+
+FIXTURES = Path(__file__).resolve().parents[1] / "fixtures" / "history"
+
+
+@pytest.fixture
+def prices():
+    """Random-walk closes for three tickers, time x tickers."""
+    rng = np.random.default_rng(1)
+    steps = rng.normal(0, 0.02, size=(120, 3))
+    close = pd.DataFrame(100 * np.exp(np.cumsum(steps, axis=0)), columns=["AAA", "BBB", "CCC"])
+    return close * 1.01, close * 0.99, close
+
+
+@pytest.fixture
+def fixture_store(tmp_path):
+    store = HistoryStore(tmp_path, fetcher=CsvHistoryFetcher(FIXTURES))
+    set_history_store(store)
+    yield store
+    set_history_store(None)
+
+
+class TestIndicators:
+    """Test cases for the indicator functions."""
+
+    def test_sma(self):
+        result = sma(pd.DataFrame({"A": [1.0, 2, 3, 4, 5]}), 3)
+        assert result["A"].tolist()[2:] == [2.0, 3.0, 4.0]
+        assert result["A"].isna().sum() == 2
+
+    def test_ema(self):
+        result = ema(pd.DataFrame({"A": [1.0, 2, 3]}), 3)  # alpha = 0.5
+        assert result["A"].iloc[-1] == pytest.approx(2.25)
+
+    def test_rsi_extremes(self):
+        close = pd.DataFrame({"UP": np.arange(1.0, 31), "FLAT": np.full(30, 5.0), "DOWN": np.arange(30.0, 0, -1)})
+        result = rsi(close, 14).iloc[-1]
+
+        assert result["UP"] == 100.0
+        assert result["FLAT"] == 50.0
+        assert result["DOWN"] == 0.0
+
+    def test_rsi_within_bounds(self, prices):
+        values = rsi(prices[2]).stack().dropna()
+        assert values.between(0, 100).all()
+
+    def test_bollinger_constant_series_has_no_width(self):
+        lower, middle, upper = bollinger(pd.DataFrame({"A": np.full(25, 10.0)}))
+        assert lower["A"].iloc[-1] == middle["A"].iloc[-1] == upper["A"].iloc[-1] == 10.0
+
+    def test_atr_constant_range(self):
+        close = pd.DataFrame({"A": np.full(30, 10.0)})
+        assert atr(close + 1, close - 1, close, 14)["A"].iloc[-1] == pytest.approx(2.0)
+
+    def test_atr_includes_gaps(self):
+        close = pd.DataFrame({"A": [10.0] * 15 + [20.0] * 15})
+        # A bar with no range still has a true range of 10 when it gaps up from the previous close
+        assert atr(close, close, close, 14)["A"].iloc[15] == pytest.approx(10 / 14)
+
+    def test_volatility_of_constant_growth_is_zero(self):
+        close = pd.DataFrame({"A": 100 * 1.01 ** np.arange(30)})
+        assert volatility(close)["A"].iloc[-1] == pytest.approx(0.0, abs=1e-12)
+
+    def test_macd_histogram(self, prices):
+        line, signal, hist = macd(prices[2])
+        pd.testing.assert_frame_equal(hist, line - signal)
+
+    def test_matrix_matches_per_ticker_computation(self, prices):
+        high, low, close = prices
+        together = compute_indicators(high, low, close)
+
+        for ticker in close.columns:
+            alone = compute_indicators(high[[ticker]], low[[ticker]], close[[ticker]])
+            for name, frame in alone.items():
+                pd.testing.assert_series_equal(together[name][ticker], frame[ticker])
+
+    def test_latest_values(self, prices):
+        latest = latest_values(compute_indicators(*prices))
+
+        assert set(latest) == {"AAA", "BBB", "CCC"}
+        assert latest["AAA"]["close"] == pytest.approx(prices[2]["AAA"].iloc[-1], abs=1e-4)
+        assert all(value is not None for value in latest["AAA"].values())
+
+
+class TestLoadPriceMatrix:
+    """Test cases for building the ticker matrix from the history store."""
+
+    def test_columns_are_aligned(self, fixture_store):
+        high, low, close = load_price_matrix(["TSLA", "AAPL", "TSLA"], "2024-01-01", "2024-04-01")
+
+        assert list(close.columns) == ["TSLA", "AAPL"]
+        assert len(close) == 61
+        assert (high >= low).all().all()
+
+    def test_failing_ticker_gets_an_empty_column(self, fixture_store):
+        fetch = fixture_store.fetcher
+
+        def flaky(ticker, *args):
+            if ticker == "AAPL":
+                raise ConnectionError("upstream down")
+            return fetch(ticker, *args)
+
+        fixture_store.fetcher = flaky
+        errors = {}
+        high, low, close = load_price_matrix(["TSLA", "AAPL"], "2024-01-01", "2024-04-01", errors=errors)
+
+        assert list(errors) == ["AAPL"]
+        assert close["AAPL"].isna().all()
+        assert close["TSLA"].notna().sum() == 61
+        with pytest.raises(ConnectionError):
+            load_price_matrix(["AAPL"], "2024-01-01", "2024-04-01")
+
+
+class TestComputeTechnicalIndicatorsTool:
+    """Test cases for the compute_technical_indicators agent tool."""
+
+    def test_tool_reports_latest_values_and_errors(self, fixture_store):
+        from src.agents.stock_agent import compute_technical_indicators
+
+        result = compute_technical_indicators(["TSLA", "MSFT", "ZZZZ", "bad"], lookback_days=3650)
+
+        assert list(result) == ["TSLA", "MSFT", "ZZZZ", "bad"]
+        assert result["TSLA"]["ticker"] == "TSLA"
+        assert 0 <= result["TSLA"]["rsi_14"] <= 100
+        assert result["MSFT"]["sma_50"] is not None
+        assert "error" in result["ZZZZ"]
+        assert "error" in result["bad"]
+
+    def test_one_failing_ticker_keeps_the_others(self, fixture_store):
+        from src.agents.stock_agent import compute_technical_indicators
+
+        fetch = fixture_store.fetcher
+
+        def flaky(ticker, *args):
+            if ticker == "MSFT":
+                raise ConnectionError("upstream down")
+            return fetch(ticker, *args)
+
+        fixture_store.fetcher = flaky
+        result = compute_technical_indicators(["TSLA", "MSFT"], lookback_days=3650)
+
+        assert result["TSLA"]["sma_50"] is not None
+        assert result["MSFT"]["error"] == "Failed to load price history for MSFT"
@@ -0,0 +1,58 @@
+"""Smoke tests for the load-test harness and its fake upstreams."""
+import json
+
+from tests.benchmarks.bench_load import percentile, print_results, run_load
+from tests.benchmarks.fake_services import script_reply, tickers_in
+
+FETCH_TOOL = {"type": "function", "function": {"name": "fetch_stock_prices"}}
+
+
+class TestFakeChatScript:
+    """The fake model asks for quotes once, then answers."""
+
+    def test_tickers_from_names_and_symbols(self):
+        assert tickers_in("Compare Apple and MSFT") == ["AAPL", "MSFT"]
+
+    def test_first_turn_calls_the_tool(self):
+        reply = script_reply({"messages": [{"role": "user", "content": "Price of Tesla?"}], "tools": [FETCH_TOOL]})
+
+        call = reply["tool_calls"][0]["function"]
+        assert call["name"] == "fetch_stock_prices"
+        assert json.loads(call["arguments"]) == {"tickers": ["TSLA"]}
+
+    def test_answers_after_tool_result(self):
+        reply = script_reply({"messages": [
+            {"role": "user", "content": "Price of Tesla?"},
+            {"role": "assistant", "tool_calls": []},
+            {"role": "tool", "content": '{"TSLA": {"price": 250.0}}'},
+        ], "tools": [FETCH_TOOL]})
+
+        assert "250.0" in reply["content"]
+
+
+class TestLoadHarness:
+    """A tiny run end to end through analyze_stock and the tools."""
+
+    def test_percentile_nearest_rank(self):
+        assert percentile([1, 2, 3, 4], 50) == 2
+        assert percentile([1, 2, 3, 4], 99) == 4
+        assert percentile([], 95) == 0.0
+
+    def test_run_reports_every_level(self, capsys):
+        document = run_load(
+            queries=4, concurrency=[1, 2], mode="both", stream=True, fast_path=False,
+            llm_latency_ms=0, quote_latency_ms=0, separate_process=False,
+        )
+
+        results = document["results"]
+        assert [(r["mode"], r["concurrency"]) for r in results] == [
+            ("agent", 1), ("agent", 2), ("tools", 1), ("tools", 2),
+        ]
+        assert all(r["errors"] == 0 and r["requests"] == 4 for r in results)
+        assert results[0]["p50_ms"] <= results[0]["p99_ms"]
+        assert results[0]["ttfb_p50_ms"] > 0
+        assert results[0]["peak_rss_mb"] > 0
+        json.dumps(document)
+
+        print_results(document, baseline=document)
+        assert "vs baseline" in capsys.readouterr().out
@@ -0,0 +1,260 @@
+"""Unit tests for the pluggable market-data providers."""
+import threading
+import time
+from unittest.mock import Mock
+
+import pytest
+import requests
+
+from src.agents.stock_agent import fetch_stock_price, fetch_stock_prices, stock_agent_factory
+from src.utils.exceptions import (
+    APIRateLimitError, StockNotFoundError, UpstreamTimeoutError, UpstreamUnavailableError,
+)
+from src.utils.market_data import (
+    FallbackProvider, HttpBatchProvider, MarketDataProvider, ReplayProvider, YFinanceProvider,
+    get_market_data_provider, make_quote, set_market_data_provider,
+)
+
+
+class StaticProvider(MarketDataProvider):
+    """Provider pricing a fixed set of tickers after an optional delay."""
+
+    def __init__(self, name, prices, delay=0.0, fail=None):
+        self.name = name
+        self.prices = prices
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+    def quote(self, ticker):
+        self.calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        if self.fail is not None:
+            raise self.fail
+        if ticker not in self.prices:
+            raise StockNotFoundError(f"Stock not found: {ticker}")
+        return make_quote(ticker, self.prices[ticker], company_name=self.name)
+
+
+def quote_response(*rows, status=200):
+    response = Mock(status_code=status)
+    response.json.return_value = {"quoteResponse": {"result": list(rows)}}
+    if status >= 400:
+        error = Exception(f"HTTP {status}")
+        error.response = response
+        response.raise_for_status.side_effect = error
+    return response
+
+
+class TestMarketDataProvider:
+    """Tests for the provider base class."""
+
+    def test_provider_without_quote_cannot_be_created(self):
+        class Incomplete(MarketDataProvider):
+            pass
+
+        with pytest.raises(TypeError):
+            Incomplete()
+
+
+class TestReplayProvider:
+    """Tests for recorded quotes."""
+
+    def test_serves_recorded_quote_with_fresh_timestamp(self, replay_provider, sample_stock_data):
+        quote = replay_provider.quote("TSLA")
+
+        assert quote["price"] == sample_stock_data["price"]
+        assert quote["change"] == sample_stock_data["change"]
+        assert quote["timestamp"] != sample_stock_data["timestamp"]
+
+    def test_unknown_ticker(self, replay_provider):
+        with pytest.raises(StockNotFoundError):
+            replay_provider.quote("AAPL")
+        assert "error" in replay_provider.quotes(["TSLA", "AAPL"])["AAPL"]
+
+    def test_latency_is_applied_once_per_batch(self, tmp_path, sample_stock_data):
+        path = str(tmp_path / "quotes.json")
+        ReplayProvider.record(path, [sample_stock_data, {"ticker": "BAD", "error": "x"}])
+        provider = ReplayProvider(path, latency=0.05)
+
+        start = time.perf_counter()
+        provider.quotes(["TSLA", "BAD", "AAPL", "MSFT", "NVDA"])
+
+        assert 0.05 <= time.perf_counter() - start < 0.2
+        assert "error" in provider.quotes(["BAD"])["BAD"]  # failed results are not recorded
+
+
+class TestHttpBatchProvider:
+    """Tests for the one-request-per-batch provider."""
+
+    def test_batch_in_one_request(self):
+        session = Mock()
+        session.get.return_value = quote_response(
+            {"symbol": "TSLA", "regularMarketPrice": 250.45, "regularMarketPreviousClose": 245.18,
+             "longName": "Tesla, Inc.", "currency": "USD"},
+            {"symbol": "VOLV-B.ST", "regularMarketPrice": 250.0, "currency": "SEK"},
+        )
+        provider = HttpBatchProvider("http://quotes.test/v7/finance/quote", session=session)
+
+        results = provider.quotes(["TSLA", "AAPL"])
+
+        assert session.get.call_count == 1
+        assert session.get.call_args.kwargs["params"] == {"symbols": "TSLA,AAPL"}
+        assert results["TSLA"]["company_name"] == "Tesla, Inc."
+        assert results["TSLA"]["change"]["percent"] == pytest.approx(2.1494, abs=1e-4)
+        assert "error" in results["AAPL"]
+
+    def test_long_batches_are_split(self):
+        session = Mock()
+        session.get.return_value = quote_response()
+        provider = HttpBatchProvider(session=session, max_batch=2)
+
+        provider.quotes(["A", "B", "C"])
+
+        assert session.get.call_count == 2
+
+    def test_throttled_request_raises_rate_limit_error(self):
+        session = Mock()
+        session.get.return_value = quote_response(status=429)
+
+        with pytest.raises(APIRateLimitError):
+            HttpBatchProvider(session=session).quote("TSLA")
+
+    def test_library_timeout_raises_timeout_error(self):
+        session = Mock()
+        session.get.side_effect = requests.exceptions.ReadTimeout("read timed out")
+
+        with pytest.raises(UpstreamTimeoutError):
+            HttpBatchProvider(session=session).quote("TSLA")
+
+    def test_server_error_is_not_reported_as_unknown_symbol(self):
+        session = Mock()
+        session.get.return_value = quote_response(status=500)
+
+        with pytest.raises(UpstreamUnavailableError):
+            HttpBatchProvider(session=session).quote("TSLA")
+
+    def test_unreachable_endpoint_fails_each_ticker(self):
+        provider = HttpBatchProvider("http://127.0.0.1:9/v7/finance/quote", session=requests.Session())
+
+        results = fetch_stock_prices(["TSLA", "AAPL"], provider=provider)
+
+        assert set(results) == {"TSLA", "AAPL"}
+        assert all("error" in quote for quote in results.values())
+
+
+class TestFallbackProvider:
+    """Tests for the ordered chain and hedged requests."""
+
+    def test_failed_provider_falls_through(self):
+        primary = StaticProvider("primary", {}, fail=APIRateLimitError("throttled"))
+        chain = FallbackProvider([primary, StaticProvider("backup", {"TSLA": 250.0})])
+
+        assert chain.quote("TSLA")["company_name"] == "backup"
+        assert chain.fallbacks == 1
+
+    def test_first_error_is_raised_when_all_fail(self):
+        chain = FallbackProvider([
+            StaticProvider("primary", {}, fail=APIRateLimitError("throttled")),
+            StaticProvider("backup", {}),
+        ])
+
+        with pytest.raises(APIRateLimitError):
+            chain.quote("TSLA")
+
+    def test_batch_retries_only_failed_tickers(self):
+        backup = StaticProvider("backup", {"AAPL": 180.0, "TSLA": 1.0})
+        chain = FallbackProvider([StaticProvider("primary", {"TSLA": 250.0}), backup])
+
+        results = chain.quotes(["TSLA", "AAPL", "ZZZZ"])
+
+        assert results["TSLA"]["price"] == 250.0
+        assert results["AAPL"]["price"] == 180.0
+        assert "error" in results["ZZZZ"]
+        assert backup.calls == 2
+
+    def test_slow_request_is_hedged_after_p95(self):
+        primary = StaticProvider("primary", {"TSLA": 250.0})
+        backup = StaticProvider("backup", {"TSLA": 250.0})
+        chain = FallbackProvider([primary, backup], min_samples=5)
+        assert chain.deadline(primary) is None
+
+        for _ in range(5):
+            chain.quote("TSLA")
+        primary.delay = 0.5
+        start = time.perf_counter()
+        quote = chain.quote("TSLA")
+
+        assert quote["company_name"] == "backup"
+        assert time.perf_counter() - start < 0.4
+        assert chain.hedges == 1
+        chain.close()
+
+    def test_hedging_can_be_disabled(self):
+        primary = StaticProvider("primary", {"TSLA": 250.0})
+        chain = FallbackProvider([primary, StaticProvider("backup", {})], hedge_percentile=0, min_samples=1)
+        chain.quote("TSLA")
+
+        assert chain.deadline(primary) is None
+
+
+class TestProviderWiring:
+    """fetch_stock_price and the StockAgent take the provider as a dependency."""
+
+    def test_fetch_uses_explicit_provider(self):
+        provider = StaticProvider("explicit", {"TSLA": 250.0, "AAPL": 180.0})
+
+        assert fetch_stock_price("TSLA", provider=provider)["company_name"] == "explicit"
+        assert fetch_stock_prices(["AAPL", "AAPL"], provider=provider)["AAPL"]["price"] == 180.0
+
+    def test_fetch_uses_process_provider(self, replay_provider, sample_stock_data):
+        assert fetch_stock_price("TSLA")["company_name"] == sample_stock_data["company_name"]
+
+    @pytest.mark.asyncio
+    async def test_agent_tools_are_bound_to_provider(self):
+        provider = StaticProvider("agent", {"TSLA": 250.0})
+        client = Mock()
+
+        stock_agent_factory(client, provider)
+
+        tools = {tool.name: tool for tool in client.create_agent.call_args.kwargs["tools"] if hasattr(tool, "name")}
+        fetch = tools["fetch_stock_price"]
+        assert "provider" not in fetch.parameters()["properties"]
+        result = await fetch.invoke(arguments=fetch.input_model(ticker="TSLA"))
+        assert result["company_name"] == "agent"
+
+    def test_provider_chain_from_config(self, monkeypatch, tmp_path, sample_stock_data):
+        path = str(tmp_path / "quotes.json")
+        ReplayProvider.record(path, [sample_stock_data])
+        monkeypatch.setenv("MARKET_DATA_PROVIDERS", "replay, yfinance")
+        monkeypatch.setenv("MARKET_DATA_REPLAY_PATH", path)
+        set_market_data_provider(None)
+        try:
+            provider = get_market_data_provider()
+            assert isinstance(provider, FallbackProvider)
+            assert [type(p) for p in provider.providers] == [ReplayProvider, YFinanceProvider]
+        finally:
+            set_market_data_provider(None)
+
+    def test_unknown_provider_name(self, monkeypatch):
+        monkeypatch.setenv("MARKET_DATA_PROVIDERS", "bloomberg")
+        set_market_data_provider(None)
+        try:
+            with pytest.raises(ValueError):
+                get_market_data_provider()
+        finally:
+            set_market_data_provider(None)
+
+    def test_one_provider_across_threads(self):
+        set_market_data_provider(None)
+        try:
+            seen = []
+            threads = [threading.Thread(target=lambda: seen.append(get_market_data_provider())) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            assert len({id(provider) for provider in seen}) == 1
+        finally:
+            set_market_data_provider(None)
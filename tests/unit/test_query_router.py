@@ -0,0 +1,110 @@
+"""Unit tests for the deterministic fast-path query router."""
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from src.agents.query_router import QueryRouter, RouterMetrics
+from src.utils.exceptions import StockNotFoundError
+
+
+@pytest.fixture
+def router():
+    return QueryRouter()
+
+
+class TestQueryRouter:
+    """Test cases for QueryRouter."""
+
+    @pytest.mark.parametrize("query,expected", [
+        ("What's the price of Tesla?", "TSLA"),
+        ("How much is Apple stock?", "AAPL"),
+        ("NVIDIA price", "NVDA"),
+        ("TSLA price", "TSLA"),
+        ("Show me the current share price of Microsoft", "MSFT"),
+        ("What is AAPL trading at?", "AAPL"),
+        ("Bank of America share price", "BAC"),
+    ])
+    def test_plain_price_queries_take_fast_path(self, router, query, expected):
+        assert router.classify(query) == expected
+
+    @pytest.mark.parametrize("query", [
+        "",
+        "What's the weather?",
+        "Tesla",                                   # no price intent
+        "Compare Tesla and Apple prices",          # two tickers
+        "What's the price of NVIDIA in SEK?",      # currency conversion
+        "Why did Tesla stock drop today?",         # analysis question
+        "Should I buy Apple at this price?",       # advice
+    ])
+    def test_ambiguous_queries_fall_through(self, router, query):
+        assert router.classify(query) is None
+
+    @pytest.mark.asyncio
+    async def test_fast_path_answers_without_agent(self, router, sample_stock_data):
+        with patch('src.agents.query_router.fetch_stock_price_async',
+                   AsyncMock(return_value=sample_stock_data)) as mock_fetch:
+            answer = await router.try_fast_path("What's the price of Tesla?")
+
+        mock_fetch.assert_awaited_once_with("TSLA", provider=None)
+        assert answer.startswith("Tesla Inc (TSLA): $250.45 USD")
+        assert router.metrics.fast_path_hits == 1
+
+    @pytest.mark.asyncio
+    async def test_fetch_failure_falls_through(self, router):
+        with patch('src.agents.query_router.fetch_stock_price_async',
+                   AsyncMock(side_effect=StockNotFoundError("nope"))):
+            assert await router.try_fast_path("TSLA price") is None
+
+        assert router.metrics.fast_path_errors == 1
+        assert router.metrics.fast_path_hits == 0
+
+    @pytest.mark.asyncio
+    async def test_fallthrough_is_counted(self, router):
+        assert await router.try_fast_path("Compare Tesla and Apple") is None
+        assert router.metrics.fallthroughs == 1
+
+
+class TestRouterMetrics:
+    """Test cases for RouterMetrics."""
+
+    def test_estimated_savings(self):
+        metrics = RouterMetrics()
+        assert metrics.estimated_seconds_saved is None
+
+        metrics.record_fast_path(0.1)
+        metrics.record_fast_path(0.1)
+        metrics.record_agent_run(2.1)
+        metrics.fallthroughs = 1
+
+        assert metrics.estimated_seconds_saved == pytest.approx(4.0)
+        assert metrics.fast_path_ratio == pytest.approx(2 / 3)
+        assert metrics.as_dict()["fast_path_hits"] == 2
+
+
+class TestOrchestratorFastPath:
+    """StockAnalyzerAgent consults the router before building a workflow."""
+
+    @pytest.mark.asyncio
+    async def test_fast_path_skips_workflow(self, sample_stock_data):
+        from src.agents.stock_orchestrator import StockAnalyzerAgent
+
+        orchestrator = StockAnalyzerAgent()
+        with patch('src.agents.query_router.fetch_stock_price_async',
+                   AsyncMock(return_value=sample_stock_data)), \
+                patch.object(orchestrator, "create_stock_workflow") as mock_workflow:
+            answer = await orchestrator.analyze_stock("What's the price of Tesla?", stream=False)
+
+        mock_workflow.assert_not_called()
+        assert "TSLA" in answer
+
+    @pytest.mark.asyncio
+    async def test_ambiguous_query_runs_workflow(self):
+        from src.agents.stock_orchestrator import StockAnalyzerAgent
+
+        orchestrator = StockAnalyzerAgent()
+        with patch.object(orchestrator, "create_stock_workflow"), \
+                patch.object(orchestrator, "_run_complete_analysis", AsyncMock(return_value="agent answer")):
+            answer = await orchestrator.analyze_stock("Compare Tesla and Apple", stream=False)
+
+        assert answer == "agent answer"
+        assert orchestrator.router.metrics.agent_runs == 1
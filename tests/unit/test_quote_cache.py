@@ -0,0 +1,153 @@
+"""Unit tests for the in-process quote cache."""
+import threading
+import time
+from datetime import datetime, timezone
+from unittest.mock import Mock, patch
+
+import pytest
+
+from src.utils.quote_cache import MarketHoursTTL, QuoteCache, is_us_market_open
+from tests.conftest import FakeClock
+
+
+class TestQuoteCache:
+    """Test cases for QuoteCache."""
+
+    @pytest.fixture
+    def clock(self):
+        return FakeClock(1000.0)
+
+    @pytest.fixture
+    def cache(self, clock):
+        cache = QuoteCache(ttl_policy=lambda ticker: 10.0, max_stale=30.0, clock=clock)
+        yield cache
+        cache.close()
+
+    def test_fresh_entry_is_served_from_cache(self, cache):
+        fetch = Mock(return_value={"ticker": "TSLA", "price": 250.0})
+
+        first = cache.get_or_fetch("TSLA", fetch)
+        second = cache.get_or_fetch("TSLA", fetch)
+
+        assert first == second == {"ticker": "TSLA", "price": 250.0}
+        assert fetch.call_count == 1
+        assert cache.stats.misses == 1
+        assert cache.stats.hits == 1
+
+    def test_returned_quotes_are_copies(self, cache):
+        cache.get_or_fetch("TSLA", lambda: {"ticker": "TSLA", "price": 250.0})["price"] = 0.0
+        assert cache.get("TSLA")["price"] == 250.0
+
+    def test_stale_entry_is_served_while_refreshing(self, cache, clock):
+        cache.get_or_fetch("TSLA", lambda: {"price": 250.0})
+        clock.now += 15.0  # past TTL, within stale window
+        refresh = Mock(return_value={"price": 260.0})
+
+        stale = cache.get_or_fetch("TSLA", refresh)
+        cache.close()  # wait for the background refresh
+
+        assert stale == {"price": 250.0}
+        assert refresh.call_count == 1
+        assert cache.get("TSLA") == {"price": 260.0}
+        assert cache.stats.stale_hits == 1
+        assert cache.stats.refreshes == 1
+
+    def test_failed_refresh_keeps_stale_value(self, cache, clock):
+        cache.get_or_fetch("TSLA", lambda: {"price": 250.0})
+        clock.now += 15.0
+
+        assert cache.get_or_fetch("TSLA", Mock(side_effect=RuntimeError("down"))) == {"price": 250.0}
+        cache.close()
+
+        assert cache.stats.refresh_failures == 1
+        assert cache.get_or_fetch("TSLA", Mock()) == {"price": 250.0}
+
+    def test_entry_past_stale_window_is_refetched(self, cache, clock):
+        cache.get_or_fetch("TSLA", lambda: {"price": 250.0})
+        clock.now += 100.0
+
+        assert cache.get_or_fetch("TSLA", lambda: {"price": 270.0}) == {"price": 270.0}
+        assert cache.stats.misses == 2
+
+    def test_concurrent_misses_are_coalesced(self, cache):
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def slow_fetch():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return {"price": 250.0}
+
+        results = []
+        leader = threading.Thread(target=lambda: results.append(cache.get_or_fetch("TSLA", slow_fetch)))
+        leader.start()
+        started.wait(5)
+        followers = [
+            threading.Thread(target=lambda: results.append(cache.get_or_fetch("TSLA", slow_fetch)))
+            for _ in range(5)
+        ]
+        for thread in followers:
+            thread.start()
+        while cache.stats.coalesced < 5:
+            time.sleep(0.001)
+        release.set()
+        for thread in [leader, *followers]:
+            thread.join(5)
+
+        assert len(calls) == 1
+        assert results == [{"price": 250.0}] * 6
+
+    def test_fetch_errors_propagate_and_are_not_cached(self, cache):
+        with pytest.raises(RuntimeError):
+            cache.get_or_fetch("TSLA", Mock(side_effect=RuntimeError("down")))
+        assert cache.get_or_fetch("TSLA", lambda: {"price": 1.0}) == {"price": 1.0}
+
+    def test_lru_eviction(self, clock):
+        cache = QuoteCache(max_entries=2, ttl_policy=lambda ticker: 10.0, clock=clock)
+        cache.put("AAPL", {"price": 1.0})
+        cache.put("MSFT", {"price": 2.0})
+        cache.get("AAPL")
+        cache.put("TSLA", {"price": 3.0})
+
+        assert cache.get("MSFT") is None
+        assert cache.get("AAPL") == {"price": 1.0}
+        assert cache.stats.evictions == 1
+
+
+class TestMarketHours:
+    """Test cases for market-hours TTL selection."""
+
+    @pytest.mark.parametrize("utc,expected", [
+        (datetime(2025, 10, 14, 15, 0, tzinfo=timezone.utc), True),    # Tue 11:00 ET
+        (datetime(2025, 10, 14, 13, 0, tzinfo=timezone.utc), False),   # Tue 09:00 ET
+        (datetime(2025, 10, 14, 20, 30, tzinfo=timezone.utc), False),  # Tue 16:30 ET
+        (datetime(2025, 10, 18, 15, 0, tzinfo=timezone.utc), False),   # Saturday
+    ])
+    def test_is_us_market_open(self, utc, expected):
+        assert is_us_market_open(utc) == expected
+
+    def test_ttl_depends_on_market_state(self):
+        assert MarketHoursTTL(15, 300, market_open=lambda: True)("TSLA") == 15
+        assert MarketHoursTTL(15, 300, market_open=lambda: False)("TSLA") == 300
+
+
+class TestFetchStockPriceCaching:
+    """fetch_stock_price goes through the process-wide quote cache."""
+
+    @patch('src.utils.market_data.yf.Ticker')
+    def test_repeated_calls_hit_upstream_once(self, mock_ticker_class, fresh_quote_cache):
+        from src.agents.stock_agent import fetch_stock_price
+
+        mock_ticker_class.return_value.info = {
+            "regularMarketPrice": 250.45,
+            "longName": "Tesla, Inc.",
+            "currency": "USD"
+        }
+
+        for _ in range(10):
+            assert fetch_stock_price("TSLA")["price"] == 250.45
+
+        assert mock_ticker_class.call_count == 1
+        assert fresh_quote_cache.stats.hits == 9
@@ -0,0 +1,200 @@
+"""Unit tests for live quote subscriptions."""
+import asyncio
+from contextlib import aclosing
+from pathlib import Path
+
+import pytest
+
+from src.agents.stock_orchestrator import StockAnalyzerAgent
+from src.utils.exceptions import StockNotFoundError
+from src.utils.market_data import TickReplayProvider
+from src.utils.quote_hub import QuoteHub
+from src.utils.rate_limit import MARKET_DATA, UpstreamLimiter, set_rate_limiter
+
+TICKS = Path(__file__).resolve().parents[1] / "fixtures" / "ticks.jsonl"
+
+
+class CountingProvider(TickReplayProvider):
+    """Tick replay that records the tickers of every batch it is asked for."""
+
+    def __init__(self, path, **kwargs):
+        super().__init__(str(path), **kwargs)
+        self.calls = []
+
+    def quotes(self, tickers):
+        self.calls.append(list(tickers))
+        return super().quotes(tickers)
+
+
+@pytest.fixture(autouse=True)
+def unlimited_market_data():
+    set_rate_limiter(MARKET_DATA, UpstreamLimiter(MARKET_DATA, 1e9, burst=10**6))
+    yield
+    set_rate_limiter(MARKET_DATA, None)
+
+
+async def take(updates, count):
+    return [await asyncio.wait_for(anext(updates), timeout=2) for _ in range(count)]
+
+
+class TestTickReplayProvider:
+    """Each poll serves the next recorded tick."""
+
+    def test_steps_through_ticks(self):
+        provider = TickReplayProvider(str(TICKS))
+
+        prices = [provider.quotes(["TSLA", "AAPL"]) for _ in range(6)]
+
+        assert [p["TSLA"]["price"] for p in prices] == [250.45, 250.45, 251.0, 251.0, 249.9, 249.9]
+        assert prices[2]["AAPL"]["price"] == 180.1  # carried over from the previous tick
+        assert prices[4]["TSLA"]["change"]["previous_close"] == 250.45
+
+    def test_loop_starts_over(self):
+        provider = TickReplayProvider(str(TICKS), loop=True)
+
+        prices = [provider.quotes(["TSLA"])["TSLA"]["price"] for _ in range(6)]
+
+        assert prices[-1] == 250.45
+
+    def test_single_quotes_do_not_advance(self):
+        provider = TickReplayProvider(str(TICKS))
+
+        assert [provider.quote("TSLA")["price"] for _ in range(3)] == [250.45] * 3
+        provider.quotes(["TSLA"])
+        provider.quotes(["TSLA"])
+        assert provider.quote("TSLA")["price"] == 251.0
+
+    def test_unknown_ticker(self, tmp_path):
+        path = tmp_path / "ticks.jsonl"
+        TickReplayProvider.record(str(path), [{"TSLA": 1.0}])
+        provider = TickReplayProvider(str(path))
+
+        assert "error" in provider.quotes(["MSFT"])["MSFT"]
+        with pytest.raises(StockNotFoundError):
+            provider.quote("MSFT")
+
+
+class TestQuoteHub:
+    """One shared poller fans price changes out to every subscriber."""
+
+    @pytest.mark.asyncio
+    async def test_emits_only_when_price_changes(self):
+        hub = QuoteHub(TickReplayProvider(str(TICKS)), interval=0.01)
+
+        async with aclosing(hub.subscribe(["TSLA"])) as updates:
+            received = await take(updates, 3)
+
+        assert [(u.price, u.previous_price) for u in received] == [(250.45, None), (251.0, 250.45), (249.9, 251.0)]
+        assert hub.metrics.polls == 5
+
+    @pytest.mark.asyncio
+    async def test_one_batch_per_interval_for_all_subscribers(self):
+        provider = CountingProvider(TICKS)
+        hub = QuoteHub(provider, interval=0.05)
+
+        async def subscriber(tickers):
+            tesla = []
+            async with aclosing(hub.subscribe(tickers)) as updates:
+                async for update in updates:
+                    if update.ticker == "TSLA":
+                        tesla.append(update.price)
+                    if len(tesla) == 2:
+                        return tesla
+
+        results = await asyncio.gather(
+            *[subscriber(["TSLA"]) for _ in range(1000)],
+            *[subscriber(["tsla", "AAPL", "TSLA"]) for _ in range(1000)],
+        )
+
+        assert provider.calls == [["AAPL", "TSLA"], ["AAPL", "TSLA"], ["AAPL", "TSLA"]]
+        assert all(prices == [250.45, 251.0] for prices in results)
+        assert hub.metrics.updates == 3
+        assert hub.metrics.deliveries == 5000
+        assert hub.subscriber_count() == 0
+
+    @pytest.mark.asyncio
+    async def test_late_subscriber_gets_last_quote_without_a_poll(self):
+        provider = CountingProvider(TICKS)
+        hub = QuoteHub(provider, interval=60)
+
+        async with aclosing(hub.subscribe(["TSLA"])) as first:
+            await take(first, 1)
+            async with aclosing(hub.subscribe(["TSLA"])) as second:
+                [snapshot] = await take(second, 1)
+
+        assert (snapshot.price, snapshot.previous_price) == (250.45, None)
+        assert provider.calls == [["TSLA"]]
+
+    @pytest.mark.asyncio
+    async def test_new_ticker_is_polled_right_away(self):
+        provider = CountingProvider(TICKS)
+        hub = QuoteHub(provider, interval=60)
+
+        async with aclosing(hub.subscribe(["TSLA"])) as tesla:
+            await take(tesla, 1)
+            async with aclosing(hub.subscribe(["AAPL"])) as apple:
+                [update] = await take(apple, 1)
+
+        assert update.ticker == "AAPL"
+        assert provider.calls == [["TSLA"], ["AAPL"]]
+
+    @pytest.mark.asyncio
+    async def test_poller_stops_with_last_subscriber(self):
+        hub = QuoteHub(TickReplayProvider(str(TICKS)), interval=0.01)
+
+        async with aclosing(hub.subscribe(["TSLA"])) as updates:
+            await take(updates, 1)
+            assert hub.tickers == ["TSLA"]
+
+        assert hub.tickers == []
+        assert hub._task is None
+
+    @pytest.mark.asyncio
+    async def test_slow_subscriber_drops_oldest_updates(self):
+        hub = QuoteHub(TickReplayProvider(str(TICKS)), interval=0.01, queue_size=1)
+
+        async with aclosing(hub.subscribe(["TSLA"])) as updates:
+            await take(updates, 1)
+            while hub.metrics.updates < 3:
+                await asyncio.sleep(0.01)
+            [latest] = await take(updates, 1)
+
+        assert latest.price == 249.9
+        assert hub.metrics.dropped == 1
+
+    @pytest.mark.asyncio
+    async def test_polled_quotes_warm_the_quote_cache(self, fresh_quote_cache):
+        hub = QuoteHub(TickReplayProvider(str(TICKS)), interval=60)
+
+        async with aclosing(hub.subscribe(["TSLA"])) as updates:
+            [update] = await take(updates, 1)
+
+        assert fresh_quote_cache.get("TSLA") == update.quote
+
+    @pytest.mark.asyncio
+    async def test_close_ends_subscriptions(self):
+        hub = QuoteHub(TickReplayProvider(str(TICKS)), interval=60)
+        updates = hub.subscribe(["TSLA"])
+        await take(updates, 1)
+
+        hub.close()
+
+        with pytest.raises(StopAsyncIteration):
+            await anext(updates)
+
+
+class TestOrchestratorWatch:
+    """StockAnalyzerAgent.watch streams updates without an Azure session."""
+
+    @pytest.mark.asyncio
+    async def test_watch_with_own_provider(self):
+        orchestrator = StockAnalyzerAgent(market_data=TickReplayProvider(str(TICKS)))
+
+        async with aclosing(orchestrator.watch([" aapl"])) as updates:
+            [update] = await take(updates, 1)
+
+        assert (update.ticker, update.price) == ("AAPL", 180.1)
+
+    def test_invalid_ticker(self):
+        with pytest.raises(StockNotFoundError):
+            StockAnalyzerAgent().watch(["TSLA", "NOT-A-TICKER"])
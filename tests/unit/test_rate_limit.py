@@ -0,0 +1,240 @@
+"""Unit tests for per-upstream rate limiting and backoff."""
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from src.agents.middleware import llm_rate_limit
+from src.agents.stock_agent import fetch_stock_price, fetch_stock_price_async
+from src.utils.exceptions import APIRateLimitError, StockNotFoundError, UpstreamTimeoutError
+from src.utils.rate_limit import (
+    LLM, MARKET_DATA, RetryBudget, TokenBucket, UpstreamLimiter, backoff_delay, get_rate_limiter,
+    is_throttling_error, rate_limit_metrics, set_rate_limiter,
+)
+from tests.conftest import FakeChatClient, FakeClock
+
+
+class HTTPStatusError(Exception):
+    """Stand-in for an HTTP client error carrying a response."""
+
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.response = type("Response", (), {"status_code": status_code})()
+
+
+class Flaky:
+    """Async callable that raises the given errors before succeeding."""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+
+@pytest.fixture(autouse=True)
+def reset_limiters():
+    yield
+    set_rate_limiter(MARKET_DATA, None)
+    set_rate_limiter(LLM, None)
+
+
+class TestTokenBucket:
+    """Tests for token accounting."""
+
+    def test_burst_then_queued_waits_in_arrival_order(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2.0, capacity=3, clock=clock)
+
+        waits = [bucket.reserve() for _ in range(6)]
+
+        assert waits[:3] == [0.0, 0.0, 0.0]
+        assert waits[3:] == pytest.approx([0.5, 1.0, 1.5])
+
+    def test_refills_over_time_up_to_capacity(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=1.0, capacity=2, clock=clock)
+        bucket.reserve()
+        bucket.reserve()
+
+        clock.now = 100.0
+
+        assert [bucket.reserve() for _ in range(3)] == pytest.approx([0.0, 0.0, 1.0])
+
+    def test_zero_rate_disables_limiting(self):
+        bucket = TokenBucket(rate=0, capacity=1)
+        assert all(bucket.reserve() == 0.0 for _ in range(100))
+
+
+class TestUpstreamLimiter:
+    """Tests for queuing, retries and metrics."""
+
+    @pytest.mark.asyncio
+    async def test_callers_over_the_limit_are_queued_not_failed(self):
+        limiter = UpstreamLimiter("test", requests_per_minute=600, burst=2)
+
+        results = await asyncio.gather(*(limiter.run(Flaky()) for _ in range(4)))
+
+        assert results == ["ok"] * 4
+        metrics = limiter.metrics.as_dict()
+        assert metrics["acquired"] == 4
+        assert metrics["queued"] == 2
+        assert metrics["wait_max"] == pytest.approx(0.2, abs=0.01)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_returns_its_token(self):
+        limiter = UpstreamLimiter("test", requests_per_minute=60, burst=1)
+        await limiter.acquire()
+
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        assert limiter.bucket.reserve() == pytest.approx(1.0, abs=0.05)
+
+    @pytest.mark.asyncio
+    async def test_throttling_errors_are_retried(self):
+        limiter = UpstreamLimiter("test", requests_per_minute=0, base_delay=0.001)
+        func = Flaky(HTTPStatusError(429), APIRateLimitError("slow down"))
+
+        assert await limiter.run(func) == "ok"
+        assert func.calls == 3
+        assert limiter.metrics.retries == 2
+
+    @pytest.mark.asyncio
+    async def test_other_errors_are_not_retried(self):
+        limiter = UpstreamLimiter("test", requests_per_minute=0, base_delay=0.001)
+        func = Flaky(StockNotFoundError("nope"))
+
+        with pytest.raises(StockNotFoundError):
+            await limiter.run(func)
+        assert func.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_retries(self):
+        limiter = UpstreamLimiter("test", requests_per_minute=0, max_retries=2, base_delay=0.001)
+        func = Flaky(*(HTTPStatusError(503) for _ in range(5)))
+
+        with pytest.raises(HTTPStatusError):
+            await limiter.run(func)
+        assert func.calls == 3
+
+    @pytest.mark.asyncio
+    async def test_retry_budget_caps_retries_across_calls(self):
+        limiter = UpstreamLimiter(
+            "test", requests_per_minute=0, base_delay=0.001, budget=RetryBudget(ratio=0.0, reserve=1)
+        )
+
+        assert await limiter.run(Flaky(HTTPStatusError(429))) == "ok"
+        with pytest.raises(HTTPStatusError):
+            await limiter.run(Flaky(HTTPStatusError(429)))
+
+        assert limiter.metrics.retries == 1
+        assert limiter.metrics.retries_denied == 1
+
+
+class TestHelpers:
+    """Tests for error classification, backoff and the registry."""
+
+    def test_wrapped_throttling_error_is_recognised(self):
+        try:
+            try:
+                raise HTTPStatusError(429)
+            except HTTPStatusError as e:
+                raise RuntimeError("fetch failed") from e
+        except RuntimeError as e:
+            assert is_throttling_error(e)
+
+        assert not is_throttling_error(HTTPStatusError(404))
+
+    def test_backoff_is_jittered_and_capped(self):
+        assert backoff_delay(3, base=0.5, cap=10, rng=lambda: 1.0) == 4.0
+        assert backoff_delay(10, base=0.5, cap=10, rng=lambda: 1.0) == 10.0
+        assert backoff_delay(3, base=0.5, cap=10, rng=lambda: 0.25) == 1.0
+
+    def test_limiters_come_from_config(self, monkeypatch):
+        monkeypatch.setenv("RATE_LIMIT", "30")
+        monkeypatch.setenv("RATE_LIMIT_BURST", "4")
+
+        limiter = get_rate_limiter(MARKET_DATA)
+
+        assert limiter is get_rate_limiter(MARKET_DATA)
+        assert limiter is not get_rate_limiter(LLM)
+        assert limiter.bucket.rate == 0.5
+        assert limiter.bucket.capacity == 4
+        assert set(rate_limit_metrics()) == {LLM, MARKET_DATA}
+
+
+class TestMarketDataLimiting:
+    """Market-data fetches go through the market-data limiter."""
+
+    @patch('src.utils.market_data.yf.Ticker')
+    def test_yfinance_throttling_surfaces_as_rate_limit_error(self, mock_ticker_class):
+        class YFRateLimitError(Exception):
+            pass
+
+        mock_ticker_class.side_effect = YFRateLimitError("Too Many Requests")
+
+        with pytest.raises(APIRateLimitError):
+            fetch_stock_price("QQQQ")
+
+    @patch('src.utils.market_data.yf.Ticker')
+    def test_yfinance_timeout_is_not_a_rate_limit_error(self, mock_ticker_class):
+        mock_ticker_class.side_effect = TimeoutError("read timed out")
+
+        with pytest.raises(UpstreamTimeoutError) as raised:
+            fetch_stock_price("QQQQ")
+        assert not is_throttling_error(raised.value)
+
+    @pytest.mark.asyncio
+    @patch('src.agents.stock_agent.fetch_stock_price')
+    async def test_async_fetch_does_not_retry_timeouts(self, mock_fetch, sample_stock_data):
+        set_rate_limiter(MARKET_DATA, UpstreamLimiter(MARKET_DATA, requests_per_minute=0, base_delay=0.001))
+        mock_fetch.side_effect = [UpstreamTimeoutError("Request timeout for TSLA"), sample_stock_data]
+
+        with pytest.raises(UpstreamTimeoutError):
+            await fetch_stock_price_async("TSLA", include_periods=True)
+        assert mock_fetch.call_count == 1
+        assert rate_limit_metrics()[MARKET_DATA]["retries"] == 0
+
+    @pytest.mark.asyncio
+    @patch('src.agents.stock_agent.fetch_stock_price')
+    async def test_async_fetch_retries_when_throttled(self, mock_fetch, sample_stock_data):
+        set_rate_limiter(MARKET_DATA, UpstreamLimiter(MARKET_DATA, requests_per_minute=0, base_delay=0.001))
+        mock_fetch.side_effect = [APIRateLimitError("Rate limited"), sample_stock_data]
+
+        assert await fetch_stock_price_async("TSLA", include_periods=True) == sample_stock_data
+        assert mock_fetch.call_count == 2
+        assert rate_limit_metrics()[MARKET_DATA]["retries"] == 1
+
+
+class TestLLMMiddleware:
+    """Model calls go through the LLM limiter."""
+
+    @pytest.mark.asyncio
+    async def test_throttled_model_call_is_retried(self):
+        set_rate_limiter(LLM, UpstreamLimiter(LLM, requests_per_minute=0, base_delay=0.001))
+        client = FakeChatClient("done", errors=[HTTPStatusError(429), HTTPStatusError(429)])
+        agent = client.create_agent(name="Test", middleware=[llm_rate_limit])
+
+        response = await agent.run("hello")
+
+        assert response.text == "done"
+        assert client.calls == 3
+        assert rate_limit_metrics()[LLM]["acquired"] == 3
+
+    @pytest.mark.asyncio
+    async def test_streaming_call_takes_a_token(self):
+        client = FakeChatClient("done")
+        agent = client.create_agent(name="Test", middleware=[llm_rate_limit])
+
+        text = "".join([update.text async for update in agent.run_stream("hello")])
+
+        assert text == "done"
+        assert rate_limit_metrics()[LLM]["acquired"] == 1
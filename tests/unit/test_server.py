@@ -0,0 +1,294 @@
+"""Unit tests for the long-running HTTP service."""
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+import pytest_asyncio
+
+from src.agents.stock_orchestrator import StreamEvent
+from src.server import StockAnalyzerServer
+from src.utils.exceptions import StockNotFoundError, UpstreamTimeoutError, UpstreamUnavailableError
+from src.utils.quote_hub import QuoteUpdate
+from src.utils.watchlist import current_watchlist_user
+
+
+class FakeOrchestrator:
+    """Stands in for StockAnalyzerAgent; records lifecycle calls and the user of each run."""
+
+    def __init__(self):
+        self.entered = 0
+        self.exited = 0
+        self.users = []
+        self.release = asyncio.Event()
+        self.release.set()
+        self.get_stock_agent = MagicMock()
+
+    async def __aenter__(self):
+        self.entered += 1
+        return self
+
+    async def __aexit__(self, *exc):
+        self.exited += 1
+
+    def analyze_stock(self, query, stream=True):
+        self.users.append(current_watchlist_user())
+        if not stream:
+            return self._complete(query)
+        return self._stream(query)
+
+    async def _complete(self, query):
+        return f"Answer to {query}"
+
+    async def _stream(self, query):
+        yield StreamEvent("tool_call", "fetch_stock_price", {"call_id": "1"})
+        yield StreamEvent("text", "Tesla is ")
+        await self.release.wait()
+        yield StreamEvent("text", "$250")
+        yield StreamEvent("done", "Tesla is $250", {"ttfb": 0.1, "total": 0.2, "fast_path": False})
+
+    def watch(self, tickers):
+        tickers = list(tickers)
+        if "ZZZZZZ" in tickers:
+            raise StockNotFoundError("Invalid ticker format: ZZZZZZ")
+        return self._watch(tickers)
+
+    async def _watch(self, tickers):
+        for ticker in tickers:
+            yield QuoteUpdate(ticker, 100.0, None, {"ticker": ticker, "price": 100.0})
+        await asyncio.Event().wait()  # a quote stream never ends by itself
+
+
+@pytest.fixture
+def orchestrator():
+    return FakeOrchestrator()
+
+
+@pytest_asyncio.fixture
+async def server(orchestrator):
+    async with StockAnalyzerServer(orchestrator, host="127.0.0.1", port=0) as running:
+        yield running
+
+
+def client_for(server):
+    return httpx.AsyncClient(base_url=f"http://127.0.0.1:{server.port}", timeout=5)
+
+
+class TestLifecycle:
+    """Tests for warm-up and shutdown."""
+
+    @pytest.mark.asyncio
+    async def test_enters_and_warms_orchestrator_once(self, server, orchestrator):
+        async with client_for(server) as client:
+            for _ in range(3):
+                response = await client.get("/health")
+                assert response.json() == {"status": "ok"}
+
+        assert orchestrator.entered == 1
+        orchestrator.get_stock_agent.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_shutdown_waits_for_in_flight_stream(self, orchestrator):
+        orchestrator.release.clear()
+        server = StockAnalyzerServer(orchestrator, host="127.0.0.1", port=0)
+        await server.__aenter__()
+        lines = []
+
+        async def consume():
+            async with client_for(server) as client:
+                async with client.stream("POST", "/analyze", json={"query": "Tesla"}) as response:
+                    async for line in response.aiter_lines():
+                        lines.append(json.loads(line))
+
+        consumer = asyncio.create_task(consume())
+        while len(lines) < 2:
+            await asyncio.sleep(0.01)
+
+        closing = asyncio.create_task(server.__aexit__(None, None, None))
+        await asyncio.sleep(0.05)
+        assert not closing.done()
+        assert orchestrator.exited == 0
+
+        orchestrator.release.set()
+        await asyncio.wait_for(asyncio.gather(consumer, closing), timeout=5)
+        assert lines[-1]["kind"] == "done"
+        assert orchestrator.exited == 1
+
+    @pytest.mark.asyncio
+    async def test_shutdown_closes_idle_connections(self, orchestrator):
+        server = StockAnalyzerServer(orchestrator, host="127.0.0.1", port=0)
+        await server.__aenter__()
+        async with client_for(server) as client:
+            await client.get("/health")  # leaves a keep-alive connection open
+            await asyncio.wait_for(server.__aexit__(None, None, None), timeout=2)
+        assert orchestrator.exited == 1
+
+
+class TestAnalyze:
+    """Tests for /analyze."""
+
+    @pytest.mark.asyncio
+    async def test_streams_events_in_order(self, server):
+        async with client_for(server) as client:
+            async with client.stream("POST", "/analyze", json={"query": "Price of Tesla?"}) as response:
+                assert response.status_code == 200
+                assert response.headers["content-type"] == "application/x-ndjson"
+                events = [json.loads(line) async for line in response.aiter_lines()]
+
+        assert [e["kind"] for e in events] == ["tool_call", "text", "text", "done"]
+        assert events[-1]["text"] == "Tesla is $250"
+
+    @pytest.mark.asyncio
+    async def test_non_streaming_answer(self, server):
+        async with client_for(server) as client:
+            response = await client.get("/analyze", params={"query": "Tesla", "stream": "false"})
+        assert response.json() == {"query": "Tesla", "answer": "Answer to Tesla"}
+
+    @pytest.mark.asyncio
+    async def test_runs_with_requested_watchlist_user(self, server, orchestrator):
+        async with client_for(server) as client:
+            await client.post("/analyze", json={"query": "my banks", "user": "alice", "stream": False})
+            await client.post("/analyze", json={"query": "my banks", "user": "bob", "stream": False})
+        assert orchestrator.users == ["alice", "bob"]
+
+    @pytest.mark.asyncio
+    async def test_remote_caller_cannot_pick_watchlist_user(self, server, orchestrator):
+        with patch("src.server.is_local_peer", return_value=False):
+            async with client_for(server) as client:
+                rejected = await client.post("/analyze", json={"query": "my banks", "user": "alice", "stream": False})
+                allowed = await client.post("/analyze", json={"query": "my banks", "stream": False})
+
+        assert rejected.status_code == 403
+        assert rejected.reason_phrase == "Forbidden"
+        assert allowed.status_code == 200
+        assert orchestrator.users == [current_watchlist_user()]
+
+    @pytest.mark.asyncio
+    async def test_missing_query_is_bad_request(self, server):
+        async with client_for(server) as client:
+            response = await client.post("/analyze", json={})
+        assert response.status_code == 400
+        assert "query" in response.json()["error"]
+
+    @pytest.mark.asyncio
+    async def test_invalid_json_is_bad_request(self, server):
+        async with client_for(server) as client:
+            response = await client.post("/analyze", content=b"{not json")
+        assert response.status_code == 400
+
+
+class TestQuote:
+    """Tests for /quote."""
+
+    @pytest.mark.asyncio
+    @patch("src.server.fetch_stock_price_async", new_callable=AsyncMock)
+    async def test_single_quote(self, mock_fetch, server, sample_stock_data):
+        mock_fetch.return_value = sample_stock_data
+        async with client_for(server) as client:
+            response = await client.get("/quote", params={"ticker": "tsla"})
+        assert response.status_code == 200
+        assert response.json()["ticker"] == "TSLA"
+        mock_fetch.assert_awaited_once_with("TSLA", False)
+
+    @pytest.mark.asyncio
+    @patch("src.server.fetch_stock_prices_async", new_callable=AsyncMock)
+    async def test_batch_quote_uses_one_bulk_fetch(self, mock_fetch, server):
+        mock_fetch.return_value = {"TSLA": {"price": 250.0}, "AAPL": {"price": 190.0}}
+        async with client_for(server) as client:
+            response = await client.get("/quote", params={"tickers": "TSLA, aapl"})
+        assert set(response.json()) == {"TSLA", "AAPL"}
+        mock_fetch.assert_awaited_once_with(["TSLA", "AAPL"])
+
+    @pytest.mark.asyncio
+    @patch("src.server.fetch_stock_price_async", new_callable=AsyncMock)
+    async def test_unknown_ticker_is_not_found(self, mock_fetch, server):
+        mock_fetch.side_effect = StockNotFoundError("Invalid ticker symbol: ZZZZZ")
+        async with client_for(server) as client:
+            response = await client.get("/quote", params={"ticker": "ZZZZZ"})
+        assert response.status_code == 404
+
+    @pytest.mark.asyncio
+    @patch("src.server.fetch_stock_price_async", new_callable=AsyncMock)
+    async def test_upstream_timeout_is_gateway_timeout(self, mock_fetch, server):
+        mock_fetch.side_effect = UpstreamTimeoutError("Timed out fetching TSLA")
+        async with client_for(server) as client:
+            response = await client.get("/quote", params={"ticker": "TSLA"})
+        assert response.status_code == 504
+        assert response.reason_phrase == "Gateway Timeout"
+
+    @pytest.mark.asyncio
+    @patch("src.server.fetch_stock_price_async", new_callable=AsyncMock)
+    async def test_upstream_outage_is_bad_gateway(self, mock_fetch, server):
+        mock_fetch.side_effect = UpstreamUnavailableError("Quote request failed for TSLA: refused")
+        async with client_for(server) as client:
+            response = await client.get("/quote", params={"ticker": "TSLA"})
+        assert response.status_code == 502
+
+    @pytest.mark.asyncio
+    async def test_missing_ticker_is_bad_request(self, server):
+        async with client_for(server) as client:
+            response = await client.get("/quote")
+        assert response.status_code == 400
+
+
+class TestWatch:
+    """Tests for /watch."""
+
+    @pytest.mark.asyncio
+    async def test_streams_quote_updates_and_shutdown_ends_them(self, orchestrator):
+        server = StockAnalyzerServer(orchestrator, host="127.0.0.1", port=0)
+        await server.__aenter__()
+        lines = []
+
+        async def consume():
+            async with client_for(server) as client:
+                async with client.stream("GET", "/watch", params={"tickers": "TSLA,AAPL"}) as response:
+                    async for line in response.aiter_lines():
+                        lines.append(json.loads(line))
+
+        consumer = asyncio.create_task(consume())
+        while len(lines) < 2:
+            await asyncio.sleep(0.01)
+
+        await asyncio.wait_for(server.__aexit__(None, None, None), timeout=2)
+        await asyncio.gather(consumer, return_exceptions=True)
+        assert [(e["kind"], e["text"]) for e in lines] == [("quote", "TSLA"), ("quote", "AAPL")]
+        assert lines[0]["data"]["price"] == 100.0
+
+    @pytest.mark.asyncio
+    async def test_invalid_ticker_is_not_found(self, server):
+        async with client_for(server) as client:
+            response = await client.get("/watch", params={"tickers": "ZZZZZZ"})
+        assert response.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_missing_tickers_is_bad_request(self, server):
+        async with client_for(server) as client:
+            response = await client.get("/watch")
+        assert response.status_code == 400
+
+
+class TestRouting:
+    """Tests for unknown paths and methods."""
+
+    @pytest.mark.asyncio
+    async def test_unknown_path(self, server):
+        async with client_for(server) as client:
+            response = await client.get("/nope")
+        assert response.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_wrong_method(self, server):
+        async with client_for(server) as client:
+            response = await client.post("/quote")
+        assert response.status_code == 405
+
+    @pytest.mark.asyncio
+    async def test_truncated_body_is_bad_request(self, server):
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+        writer.write(b"POST /analyze HTTP/1.1\r\nHost: x\r\nContent-Length: 10\r\n\r\n{}")
+        writer.write_eof()
+        status_line = await asyncio.wait_for(reader.readline(), timeout=2)
+        writer.close()
+        assert status_line == b"HTTP/1.1 400 Bad Request\r\n"
@@ -2,7 +2,28 @@
 import pytest
 from unittest.mock import Mock, patch
 
-from src.agents.stock_agent import extract_ticker, fetch_stock_price, format_stock_response, validate_ticker
+from src.agents.stock_agent import (
+    extract_ticker, fetch_stock_price, fetch_stock_prices, format_stock_response, validate_ticker
+)
+from src.utils.market_data import YFinanceProvider, get_market_data_provider, set_market_data_provider
+
+CHART_METADATA = {
+    "TSLA": {"currency": "USD", "longName": "Tesla, Inc."},
+    "AAPL": {"currency": "USD", "longName": "Apple Inc."},
+    "SAP": {"currency": "EUR", "shortName": "SAP SE"},
+}
+
+
+@pytest.fixture
+def chart_metadata():
+    """Fresh yfinance provider whose per-ticker metadata lookups are answered from CHART_METADATA."""
+    with patch('src.utils.market_data.yf.Ticker') as mock_ticker_class:
+        mock_ticker_class.side_effect = lambda symbol, session=None: Mock(
+            get_history_metadata=Mock(return_value=CHART_METADATA.get(symbol, {}))
+        )
+        set_market_data_provider(YFinanceProvider())
+        yield mock_ticker_class
+        set_market_data_provider(None)
 
 
 class TestStockAgentFunctions:
@@ -53,6 +74,8 @@ class TestStockAgentFunctions:
         ("TOOLONG", False),  # More than 5 chars
         ("tsla", False),     # Lowercase
         ("TS-LA", False),    # Invalid chars
+        ("TSLA\n", False),   # Trailing newline
+        ("ÄBC", False),      # Non-ASCII letters
     ])
     def test_validate_ticker_formats(self, ticker, expected_valid):
         """Test ticker validation for various formats."""
@@ -60,7 +83,7 @@ class TestStockAgentFunctions:
         assert result == expected_valid
 
     # Test fetch_stock_price function
-    @patch('src.agents.stock_agent.yf.Ticker')
+    @patch('src.utils.market_data.yf.Ticker')
     def test_fetch_stock_price_success(self, mock_ticker_class):
         """Test successful stock price fetching."""
         # Setup mock yfinance response
@@ -79,9 +102,60 @@ class TestStockAgentFunctions:
         assert result["price"] == 250.45
         assert result["currency"] == "USD"
         assert "timestamp" in result
-        assert result["change"] == "+0.00%"
+        assert result["change"] == {"absolute": None, "percent": None, "previous_close": None}
+
+    @patch('src.utils.market_data.yf.Ticker')
+    def test_fetch_stock_price_change_from_previous_close(self, mock_ticker_class):
+        """Test that the day change comes from the same .info response."""
+        mock_ticker = Mock()
+        mock_ticker.info = {
+            "regularMarketPrice": 250.0,
+            "regularMarketPreviousClose": 200.0,
+            "longName": "Tesla, Inc.",
+            "currency": "USD"
+        }
+        mock_ticker_class.return_value = mock_ticker
+
+        result = fetch_stock_price("TSLA")
+
+        assert result["change"] == {"absolute": 50.0, "percent": 25.0, "previous_close": 200.0}
+        mock_ticker.history.assert_not_called()
+
+    @patch('src.utils.market_data.yf.Ticker')
+    def test_fetch_stock_price_period_changes_from_history(self, mock_ticker_class, tmp_path):
+        """Test that 1w/1m/YTD changes are read from the local history store."""
+        from datetime import datetime, timedelta, timezone
+        import pandas as pd
+        from src.utils.history_store import HistoryStore, set_history_store
 
-    @patch('src.agents.stock_agent.yf.Ticker')
+        now = datetime.now(timezone.utc)
+        days = pd.date_range(datetime(now.year - 1, 12, 1, tzinfo=timezone.utc), now, freq="D")
+        closes = [100.0 if day.year < now.year else 150.0 for day in days]
+        frame = pd.DataFrame({"Open": closes, "High": closes, "Low": closes, "Close": closes, "Volume": 0.0},
+                             index=days)
+        week_ref = frame.loc[frame.index <= now - timedelta(days=7), "Close"].iloc[-1]
+
+        def fetcher(ticker, start, end, interval):
+            return frame[(frame.index >= pd.Timestamp(start, unit="s", tz="UTC"))
+                         & (frame.index < pd.Timestamp(end, unit="s", tz="UTC"))]
+
+        fetcher = Mock(side_effect=fetcher)
+        set_history_store(HistoryStore(tmp_path, fetcher=fetcher))
+        mock_ticker_class.return_value.info = {"regularMarketPrice": 300.0, "previousClose": 150.0}
+
+        try:
+            result = fetch_stock_price("TSLA", include_periods=True)
+        finally:
+            set_history_store(None)
+
+        periods = result["change"]["periods"]
+        assert fetcher.call_count == 1
+        assert periods["ytd"] == {"absolute": 200.0, "percent": 200.0}
+        assert periods["1w"]["percent"] == pytest.approx((300.0 / week_ref - 1) * 100)
+        assert result["change"]["percent"] == 100.0
+        assert "periods" not in fetch_stock_price("TSLA")["change"]
+
+    @patch('src.utils.market_data.yf.Ticker')
     def test_fetch_stock_price_fallback_to_history(self, mock_ticker_class):
         """Test fallback to history when regularMarketPrice not available."""
         # Setup mock for fallback scenario
@@ -99,7 +173,7 @@ class TestStockAgentFunctions:
         assert result["ticker"] == "TSLA"
         assert result["price"] == 245.67
 
-    @patch('src.agents.stock_agent.yf.Ticker')
+    @patch('src.utils.market_data.yf.Ticker')
     def test_fetch_stock_price_invalid_ticker(self, mock_ticker_class):
         """Test handling of invalid ticker symbols."""
         from src.utils.exceptions import StockNotFoundError
@@ -132,7 +206,7 @@ class TestStockAgentFunctions:
             "company_name": "Tesla, Inc.",
             "price": 250.45,
             "currency": "USD",
-            "change": "+2.15%"
+            "change": {"absolute": 5.27, "percent": 2.15, "previous_close": 245.18}
         }
         
         result = format_stock_response(stock_data)
@@ -146,11 +220,11 @@ class TestStockAgentFunctions:
             "company_name": "Apple Inc.",
             "price": 175.50,
             "currency": "USD",
-            "change": "+0.00%"
+            "change": {"absolute": None, "percent": None, "previous_close": None}
         }
         
         result = format_stock_response(stock_data)
-        expected = "Apple Inc. (AAPL): $175.50 USD (+0.00%)"
+        expected = "Apple Inc. (AAPL): $175.50 USD"
         assert result == expected
 
     def test_format_stock_response_decimal_precision(self):
@@ -160,10 +234,139 @@ class TestStockAgentFunctions:
             "company_name": "Microsoft Corporation",
             "price": 299.999,
             "currency": "USD",
-            "change": "+1.23%"
+            "change": {"absolute": 3.63, "percent": 1.234, "previous_close": 296.37}
         }
         
         result = format_stock_response(stock_data)
         expected = "Microsoft Corporation (MSFT): $300.00 USD (+1.23%)"
         assert result == expected
 
+    def test_format_stock_response_with_periods(self):
+        """Test that period changes are appended after the day change."""
+        stock_data = {
+            "ticker": "AAPL",
+            "company_name": "Apple Inc.",
+            "price": 175.50,
+            "currency": "USD",
+            "change": {
+                "absolute": -1.0, "percent": -0.5667, "previous_close": 176.5,
+                "periods": {"1w": {"percent": 1.5}, "1m": {"percent": -3.0}, "ytd": {"percent": 12.25}},
+            }
+        }
+
+        result = format_stock_response(stock_data)
+        assert result == "Apple Inc. (AAPL): $175.50 USD (-0.57%, 1w +1.50%, 1m -3.00%, YTD +12.25%)"
+
+
+    # Test fetch_stock_prices function
+    @staticmethod
+    def _bulk_frame(closes):
+        """Build a yf.download(group_by="ticker") style frame."""
+        import pandas as pd
+        frames = {ticker: pd.DataFrame({"Close": values}) for ticker, values in closes.items()}
+        return pd.concat(frames, axis=1)
+
+    @patch('src.utils.market_data.yf.download')
+    def test_fetch_stock_prices_single_bulk_request(self, mock_download, chart_metadata):
+        """Test that all tickers are fetched with one download call."""
+        mock_download.return_value = self._bulk_frame({"TSLA": [250.45], "AAPL": [175.5]})
+
+        result = fetch_stock_prices(["TSLA", "AAPL"])
+
+        assert mock_download.call_count == 1
+        assert list(result) == ["TSLA", "AAPL"]
+        assert result["TSLA"]["price"] == 250.45
+        assert result["AAPL"]["price"] == 175.5
+
+    @patch('src.utils.market_data.yf.download')
+    def test_fetch_stock_prices_change_from_same_download(self, mock_download, chart_metadata):
+        """Test that the previous close comes from the same bulk request."""
+        mock_download.return_value = self._bulk_frame({"TSLA": [200.0, 210.0]})
+
+        result = fetch_stock_prices(["TSLA"])
+
+        assert result["TSLA"]["change"] == {"absolute": 10.0, "percent": 5.0, "previous_close": 200.0}
+        assert mock_download.call_args.kwargs["period"] == "5d"
+
+    @patch('src.utils.market_data.yf.download')
+    @patch('src.utils.market_data.yf.Ticker')
+    def test_fetch_stock_prices_matches_single_result_shape(self, mock_ticker_class, mock_download):
+        """Test that batched entries have the same keys as fetch_stock_price results."""
+        mock_ticker_class.return_value.info = {"regularMarketPrice": 250.45, "currency": "USD"}
+        mock_ticker_class.return_value.get_history_metadata.return_value = CHART_METADATA["AAPL"]
+        mock_download.return_value = self._bulk_frame({"AAPL": [175.5]})
+        set_market_data_provider(YFinanceProvider())
+
+        single = fetch_stock_price("TSLA")
+        batched = fetch_stock_prices(["AAPL"])["AAPL"]
+        set_market_data_provider(None)
+
+        assert set(batched) == set(single)
+
+    @patch('src.utils.market_data.yf.download')
+    def test_fetch_stock_prices_carries_name_and_currency(self, mock_download, chart_metadata):
+        """Test that batched entries, and the cached quotes they leave behind, keep name and currency."""
+        mock_download.return_value = self._bulk_frame({"TSLA": [250.0], "SAP": [120.0]})
+
+        result = fetch_stock_prices(["TSLA", "SAP"])
+
+        assert (result["SAP"]["company_name"], result["SAP"]["currency"]) == ("SAP SE", "EUR")
+        assert fetch_stock_price("TSLA")["company_name"] == "Tesla, Inc."
+
+    @patch('src.utils.market_data.yf.download')
+    def test_fetch_stock_prices_looks_up_metadata_once(self, mock_download, chart_metadata):
+        """Test that metadata is remembered between batches."""
+        mock_download.return_value = self._bulk_frame({"TSLA": [250.0], "AAPL": [175.5]})
+        fetch_stock_prices(["TSLA", "AAPL"])
+
+        get_market_data_provider().quotes(["TSLA", "AAPL"])
+
+        assert chart_metadata.call_count == 2
+
+    @patch('src.utils.market_data.yf.download')
+    def test_fetch_stock_prices_without_metadata_uses_single_fetch(self, mock_download, chart_metadata):
+        """Test that a ticker whose metadata is unavailable is fetched like fetch_stock_price."""
+        mock_download.return_value = self._bulk_frame({"ZZZZ": [10.0]})
+        single = {"regularMarketPrice": 10.5, "longName": "Zed Corp", "currency": "CAD"}
+        chart_metadata.side_effect = lambda symbol, session=None: Mock(
+            get_history_metadata=Mock(side_effect=RuntimeError("no chart")), info=single
+        )
+
+        result = fetch_stock_prices(["ZZZZ"])["ZZZZ"]
+
+        assert (result["price"], result["company_name"], result["currency"]) == (10.5, "Zed Corp", "CAD")
+
+    @patch('src.utils.market_data.yf.download')
+    def test_fetch_stock_prices_partial_failure(self, mock_download, chart_metadata):
+        """Test that invalid and unknown tickers fail independently."""
+        import numpy as np
+        mock_download.return_value = self._bulk_frame({"TSLA": [250.45], "ZZZZ": [np.nan]})
+
+        result = fetch_stock_prices(["TSLA", "ZZZZ", "bad"])
+
+        assert result["TSLA"]["price"] == 250.45
+        assert "error" in result["ZZZZ"]
+        assert "error" in result["bad"]
+        mock_download.assert_called_once()
+        assert mock_download.call_args[0][0] == ["TSLA", "ZZZZ"]
+
+    @patch('src.utils.market_data.yf.download')
+    def test_fetch_stock_prices_uses_quote_cache(self, mock_download, chart_metadata):
+        """Test that cached tickers are not downloaded again."""
+        mock_download.return_value = self._bulk_frame({"TSLA": [250.45]})
+        fetch_stock_prices(["TSLA"])
+
+        mock_download.return_value = self._bulk_frame({"AAPL": [175.5]})
+        result = fetch_stock_prices(["TSLA", "AAPL"])
+
+        assert mock_download.call_args[0][0] == ["AAPL"]
+        assert result["TSLA"]["price"] == 250.45
+
+    @patch('src.utils.market_data.yf.download')
+    def test_fetch_stock_prices_download_error(self, mock_download):
+        """Test that a failed bulk request marks every ticker as failed."""
+        mock_download.side_effect = RuntimeError("network down")
+
+        result = fetch_stock_prices(["TSLA", "AAPL"])
+
+        assert all("error" in entry for entry in result.values())
@@ -0,0 +1,313 @@
+"""Unit tests for StockAnalyzerAgent workflow reuse."""
+import asyncio
+from unittest.mock import Mock, patch
+
+import pytest
+
+from src.agents.stock_orchestrator import BatchSummary, StockAnalyzerAgent, WorkflowPool
+from tests.conftest import FakeChatClient
+
+
+def saw_messages(messages):
+    return f"saw {len(messages)} messages"
+
+
+@pytest.fixture
+def orchestrator():
+    orchestrator = StockAnalyzerAgent(enable_fast_path=False, max_workflows=2)
+    orchestrator._client = FakeChatClient(saw_messages)
+    return orchestrator
+
+
+class TestWorkflowPool:
+    """Test cases for WorkflowPool."""
+
+    @pytest.mark.asyncio
+    async def test_workflows_are_reused(self):
+        build = Mock(side_effect=lambda: Mock())
+        pool = WorkflowPool(build, max_size=2)
+
+        for _ in range(5):
+            async with pool.acquire():
+                pass
+
+        assert build.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_pool_size_is_bounded(self):
+        build = Mock(side_effect=lambda: Mock())
+        pool = WorkflowPool(build, max_size=2)
+        active = 0
+        peak = 0
+
+        async def borrow():
+            nonlocal active, peak
+            async with pool.acquire():
+                active += 1
+                peak = max(peak, active)
+                await asyncio.sleep(0.01)
+                active -= 1
+
+        await asyncio.gather(*(borrow() for _ in range(6)))
+
+        assert build.call_count == 2
+        assert peak == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_run_discards_workflow(self):
+        build = Mock(side_effect=lambda: Mock())
+        pool = WorkflowPool(build, max_size=1)
+
+        with pytest.raises(RuntimeError):
+            async with pool.acquire():
+                raise RuntimeError("run failed")
+        async with pool.acquire():
+            pass
+
+        assert build.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_close_waits_for_borrowed_workflows(self):
+        build = Mock(side_effect=lambda: Mock())
+        pool = WorkflowPool(build, max_size=1)
+        release = asyncio.Event()
+        borrowed = []
+
+        async def borrow():
+            async with pool.acquire():
+                borrowed.append(pool.created)
+                await release.wait()
+
+        first = asyncio.create_task(borrow())
+        await asyncio.sleep(0)
+        closing = asyncio.create_task(pool.close())
+        second = asyncio.create_task(borrow())
+        await asyncio.sleep(0.01)
+        assert not closing.done()
+        assert borrowed == [1]
+
+        release.set()
+        await asyncio.gather(first, closing, second)
+
+        # The workflow borrowed before close() is dropped, not reused or double-counted
+        assert borrowed == [1, 1]
+        assert build.call_count == 2
+        assert pool.created == 1
+
+
+class TestOrchestratorWorkflowReuse:
+    """StockAnalyzerAgent builds its agent and workflows once."""
+
+    @pytest.mark.asyncio
+    async def test_agent_is_created_once(self, orchestrator):
+        with patch('src.agents.stock_orchestrator.stock_agent_factory',
+                   side_effect=lambda client, provider=None: client.create_agent(name="StockAgent")) as factory:
+            for _ in range(3):
+                await orchestrator.analyze_stock("Compare Tesla and Apple", stream=False)
+
+        assert factory.call_count == 1
+        assert orchestrator._workflows.created == 1
+
+    @pytest.mark.asyncio
+    async def test_reused_workflow_starts_with_fresh_conversation(self, orchestrator):
+        with patch('src.agents.stock_orchestrator.stock_agent_factory',
+                   side_effect=lambda client, provider=None: client.create_agent(name="StockAgent")):
+            first = await orchestrator.analyze_stock("Compare Tesla and Apple", stream=False)
+            second = await orchestrator.analyze_stock("Compare Tesla and Apple", stream=False)
+
+        assert str(first) == str(second) == "saw 1 messages"
+
+    @pytest.mark.asyncio
+    async def test_aexit_releases_agent_and_workflows(self, orchestrator):
+        with patch('src.agents.stock_orchestrator.stock_agent_factory',
+                   side_effect=lambda client, provider=None: client.create_agent(name="StockAgent")):
+            await orchestrator.analyze_stock("Compare Tesla and Apple", stream=False)
+
+        await orchestrator.__aexit__(None, None, None)
+
+        assert orchestrator._stock_agent is None
+        assert orchestrator._workflows.created == 0
+
+
+class TestCurrencyHandoff:
+    """The CurrencyAgent only runs when the query asks for another currency."""
+
+    @pytest.fixture(autouse=True)
+    def plain_agents(self):
+        with patch('src.agents.stock_orchestrator.stock_agent_factory',
+                   side_effect=lambda client, provider=None: client.create_agent(name="StockAgent")), \
+                patch('src.agents.stock_orchestrator.currency_agent_factory',
+                      side_effect=lambda client: client.create_agent(name="CurrencyAgent")):
+            yield
+
+    @pytest.mark.asyncio
+    async def test_conversion_query_reaches_currency_agent(self, orchestrator):
+        answer = await orchestrator.analyze_stock("Price of Tesla and Apple in SEK", stream=False)
+
+        # The CurrencyAgent sees the user question plus the StockAgent's answer
+        assert str(answer) == "saw 2 messages"
+
+    @pytest.mark.asyncio
+    async def test_plain_query_skips_currency_agent(self, orchestrator):
+        answer = await orchestrator.analyze_stock("Compare Tesla and Apple", stream=False)
+        assert str(answer) == "saw 1 messages"
+
+    @pytest.mark.asyncio
+    async def test_usd_request_needs_no_conversion(self, orchestrator):
+        answer = await orchestrator.analyze_stock("Compare Tesla and Apple in USD", stream=False)
+        assert str(answer) == "saw 1 messages"
+
+
+class TestAnalyzeMany:
+    """Test cases for StockAnalyzerAgent.analyze_many."""
+
+    @pytest.mark.asyncio
+    async def test_results_stream_as_they_finish(self, orchestrator):
+        async def fake_analyze(query, stream=True):
+            await asyncio.sleep(0.05 if query == "slow" else 0)
+            return f"answer: {query}"
+
+        with patch.object(orchestrator, "analyze_stock", side_effect=fake_analyze):
+            items = [item async for item in orchestrator.analyze_many(["slow", "fast"], max_concurrency=2)]
+
+        assert [item["query"] for item in items] == ["fast", "slow"]
+        assert items[0] == {"index": 1, "query": "fast", "ok": True, "result": "answer: fast",
+                            "latency": items[0]["latency"]}
+
+    @pytest.mark.asyncio
+    async def test_failures_stay_per_item(self, orchestrator):
+        async def fake_analyze(query, stream=True):
+            if query == "bad":
+                raise RuntimeError("boom")
+            return "ok"
+
+        with patch.object(orchestrator, "analyze_stock", side_effect=fake_analyze):
+            items = [item async for item in orchestrator.analyze_many(["a", "bad", "b"])]
+
+        failed = [item for item in items if not item["ok"]]
+        assert len(items) == 3
+        assert failed == [{"index": 1, "query": "bad", "ok": False, "error": "RuntimeError: boom",
+                           "latency": failed[0]["latency"]}]
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self, orchestrator):
+        active = 0
+        peak = 0
+
+        async def fake_analyze(query, stream=True):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return "ok"
+
+        with patch.object(orchestrator, "analyze_stock", side_effect=fake_analyze):
+            items = [item async for item in orchestrator.analyze_many(map(str, range(10)), max_concurrency=3)]
+
+        assert len(items) == 10
+        assert peak == 3
+
+    @pytest.mark.asyncio
+    async def test_results_flow_while_async_source_waits(self, orchestrator):
+        more_input = asyncio.Event()
+
+        async def queries():
+            yield "first"
+            await more_input.wait()  # e.g. stdin with no new line yet
+            yield "second"
+
+        async def fake_analyze(query, stream=False):
+            return f"answer: {query}"
+
+        with patch.object(orchestrator, "analyze_stock", side_effect=fake_analyze):
+            results = orchestrator.analyze_many(queries(), max_concurrency=2)
+            first = await asyncio.wait_for(anext(results), timeout=1)
+            more_input.set()
+            rest = [item async for item in results]
+
+        assert first["query"] == "first"
+        assert [item["index"] for item in rest] == [1]
+
+    def test_batch_summary(self):
+        summary = BatchSummary()
+        summary.record({"ok": True, "latency": 0.2})
+        summary.record({"ok": False, "latency": 0.4})
+
+        result = summary.as_dict()
+
+        assert result["total"] == 2
+        assert result["succeeded"] == 1
+        assert result["failed"] == 1
+        assert result["queries_per_second"] > 0
+
+
+class TestStreamingAnalysis:
+    """analyze_stock(stream=True) yields events as the workflow produces them."""
+
+    @pytest.mark.asyncio
+    async def test_streams_partial_text_then_done(self):
+        orchestrator = StockAnalyzerAgent(enable_fast_path=False, max_workflows=1)
+        orchestrator._client = FakeChatClient(chunks=["Tesla ", "is ", "up"])
+
+        with patch('src.agents.stock_orchestrator.stock_agent_factory',
+                   side_effect=lambda client, provider=None: client.create_agent(name="StockAgent")):
+            events = [event async for event in orchestrator.analyze_stock("Compare Tesla and Apple", stream=True)]
+
+        assert [e.text for e in events if e.kind == "text"] == ["Tesla ", "is ", "up"]
+        done = events[-1]
+        assert done.kind == "done"
+        assert done.text == "Tesla is up"
+        assert 0 <= done.data["ttfb"] <= done.data["total"]
+        assert done.data["fast_path"] is False
+        assert orchestrator.router.metrics.agent_runs == 1
+
+    @pytest.mark.asyncio
+    async def test_agents_text_is_separated(self):
+        orchestrator = StockAnalyzerAgent(enable_fast_path=False, max_workflows=1)
+        orchestrator._client = FakeChatClient(chunks=["Tesla ", "is ", "up"])
+
+        with patch('src.agents.stock_orchestrator.stock_agent_factory',
+                   side_effect=lambda client, provider=None: client.create_agent(name="StockAgent")), \
+                patch('src.agents.stock_orchestrator.currency_agent_factory',
+                      side_effect=lambda client: client.create_agent(name="CurrencyAgent")):
+            events = [event async for event in orchestrator.analyze_stock("Tesla in SEK", stream=True)]
+
+        text = "".join(e.text for e in events if e.kind == "text")
+        assert text == "Tesla is up\n\nTesla is up"
+
+    @pytest.mark.asyncio
+    async def test_answer_is_awaitable_by_default(self):
+        orchestrator = StockAnalyzerAgent(enable_fast_path=False, max_workflows=1)
+        orchestrator._client = FakeChatClient(chunks=["Tesla ", "is ", "up"])
+
+        with patch('src.agents.stock_orchestrator.stock_agent_factory',
+                   side_effect=lambda client, provider=None: client.create_agent(name="StockAgent")):
+            answer = await orchestrator.analyze_stock("Compare Tesla and Apple")
+
+        assert str(answer) == "Tesla is up"
+
+    @pytest.mark.asyncio
+    async def test_fast_path_streams_single_answer(self, sample_stock_data):
+        from unittest.mock import AsyncMock
+
+        orchestrator = StockAnalyzerAgent()
+        with patch('src.agents.query_router.fetch_stock_price_async', AsyncMock(return_value=sample_stock_data)):
+            events = [event async for event in orchestrator.analyze_stock("What's the price of Tesla?", stream=True)]
+
+        assert [e.kind for e in events] == ["text", "done"]
+        assert events[-1].data["fast_path"] is True
+
+    def test_tool_calls_become_progress_events(self):
+        from agent_framework import AgentRunResponseUpdate, AgentRunUpdateEvent, FunctionCallContent
+
+        from src.agents.stock_orchestrator import _to_stream_events
+
+        update = AgentRunResponseUpdate(contents=[
+            FunctionCallContent(call_id="1", name="fetch_stock_price", arguments=""),
+            FunctionCallContent(call_id="1", name="", arguments='{"ticker": "TSLA"}'),
+        ])
+
+        events = _to_stream_events(AgentRunUpdateEvent("StockAgent", update))
+
+        assert [(e.kind, e.text) for e in events] == [("tool_call", "fetch_stock_price")]
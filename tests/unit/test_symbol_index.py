@@ -0,0 +1,82 @@
+"""Unit tests for the symbol index used by extract_ticker."""
+import pytest
+
+from src.utils.symbol_index import DEFAULT_SYMBOLS_PATH, SymbolIndex, SymbolMatch
+
+
+@pytest.fixture
+def index():
+    return SymbolIndex([
+        ("BAC", "Bank of America Corporation", ["bank of america"]),
+        ("AAPL", "Apple Inc.", ["apple"]),
+        ("PG", "The Procter & Gamble Company", ["procter & gamble"]),
+        ("AMZN", "Amazon.com Inc.", ["amazon", "amazon.com"]),
+        ("AMD", "Advanced Micro Devices Inc.", ["advanced micro devices", "amd"]),
+        ("MD", "Micro Devices Corp", ["micro devices"]),
+    ])
+
+
+class TestSymbolIndex:
+    """Test cases for SymbolIndex."""
+
+    def test_ticker_lookup(self, index):
+        assert index.is_ticker("AAPL")
+        assert not index.is_ticker("aapl")
+        assert not index.is_ticker("I")
+        assert len(index) == 6
+
+    @pytest.mark.parametrize("text,expected", [
+        ("What's the price of Bank of America?", "BAC"),
+        ("APPLE shares", "AAPL"),
+        ("Procter & Gamble today", "PG"),
+        ("amazon.com stock", "AMZN"),
+        ("Advanced Micro Devices earnings", "AMD"),   # longest match wins over "micro devices"
+        ("I like pineapple", None),                   # whole words only
+        ("Apples and oranges", None),
+        ("", None),
+    ])
+    def test_find_company(self, index, text, expected):
+        assert index.find_company(text) == expected
+
+    def test_find_all_returns_non_overlapping_spans(self, index):
+        text = "Compare Apple and Bank of America"
+        matches = index.find_all(text)
+
+        assert matches == [SymbolMatch(8, 13, "AAPL"), SymbolMatch(18, 33, "BAC")]
+        assert text[matches[1].start:matches[1].end] == "Bank of America"
+
+    def test_adjacent_single_word_patterns(self):
+        index = SymbolIndex([("AB", "ab", []), ("BCD", "bcd", []), ("C", "c", [])])
+
+        assert [m.ticker for m in index.find_all("ab c bcd")] == ["AB", "C", "BCD"]
+
+    def test_company_name(self, index):
+        assert index.company_name("AAPL") == "Apple Inc."
+        assert index.company_name("ZZZZ") is None
+
+    def test_bundled_symbols_file_loads(self):
+        index = SymbolIndex.from_csv(DEFAULT_SYMBOLS_PATH)
+
+        assert len(index) > 100
+        assert index.find_company("How is Johnson & Johnson doing?") == "JNJ"
+        assert index.is_ticker("NVDA")
+
+
+class TestExtractTickerWithIndex:
+    """extract_ticker resolves against the listed-securities universe."""
+
+    @pytest.mark.parametrize("query,expected", [
+        ("I want NVIDIA", "NVDA"),
+        ("I want to buy something", "UNKNOWN"),
+        ("What's the price of Bank of America?", "BAC"),
+        ("Check JPM today", "JPM"),
+        ("Pineapple prices", "UNKNOWN"),
+        ("Show me ZZZQ", "ZZZQ"),
+        ("Is ZZZQ a buy for a CEO paid in USD?", "ZZZQ"),
+        ("Price of NVDA next to ZZZQ", "NVDA"),
+        ("Convert 100 USD to SEK", "UNKNOWN"),
+    ])
+    def test_extract_ticker(self, query, expected):
+        from src.agents.stock_agent import extract_ticker
+
+        assert extract_ticker(query) == expected
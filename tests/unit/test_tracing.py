@@ -0,0 +1,168 @@
+"""Unit tests for span-based latency tracing."""
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from agent_framework import ai_function
+from opentelemetry.trace import StatusCode
+
+from src.agents.stock_agent import extract_ticker, fetch_stock_price_async, fetch_stock_prices_async
+from src.agents.stock_orchestrator import StockAnalyzerAgent
+from src.utils.credentials import CachingCredential
+from src.utils.exceptions import ConfigurationError
+from src.utils.tracing import configure_tracing, disable_tracing, span, traced, tracing_enabled
+from tests.conftest import FakeChatClient, FakeTokenSource
+
+
+@pytest.fixture
+def spans():
+    exporter = configure_tracing("memory")
+    yield exporter
+    disable_tracing()
+
+
+def by_name(exporter):
+    return {s.name: s for s in exporter.get_finished_spans()}
+
+
+class TestDisabledTracing:
+    """With no exporter configured tracing costs next to nothing."""
+
+    def test_span_is_a_shared_noop(self):
+        assert not tracing_enabled()
+        with span("anything", ticker="TSLA") as current:
+            current.set_attribute("cache.hit", True)
+        assert span("a") is span("b")
+
+    @pytest.mark.asyncio
+    async def test_traced_functions_still_run(self):
+        @traced("sync")
+        def double(x):
+            return 2 * x
+
+        @traced("async")
+        async def triple(x):
+            return 3 * x
+
+        assert double(2) == 4
+        assert await triple(2) == 6
+
+
+class TestSpans:
+    """Spans and attributes recorded while tracing is on."""
+
+    def test_attributes_and_result_attributes(self, spans):
+        @traced("lookup", lambda ticker: {"stock.ticker": ticker}, result=lambda n: {"result.count": n})
+        def lookup(ticker):
+            return 3
+
+        lookup("TSLA")
+
+        recorded = by_name(spans)["lookup"]
+        assert recorded.attributes["stock.ticker"] == "TSLA"
+        assert recorded.attributes["result.count"] == 3
+
+    def test_errors_mark_the_span(self, spans):
+        @traced("boom")
+        def boom():
+            raise ValueError("bad")
+
+        with pytest.raises(ValueError):
+            boom()
+
+        assert by_name(spans)["boom"].status.status_code == StatusCode.ERROR
+
+    def test_tool_schema_is_unchanged(self):
+        assert list(ai_function(extract_ticker).parameters()["properties"]) == ["query"]
+
+    @pytest.mark.asyncio
+    async def test_quote_fetch_nests_across_executor_thread(self, spans, replay_provider):
+        await fetch_stock_price_async("TSLA")
+
+        recorded = by_name(spans)
+        tool, fetch, quote = recorded["tool.fetch_stock_price"], recorded["fetch_stock_price"], recorded["market_data.quote"]
+        assert fetch.parent.span_id == tool.context.span_id
+        assert quote.parent.span_id == fetch.context.span_id
+        assert quote.attributes["market_data.provider"] == "replay"
+        assert fetch.attributes["cache.hit"] is False
+
+    @pytest.mark.asyncio
+    async def test_cache_hits_are_recorded(self, spans, replay_provider):
+        await fetch_stock_price_async("TSLA")
+        spans.clear()
+
+        await fetch_stock_price_async("TSLA")
+        await fetch_stock_prices_async(["TSLA", "TSLA"])
+
+        recorded = by_name(spans)
+        assert recorded["tool.fetch_stock_price"].attributes["cache.hit"] is True
+        assert recorded["tool.fetch_stock_prices"].attributes["cache.hits"] == 1
+        assert recorded["tool.fetch_stock_prices"].attributes["stock.tickers"] == ("TSLA", "TSLA")
+        assert "market_data.quote" not in recorded
+
+    @pytest.mark.asyncio
+    async def test_credential_fetch_is_traced(self, spans):
+        credential = CachingCredential(FakeTokenSource())
+
+        await credential.get_token("scope")
+        await credential.get_token("scope")
+
+        names = [s.name for s in spans.get_finished_spans()]
+        assert names.count("credential.fetch") == 1
+        assert names.count("credential.get_token") == 1
+
+
+class TestOrchestratorSpans:
+    """The orchestrator's stages show up as one trace per query."""
+
+    @pytest.fixture
+    def orchestrator(self):
+        orchestrator = StockAnalyzerAgent(enable_fast_path=False, max_workflows=1)
+        orchestrator._client = FakeChatClient("Tesla is up")
+        with patch('src.agents.stock_orchestrator.stock_agent_factory',
+                   side_effect=lambda client, provider=None: client.create_agent(name="StockAgent")):
+            yield orchestrator
+
+    @pytest.mark.asyncio
+    async def test_workflow_stages(self, spans, orchestrator):
+        await orchestrator.analyze_stock("Compare Tesla and Apple", stream=False)
+
+        recorded = by_name(spans)
+        analyze = recorded["analyze"]
+        assert {"workflow.create", "agent.create", "workflow.run"} <= recorded.keys()
+        assert recorded["workflow.run"].parent.span_id == analyze.context.span_id
+        assert analyze.attributes["analyze.fast_path"] is False
+
+    @pytest.mark.asyncio
+    async def test_streamed_run_records_ttfb(self, spans, orchestrator):
+        events = [event async for event in orchestrator.analyze_stock("Compare Tesla and Apple", stream=True)]
+
+        assert events[-1].kind == "done"
+        run = by_name(spans)["workflow.run"]
+        assert run.attributes["workflow.stream"] is True
+        assert run.attributes["workflow.ttfb"] > 0
+
+    @pytest.mark.asyncio
+    async def test_start_up_span(self, spans):
+        with patch("agent_framework.azure.AzureAIAgentClient"), \
+                patch("src.agents.stock_orchestrator.get_credential",
+                      return_value=CachingCredential(FakeTokenSource())):
+            async with StockAnalyzerAgent():
+                await asyncio.sleep(0)
+
+        recorded = by_name(spans)
+        assert "orchestrator.start" in recorded
+        assert recorded["credential.fetch"].parent.span_id == recorded["orchestrator.start"].context.span_id
+
+
+class TestConfiguration:
+    """Tests for exporter selection."""
+
+    def test_unknown_exporter(self):
+        with pytest.raises(ConfigurationError):
+            configure_tracing("zipkin")
+
+    def test_azure_exporter_needs_connection_string(self):
+        with pytest.raises(ConfigurationError):
+            configure_tracing("azure")
+        assert not tracing_enabled()
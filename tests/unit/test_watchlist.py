@@ -0,0 +1,155 @@
+"""Unit tests for the watchlist vector index and retriever."""
+import json
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from src.utils.vector_index import HashingEmbedder, VectorIndex
+from src.utils.watchlist import (
+    WatchlistRetriever, current_watchlist_user, load_watchlists, set_watchlist_retriever, watchlist_user,
+)
+
+FIXTURE = Path(__file__).resolve().parents[1] / "fixtures" / "watchlist.json"
+
+
+class CountingEmbedder(HashingEmbedder):
+    """HashingEmbedder that records how many texts it embedded."""
+
+    def __init__(self):
+        super().__init__(dim=128)
+        self.texts = []
+
+    def embed(self, texts):
+        self.texts.extend(texts)
+        return super().embed(texts)
+
+
+@pytest.fixture
+def watchlist_path(tmp_path):
+    path = tmp_path / "watchlist.json"
+    shutil.copy(FIXTURE, path)
+    return path
+
+
+@pytest.fixture
+def embedder():
+    return CountingEmbedder()
+
+
+@pytest.fixture
+def retriever(tmp_path, watchlist_path, embedder):
+    return WatchlistRetriever(watchlist_path, VectorIndex(tmp_path / "index", embedder))
+
+
+def rewrite(path, update):
+    data = json.loads(path.read_text())
+    update(data)
+    path.write_text(json.dumps(data))
+
+
+class TestHashingEmbedder:
+    """Test cases for HashingEmbedder."""
+
+    def test_deterministic_and_normalized(self):
+        embedder = HashingEmbedder(dim=64)
+        first, second = embedder.embed(["electric vehicles", "electric vehicles"])
+
+        np.testing.assert_array_equal(first, second)
+        assert np.linalg.norm(first) == pytest.approx(1.0)
+        assert first.dtype == np.float32
+
+    def test_similar_texts_score_higher(self):
+        a, b, c = HashingEmbedder().embed(["bank dividend", "banks paying dividends", "oil and gas"])
+        assert a @ b > a @ c
+
+
+class TestWatchlistRetriever:
+    """Test cases for WatchlistRetriever."""
+
+    def test_load_watchlists(self):
+        watchlists = load_watchlists(FIXTURE)
+        assert [e.ticker for e in watchlists["bob"]] == ["AAPL", "KO"]
+        assert watchlists["alice"][0].tags == ("ev", "growth")
+
+    def test_search_ranks_relevant_entries(self, retriever):
+        hits = retriever.search("alice", "which banks do I own?", k=2)
+
+        assert hits[0]["ticker"] == "JPM"
+        assert len(hits) == 2
+        assert hits[0]["score"] >= hits[1]["score"]
+
+    def test_search_is_scoped_per_user(self, retriever):
+        assert {hit["ticker"] for hit in retriever.search("bob", "dividend", k=10)} == {"AAPL", "KO"}
+        assert retriever.search("carol", "dividend") == []
+
+    def test_similar_user_ids_get_separate_collections(self, retriever, watchlist_path):
+        rewrite(watchlist_path, lambda data: data["users"].update({
+            "a.b": [{"ticker": "KO", "name": "Coca-Cola", "note": "dividend"}],
+            "a_b": [{"ticker": "XOM", "name": "Exxon Mobil", "note": "oil dividend"}],
+        }))
+
+        assert [hit["ticker"] for hit in retriever.search("a.b", "dividend", k=10)] == ["KO"]
+        assert [hit["ticker"] for hit in retriever.search("a_b", "dividend", k=10)] == ["XOM"]
+
+    def test_queries_do_not_reembed_watchlist(self, retriever, embedder):
+        retriever.search("alice", "energy")
+        embedded = len(embedder.texts)
+        retriever.search("alice", "semiconductors")
+        retriever.search("bob", "phones")
+
+        assert embedded == 6 + 1
+        assert len(embedder.texts) == embedded + 2  # only the two queries
+
+    def test_changed_entries_are_reembedded_incrementally(self, retriever, embedder, watchlist_path):
+        retriever.refresh()
+        embedder.texts.clear()
+
+        def update(data):
+            data["users"]["alice"][0]["note"] = "Robotaxi launch"
+            data["users"]["alice"].append({"ticker": "AMD", "note": "GPUs"})
+            del data["users"]["alice"][3]  # XOM
+
+        rewrite(watchlist_path, update)
+        retriever.refresh()
+
+        assert len(embedder.texts) == 2
+        assert {e.ticker for e in retriever.entries("alice")} == {"TSLA", "NVDA", "JPM", "AMD"}
+        assert retriever.search("alice", "robotaxi", k=1)[0]["ticker"] == "TSLA"
+
+    def test_index_persists_across_processes(self, tmp_path, retriever, watchlist_path):
+        retriever.refresh()
+
+        embedder = CountingEmbedder()
+        restarted = WatchlistRetriever(watchlist_path, VectorIndex(tmp_path / "index", embedder))
+        hits = restarted.search("alice", "oil", k=1)
+
+        assert embedder.texts == ["oil"]
+        assert hits[0]["ticker"] == "XOM"
+
+    def test_missing_file_means_empty_watchlists(self, tmp_path):
+        retriever = WatchlistRetriever(tmp_path / "none.json", VectorIndex(tmp_path / "index", HashingEmbedder()))
+        assert retriever.search("alice", "anything") == []
+
+
+class TestWatchlistUser:
+    """Test cases for the per-request watchlist user."""
+
+    def test_context_scopes_user(self):
+        with watchlist_user("alice"):
+            assert current_watchlist_user() == "alice"
+        assert current_watchlist_user() == "default"
+
+    @pytest.mark.asyncio
+    async def test_tool_searches_current_user(self, retriever):
+        from src.agents.stock_agent import search_watchlist_async
+
+        set_watchlist_retriever(retriever)
+        try:
+            with watchlist_user("bob"):
+                hits = await search_watchlist_async("soft drinks dividend", k=1)
+        finally:
+            set_watchlist_retriever(None)
+
+        assert hits[0]["ticker"] == "KO"